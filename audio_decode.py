@@ -0,0 +1,501 @@
+"""
+Compressed Audio Ingest
+Server-side decode of Opus audio from the browser's MediaRecorder (WebM) or Ogg pages,
+so the uplink carries ~32 kbps Opus instead of 384 kbps PCM16 and every provider,
+the VAD gate and the recorder still see PCM16 24kHz mono.
+
+Both containers are demuxed incrementally: chunks are fed as they arrive (a
+MediaRecorder timeslice ends anywhere in a cluster) and only the unfinished tail of an
+element / page is held, never the whole stream. Opus packets are decoded straight to
+24kHz with libopus (the optional `opuslib` binding; the server only advertises the Opus
+codecs when it imports).
+
+Demuxing and decoding run in a pool of worker processes, off the Socket.IO threads and
+the GIL. A session's stream always goes to the same worker (decoders are stateful) and
+one worker handles one chunk at a time, so decoded audio comes back in order. The CPU
+time spent per second of decoded audio is counted per session and served at /metrics.
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from audio_framing import CODEC_OPUS_OGG, CODEC_OPUS_WEBM
+from latency_metrics import LogHistogram
+
+logger = logging.getLogger(__name__)
+
+try:
+    import opuslib  # Needs the libopus shared library
+    OPUS_AVAILABLE = True
+except Exception:
+    opuslib = None
+    OPUS_AVAILABLE = False
+    logger.warning("opuslib not available - compressed (Opus) audio from the browser will not be accepted. "
+                   "Install with: pip install opuslib (needs libopus)")
+
+# Decode worker processes (each owns the decoders of the sessions hashed to it)
+AUDIO_DECODE_WORKERS = int(os.getenv("AUDIO_DECODE_WORKERS", "2"))
+
+DECODE_SAMPLE_RATE = 24000
+DECODE_BYTES_PER_SECOND = DECODE_SAMPLE_RATE * 2
+# Longest Opus packet (120ms) at the decode rate, per channel
+OPUS_MAX_FRAME_SAMPLES = DECODE_SAMPLE_RATE * 120 // 1000
+
+WEBM_MAGIC = b"\x1a\x45\xdf\xa3"  # EBML header element id
+OGG_MAGIC = b"OggS"
+
+
+def sniff_codec(data) -> Optional[int]:
+    """Container of un-framed compressed audio from its first bytes (CODEC_OPUS_WEBM / CODEC_OPUS_OGG), or None"""
+    head = bytes(data[:4])
+    if head == WEBM_MAGIC:
+        return CODEC_OPUS_WEBM
+    if head == OGG_MAGIC:
+        return CODEC_OPUS_OGG
+    return None
+
+
+def parse_opus_head(data: bytes) -> Tuple[int, int]:
+    """
+    Channel count and pre-skip of an OpusHead header (RFC 7845)
+
+    Returns:
+        (channels, pre_skip in 48kHz samples)
+    """
+    if len(data) < 19 or data[:8] != b"OpusHead":
+        raise ValueError("not an OpusHead header")
+    return data[9], struct.unpack_from("<H", data, 10)[0]
+
+
+# --- WebM (Matroska) --------------------------------------------------------------
+
+_EBML_UNKNOWN_SIZE = -1
+
+# Elements descended into (their children are parsed; size is not needed, may be unknown)
+_WEBM_SEGMENT = 0x18538067
+_WEBM_CLUSTER = 0x1F43B675
+_WEBM_TRACKS = 0x1654AE6B
+_WEBM_TRACK_ENTRY = 0xAE
+_WEBM_BLOCK_GROUP = 0xA0
+_WEBM_MASTERS = {_WEBM_SEGMENT, _WEBM_CLUSTER, _WEBM_TRACKS, _WEBM_TRACK_ENTRY, _WEBM_BLOCK_GROUP}
+# Leaf elements that are read (held until complete); everything else is skipped as it streams past
+_WEBM_TRACK_NUMBER = 0xD7
+_WEBM_CODEC_ID = 0x86
+_WEBM_CODEC_PRIVATE = 0x63A2
+_WEBM_SIMPLE_BLOCK = 0xA3
+_WEBM_BLOCK = 0xA1
+_WEBM_READ = {_WEBM_TRACK_NUMBER, _WEBM_CODEC_ID, _WEBM_CODEC_PRIVATE, _WEBM_SIMPLE_BLOCK, _WEBM_BLOCK}
+
+
+def _read_vint(buf, pos: int, is_id: bool = False):
+    """
+    EBML variable-length integer at buf[pos]
+
+    Returns:
+        (value, length), or None if buf ends first. Sizes with all value bits set are
+        _EBML_UNKNOWN_SIZE; ids keep their length marker bits.
+
+    Raises:
+        ValueError: On an invalid first byte
+    """
+    if pos >= len(buf):
+        return None
+    first = buf[pos]
+    if first == 0:
+        raise ValueError("invalid EBML variable-length integer")
+    length = 9 - first.bit_length()
+    if pos + length > len(buf):
+        return None
+    value = first if is_id else first & ((1 << (8 - length)) - 1)
+    for i in range(1, length):
+        value = (value << 8) | buf[pos + i]
+    if not is_id and value == (1 << (7 * length)) - 1:
+        value = _EBML_UNKNOWN_SIZE
+    return value, length
+
+
+def _split_laced(payload: bytes, lacing: int) -> List[bytes]:
+    """Frames of a Matroska block payload (after the flags byte)"""
+    if lacing == 0:
+        return [payload]
+    count = payload[0] + 1
+    pos = 1
+    sizes: List[int] = []
+    if lacing == 1:  # Xiph: sizes as runs of 255
+        for _ in range(count - 1):
+            size = 0
+            while True:
+                byte = payload[pos]
+                pos += 1
+                size += byte
+                if byte != 255:
+                    break
+            sizes.append(size)
+    elif lacing == 3:  # EBML: first size, then signed differences
+        size, length = _read_vint(payload, pos)
+        pos += length
+        sizes.append(size)
+        for _ in range(count - 2):
+            raw, length = _read_vint(payload, pos)
+            pos += length
+            size += raw - ((1 << (7 * length - 1)) - 1)
+            sizes.append(size)
+    else:  # Fixed: equal sizes
+        sizes = [(len(payload) - pos) // count] * (count - 1)
+    sizes.append(len(payload) - pos - sum(sizes))
+    frames = []
+    for size in sizes:
+        frames.append(payload[pos:pos + size])
+        pos += size
+    return frames
+
+
+class WebMOpusDemuxer:
+    """Incremental WebM demuxer returning the Opus packets of the first Opus track"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._skip = 0  # Bytes of a skipped element still to come
+        self._entry_track: Optional[int] = None
+        self.track_number: Optional[int] = None
+        self.channels: Optional[int] = None
+        self.pre_skip = 0
+
+    def feed(self, data) -> List[bytes]:
+        """
+        Demux the next chunk of the stream
+
+        Returns:
+            Opus packets completed by this chunk, in order
+
+        Raises:
+            ValueError: If the data is not valid EBML
+        """
+        data = memoryview(data)
+        if self._skip:
+            skipped = min(self._skip, len(data))
+            self._skip -= skipped
+            data = data[skipped:]
+        self._buffer += data
+        packets: List[bytes] = []
+        buf = self._buffer
+        pos = 0
+        while True:
+            element_id = _read_vint(buf, pos, is_id=True)
+            if element_id is None:
+                break
+            size = _read_vint(buf, pos + element_id[1])
+            if size is None:
+                break
+            element_id, header = element_id[0], element_id[1] + size[1]
+            size = size[0]
+            if element_id in _WEBM_MASTERS or size == _EBML_UNKNOWN_SIZE:
+                pos += header
+                continue
+            if element_id in _WEBM_READ:
+                if pos + header + size > len(buf):
+                    break
+                self._read(element_id, bytes(buf[pos + header:pos + header + size]), packets)
+                pos += header + size
+                continue
+            # Skipped element: drop what has arrived, remember how much is still to come
+            available = len(buf) - pos - header
+            if size > available:
+                self._skip = size - available
+                pos = len(buf)
+                break
+            pos += header + size
+        del buf[:pos]
+        return packets
+
+    def _read(self, element_id: int, body: bytes, packets: List[bytes]):
+        if element_id == _WEBM_TRACK_NUMBER:
+            self._entry_track = int.from_bytes(body, "big")
+        elif element_id == _WEBM_CODEC_ID:
+            if body.rstrip(b"\x00") == b"A_OPUS" and self.track_number is None:
+                self.track_number = self._entry_track
+        elif element_id == _WEBM_CODEC_PRIVATE:
+            if self._entry_track == self.track_number and body[:8] == b"OpusHead":
+                self.channels, self.pre_skip = parse_opus_head(body)
+        else:
+            track, length = _read_vint(body, 0)
+            if self.track_number is None:
+                self.track_number = track
+            if track != self.track_number:
+                return
+            flags = body[length + 2]
+            packets.extend(_split_laced(body[length + 3:], (flags >> 1) & 3))
+
+
+# --- Ogg ----------------------------------------------------------------------------
+
+_OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+
+
+class OggOpusDemuxer:
+    """Incremental Ogg demuxer returning the audio packets of the first Opus stream"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._packet = bytearray()  # Packet continued on the next page
+        self.serial: Optional[int] = None
+        self.channels: Optional[int] = None
+        self.pre_skip = 0
+        self._headers_seen = 0
+
+    def feed(self, data) -> List[bytes]:
+        """
+        Demux the next chunk of the stream
+
+        Returns:
+            Opus audio packets completed by this chunk, in order (OpusHead/OpusTags are consumed)
+
+        Raises:
+            ValueError: If the data is not a sequence of Ogg pages
+        """
+        self._buffer += memoryview(data)
+        packets: List[bytes] = []
+        buf = self._buffer
+        pos = 0
+        while len(buf) - pos >= _OGG_PAGE_HEADER.size:
+            magic, version, header_type, granule, serial, page_seq, crc, segments = _OGG_PAGE_HEADER.unpack_from(buf, pos)
+            if magic != OGG_MAGIC:
+                raise ValueError("lost Ogg page sync")
+            table_start = pos + _OGG_PAGE_HEADER.size
+            if len(buf) < table_start + segments:
+                break
+            lacing = buf[table_start:table_start + segments]
+            body_start = table_start + segments
+            page_end = body_start + sum(lacing)
+            if len(buf) < page_end:
+                break
+            if self.serial is None and header_type & 0x02:
+                self.serial = serial
+            if serial == self.serial:
+                if not header_type & 0x01:
+                    self._packet.clear()  # Not a continuation - drop a packet that never finished
+                offset = body_start
+                for value in lacing:
+                    self._packet += buf[offset:offset + value]
+                    offset += value
+                    if value < 255:
+                        self._packet_done(bytes(self._packet), packets)
+                        self._packet.clear()
+            pos = page_end
+        del buf[:pos]
+        return packets
+
+    def _packet_done(self, packet: bytes, packets: List[bytes]):
+        if self._headers_seen == 0:
+            self.channels, self.pre_skip = parse_opus_head(packet)
+            self._headers_seen = 1
+        elif self._headers_seen == 1 and packet[:8] == b"OpusTags":
+            self._headers_seen = 2
+        else:
+            packets.append(packet)
+
+
+def open_demuxer(codec: int):
+    """Demuxer for a container codec id"""
+    if codec == CODEC_OPUS_WEBM:
+        return WebMOpusDemuxer()
+    if codec == CODEC_OPUS_OGG:
+        return OggOpusDemuxer()
+    raise ValueError(f"unsupported compressed audio codec {codec}")
+
+
+# --- Decode workers ----------------------------------------------------------------
+
+class _DecodeStream:
+    """A stream's demuxer and decoder, living in a worker process"""
+
+    def __init__(self, codec: int):
+        self.demuxer = open_demuxer(codec)
+        self.decoder = None
+        self.skip_samples: Optional[int] = None  # Pre-skip left to drop, at the decode rate
+
+
+_worker_streams: Dict[str, _DecodeStream] = {}
+
+
+def _decode_chunk(stream_id: str, codec: int, data: bytes, reset: bool) -> Tuple[bytes, float]:
+    """
+    Demux and decode one chunk of a stream (runs in a worker process)
+
+    Returns:
+        (PCM16 24kHz mono, CPU seconds spent)
+    """
+    started = time.process_time()
+    stream = _worker_streams.get(stream_id)
+    if stream is None or reset:
+        stream = _worker_streams[stream_id] = _DecodeStream(codec)
+    packets = stream.demuxer.feed(data)
+    pcm: List[bytes] = []
+    for packet in packets:
+        if stream.decoder is None:
+            channels = stream.demuxer.channels or 1
+            stream.decoder = opuslib.Decoder(DECODE_SAMPLE_RATE, channels)
+            stream.skip_samples = stream.demuxer.pre_skip * DECODE_SAMPLE_RATE // 48000
+        decoded = stream.decoder.decode(packet, OPUS_MAX_FRAME_SAMPLES)
+        if (stream.demuxer.channels or 1) > 1:
+            samples = np.frombuffer(decoded, dtype='<i2').reshape(-1, stream.demuxer.channels)
+            decoded = samples.mean(axis=1).astype('<i2').tobytes()
+        if stream.skip_samples:
+            dropped = min(stream.skip_samples, len(decoded) // 2)
+            stream.skip_samples -= dropped
+            decoded = decoded[dropped * 2:]
+        pcm.append(decoded)
+    return b"".join(pcm), time.process_time() - started
+
+
+def _close_stream(stream_id: str):
+    _worker_streams.pop(stream_id, None)
+
+
+class DecodeStats:
+    """Process-wide decode cost: CPU time per second of decoded audio"""
+
+    def __init__(self):
+        self.chunks = 0
+        self.errors = 0
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.cost = LogHistogram()  # ms of CPU per second of audio, per chunk
+        self._lock = threading.Lock()
+
+    def record(self, audio_seconds: float, cpu_seconds: float):
+        with self._lock:
+            self.chunks += 1
+            self.audio_seconds += audio_seconds
+            self.cpu_seconds += cpu_seconds
+            if audio_seconds > 0:
+                self.cost.record(cpu_seconds * 1000 / audio_seconds)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            cost = self.cost.summary()
+            return {
+                "chunks": self.chunks,
+                "errors": self.errors,
+                "audio_seconds": round(self.audio_seconds, 3),
+                "cpu_seconds": round(self.cpu_seconds, 6),
+                "cost_p50_ms_per_audio_sec": cost["p50"],
+                "cost_p99_ms_per_audio_sec": cost["p99"],
+            }
+
+    def prometheus_text(self) -> str:
+        """Counters and cost quantiles in Prometheus text exposition format (empty until audio is decoded)"""
+        stats = self.snapshot()
+        if not stats["chunks"] and not stats["errors"]:
+            return ""
+        lines = [
+            "# HELP stt_audio_decode_audio_seconds_total Seconds of compressed browser audio decoded",
+            "# TYPE stt_audio_decode_audio_seconds_total counter",
+            f"stt_audio_decode_audio_seconds_total {stats['audio_seconds']}",
+            "# HELP stt_audio_decode_cpu_seconds_total Worker CPU seconds spent demuxing and decoding",
+            "# TYPE stt_audio_decode_cpu_seconds_total counter",
+            f"stt_audio_decode_cpu_seconds_total {stats['cpu_seconds']}",
+            "# HELP stt_audio_decode_errors_total Compressed audio chunks that failed to decode",
+            "# TYPE stt_audio_decode_errors_total counter",
+            f"stt_audio_decode_errors_total {stats['errors']}",
+            "# HELP stt_audio_decode_cost_ms_per_audio_second Decode CPU ms per second of audio, per chunk",
+            "# TYPE stt_audio_decode_cost_ms_per_audio_second summary",
+        ]
+        for q, key in ((0.5, "cost_p50_ms_per_audio_sec"), (0.99, "cost_p99_ms_per_audio_sec")):
+            value = stats[key]
+            lines.append(f'stt_audio_decode_cost_ms_per_audio_second{{quantile="{q}"}} {value if value is not None else "NaN"}')
+        return "\n".join(lines) + "\n"
+
+
+class AudioDecodePool:
+    """
+    Worker processes that demux and decode compressed audio streams.
+
+    Args:
+        workers: Number of worker processes (started on first use)
+    """
+
+    def __init__(self, workers: int = AUDIO_DECODE_WORKERS):
+        self.workers = max(1, workers)
+        self.stats = DecodeStats()
+        self._executors: List[ProcessPoolExecutor] = []
+        self._lock = threading.Lock()
+
+    def _executor(self, stream_id: str) -> ProcessPoolExecutor:
+        with self._lock:
+            if not self._executors:
+                # spawn, not fork: the app process is multi-threaded
+                context = multiprocessing.get_context("spawn")
+                self._executors = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.workers)]
+            return self._executors[zlib.crc32(stream_id.encode("utf-8")) % len(self._executors)]
+
+    def decode(self, stream_id: str, data, codec: int, reset: bool = False) -> Future:
+        """
+        Queue the next chunk of a stream
+
+        Args:
+            stream_id: Stream key (one demuxer + decoder per stream)
+            data: Container bytes as received
+            codec: CODEC_OPUS_WEBM or CODEC_OPUS_OGG
+            reset: Start a new stream (a new recording sends a new container header)
+
+        Returns:
+            Future resolving to (PCM16 24kHz mono audio - possibly empty, worker CPU seconds);
+            futures of one stream resolve in order
+        """
+        worker_future = self._executor(stream_id).submit(_decode_chunk, stream_id, codec, bytes(data), reset)
+        future: Future = Future()
+
+        def done(f: Future):
+            try:
+                pcm, cpu_seconds = f.result()
+            except Exception as e:
+                self.stats.record_error()
+                future.set_exception(e)
+                return
+            self.stats.record(len(pcm) / DECODE_BYTES_PER_SECOND, cpu_seconds)
+            future.set_result((pcm, cpu_seconds))
+
+        worker_future.add_done_callback(done)
+        return future
+
+    def close_stream(self, stream_id: str):
+        """Free a stream's demuxer and decoder"""
+        with self._lock:
+            if not self._executors:
+                return
+        self._executor(stream_id).submit(_close_stream, stream_id)
+
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = self._executors, []
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared decode pool for the whole process
+_shared_pool: Optional[AudioDecodePool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_audio_decode_pool() -> AudioDecodePool:
+    """Get the process-wide decode pool (worker processes start on the first chunk)"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = AudioDecodePool()
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
@@ -0,0 +1,189 @@
+"""
+Binary Audio Framing
+Versioned frame format for the audio_stream event, so dropped or reordered frames are
+visible and every frame carries the time it was captured.
+
+Frame layout (little-endian, 20-byte header, then the audio payload):
+
+    offset  size  field
+    0       2     magic b"AF"
+    2       1     version (1)
+    3       1     codec (1 = PCM16 little-endian mono, 2 = Opus in WebM, 3 = Opus in Ogg)
+    4       4     seq - uint32, 0 for the first frame of a recording, +1 per frame
+    8       4     sample_rate - uint32, Hz
+    12      8     capture_ms - float64, client wall clock (ms since the epoch) when the
+                  last sample of the frame was captured
+
+Opus frames carry consecutive pieces of one container stream (seq 0 starts with its
+header) and are decoded to PCM16 24kHz before anything else sees them.
+
+The header is read with struct.unpack_from and the payload is a memoryview slice of
+the Socket.IO message, so the audio is never copied on the way to the providers.
+Un-framed payloads (raw PCM16 from older clients) are still accepted.
+
+AudioFrameTracker follows one session's frame sequence: frames after a gap count the
+missing ones, frames older than one already seen are late (dropped - forwarding them
+would scramble the audio). It also estimates the client-to-server clock offset from
+the capture timestamps (the fastest frame is taken as zero network delay), which maps
+capture times onto this server's perf_counter clock for mic-to-transcript latency.
+"""
+import math
+import struct
+import time
+from typing import Dict, Optional
+
+from latency_metrics import LogHistogram
+
+FRAME_MAGIC = b"AF"
+FRAME_VERSION = 1
+CODEC_PCM16 = 1
+CODEC_OPUS_WEBM = 2  # Opus in WebM (MediaRecorder), decoded by audio_decode.py
+CODEC_OPUS_OGG = 3   # Opus in Ogg pages
+CODEC_NAMES = {CODEC_PCM16: "pcm16", CODEC_OPUS_WEBM: "opus_webm", CODEC_OPUS_OGG: "opus_ogg"}
+
+FRAME_HEADER = struct.Struct("<2sBBIId")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+
+class AudioFrame:
+    """
+    One parsed audio_stream frame.
+
+    Args:
+        seq: Frame sequence number within the recording
+        sample_rate: Sample rate of the payload
+        codec: Codec id (CODEC_PCM16)
+        capture_ms: Client capture time of the frame's last sample (ms since the epoch)
+        payload: Audio data - a memoryview into the received message
+    """
+    __slots__ = ("seq", "sample_rate", "codec", "capture_ms", "payload")
+
+    def __init__(self, seq: int, sample_rate: int, codec: int, capture_ms: float, payload: memoryview):
+        self.seq = seq
+        self.sample_rate = sample_rate
+        self.codec = codec
+        self.capture_ms = capture_ms
+        self.payload = payload
+
+    @property
+    def has_capture_time(self) -> bool:
+        """False for frames without a usable capture timestamp (0 / not finite)"""
+        return self.capture_ms > 0 and math.isfinite(self.capture_ms)
+
+
+def parse_audio_frame(data) -> Optional[AudioFrame]:
+    """
+    Parse a framed audio_stream payload without copying the audio
+
+    Args:
+        data: bytes-like Socket.IO message
+
+    Returns:
+        The AudioFrame, or None if the data isn't framed (raw PCM16 from an older client)
+
+    Raises:
+        ValueError: If the frame has an unsupported version
+    """
+    view = memoryview(data)
+    if view.ndim != 1 or view.itemsize != 1:
+        view = view.cast('B')
+    if len(view) < FRAME_HEADER_SIZE or view[:2] != FRAME_MAGIC:
+        return None
+    magic, version, codec, seq, sample_rate, capture_ms = FRAME_HEADER.unpack_from(view)
+    if version != FRAME_VERSION:
+        raise ValueError(f"unsupported audio frame version {version}")
+    return AudioFrame(seq, sample_rate, codec, capture_ms, view[FRAME_HEADER_SIZE:])
+
+
+def encode_audio_frame(seq: int, payload: bytes, sample_rate: int = 24000, codec: int = CODEC_PCM16,
+                       capture_ms: Optional[float] = None) -> bytes:
+    """
+    Build a framed audio_stream payload (what static/script.js sends)
+
+    Args:
+        seq: Frame sequence number
+        payload: Audio data
+        sample_rate: Sample rate of the payload
+        codec: Codec id
+        capture_ms: Capture time in ms since the epoch (default: now)
+
+    Returns:
+        Header + payload
+    """
+    if capture_ms is None:
+        capture_ms = time.time() * 1000
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, codec, seq, sample_rate, capture_ms) + bytes(payload)
+
+
+class AudioFrameTracker:
+    """Sequence, loss and timing tracking for one session's framed audio"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new recording (the client restarts seq at 0)"""
+        self.next_seq = 0
+        self.frames = 0
+        self.missing = 0
+        self.late = 0
+        self.clock_offset: Optional[float] = None  # perf_counter seconds minus capture seconds
+        self.last_capture_ms: Optional[float] = None
+        self.uplink = LogHistogram()
+
+    def observe(self, frame: AudioFrame, arrival: Optional[float] = None) -> bool:
+        """
+        Account for a received frame
+
+        Args:
+            frame: The parsed frame
+            arrival: perf_counter() time it arrived (default: now)
+
+        Returns:
+            False if the frame is late (older than a frame already received) and should be dropped
+        """
+        if frame.seq < self.next_seq:
+            self.late += 1
+            return False
+        self.missing += frame.seq - self.next_seq
+        self.next_seq = frame.seq + 1
+        self.frames += 1
+
+        arrival = time.perf_counter() if arrival is None else arrival
+        if frame.has_capture_time:
+            offset = arrival - frame.capture_ms / 1000.0
+            if self.clock_offset is None or offset < self.clock_offset:
+                self.clock_offset = offset
+            # Delay above the fastest frame so far: uplink queueing and jitter
+            self.uplink.record((offset - self.clock_offset) * 1000)
+            self.last_capture_ms = frame.capture_ms
+        return True
+
+    def capture_time(self, capture_ms: float) -> Optional[float]:
+        """
+        Map a client capture time onto this server's perf_counter clock
+
+        Returns:
+            perf_counter() seconds, or None before any timestamped frame arrived
+        """
+        if self.clock_offset is None:
+            return None
+        return capture_ms / 1000.0 + self.clock_offset
+
+    def capture_age_ms(self, now: Optional[float] = None) -> Optional[float]:
+        """Time since the newest received audio was captured (mic-to-now latency)"""
+        if self.last_capture_ms is None:
+            return None
+        now = time.perf_counter() if now is None else now
+        return (now - self.capture_time(self.last_capture_ms)) * 1000
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Frame counts and uplink delay percentiles for the recording"""
+        uplink = self.uplink.summary()
+        return {
+            "frames": self.frames,
+            "missing": self.missing,
+            "late": self.late,
+            "uplink_p50_ms": uplink["p50"],
+            "uplink_p99_ms": uplink["p99"],
+        }
@@ -0,0 +1,206 @@
+"""
+Provider Audio Pipeline
+Declarative conversion of a session's inbound audio into each provider's input format.
+
+Every provider declares the AudioFormat it wants (Deepgram and Azure OpenAI take PCM16
+24kHz, ElevenLabs PCM16 16kHz). plan_audio_pipeline() negotiates, once per (source,
+targets) combination, the stages each provider needs, in order:
+
+    resample  PCM16Resampler to the provider's sample rate
+    gain      fixed gain (AUDIO_GAIN_DB), clipped to the PCM16 range
+
+Stages that would not change the audio (same rate, 0 dB) are left out, and providers
+whose chains start the same share those stages: the plan is a tree, each node a
+stage fed by its parent's output. Decode happens before the pipeline (compressed audio
+is decoded by audio_decode.py), and chunking / base64 encoding stay in the provider
+handlers, whose AudioRingBuffers also hold audio while the connection opens.
+
+AudioPipeline instantiates a plan for one session (stages are stateful - the
+resampler carries samples across frames). process() runs only the nodes on the paths
+of the providers asked for, each once per frame, so compare mode converts a frame
+once per distinct format rather than once per provider.
+"""
+import functools
+import math
+import os
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from audio_resampler import PCM16Resampler
+
+# Gain applied to the audio every provider receives, in dB (0 disables the stage)
+AUDIO_GAIN_DB = float(os.getenv("AUDIO_GAIN_DB", "0"))
+
+LINEAR16 = "linear16"
+
+
+class AudioFormat:
+    """
+    Raw audio format a pipeline reads or a provider accepts.
+
+    Args:
+        sample_rate: Samples per second
+        encoding: Sample encoding (only little-endian PCM16, "linear16", is supported)
+        channels: Channel count
+    """
+    __slots__ = ("sample_rate", "encoding", "channels")
+
+    def __init__(self, sample_rate: int, encoding: str = LINEAR16, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.channels = channels
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.sample_rate * 2 * self.channels
+
+    def _key(self):
+        return (self.sample_rate, self.encoding, self.channels)
+
+    def __eq__(self, other):
+        return isinstance(other, AudioFormat) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"AudioFormat({self.sample_rate}, {self.encoding!r}, channels={self.channels})"
+
+
+class ResampleStage:
+    """Stateful sample rate conversion"""
+
+    def __init__(self, input_rate: int, output_rate: int):
+        self.resampler = PCM16Resampler(input_rate, output_rate)
+
+    def process(self, audio_bytes) -> bytes:
+        return self.resampler.process(audio_bytes)
+
+    def reset(self):
+        self.resampler.reset()
+
+
+class GainStage:
+    """Fixed gain with clipping"""
+
+    def __init__(self, gain_db: float):
+        self.gain = 10 ** (gain_db / 20)
+
+    def process(self, audio_bytes) -> bytes:
+        samples = np.frombuffer(audio_bytes, dtype='<i2', count=len(audio_bytes) // 2) * np.float32(self.gain)
+        np.rint(samples, out=samples)
+        np.clip(samples, -32768, 32767, out=samples)
+        return samples.astype('<i2').tobytes()
+
+    def reset(self):
+        pass
+
+
+_STAGE_TYPES = {"resample": ResampleStage, "gain": GainStage}
+
+
+def _stage_specs(source: AudioFormat, target: AudioFormat, gain_db: float) -> List[Tuple]:
+    """Stages converting source audio to target, no-ops left out"""
+    if source.encoding != LINEAR16 or target.encoding != LINEAR16:
+        raise ValueError(f"unsupported audio encoding: {source.encoding} -> {target.encoding}")
+    if source.channels != target.channels:
+        raise ValueError(f"channel conversion is not supported: {source.channels} -> {target.channels}")
+    specs = []
+    if source.sample_rate != target.sample_rate:
+        specs.append(("resample", source.sample_rate, target.sample_rate))
+    if gain_db and math.isfinite(gain_db):
+        specs.append(("gain", gain_db))
+    return specs
+
+
+@functools.lru_cache(maxsize=64)
+def plan_audio_pipeline(source: AudioFormat, targets: Tuple[Tuple[str, AudioFormat], ...],
+                        gain_db: float = AUDIO_GAIN_DB):
+    """
+    Negotiate the stage tree converting source audio to every target format (cached)
+
+    Args:
+        source: Format of the session's inbound audio
+        targets: (name, format) of every provider, in a stable order
+        gain_db: Gain applied to every target
+
+    Returns:
+        (nodes, paths): nodes is a tuple of (stage spec, parent node index or -1), parents
+        first; paths maps each target name to its node indices from the root (empty if
+        the source already matches)
+
+    Raises:
+        ValueError: If a target can't be produced from the source
+    """
+    nodes: List[Tuple[Tuple, int]] = []
+    index: Dict[Tuple[int, Tuple], int] = {}
+    paths: Dict[str, Tuple[int, ...]] = {}
+    for name, target in targets:
+        parent = -1
+        path = []
+        for spec in _stage_specs(source, target, gain_db):
+            node = index.get((parent, spec))
+            if node is None:
+                node = index[(parent, spec)] = len(nodes)
+                nodes.append((spec, parent))
+            path.append(node)
+            parent = node
+        paths[name] = tuple(path)
+    return tuple(nodes), paths
+
+
+class AudioPipeline:
+    """
+    Per-session instance of a pipeline plan.
+
+    Args:
+        source: Format of the session's inbound audio
+        targets: Provider name to the AudioFormat it accepts
+        gain_db: Gain applied for every provider
+    """
+
+    def __init__(self, source: AudioFormat, targets: Mapping[str, AudioFormat], gain_db: float = AUDIO_GAIN_DB):
+        self.source = source
+        self.targets = dict(targets)
+        nodes, self._paths = plan_audio_pipeline(source, tuple(sorted(self.targets.items(), key=lambda t: t[0])), gain_db)
+        self._parents = [parent for _, parent in nodes]
+        self._stages = [_STAGE_TYPES[spec[0]](*spec[1:]) for spec, _ in nodes]
+
+    @property
+    def stage_count(self) -> int:
+        """Stage instances shared by all providers"""
+        return len(self._stages)
+
+    def output_bytes(self, name: str, source_bytes: int) -> int:
+        """Bytes a provider receives for source_bytes of inbound audio"""
+        return source_bytes * self.targets[name].bytes_per_second // self.source.bytes_per_second
+
+    def process(self, audio_bytes, names: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Convert one inbound frame for the given providers
+
+        Args:
+            audio_bytes: Inbound audio in the source format
+            names: Providers to produce output for (their stages run once each)
+
+        Returns:
+            Provider name to its audio - the input itself when no conversion is needed
+        """
+        outputs: Dict[int, bytes] = {}
+        results = {}
+        for name in names:
+            data = audio_bytes
+            for node in self._paths[name]:
+                data = outputs.get(node)
+                if data is None:
+                    parent = self._parents[node]
+                    data = outputs[node] = self._stages[node].process(audio_bytes if parent < 0 else outputs[parent])
+            results[name] = data
+        return results
+
+    def reset(self, names: Optional[Iterable[str]] = None):
+        """Drop carried-over stage state (a new stream starts) for some providers, or all"""
+        nodes = range(len(self._stages)) if names is None else {n for name in names for n in self._paths[name]}
+        for node in nodes:
+            self._stages[node].reset()
@@ -0,0 +1,308 @@
+"""
+Session Audio Recorder and Replayer
+Opt-in capture of each session's inbound browser audio (PCM16 24kHz mono), so the exact
+same traffic can later be fed to every provider for reproducible latency comparisons.
+
+Enabled by setting AUDIO_RECORD_DIR. Each recording is a WAV file plus a JSON sidecar
+holding the arrival time and size of every frame:
+
+    <AUDIO_RECORD_DIR>/<session_id>-<YYYYmmdd-HHMMSS>.wav
+    <AUDIO_RECORD_DIR>/<session_id>-<YYYYmmdd-HHMMSS>.json
+
+The audio path only enqueues frames - files are opened, written and closed by one
+background writer thread. The queue is bounded: when it is full, frames are dropped and
+counted in the sidecar rather than blocking the Socket.IO handler.
+
+replay() streams a recording into any send function (a provider handler's send_audio_*,
+a Socket.IO client, ...) at the original pacing or faster.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import wave
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory for recordings - recording is disabled when unset
+AUDIO_RECORD_DIR = os.getenv("AUDIO_RECORD_DIR", "")
+# Frames buffered in memory before new ones are dropped
+AUDIO_RECORD_QUEUE_SIZE = int(os.getenv("AUDIO_RECORD_QUEUE_SIZE", "2000"))
+
+# Browser audio format (see static/audio-processor.js)
+RECORD_SAMPLE_RATE = 24000
+RECORD_SAMPLE_WIDTH = 2
+RECORD_CHANNELS = 1
+# Frame size assumed for WAV files without a sidecar (audio-processor.js chunk size)
+DEFAULT_FRAME_SAMPLES = 1024
+
+
+class _ActiveRecording:
+    """Writer-side state of one recording (only touched on the writer thread, except dropped)"""
+
+    def __init__(self, session_id: str, path: str, metadata: Dict[str, Any]):
+        self.session_id = session_id
+        self.path = path
+        self.metadata = metadata
+        self.start_time = time.perf_counter()
+        self.frames: List[Tuple[float, int]] = []
+        self.dropped = 0
+        self.wav: Optional[wave.Wave_write] = None
+
+
+class AudioRecorder:
+    """
+    Records inbound session audio through a single background writer thread.
+
+    Args:
+        directory: Output directory (recording is disabled when empty)
+        queue_size: Frames buffered before new ones are dropped
+    """
+
+    def __init__(self, directory: str = AUDIO_RECORD_DIR, queue_size: int = AUDIO_RECORD_QUEUE_SIZE):
+        self.directory = directory
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.written = 0
+        self.dropped = 0
+        self._active: Dict[str, _ActiveRecording] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def start(self, session_id: str, provider: str = "", language: str = "") -> Optional[str]:
+        """
+        Begin a new recording for a session, finishing any previous one
+
+        Args:
+            session_id: Session to record
+            provider: Provider the audio is streamed to (stored in the sidecar)
+            language: Selected language (stored in the sidecar)
+
+        Returns:
+            The WAV path, or None if recording is disabled
+        """
+        if not self.enabled:
+            return None
+        self.stop(session_id)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"{session_id}-{stamp}.wav")
+        recording = _ActiveRecording(session_id, path, {
+            "session_id": session_id,
+            "provider": provider,
+            "language": language,
+            "started_at": time.time(),
+        })
+        with self._lock:
+            self._ensure_writer()
+            self._active[session_id] = recording
+        # Control messages wait for room - only frames are dropped
+        self.queue.put(("start", recording))
+        logger.info(f"🎙️ Recording audio for session {session_id} to {path}")
+        return path
+
+    def write(self, session_id: str, audio_bytes: bytes):
+        """Queue one inbound frame - never blocks; a no-op if the session isn't being recorded"""
+        recording = self._active.get(session_id)
+        if recording is None:
+            return
+        arrival_ms = (time.perf_counter() - recording.start_time) * 1000
+        try:
+            self.queue.put_nowait(("frame", recording, arrival_ms, audio_bytes))
+        except queue.Full:
+            with self._lock:
+                recording.dropped += 1
+                self.dropped += 1
+
+    def stop(self, session_id: str):
+        """Finish a session's recording (the files are closed by the writer thread)"""
+        with self._lock:
+            recording = self._active.pop(session_id, None)
+        if recording is not None:
+            self.queue.put(("stop", recording))
+
+    def close(self):
+        """Finish all recordings and wait for the writer thread to write them out"""
+        with self._lock:
+            active = list(self._active)
+        for session_id in active:
+            self.stop(session_id)
+        thread = self._thread
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        """Active recordings, queued, written and dropped frame counts"""
+        return {
+            "active": len(self._active),
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audio-recorder", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                if item[0] == "frame":
+                    _, recording, arrival_ms, audio_bytes = item
+                    if recording.wav is not None:
+                        recording.wav.writeframesraw(audio_bytes)
+                        recording.frames.append((round(arrival_ms, 3), len(audio_bytes)))
+                        self.written += 1
+                elif item[0] == "start":
+                    self._open(item[1])
+                else:
+                    self._finish(item[1])
+            except Exception as e:
+                logger.error(f"Audio recorder error for session {item[1].session_id}: {e}")
+
+    def _open(self, recording: _ActiveRecording):
+        os.makedirs(self.directory, exist_ok=True)
+        recording.wav = wave.open(recording.path, 'wb')
+        recording.wav.setnchannels(RECORD_CHANNELS)
+        recording.wav.setsampwidth(RECORD_SAMPLE_WIDTH)
+        recording.wav.setframerate(RECORD_SAMPLE_RATE)
+
+    def _finish(self, recording: _ActiveRecording):
+        if recording.wav is None:
+            return
+        recording.wav.close()  # Patches the WAV header with the final length
+        recording.wav = None
+        sidecar = dict(recording.metadata)
+        sidecar.update({
+            "sample_rate": RECORD_SAMPLE_RATE,
+            "sample_width": RECORD_SAMPLE_WIDTH,
+            "channels": RECORD_CHANNELS,
+            "dropped": recording.dropped,
+            "frames": recording.frames,
+        })
+        with open(_sidecar_path(recording.path), 'w') as f:
+            json.dump(sidecar, f, separators=(",", ":"))
+        logger.info(f"🎙️ Recording finished for session {recording.session_id}: {len(recording.frames)} frames, "
+                    f"{recording.dropped} dropped -> {recording.path}")
+
+
+def _sidecar_path(wav_path: str) -> str:
+    return os.path.splitext(wav_path)[0] + ".json"
+
+
+class Recording:
+    """
+    A recorded audio stream loaded for replay.
+
+    Args:
+        audio: PCM16 audio bytes
+        frames: (arrival_ms, size_bytes) for each frame, in order
+        metadata: Sidecar fields (session_id, provider, language, sample_rate, ...)
+    """
+
+    def __init__(self, audio: bytes, frames: List[Tuple[float, int]], metadata: Dict[str, Any]):
+        self.audio = audio
+        self.frames = frames
+        self.metadata = metadata
+
+    @property
+    def duration_sec(self) -> float:
+        rate = self.metadata.get("sample_rate", RECORD_SAMPLE_RATE)
+        return len(self.audio) / (rate * RECORD_SAMPLE_WIDTH)
+
+    def iter_frames(self) -> Iterator[Tuple[float, bytes]]:
+        """Yield (arrival_sec, frame_bytes) in order"""
+        offset = 0
+        for arrival_ms, size in self.frames:
+            yield arrival_ms / 1000.0, self.audio[offset:offset + size]
+            offset += size
+
+
+def load_recording(path: str) -> Recording:
+    """
+    Load a recording for replay
+
+    Args:
+        path: WAV file path. Without a JSON sidecar next to it, the audio is split into
+            1024-sample frames arriving in real time, like the browser sends them.
+
+    Returns:
+        The Recording
+    """
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != RECORD_SAMPLE_WIDTH or wav.getnchannels() != RECORD_CHANNELS:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        rate = wav.getframerate()
+        audio = wav.readframes(wav.getnframes())
+
+    sidecar_path = _sidecar_path(path)
+    if os.path.exists(sidecar_path):
+        with open(sidecar_path) as f:
+            metadata = json.load(f)
+        frames = [(float(arrival_ms), int(size)) for arrival_ms, size in metadata.pop("frames")]
+    else:
+        metadata = {"sample_rate": rate}
+        frame_bytes = DEFAULT_FRAME_SAMPLES * RECORD_SAMPLE_WIDTH
+        frames = []
+        for offset in range(0, len(audio), frame_bytes):
+            size = min(frame_bytes, len(audio) - offset)
+            # A frame arrives once its last sample has been captured
+            frames.append(((offset + size) / (rate * RECORD_SAMPLE_WIDTH) * 1000, size))
+    return Recording(audio, frames, metadata)
+
+
+def replay(recording: Recording, send: Callable[[bytes], Any], speed: float = 1.0,
+           stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Stream a recording into a send function
+
+    Args:
+        recording: Recording to replay
+        send: Called with each frame's bytes, e.g.
+            lambda chunk: send_audio_to_azure_openai(chunk, session_id)
+        speed: Pacing relative to the original arrival times (2.0 = twice as fast);
+            0 sends every frame immediately
+        stop_event: Optional event that ends the replay early
+
+    Returns:
+        Number of frames sent
+    """
+    sent = 0
+    start = time.perf_counter()
+    for arrival_sec, frame in recording.iter_frames():
+        if stop_event is not None and stop_event.is_set():
+            break
+        if speed > 0:
+            delay = start + arrival_sec / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        send(frame)
+        sent += 1
+    return sent
+
+
+# Shared recorder for the whole process
+_shared_recorder: Optional[AudioRecorder] = None
+_shared_recorder_lock = threading.Lock()
+
+
+def get_audio_recorder() -> AudioRecorder:
+    """Get the process-wide audio recorder (disabled unless AUDIO_RECORD_DIR is set)"""
+    global _shared_recorder
+    with _shared_recorder_lock:
+        if _shared_recorder is None:
+            _shared_recorder = AudioRecorder()
+            atexit.register(_shared_recorder.close)
+        return _shared_recorder
@@ -0,0 +1,128 @@
+"""
+Streaming PCM16 Resampler
+Polyphase FIR resampler for converting browser audio (24kHz PCM16) to the
+sample rate a provider expects (e.g. 16kHz for ElevenLabs).
+
+The resampler is stateful: the tail of each frame is carried over to the next
+call so that chunk boundaries neither click nor drop samples. Keep one
+instance per session and call reset() when a new stream starts.
+"""
+import math
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Filter design - matches scipy.signal.resample_poly defaults (half_len = 10 * max(up, down),
+# Kaiser window with beta=5.0) so output is comparable with the usual reference resampler
+RESAMPLER_HALF_LEN_FACTOR = 10
+RESAMPLER_KAISER_BETA = 5.0
+
+
+def design_polyphase_filter(up: int, down: int) -> np.ndarray:
+    """
+    Design the anti-aliasing low-pass filter for up/down resampling and split it into phases
+
+    Args:
+        up: Interpolation factor
+        down: Decimation factor
+
+    Returns:
+        Filter bank of shape (up, taps_per_phase). Row p holds h[p::up] reversed so that
+        it can be applied to an input window with a single dot product.
+    """
+    max_rate = max(up, down)
+    half_len = RESAMPLER_HALF_LEN_FACTOR * max_rate
+    num_taps = 2 * half_len + 1
+    cutoff = 1.0 / max_rate  # Fraction of the upsampled Nyquist frequency
+
+    n = np.arange(num_taps) - half_len
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(num_taps, RESAMPLER_KAISER_BETA)
+    h *= up / h.sum()  # Unity DC gain after zero-stuffing by 'up'
+
+    # Pad so every phase has the same number of taps
+    taps_per_phase = math.ceil(num_taps / up)
+    padded = np.zeros(taps_per_phase * up)
+    padded[:num_taps] = h
+
+    bank = padded.reshape(taps_per_phase, up).T  # bank[p] == padded[p::up]
+    return np.ascontiguousarray(bank[:, ::-1], dtype=np.float32)
+
+
+class PCM16Resampler:
+    """
+    Stateful polyphase resampler for little-endian mono PCM16 audio.
+
+    Each call to process() returns exactly the output samples that can be produced
+    from the input seen so far; the remaining input is kept for the next call.
+    Processing a stream in chunks therefore yields the same samples as processing
+    it in one go.
+    """
+
+    def __init__(self, input_rate: int = 24000, output_rate: int = 16000):
+        gcd = math.gcd(input_rate, output_rate)
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.up = output_rate // gcd
+        self.down = input_rate // gcd
+        self.filter_bank = design_polyphase_filter(self.up, self.down)
+        self.taps = self.filter_bank.shape[1]
+
+        # Output m reads input window ending at floor(m * down / up) using phase (m * down) % up.
+        # One cycle of 'up' outputs consumes exactly 'down' inputs, so precompute one cycle.
+        cycle = np.arange(self.up) * self.down
+        self._cycle_offsets = cycle // self.up
+        self._cycle_phases = cycle % self.up
+
+        # Group delay of the filter, in output samples
+        self.delay = RESAMPLER_HALF_LEN_FACTOR * max(self.up, self.down) / self.down
+
+        self._lock = threading.Lock()
+        self._history = np.zeros(0, dtype=np.float32)
+        self._odd_byte = b""
+        self.reset()
+
+    def reset(self):
+        """Drop carried-over state - call when a new audio stream starts"""
+        with self._lock:
+            # Prime with silence so the first samples have a full filter window
+            self._history = np.zeros(self.taps - 1, dtype=np.float32)
+            self._odd_byte = b""
+
+    def process(self, audio_bytes: bytes) -> bytes:
+        """
+        Resample a frame of PCM16 audio
+
+        Args:
+            audio_bytes: PCM16 audio data at input_rate (any length)
+
+        Returns:
+            PCM16 audio data at output_rate
+        """
+        with self._lock:
+            if self._odd_byte:
+                audio_bytes = self._odd_byte + bytes(audio_bytes)
+                self._odd_byte = b""
+            if len(audio_bytes) % 2:
+                # Keep a dangling byte for the next frame rather than misaligning samples
+                self._odd_byte = bytes(audio_bytes[-1:])
+                audio_bytes = audio_bytes[:-1]
+
+            samples = np.frombuffer(audio_bytes, dtype='<i2')
+            x = np.concatenate((self._history, samples.astype(np.float32)))
+
+            num_blocks = (len(x) - (self.taps - 1)) // self.down
+            if num_blocks <= 0:
+                self._history = x
+                return b""
+
+            # Window start index for every output sample, shape (num_blocks, up)
+            starts = (np.arange(num_blocks)[:, None] * self.down) + self._cycle_offsets[None, :]
+            windows = sliding_window_view(x, self.taps)[starts]
+            out = np.einsum('bpk,pk->bp', windows, self.filter_bank[self._cycle_phases])
+
+            self._history = x[num_blocks * self.down:]
+
+        out = np.rint(out.ravel())
+        np.clip(out, -32768, 32767, out=out)
+        return out.astype('<i2').tobytes()
@@ -0,0 +1,177 @@
+"""
+Fixed-capacity Audio Ring Buffer
+Preallocated, memoryview-based byte ring used by the provider handlers to chunk
+outgoing audio without reallocating or copying the backlog on every chunk.
+
+The capacity and overflow policy only bound pre-connect buffering (append). Once a
+connection is open, send_through() passes frames through in chunks - whole chunks
+straight from the frame - and only holds the remainder shorter than one chunk, so
+no frame size can make a healthy connection drop audio.
+
+The buffer is not thread-safe on its own - callers hold their session's
+audio_buffer_lock around append/peek/consume/send_through, and must finish using a
+view returned by peek() before releasing the lock.
+"""
+import os
+from typing import Callable, List, TypeVar
+
+T = TypeVar("T")
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+
+# Pre-connect buffering: how many provider chunks of audio to hold while a connection is
+# establishing, and what to discard once that fills up (drop_oldest keeps the most recent audio)
+PRECONNECT_BUFFER_CHUNKS = int(os.getenv("PRECONNECT_BUFFER_CHUNKS", "10"))
+PRECONNECT_OVERFLOW_POLICY = os.getenv("PRECONNECT_OVERFLOW_POLICY", OVERFLOW_DROP_OLDEST)
+
+
+class AudioRingBuffer:
+    """
+    Byte ring buffer with fixed capacity.
+
+    Args:
+        capacity: Maximum number of bytes held
+        chunk_size: Largest chunk that will be peeked; a scratch area of this size is
+                    preallocated for chunks that wrap around the end of the ring
+        overflow: OVERFLOW_DROP_OLDEST to discard buffered audio to make room,
+                  OVERFLOW_DROP_NEWEST to discard the part of the incoming data that doesn't fit
+        align: Drops happen in multiples of this many bytes (2 keeps PCM16 samples intact)
+    """
+
+    def __init__(self, capacity: int, chunk_size: int, overflow: str = OVERFLOW_DROP_OLDEST, align: int = 2):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.align = max(1, align)
+        self.capacity = max(capacity - capacity % self.align, self.align)
+        self.chunk_size = chunk_size
+        self.overflow = overflow
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._scratch = memoryview(bytearray(chunk_size))
+        self._head = 0  # Index of the oldest byte
+        self._size = 0
+        self.dropped_bytes = 0  # Total bytes discarded by the overflow policy
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def clear(self):
+        """Discard all buffered bytes"""
+        self._head = 0
+        self._size = 0
+
+    def append(self, data) -> int:
+        """
+        Copy data into the ring, applying the overflow policy if it doesn't fit
+
+        Returns:
+            Number of bytes dropped to make it fit
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = memoryview(data).cast('B')
+        n = len(data)
+        dropped = 0
+
+        if n > self.capacity - self._size:
+            data, dropped = self._make_room(data)
+            n = len(data)
+
+        tail = self._head + self._size
+        if tail >= self.capacity:
+            tail -= self.capacity
+        end = tail + n
+        if end <= self.capacity:
+            self._view[tail:end] = data
+        else:
+            first = self.capacity - tail
+            self._view[tail:] = data[:first]
+            self._view[:n - first] = data[first:]
+        self._size += n
+        return dropped
+
+    def _make_room(self, data):
+        """Apply the overflow policy; returns the data to write and the number of bytes dropped"""
+        n = len(data)
+        free = self.capacity - self._size
+        if self.overflow == OVERFLOW_DROP_NEWEST:
+            keep = free - free % self.align
+            dropped = n - keep
+            data = data[:keep]
+        elif n >= self.capacity:
+            # Incoming data alone fills the ring - keep only its newest bytes
+            dropped = self._size + (n - self.capacity)
+            data = data[n - self.capacity:]
+            self.clear()
+        else:
+            dropped = n - free
+            dropped += -dropped % self.align
+            self.consume(dropped)
+        self.dropped_bytes += dropped
+        return data, dropped
+
+    def send_through(self, data, encode: Callable[[memoryview], T]) -> List[T]:
+        """
+        Pass data through the ring in chunk_size pieces, without the overflow policy
+
+        Buffered bytes (pre-connect backlog or a partial chunk) go out first, then whole
+        chunks are taken straight from data; only the remainder shorter than chunk_size
+        is kept for the next call.
+
+        Args:
+            data: Incoming audio
+            encode: Called with each complete chunk in stream order; the view is only
+                    valid during the call
+
+        Returns:
+            encode() results for the complete chunks
+        """
+        view = memoryview(data).cast('B')
+        encoded = []
+        offset = 0
+        while self._size:
+            if self._size < self.chunk_size:
+                # Top up the partial chunk - always fits, less than one chunk is buffered
+                take = min(self.chunk_size - self._size, len(view))
+                self.append(view[:take])
+                offset = take
+                if self._size < self.chunk_size:
+                    return encoded
+            encoded.append(encode(self.peek(self.chunk_size)))
+            self.consume(self.chunk_size)
+        while len(view) - offset >= self.chunk_size:
+            encoded.append(encode(view[offset:offset + self.chunk_size]))
+            offset += self.chunk_size
+        if offset < len(view):
+            self.append(view[offset:])
+        return encoded
+
+    def peek(self, n: int) -> memoryview:
+        """
+        View of the oldest n bytes without consuming them
+
+        The view points into the ring (or the scratch area when the bytes wrap) and is
+        only valid until the next append/consume/clear.
+        """
+        if n > self._size:
+            raise ValueError(f"Cannot peek {n} bytes, only {self._size} buffered")
+        end = self._head + n
+        if end <= self.capacity:
+            return self._view[self._head:end]
+        if n > self.chunk_size:
+            raise ValueError(f"Cannot peek {n} wrapped bytes, chunk_size is {self.chunk_size}")
+        first = self.capacity - self._head
+        self._scratch[:first] = self._view[self._head:]
+        self._scratch[first:n] = self._view[:n - first]
+        return self._scratch[:n]
+
+    def consume(self, n: int):
+        """Discard the oldest n bytes"""
+        n = min(n, self._size)
+        self._size -= n
+        # Rewind to the start when empty so the next chunks are contiguous
+        self._head = 0 if self._size == 0 else (self._head + n) % self.capacity
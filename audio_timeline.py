@@ -0,0 +1,151 @@
+"""
+Audio Timeline
+Maps a provider connection's audio stream position onto this server's clock, for true
+speech-end-to-final latency.
+
+ResponseTime (now - last_audio_send_time) is reset by every chunk sent, so it measures
+the time since the most recent frame rather than how long a provider took to finalise a
+piece of speech. Providers report where speech ends in *their* audio stream instead:
+
+    Deepgram      Results start + duration, or the end of the last word
+    Azure OpenAI  input_audio_buffer.speech_stopped audio_end_ms (per item_id)
+    ElevenLabs    committed_transcript_with_timestamps words[-1].end
+
+AudioTimeline records, for every chunk that enters the provider's stream, its
+cumulative end offset in bytes and the perf_counter() time its last sample was captured
+(the client's frame capture time when the audio is framed, else its arrival). A provider
+offset is mapped back by finding the chunk containing it and stepping back from the
+chunk's end at the stream's byte rate, so audio withheld by the VAD gate or dropped
+before the connection opened doesn't skew the result. The latency of a final is then
+its arrival time minus the capture time of the speech end it reports.
+
+One timeline per provider connection; it is reset whenever the provider's stream
+restarts at offset 0. Thread-safe: chunks are recorded from the Socket.IO handlers and
+looked up on the provider I/O loop.
+"""
+import bisect
+import os
+import threading
+import time
+from array import array
+from typing import Optional
+
+from audio_ring_buffer import OVERFLOW_DROP_NEWEST
+
+# Chunks remembered per timeline - older audio can no longer be looked up (~10 min at 170ms chunks)
+AUDIO_TIMELINE_MAX_CHUNKS = int(os.getenv("AUDIO_TIMELINE_MAX_CHUNKS", "4096"))
+# Provider offsets this far past the recorded audio still map (timestamp rounding)
+AUDIO_TIMELINE_TOLERANCE_SEC = 0.005
+
+
+class AudioTimeline:
+    """
+    Cumulative audio position to capture time map for one provider stream.
+
+    Args:
+        bytes_per_second: Byte rate of the audio the provider receives (PCM16: 2 x sample rate)
+        max_chunks: Chunks kept before the oldest half is forgotten
+    """
+
+    def __init__(self, bytes_per_second: int, max_chunks: int = AUDIO_TIMELINE_MAX_CHUNKS):
+        self.bytes_per_second = bytes_per_second
+        self.max_chunks = max(2, max_chunks)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Start a new provider stream (offset 0 is the next chunk recorded)"""
+        with self._lock:
+            self._ends = array('q')    # Cumulative byte offset of each chunk's end
+            self._times = array('d')   # perf_counter() time each chunk's last sample was captured
+            self.total_bytes = 0
+            self._first_start = 0  # Offset where the oldest remembered chunk starts
+            self.origin = 0  # Recorded bytes the provider never received (dropped before sending)
+
+    def record(self, nbytes: int, end_time: Optional[float] = None):
+        """
+        Append a chunk to the stream
+
+        Args:
+            nbytes: Size of the chunk as the provider receives it
+            end_time: perf_counter() time its last sample was captured (default: now)
+        """
+        if nbytes <= 0:
+            return
+        end_time = time.perf_counter() if end_time is None else end_time
+        with self._lock:
+            self.total_bytes += nbytes
+            self._ends.append(self.total_bytes)
+            self._times.append(end_time)
+            if len(self._ends) > self.max_chunks:
+                drop = len(self._ends) // 2
+                self._first_start = self._ends[drop - 1]
+                del self._ends[:drop]
+                del self._times[:drop]
+
+    def record_buffered(self, nbytes: int, dropped: int, overflow: str, end_time: Optional[float] = None):
+        """
+        Append a chunk that went into an AudioRingBuffer on its way to the provider
+
+        Args:
+            nbytes: Size of the chunk
+            dropped: Bytes the buffer's overflow policy discarded to fit it (AudioRingBuffer.append)
+            overflow: The buffer's overflow policy
+            end_time: perf_counter() time its last sample was captured (default: now)
+        """
+        end_time = time.perf_counter() if end_time is None else end_time
+        if overflow == OVERFLOW_DROP_NEWEST:
+            # The tail of the chunk was discarded
+            self.record(nbytes - dropped, end_time - dropped / self.bytes_per_second)
+        else:
+            # The oldest buffered audio was discarded
+            self.record(nbytes, end_time)
+            self.skip(dropped)
+
+    def skip(self, nbytes: int):
+        """The oldest nbytes not yet skipped never reach the provider (e.g. pre-connect buffer overflow)"""
+        if nbytes > 0:
+            with self._lock:
+                self.origin = min(self.origin + nbytes, self.total_bytes)
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio in the provider's stream so far"""
+        return (self.total_bytes - self.origin) / self.bytes_per_second
+
+    def time_at(self, audio_sec: float) -> Optional[float]:
+        """
+        Capture time of a position in the provider's stream
+
+        Args:
+            audio_sec: Offset in seconds from the start of the stream (provider timestamp)
+
+        Returns:
+            perf_counter() seconds, or None if the offset is outside the remembered audio
+        """
+        if audio_sec is None or audio_sec < 0:
+            return None
+        with self._lock:
+            position = self.origin + audio_sec * self.bytes_per_second
+            tolerance = AUDIO_TIMELINE_TOLERANCE_SEC * self.bytes_per_second
+            if not self._ends or position < self._first_start or position > self.total_bytes + tolerance:
+                return None
+            index = min(bisect.bisect_left(self._ends, position), len(self._ends) - 1)
+            return self._times[index] - (self._ends[index] - position) / self.bytes_per_second
+
+    def latency_ms(self, audio_sec: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Time from the capture of a stream position (e.g. the end of speech) until now
+
+        Args:
+            audio_sec: Provider timestamp in seconds from the start of the stream
+            now: perf_counter() time the result arrived (default: now)
+
+        Returns:
+            Milliseconds, or None if the position can't be mapped
+        """
+        captured = self.time_at(audio_sec)
+        if captured is None:
+            return None
+        now = time.perf_counter() if now is None else now
+        return (now - captured) * 1000
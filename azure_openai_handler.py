@@ -9,39 +9,23 @@ import base64
 import logging
 import threading
 import time
-import io
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from typing import Optional, TYPE_CHECKING, Dict
 from flask_socketio import SocketIO
+from timer_wheel import WheelTimer, get_timer_wheel
+from provider_io_loop import AsyncWebSocketConnection
+from audio_ring_buffer import AudioRingBuffer, PRECONNECT_BUFFER_CHUNKS, PRECONNECT_OVERFLOW_POLICY
+from performance_log import get_performance_logger
+from metrics_events import MetricEvent, SESSION_END, SESSION_START, TRANSCRIPTION, TRANSCRIPTION_COMPLETED
+from latency_metrics import CONNECTION_SETUP, SPEECH_END_TO_FINAL, latency_metrics
+from audio_timeline import AudioTimeline
+from transcript_segments import TranscriptSegments
+from warm_pool import get_warm_pool
 
 logger = logging.getLogger(__name__)
 
-# Configure performance logger (only add handler if not already added)
-performance_logger = logging.getLogger('azure_performance')
-performance_logger.setLevel(logging.INFO)
-if not performance_logger.handlers:
-    performance_handler = logging.FileHandler('voicesearch_performance.log')
-    performance_formatter = logging.Formatter('%(asctime)s - %(filename)s:%(lineno)d - %(message)s')
-    performance_handler.setFormatter(performance_formatter)
-    performance_logger.addHandler(performance_handler)
-performance_logger.propagate = False  # Don't propagate to root logger
-
-# Try to import pydub for audio conversion (optional)
-try:
-    from pydub import AudioSegment
-    PYDUB_AVAILABLE = True
-except ImportError:
-    PYDUB_AVAILABLE = False
-    logger.warning("pydub not available - WebM to PCM16 conversion will not work. Install with: pip install pydub")
-    logger.warning("Note: pydub requires ffmpeg to be installed on the system")
-
-if TYPE_CHECKING:
-    from websocket import WebSocketApp  # type: ignore
-else:
-    try:
-        from websocket import WebSocketApp  # type: ignore
-    except ImportError:
-        import websocket  # type: ignore
-        WebSocketApp = websocket.WebSocketApp  # type: ignore
+# Performance logger - records are written to voicesearch_performance.log by the shared background writer
+performance_logger = get_performance_logger('azure_performance')
 
 # Get silence timeout from environment (in milliseconds, convert to seconds)
 AZURE_SILENCE_TIMEOUT_MS = int(os.getenv("SILENCE_TIMEOUT", "5000"))  # Default 5 seconds if not set
@@ -49,6 +33,10 @@ AZURE_SILENCE_TIMEOUT_SEC = AZURE_SILENCE_TIMEOUT_MS / 1000.0
 
 # Audio chunk size to match CLI (1024 samples * 2 bytes per sample = 2048 bytes)
 AZURE_AUDIO_CHUNK_SIZE = 1024 * 2  # 2048 bytes for PCM16
+AZURE_BYTES_PER_SECOND = 24000 * 2  # PCM16 at 24kHz
+
+# How long initialize_azure_openai_connection waits for the connection to become ready
+AZURE_READY_TIMEOUT_SEC = 5.0
 
 # Session storage for Azure OpenAI connections - each session gets isolated state
 azure_sessions: Dict[str, 'AzureSession'] = {}
@@ -58,22 +46,25 @@ class AzureSession:
     def __init__(self, session_id: str, socketio: SocketIO):
         self.session_id = session_id
         self.socketio = socketio
-        self.ws: Optional['WebSocketApp'] = None
-        self.thread: Optional[threading.Thread] = None
+        self.ws: Optional[AsyncWebSocketConnection] = None
+        # Resolved with True once the connection can take audio, or with an exception if it fails first
+        self.ready: Optional[Future] = None
         self.session_start_time = None
         self.transcription_count = 0
         self.last_transcription_time = None
         self.last_audio_send_time = None
-        self.current_transcript = ""  # Full transcript shown to user (accumulated + current segment)
-        self.accumulated_transcript = ""  # Finalized/completed segments only
-        self.current_segment_transcript = ""  # Current segment being transcribed (from deltas)
+        self.transcript = TranscriptSegments()  # Completed segments + current segment (from deltas)
         self.connection_open = False
-        self.silence_timer = None
+        self.silence_timer: Optional[WheelTimer] = None
         self.silence_timer_started = False  # Track if silence timer has been started (to start only on first audio)
         self.language = "Auto"
         self.model = "gpt-4o-mini-transcribe"
-        self.audio_buffer = bytearray()
+        # Preallocated ring: pre-connect backlog (overflow drops per policy), then the partial chunk between frames
+        self.audio_buffer = AudioRingBuffer(AZURE_AUDIO_CHUNK_SIZE * PRECONNECT_BUFFER_CHUNKS, AZURE_AUDIO_CHUNK_SIZE, overflow=PRECONNECT_OVERFLOW_POLICY)
         self.audio_buffer_lock = threading.Lock()
+        # Capture time of the audio Azure received, and the stream offset where each item's speech ended
+        self.audio_timeline = AudioTimeline(AZURE_BYTES_PER_SECOND)
+        self.speech_end_ms: Dict[str, float] = {}
         
     def reset_performance_metrics(self):
         """Reset performance tracking for new session"""
@@ -81,9 +72,8 @@ class AzureSession:
         self.transcription_count = 0
         self.last_transcription_time = None
         self.last_audio_send_time = None
-        self.current_transcript = ""
-        self.accumulated_transcript = ""
-        self.current_segment_transcript = ""
+        self.transcript.clear()
+        self.speech_end_ms.clear()
         self.silence_timer_started = False  # Reset the silence timer started flag
 
 def get_azure_session(session_id: str, socketio: SocketIO) -> AzureSession:
@@ -110,17 +100,19 @@ def cleanup_azure_session(session_id: str):
 
 def reset_azure_silence_timer(session: AzureSession):
     """Reset the silence timeout timer when transcription is received or audio is sent"""
+    # Re-arm the existing wheel timer in place - no new thread per reset
     if session.silence_timer:
-        session.silence_timer.cancel()
-    session.silence_timer = threading.Timer(AZURE_SILENCE_TIMEOUT_SEC, lambda: handle_azure_silence_timeout(session))
-    session.silence_timer.start()
+        session.silence_timer.reset(AZURE_SILENCE_TIMEOUT_SEC)
+    else:
+        session.silence_timer = get_timer_wheel().schedule(
+            AZURE_SILENCE_TIMEOUT_SEC, lambda: handle_azure_silence_timeout(session), name=f"azure-silence:{session.session_id}"
+        )
     session.silence_timer_started = True
 
 def stop_azure_silence_timer(session: AzureSession):
     """Stop the silence timeout timer"""
     if session.silence_timer:
         session.silence_timer.cancel()
-        session.silence_timer = None
     session.silence_timer_started = False
 
 def handle_azure_silence_timeout(session: AzureSession):
@@ -145,17 +137,15 @@ def handle_azure_silence_timeout(session: AzureSession):
             f"Azure OpenAI session ended | Session: {session.session_id} | Duration: {session_duration_ms:.2f}ms | "
             f"TotalTranscriptions: {session.transcription_count} | Reason: SilenceTimeout"
         )
-        performance_logger.info(
-            f"SESSION_END | Session: {session.session_id} | TotalDuration: {session_duration_ms:.2f}ms | "
-            f"TotalTranscriptions: {session.transcription_count} | Reason: SilenceTimeout"
-        )
+        performance_logger.info(MetricEvent(
+            SESSION_END, session.session_id, provider="Azure OpenAI", model=session.model, language=session.language,
+            duration_ms=session_duration_ms, count=session.transcription_count, reason="SilenceTimeout"
+        ))
         session.session_start_time = None
         session.transcription_count = 0
         session.last_transcription_time = None
         session.last_audio_send_time = None
-        session.current_transcript = ""
-        session.accumulated_transcript = ""
-        session.current_segment_transcript = ""
+        session.transcript.clear()
     
     # Notify ONLY this specific user to stop recording
     session.socketio.emit('silence_timeout', {
@@ -165,6 +155,123 @@ def handle_azure_silence_timeout(session: AzureSession):
     
     stop_azure_silence_timer(session)
 
+def resolve_azure_ready(session: AzureSession, ws: AsyncWebSocketConnection, error: Optional[Exception] = None):
+    """Settle the readiness future of the session's current connection (first outcome wins)"""
+    ready = session.ready
+    if ready is None or session.ws is not ws or ready.done():
+        return
+    try:
+        if error:
+            ready.set_exception(error)
+        else:
+            ready.set_result(True)
+    except Exception:
+        # Already settled by the waiting thread (timeout)
+        pass
+
+# Transcription session configuration sent once a connection opens
+AZURE_SESSION_CONFIG = {
+    "type": "transcription_session.update",
+    "session": {
+        "input_audio_format": "pcm16",
+        "input_audio_transcription": {
+            "model": "gpt-4o-mini-transcribe"
+        },
+        "turn_detection": {
+            "type": "server_vad",
+            "threshold": 0.5,
+            "prefix_padding_ms": 1000,
+            "silence_duration_ms": 500
+        }
+    }
+}
+
+def azure_connection_target():
+    """
+    Realtime WebSocket URL and handshake headers from the environment
+    
+    Returns:
+        (url, headers)
+    
+    Raises:
+        ValueError: If the API key or endpoint is not configured
+    """
+    # Get Azure OpenAI credentials from environment
+    api_key = os.getenv("AZURE_OPENAI_API_KEY")
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    # Full WebSocket URL override (e.g. ws://127.0.0.1:8766/openai/realtime for the local mock_stt server)
+    ws_url_override = os.getenv("AZURE_OPENAI_WS_URL")
+    
+    if not api_key:
+        raise ValueError("AZURE_OPENAI_API_KEY environment variable is not set")
+    
+    if ws_url_override:
+        url = ws_url_override
+    elif not endpoint:
+        raise ValueError("AZURE_OPENAI_ENDPOINT environment variable is not set")
+    else:
+        # Parse endpoint: remove https:// or http:// if present, remove trailing slashes
+        endpoint_host = endpoint.strip()
+        if '://' in endpoint_host:
+            endpoint_host = endpoint_host.split('://')[1]
+        # Remove any trailing path or slashes
+        endpoint_host = endpoint_host.split('/')[0].rstrip('/')
+        
+        # Construct WebSocket URL
+        url = f"wss://{endpoint_host}/openai/realtime?api-version=2025-04-01-preview&intent=transcription"
+    return url, {"api-key": api_key}
+
+def open_warm_azure_connection(key: str, on_lost) -> Future:
+    """
+    Open an idle, configured Azure OpenAI connection for the warm pool (see warm_pool.py)
+    
+    Args:
+        key: Pool key - unused, the transcription session config doesn't depend on the language
+        on_lost: Called with the connection if it closes or fails while idle
+    
+    Returns:
+        Future resolving to the AsyncWebSocketConnection once the session config is sent
+    """
+    url, headers = azure_connection_target()
+    ready: Future = Future()
+    
+    def settle(ws, error=None):
+        if ready.done():
+            on_lost(ws)
+            return
+        try:
+            if error:
+                ready.set_exception(error)
+            else:
+                ready.set_result(ws)
+        except Exception:
+            # Cancelled by the pool (open timeout)
+            pass
+    
+    def on_open(ws):
+        try:
+            ws.send(json.dumps(AZURE_SESSION_CONFIG))
+        except Exception as e:
+            settle(ws, e)
+            return
+        settle(ws)
+    
+    # Replaced with the session's callbacks when the connection is claimed
+    ws = AsyncWebSocketConnection(
+        url,
+        header=headers,
+        on_open=on_open,
+        on_error=lambda ws, error: settle(ws, error if isinstance(error, Exception) else ConnectionError(str(error))),
+        on_close=lambda ws, code, reason: settle(ws, ConnectionError(f"closed before ready: {code} - {reason}")),
+        name="azure-warm"
+    )
+    ready.add_done_callback(lambda f: f.cancelled() and ws.close())
+    ws.start()
+    return ready
+
+# Configured connections waiting for a session (WARM_POOL_SIZE > 0) - one key, the config is the same for every language
+azure_warm_pool = get_warm_pool("Azure OpenAI", open_warm_azure_connection, lambda ws: ws.close())
+
 def initialize_azure_openai_connection(socketio_instance: SocketIO, language_name: str = "Auto", session_id: str = None):
     """
     Initialize Azure OpenAI WebSocket connection with automatic language detection
@@ -185,35 +292,20 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
         return False
         
     session = get_azure_session(session_id, socketio_instance)
+    session.socketio = socketio_instance  # The session may have been created for another mode (plain / compare)
     session.language = language_name
     
     # Clear audio buffer
     with session.audio_buffer_lock:
-        session.audio_buffer = bytearray()
-    
-    # Get Azure OpenAI credentials from environment
-    api_key = os.getenv("AZURE_OPENAI_API_KEY")
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-    
-    if not api_key:
-        logger.error(f"AZURE_OPENAI_API_KEY environment variable is not set for session {session.session_id}")
-        return False
+        session.audio_buffer.clear()
+        session.audio_timeline.reset()
     
-    if not endpoint:
-        logger.error(f"AZURE_OPENAI_ENDPOINT environment variable is not set for session {session.session_id}")
+    try:
+        url, headers = azure_connection_target()
+    except ValueError as e:
+        logger.error(f"{e} for session {session.session_id}")
         return False
     
-    # Parse endpoint: remove https:// or http:// if present, remove trailing slashes
-    endpoint_host = endpoint.strip()
-    if '://' in endpoint_host:
-        endpoint_host = endpoint_host.split('://')[1]
-    # Remove any trailing path or slashes
-    endpoint_host = endpoint_host.split('/')[0].rstrip('/')
-    
-    # Construct WebSocket URL
-    url = f"wss://{endpoint_host}/openai/realtime?api-version=2025-04-01-preview&intent=transcription"
-    headers = {"api-key": api_key}
-    
     logger.info(f"Initializing Azure OpenAI connection for session {session.session_id} to: {url}")
     
     # Close existing connection if any
@@ -248,33 +340,16 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
         
         # Clear any buffered audio from previous sessions
         with session.audio_buffer_lock:
-            session.audio_buffer = bytearray()
+            session.audio_buffer.clear()
+            session.audio_timeline.reset()
         
         # Log session start to performance log
-        performance_logger.info(
-            f"SESSION_START | Session: {session.session_id} | Language: {session.language} | Model: {session.model} | Timestamp: {time.time()}"
-        )
+        performance_logger.info(MetricEvent(SESSION_START, session.session_id, provider="Azure OpenAI", model=session.model, language=session.language))
         
         # NOTE: Silence timer is NOT started here - it will be started when first audio is sent
         # This prevents false "silence timeout" messages when user hasn't started speaking yet
         
         # Send session configuration
-        session_config = {
-            "type": "transcription_session.update",
-            "session": {
-                "input_audio_format": "pcm16",
-                "input_audio_transcription": {
-                    "model": "gpt-4o-mini-transcribe"
-                },
-                "turn_detection": {
-                    "type": "server_vad",
-                    "threshold": 0.5,
-                    "prefix_padding_ms": 1000,
-                    "silence_duration_ms": 500
-                }
-            }
-        }
-        
         logger.info(f"Azure OpenAI using auto-detection for language (user selected: {session.language}) for session {session.session_id}")
         
         try:
@@ -285,38 +360,42 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                 return
             
             # Verify the socket is still connected
-            if not hasattr(ws, 'sock') or ws.sock is None:
-                logger.warning(f"Azure OpenAI WebSocket socket is None for session {session.session_id} - connection closed")
+            if not ws.connected:
+                logger.warning(f"Azure OpenAI WebSocket is not connected for session {session.session_id} - connection closed")
                 session.connection_open = False
                 return
             
-            ws.send(json.dumps(session_config))
-            logger.info(f"Azure OpenAI session configuration sent for session {session.session_id}: {json.dumps(session_config)}")
+            ws.send(json.dumps(AZURE_SESSION_CONFIG))
+            logger.info(f"Azure OpenAI session configuration sent for session {session.session_id}: {json.dumps(AZURE_SESSION_CONFIG)}")
             
             # Mark connection as open immediately after sending config (like standalone file)
             # Don't wait for transcription_session.updated - Azure will buffer audio while processing config
             session.connection_open = True
             logger.info(f"Azure OpenAI connection marked as open for session {session.session_id} - ready to receive audio")
+            resolve_azure_ready(session, ws)
             
         except Exception as e:
             logger.error(f"Error sending session configuration for session {session.session_id}: {e}")
             session.connection_open = False
+            resolve_azure_ready(session, ws, e)
     
     def on_message(ws, message):
         """Handle incoming messages from Azure OpenAI"""
+        # Ignore late messages from a connection that has been replaced
+        if session.ws is not None and session.ws is not ws:
+            return
         try:
             data = json.loads(message)
             event_type = data.get("type", "")
             
-            # Log ALL event types for debugging
-            logger.info(f"Azure OpenAI received event for session {session.session_id}: {event_type}")
-            
-            # Log full message for transcription-related events
-            if event_type and "transcription" in event_type.lower():
-                logger.info(f"Azure OpenAI transcription event for session {session.session_id}: {event_type} | Full Data: {json.dumps(data)}")
-            else:
-                # Log abbreviated data for non-transcription events
-                logger.info(f"Azure OpenAI event data for session {session.session_id}: {json.dumps(data)[:300]}")
+            # Per-event logging runs on the shared I/O loop - DEBUG only, and skip the JSON dump when it is off
+            if logger.isEnabledFor(logging.DEBUG):
+                # Log full message for transcription-related events
+                if event_type and "transcription" in event_type.lower():
+                    logger.debug(f"Azure OpenAI transcription event for session {session.session_id}: {event_type} | Full Data: {json.dumps(data)}")
+                else:
+                    # Log abbreviated data for non-transcription events
+                    logger.debug(f"Azure OpenAI event data for session {session.session_id}: {event_type} | {json.dumps(data)[:300]}")
             
             # Start silence timer when speech is detected (not when audio is first sent)
             # This prevents premature timeout when user hasn't started speaking yet
@@ -332,22 +411,22 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                 }, room=session.session_id)
                 logger.info(f"📤 Sent 'processing' (speech detected) status to frontend for session {session.session_id}")
             
+            # Remember where the item's speech ended in the audio stream, to time its transcript
+            if event_type == "input_audio_buffer.speech_stopped" and data.get("item_id") and data.get("audio_end_ms") is not None:
+                session.speech_end_ms[data["item_id"]] = data["audio_end_ms"]
+            
             # Log session updated event for debugging
             if event_type == "transcription_session.updated":
                 logger.info(f"✅ Azure OpenAI session configuration applied for session {session.session_id}")
+                resolve_azure_ready(session, ws)
             
             # Handle incremental transcription updates (deltas)
             if event_type == "conversation.item.input_audio_transcription.delta":
                 transcript_piece = data.get("delta", "")
                 if transcript_piece:
-                    # Accumulate the delta into the current segment transcript
-                    session.current_segment_transcript += transcript_piece
-                    
-                    # Build full display transcript: accumulated + current segment
-                    if session.accumulated_transcript and session.accumulated_transcript.strip():
-                        session.current_transcript = session.accumulated_transcript.strip() + " " + session.current_segment_transcript.strip()
-                    else:
-                        session.current_transcript = session.current_segment_transcript.strip()
+                    # Accumulate the delta into the current segment
+                    segment_id = session.transcript.append_partial(transcript_piece)
+                    segment = session.transcript.partial
                     
                     current_time = time.perf_counter()
                     
@@ -368,21 +447,20 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                     session.last_transcription_time = current_time
                     
                     # Log performance metrics
-                    performance_logger.info(
-                        f"TRANSCRIPTION | Session: {session.session_id} | Count: {session.transcription_count} | "
-                        f"ResponseTime: {transcription_response_time_ms:.2f}ms | "
-                        f"TimeSinceStart: {time_since_start_ms:.2f}ms | "
-                        f"TimeSinceLast: {time_since_last_ms:.2f}ms | "
-                        f"Text: \"{session.current_transcript}\""
-                    )
+                    performance_logger.info(MetricEvent(
+                        TRANSCRIPTION, session.session_id, provider="Azure OpenAI", model=session.model, language=session.language,
+                        count=session.transcription_count, response_time_ms=transcription_response_time_ms,
+                        time_since_start_ms=time_since_start_ms, time_since_last_ms=time_since_last_ms,
+                        text=segment
+                    ))
                     
                     # Reset silence timer when transcription is received
                     reset_azure_silence_timer(session)
                     
-                    logger.info(f"Azure OpenAI transcript delta for session {session.session_id}: '{transcript_piece}' | Segment: '{session.current_segment_transcript}' | Full: '{session.current_transcript}'")
+                    logger.debug(f"Azure OpenAI transcript delta for session {session.session_id}: '{transcript_piece}' | Segment {segment_id}: '{segment}'")
                     # Send transcription ONLY to the specific user who is speaking
-                    session.socketio.emit('transcription_update', {'transcription': session.current_transcript}, room=session.session_id)
-                    logger.info(f"✅ Emitted transcription_update event for session {session.session_id} with: '{session.current_transcript}'")
+                    session.socketio.emit('transcription_update', session.transcript.update_payload(segment_id, segment, 'Azure OpenAI', False), room=session.session_id)
+                    logger.debug(f"✅ Emitted transcription_update event for session {session.session_id} with segment {segment_id}: '{segment}'")
             
             # Handle completed/final transcription events - finalize the segment
             elif event_type in ["conversation.item.input_audio_transcription.completed", "conversation.item.input_audio_transcription.final"]:
@@ -390,17 +468,8 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                 if transcript:
                     logger.info(f"🎯 Azure OpenAI received COMPLETED transcription for session {session.session_id}: '{transcript}'")
                     
-                    # Add this completed segment to accumulated transcript
-                    if session.accumulated_transcript and session.accumulated_transcript.strip():
-                        session.accumulated_transcript = session.accumulated_transcript.strip() + " " + transcript.strip()
-                    else:
-                        session.accumulated_transcript = transcript.strip()
-                    
-                    # Reset current segment (it's now part of accumulated)
-                    session.current_segment_transcript = ""
-                    
-                    # Update display transcript
-                    session.current_transcript = session.accumulated_transcript
+                    # Commit this segment (replaces the current segment built from deltas)
+                    segment_id = session.transcript.commit(transcript)
                     
                     current_time = time.perf_counter()
                     
@@ -419,30 +488,39 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                     session.transcription_count += 1
                     session.last_transcription_time = current_time
                     
+                    # Speech end (server VAD speech_stopped offset) to this final transcript
+                    extra = {"Segments": len(session.transcript.segments)}
+                    speech_end_ms = session.speech_end_ms.pop(data.get("item_id"), None)
+                    if speech_end_ms is not None:
+                        speech_end_latency_ms = session.audio_timeline.latency_ms(speech_end_ms / 1000.0, now=current_time)
+                        if speech_end_latency_ms is not None:
+                            latency_metrics.observe(SPEECH_END_TO_FINAL, "Azure OpenAI", session.language, speech_end_latency_ms)
+                            extra["SpeechEndToFinal"] = f"{speech_end_latency_ms:.2f}ms"
+                    
                     # Log performance metrics
-                    performance_logger.info(
-                        f"TRANSCRIPTION_COMPLETED | Session: {session.session_id} | Count: {session.transcription_count} | "
-                        f"ResponseTime: {transcription_response_time_ms:.2f}ms | "
-                        f"TimeSinceStart: {time_since_start_ms:.2f}ms | "
-                        f"TimeSinceLast: {time_since_last_ms:.2f}ms | "
-                        f"Segment: \"{transcript}\" | Accumulated: \"{session.accumulated_transcript}\""
-                    )
+                    performance_logger.info(MetricEvent(
+                        TRANSCRIPTION_COMPLETED, session.session_id, provider="Azure OpenAI", model=session.model, language=session.language,
+                        count=session.transcription_count, response_time_ms=transcription_response_time_ms,
+                        time_since_start_ms=time_since_start_ms, time_since_last_ms=time_since_last_ms,
+                        text=transcript, extra=extra
+                    ))
                     
                     # Reset silence timer when transcription is received
                     reset_azure_silence_timer(session)
-                    logger.info(f"Azure OpenAI {event_type} for session {session.session_id}: Segment='{transcript}' | Accumulated='{session.accumulated_transcript}'")
-                    session.socketio.emit('transcription_update', {'transcription': session.current_transcript}, room=session.session_id)
-                    logger.info(f"✅ Emitted transcription_update event for session {session.session_id} with {event_type}: '{session.current_transcript}'")
+                    logger.info(f"Azure OpenAI {event_type} for session {session.session_id}: Segment {segment_id}='{transcript}' | Segments: {len(session.transcript.segments)}")
+                    session.socketio.emit('transcription_update', session.transcript.update_payload(segment_id, transcript.strip(), 'Azure OpenAI', True), room=session.session_id)
+                    logger.info(f"✅ Emitted transcription_update event for session {session.session_id} with {event_type}: segment {segment_id}")
                 else:
                     logger.warning(f"⚠️ Received {event_type} but transcript is empty for session {session.session_id}")
             
             # Handle conversation item created (new segment started)
-            # Reset current_segment_transcript for the new utterance
+            # Reset the current segment for the new utterance
             elif event_type == "conversation.item.created":
                 # Log the full item to see if transcription is included
                 item = data.get("item", {})
                 content = item.get("content", [])
-                logger.info(f"Azure OpenAI conversation.item.created for session {session.session_id} | Full item: {json.dumps(item)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Azure OpenAI conversation.item.created for session {session.session_id} | Full item: {json.dumps(item)}")
                 
                 # Check if transcript is present in the item
                 for content_item in content:
@@ -454,9 +532,9 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                             logger.info(f"⏳ Transcript is NULL in conversation.item.created - waiting for transcription.completed event")
                 
                 # Reset current segment for the new conversation item
-                # The previous segment should already be in accumulated_transcript via completed event
-                session.current_segment_transcript = ""
-                logger.info(f"Azure OpenAI new conversation item created for session {session.session_id} - reset segment, accumulated so far: '{session.accumulated_transcript}'")
+                # The previous segment should already be committed via the completed event
+                session.transcript.clear_partial()
+                logger.info(f"Azure OpenAI new conversation item created for session {session.session_id} - reset segment, {len(session.transcript.segments)} segments so far")
                 
                 # IMPORTANT: Reset silence timer to give time for transcription to arrive
                 # The transcription.completed event comes AFTER conversation.item.created
@@ -477,11 +555,17 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
     
     def on_error(ws, error):
         """Handle WebSocket errors"""
-        # Filter out expected race condition errors
+        # Ignore errors from a connection that has been closed or replaced
+        if session.ws is not ws:
+            logger.debug(f"Azure OpenAI WebSocket error after close for session {session.session_id}: {error}")
+            return
+        
         error_str = str(error) if error else ""
-        if "NoneType" in error_str and "sock" in error_str:
-            logger.debug(f"Azure OpenAI WebSocket closed during connection for session {session.session_id} - ignoring race condition error")
+        if session.ready and not session.ready.done():
+            # Still connecting - fail the readiness future and let the caller retry instead of reporting to the frontend
+            logger.warning(f"Azure OpenAI WebSocket failed before ready for session {session.session_id}: {type(error).__name__}: {error}")
             session.connection_open = False
+            resolve_azure_ready(session, ws, error if isinstance(error, Exception) else ConnectionError(error_str))
             return
         
         logger.error(f"Azure OpenAI WebSocket error for session {session.session_id}: {error}")
@@ -501,7 +585,10 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
     def on_close(ws, close_status_code, close_msg):
         """Handle WebSocket close"""
         logger.info(f"Azure OpenAI WebSocket connection closed for session {session.session_id}: {close_status_code} - {close_msg}")
+        if session.ws is not None and session.ws is not ws:
+            return
         session.connection_open = False
+        resolve_azure_ready(session, ws, ConnectionError(f"closed before ready: {close_status_code} - {close_msg}"))
         
         # Stop silence timer when connection closes
         stop_azure_silence_timer(session)
@@ -512,51 +599,72 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
                 f"Azure OpenAI session ended | Session: {session.session_id} | Duration: {session_duration_ms:.2f}ms | "
                 f"TotalTranscriptions: {session.transcription_count}"
             )
-            performance_logger.info(
-                f"SESSION_END | Session: {session.session_id} | TotalDuration: {session_duration_ms:.2f}ms | "
-                f"TotalTranscriptions: {session.transcription_count}"
-            )
+            performance_logger.info(MetricEvent(
+                SESSION_END, session.session_id, provider="Azure OpenAI", model=session.model, language=session.language,
+                duration_ms=session_duration_ms, count=session.transcription_count
+            ))
             session.session_start_time = None
             session.transcription_count = 0
             session.last_transcription_time = None
-            session.current_transcript = ""
-            session.accumulated_transcript = ""
-            session.current_segment_transcript = ""
+            session.transcript.clear()
+    
+    # A pooled connection is already open with the session config sent - take it over
+    connect_start = time.perf_counter()
+    warm_ws = azure_warm_pool.claim("")
+    if warm_ws and not warm_ws.connected:
+        warm_ws.close()
+        warm_ws = None
+    if warm_ws:
+        session.ws = warm_ws
+        session.ready = Future()
+        warm_ws.on_message, warm_ws.on_error, warm_ws.on_close = on_message, on_error, on_close
+        session.session_start_time = time.perf_counter()
+        performance_logger.info(MetricEvent(SESSION_START, session.session_id, provider="Azure OpenAI", model=session.model, language=session.language))
+        session.connection_open = True
+        resolve_azure_ready(session, warm_ws)
+        open_ms = (time.perf_counter() - connect_start) * 1000
+        logger.info(f"Azure OpenAI claimed a warm connection for session {session.session_id} - ready to receive audio")
+        performance_logger.info(f"CONNECTION_OPEN | Session: {session.session_id} | Provider: Azure OpenAI | OpenTime: {open_ms:.2f}ms | WarmPool: hit")
+        latency_metrics.observe(CONNECTION_SETUP, "Azure OpenAI", session.language, open_ms)
+        return True
     
     try:
-        # Create WebSocket connection
-        session.ws = WebSocketApp(
+        # Create WebSocket connection - connects and receives on the shared provider I/O loop
+        session.ready = Future()
+        session.ws = AsyncWebSocketConnection(
             url,
             header=headers,
             on_open=on_open,
             on_message=on_message,
             on_error=on_error,
-            on_close=on_close
+            on_close=on_close,
+            name=f"azure:{session.session_id}"
         )
+        ws = session.ws
+        ready = session.ready
+        ws.start()
         
-        # Start WebSocket in a separate thread
-        def run_websocket():
-            if session.ws:
-                session.ws.run_forever()
-        
-        session.thread = threading.Thread(target=run_websocket, daemon=True)
-        session.thread.start()
-        
-        # Wait for connection to open (with timeout)
-        max_wait_time = 5.0
-        wait_interval = 0.1
-        waited_time = 0.0
-        
-        while not session.connection_open and waited_time < max_wait_time:
-            time.sleep(wait_interval)
-            waited_time += wait_interval
+        # Wake as soon as the connection is ready or fails (on_open / on_error / on_close settle the future)
+        try:
+            ready.result(timeout=AZURE_READY_TIMEOUT_SEC)
+        except FuturesTimeoutError:
+            ready.cancel()
+            logger.warning(f"Azure OpenAI WebSocket connection did not open within {AZURE_READY_TIMEOUT_SEC}s for session {session.session_id}")
+            performance_logger.warning(f"CONNECTION_FAILED | Session: {session.session_id} | Provider: Azure OpenAI | Reason: Timeout | WaitTime: {AZURE_READY_TIMEOUT_SEC * 1000:.2f}ms")
+            abandon_azure_connection(session, ws)
+            return False
+        except Exception as e:
+            wait_ms = (time.perf_counter() - connect_start) * 1000
+            logger.warning(f"Azure OpenAI WebSocket connection failed for session {session.session_id}: {type(e).__name__}: {e}")
+            performance_logger.warning(f"CONNECTION_FAILED | Session: {session.session_id} | Provider: Azure OpenAI | Reason: {type(e).__name__} | WaitTime: {wait_ms:.2f}ms")
+            abandon_azure_connection(session, ws)
+            return False
         
-        if session.connection_open:
-            logger.info(f"Azure OpenAI WebSocket connection started and opened successfully for session {session.session_id}")
-            return True
-        else:
-            logger.warning(f"Azure OpenAI WebSocket connection started but did not open within {max_wait_time}s for session {session.session_id}")
-            return True
+        open_ms = (time.perf_counter() - connect_start) * 1000
+        logger.info(f"Azure OpenAI WebSocket connection started and opened successfully for session {session.session_id} in {open_ms:.0f}ms")
+        performance_logger.info(f"CONNECTION_OPEN | Session: {session.session_id} | Provider: Azure OpenAI | OpenTime: {open_ms:.2f}ms")
+        latency_metrics.observe(CONNECTION_SETUP, "Azure OpenAI", session.language, open_ms)
+        return True
     
     except Exception as e:
         logger.error(f"Failed to initialize Azure OpenAI connection for session {session.session_id}: {type(e).__name__}: {e}")
@@ -564,13 +672,24 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
         session.ws = None
         return False
 
-def send_audio_to_azure_openai(audio_data: bytes, session_id: str = None):
+def abandon_azure_connection(session: AzureSession, ws: AsyncWebSocketConnection):
+    """Drop a connection that never became ready so the next attempt starts clean"""
+    if session.ws is ws:
+        session.ws = None
+        session.connection_open = False
+    try:
+        ws.close()
+    except Exception as e:
+        logger.debug(f"Error closing failed Azure OpenAI connection for session {session.session_id}: {e}")
+
+def send_audio_to_azure_openai(audio_data: bytes, session_id: str = None, captured_at: Optional[float] = None):
     """
     Send audio data to Azure OpenAI WebSocket for specific session
     
     Args:
         audio_data: Audio data in bytes (PCM16 from Web Audio API)
         session_id: Session ID for user isolation
+        captured_at: perf_counter() time the last sample was captured (default: now)
     
     Returns:
         bool: True if audio was sent successfully
@@ -593,45 +712,26 @@ def send_audio_to_azure_openai(audio_data: bytes, session_id: str = None):
     if not session.connection_open:
         # Buffer audio while connection is establishing
         with session.audio_buffer_lock:
-            session.audio_buffer.extend(audio_data)
-            if len(session.audio_buffer) > AZURE_AUDIO_CHUNK_SIZE * 10:
-                session.audio_buffer = session.audio_buffer[-AZURE_AUDIO_CHUNK_SIZE * 5:]
-        logger.debug(f"Azure OpenAI connection establishing for session {session.session_id} - buffered {len(audio_data)} bytes (total buffer: {len(session.audio_buffer)} bytes)")
+            dropped = session.audio_buffer.append(audio_data)
+            session.audio_timeline.record_buffered(len(audio_data), dropped, session.audio_buffer.overflow, captured_at)
+        logger.debug(f"Azure OpenAI connection establishing for session {session.session_id} - buffered {len(audio_data)} bytes (total buffer: {len(session.audio_buffer)} bytes, dropped: {session.audio_buffer.dropped_bytes} bytes)")
         return False
     
     # Double-check socket state before sending
-    try:
-        if not hasattr(session.ws, 'sock') or session.ws.sock is None:
-            logger.debug(f"Azure OpenAI WebSocket socket is None for session {session.session_id} - connection not ready")
-            session.connection_open = False
-            return False
-        
-        if not session.ws.sock.connected:
-            logger.warning(f"Azure OpenAI WebSocket socket is not connected for session {session.session_id}")
-            session.connection_open = False
-            return False
-    except (AttributeError, Exception) as e:
-        logger.debug(f"Cannot verify Azure OpenAI WebSocket socket state for session {session.session_id}: {e}")
+    if not session.ws.connected:
+        logger.warning(f"Azure OpenAI WebSocket is not connected for session {session.session_id}")
         session.connection_open = False
         return False
     
     try:
-        # Add incoming data to buffer
+        # Chunk the backlog and the frame (views are only valid under the lock) - nothing is dropped while connected
         with session.audio_buffer_lock:
-            session.audio_buffer.extend(audio_data)
+            chunks = session.audio_buffer.send_through(audio_data, lambda chunk: base64.b64encode(chunk).decode('utf-8'))
+            session.audio_timeline.record(len(audio_data), captured_at)
         
         # Send buffered audio in chunks
         bytes_sent = 0
-        while True:
-            with session.audio_buffer_lock:
-                if len(session.audio_buffer) < AZURE_AUDIO_CHUNK_SIZE:
-                    break
-                chunk = bytes(session.audio_buffer[:AZURE_AUDIO_CHUNK_SIZE])
-                session.audio_buffer = session.audio_buffer[AZURE_AUDIO_CHUNK_SIZE:]
-            
-            # Encode audio chunk as base64
-            audio_base64 = base64.b64encode(chunk).decode('utf-8')
-            
+        for audio_base64 in chunks:
             # Send audio buffer append message
             message = {
                 "type": "input_audio_buffer.append",
@@ -652,7 +752,7 @@ def send_audio_to_azure_openai(audio_data: bytes, session_id: str = None):
                 pass
             
             session.ws.send(json.dumps(message))
-            bytes_sent += len(chunk)
+            bytes_sent += AZURE_AUDIO_CHUNK_SIZE
         
         # if bytes_sent > 0:
         #     logger.info(f"📤 Sent total {bytes_sent} bytes to Azure OpenAI for session {session.session_id}")
@@ -692,7 +792,8 @@ def close_azure_openai_connection(session_id: str = None):
     
     # Clear audio buffer
     with session.audio_buffer_lock:
-        session.audio_buffer = bytearray()
+        session.audio_buffer.clear()
+        session.audio_timeline.reset()
     
     # Save reference and clear session immediately to prevent race conditions
     ws_to_close = session.ws
@@ -706,10 +807,4 @@ def close_azure_openai_connection(session_id: str = None):
             logger.debug(f"Error closing Azure OpenAI connection for session {session.session_id} (may be already closed): {e}")
     
     # Reset transcript accumulator
-    session.current_transcript = ""
-    session.accumulated_transcript = ""
-    session.current_segment_transcript = ""
-    
-    if session.thread and session.thread.is_alive():
-        # Thread will terminate when WebSocket closes
-        pass
\ No newline at end of file
+    session.transcript.clear()
\ No newline at end of file
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+End-to-end load generator: N simulated browsers against the Socket.IO app
+
+Each simulated browser does what static/script.js does:
+  - connects over Socket.IO and emits toggle_transcription {action: "start"}
+  - "captures" PCM16 24kHz mono audio in real time, 1024-sample frames like
+    audio-processor.js, buffering frames until transcription_status "started"
+    and then flushing them as audio_stream events (framed with seq and capture
+    time, see audio_framing.py). Recordings made with
+    AUDIO_RECORD_DIR (see audio_recorder.py) keep their original frame sizes
+    and arrival times, optionally sped up with --speed
+  - waits for trailing transcripts and emits toggle_transcription {action: "stop"}
+
+Measured per round (provider x session count):
+  - latency of every transcription_update: receive time minus the capture time
+    of the frame that completed the last word in it. Word end times follow the
+    mock_stt script (one word per --sec-per-word of audio), so this is exact
+    against the mock providers and only indicative against real ones
+  - first transcript latency: first transcription_update minus first capture
+  - dropped frames: captured frames never emitted (not started / disconnected)
+  - transcript bytes per session: JSON size of the transcript events received
+    (full-text transcription_update, or transcription_delta with --protocol 2)
+  - server CPU per session (% of one core) and peak server thread count,
+    sampled from /proc/<pid> (Linux)
+
+With --spawn-mock the mock providers run in this process and the app runs as a
+subprocess pointed at them, which gives a capacity curve per provider:
+
+    python benchmarks/bench_load.py --spawn-mock --sessions 1,10,25,50
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000 --server-pid 1234 \\
+        --providers deepgram --sessions 5 --wav speech.wav
+    python benchmarks/bench_load.py --spawn-mock --wav recordings/*.wav --speed 2
+    python benchmarks/bench_load.py --spawn-mock --providers azure --protocol 2
+
+The clients here cost threads too: for large session counts run several
+generators, or keep the sum of their CPU well below one core per process.
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import wave
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import socketio  # noqa: E402
+
+from audio_framing import encode_audio_frame  # noqa: E402
+from audio_recorder import Recording, load_recording  # noqa: E402
+from audio_resampler import PCM16Resampler  # noqa: E402
+from compare_mode import COMPARE_API  # noqa: E402
+from latency_metrics import LogHistogram  # noqa: E402
+from mock_stt import MockAzureRealtimeServer, MockBehavior, MockDeepgramServer, MockElevenLabsServer  # noqa: E402
+from mock_stt.base import WORD_AUDIO_SEC  # noqa: E402
+from transcript_protocol import PROTOCOL_LEGACY, TranscriptDeltaDecoder, payload_size  # noqa: E402
+
+SAMPLE_RATE = 24000
+FRAME_SAMPLES = 1024  # audio-processor.js targetChunkSize
+FRAME_BYTES = FRAME_SAMPLES * 2
+
+# --providers short names -> the api value the browser sends
+PROVIDERS = {
+    "deepgram": "Deepgram API",
+    "azure": "Azure OpenAI",
+    "elevenlabs": "ElevenLabs ScribeV2",
+    "compare": COMPARE_API,  # All three at once - latencies are pooled across providers
+}
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'voicesearch_app.py')
+
+
+def audio_recording(audio: bytes) -> Recording:
+    """Split PCM16 24kHz audio into browser-sized frames arriving in real time"""
+    frames = []
+    for offset in range(0, len(audio) - FRAME_BYTES + 1, FRAME_BYTES):
+        frames.append(((offset + FRAME_BYTES) / (SAMPLE_RATE * 2) * 1000, FRAME_BYTES))
+    return Recording(audio[:len(frames) * FRAME_BYTES], frames, {"sample_rate": SAMPLE_RATE})
+
+
+def load_wav(path: str) -> Recording:
+    """
+    Read a 16-bit WAV file as PCM16 24kHz mono frames
+
+    Args:
+        path: WAV file path. A recording with an audio_recorder sidecar keeps its
+            original frames and arrival times.
+
+    Returns:
+        Recording to stream
+    """
+    if os.path.exists(os.path.splitext(path)[0] + ".json"):
+        return load_recording(path)
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    if channels > 1:
+        # Keep the first channel
+        frames = b"".join(frames[i:i + 2] for i in range(0, len(frames), 2 * channels))
+    if rate != SAMPLE_RATE:
+        frames = PCM16Resampler(rate, SAMPLE_RATE).process(frames)
+    return audio_recording(frames)
+
+
+def synthetic_audio(seconds: float, seed: int = 0) -> Recording:
+    """Low-level noise - enough for the mock providers, which only count bytes"""
+    rng = random.Random(seed)
+    samples = int(seconds * SAMPLE_RATE)
+    return audio_recording(b"".join(rng.randint(-200, 200).to_bytes(2, 'little', signed=True) for _ in range(samples)))
+
+
+class ProcessSampler:
+    """
+    Samples CPU time and thread count of a process from /proc (Linux only).
+
+    Args:
+        pid: Process to sample, or None to disable sampling
+        interval: Seconds between thread count samples
+    """
+
+    def __init__(self, pid: Optional[int], interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.available = pid is not None and os.path.exists(f"/proc/{pid}/stat")
+        self.peak_threads = 0
+        self._cpu_start = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Fields after the ")" of the command name: utime and stime are fields 14 and 15
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def threads(self) -> int:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+        return 0
+
+    def start(self):
+        if not self.available:
+            return
+        self.peak_threads = self.threads()
+        self._cpu_start = self.cpu_seconds()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="load-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.peak_threads = max(self.peak_threads, self.threads())
+            except OSError:
+                return
+
+    def stop(self) -> Optional[float]:
+        """Stop sampling and return CPU seconds used since start(), or None if unavailable"""
+        if not self.available:
+            return None
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.cpu_seconds() - self._cpu_start
+
+
+class SimulatedBrowser:
+    """
+    One Socket.IO client streaming audio like the browser app.
+
+    Args:
+        url: App base URL
+        api: Provider name as the browser sends it (e.g. "Azure OpenAI")
+        language: Language name as the browser sends it
+        recording: PCM16 24kHz mono frames to stream, with their capture times
+        speed: Pacing relative to the capture times (2.0 = twice as fast)
+        sec_per_word: Audio seconds per recognised word, for latency attribution
+        tail_sec: How long to wait for trailing transcripts after the last frame
+        protocol: Transcript protocol to negotiate (2 = deltas, see transcript_protocol.py)
+    """
+
+    def __init__(self, url: str, api: str, language: str, recording: Recording, speed: float,
+                 sec_per_word: float, tail_sec: float, protocol: int = PROTOCOL_LEGACY):
+        self.url = url
+        self.api = api
+        self.language = language
+        self.recording = recording
+        self.speed = speed
+        self.sec_per_word = sec_per_word
+        self.tail_sec = tail_sec
+        self.protocol = protocol
+
+        self.latencies: List[float] = []
+        self.first_transcript_ms: Optional[float] = None
+        self.frames = 0
+        self.dropped = 0
+        self.updates = 0
+        self.transcript_bytes = 0
+        self.resyncs = 0
+        self.error: Optional[str] = None
+        self._decoder = TranscriptDeltaDecoder()
+
+        self._started = threading.Event()
+        self._pending: List[bytes] = []
+        self._capture_start = 0.0
+        # Per provider ('api' tag - several in compare mode): last text, words in earlier utterances, last word count
+        self._text_state: Dict[str, Tuple[str, int, int]] = {}
+        # Cumulative audio bytes and capture offset (sec) at the end of each frame, for latency attribution
+        self._frame_ends: List[int] = []
+        self._frame_times: List[float] = []
+        total = 0
+        for arrival_sec, frame in recording.iter_frames():
+            total += len(frame)
+            self._frame_ends.append(total)
+            self._frame_times.append(arrival_sec / speed)
+        self._client = socketio.Client(reconnection=False)
+        self._client.on('transcription_status', self._on_status)
+        self._client.on('transcription_update', self._on_update)
+        self._client.on('transcription_delta', self._on_delta)
+        self._client.on('transcription_snapshot', self._on_snapshot)
+
+    def _on_status(self, data):
+        status = data.get('status')
+        if status == 'started':
+            self._started.set()
+        elif status == 'error' and not self.error:
+            self.error = data.get('message', 'error')
+
+    def _on_update(self, data):
+        received = time.perf_counter()
+        self.transcript_bytes += payload_size(data)
+        self._record_text(data.get('api', self.api), (data.get('transcription') or "").strip(), received)
+
+    def _on_delta(self, data):
+        received = time.perf_counter()
+        self.transcript_bytes += payload_size(data)
+        if not self._decoder.apply(data):
+            self.resyncs += 1
+            self._client.emit('transcription_resync')
+            return
+        self._record_text(data['api'], self._decoder.text(data['api']), received)
+
+    def _on_snapshot(self, data):
+        self.transcript_bytes += payload_size(data)
+        self._decoder.load_snapshot(data)
+
+    def _record_text(self, api: str, text: str, received: float):
+        if not text:
+            return
+        self.updates += 1
+        if self.first_transcript_ms is None:
+            self.first_transcript_ms = (received - self._capture_start) * 1000
+
+        # Handlers emit either the running transcript or the current utterance only -
+        # a text that doesn't extend the previous one starts a new utterance
+        last_text, words_before, last_words = self._text_state.get(api, ("", 0, 0))
+        words = len(text.split())
+        if not text.startswith(last_text):
+            words_before += last_words
+        self._text_state[api] = (text, words_before, words)
+
+        # The word ends in the frame containing its last byte, which is sent once that frame is captured
+        word_end_byte = (words_before + words) * self.sec_per_word * SAMPLE_RATE * 2
+        index = min(bisect.bisect_left(self._frame_ends, word_end_byte), len(self._frame_times) - 1)
+        self.latencies.append((received - (self._capture_start + self._frame_times[index])) * 1000)
+
+    def _emit_frame(self, frame: bytes):
+        if not self._client.connected:
+            self.dropped += 1
+            return
+        try:
+            self._client.emit('audio_stream', frame)
+        except Exception:
+            self.dropped += 1
+
+    def run(self):
+        try:
+            auth = {"transcript_protocol": self.protocol} if self.protocol != PROTOCOL_LEGACY else None
+            self._client.connect(self.url, transports=['websocket'], wait_timeout=10, auth=auth)
+        except Exception as e:
+            self.error = f"connect failed: {e}"
+            self.frames = len(self.recording.frames)
+            self.dropped = self.frames
+            return
+
+        try:
+            self._client.emit('toggle_transcription', {"action": "start", "api": self.api, "language": self.language})
+            self._capture_start = time.perf_counter()
+            capture_wall_ms = time.time() * 1000
+            for seq, ((_, pcm), capture_sec) in enumerate(zip(self.recording.iter_frames(), self._frame_times)):
+                # Real-time capture: a frame is available once its last sample has been "recorded"
+                self.frames += 1
+                delay = self._capture_start + capture_sec - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                frame = encode_audio_frame(seq, pcm, capture_ms=capture_wall_ms + capture_sec * 1000)
+                if not self._started.is_set():
+                    # Like the browser, buffer until the backend connection is ready
+                    self._pending.append(frame)
+                    continue
+                while self._pending:
+                    self._emit_frame(self._pending.pop(0))
+                self._emit_frame(frame)
+
+            self.dropped += len(self._pending)
+            self._pending.clear()
+            time.sleep(self.tail_sec)
+            if self._client.connected:
+                self._client.emit('toggle_transcription', {"action": "stop", "api": self.api})
+        finally:
+            self._client.disconnect()
+
+
+def run_round(url: str, provider: str, sessions: int, args, audio_files: List[Recording],
+              sampler: ProcessSampler) -> Dict:
+    """
+    Run one round of concurrent simulated browsers against one provider
+
+    Returns:
+        One result row (latency percentiles, drops, errors, server CPU and threads)
+    """
+    browsers = [
+        SimulatedBrowser(url, PROVIDERS[provider], args.language, audio_files[i % len(audio_files)],
+                         args.speed, args.sec_per_word, args.tail_sec, args.protocol)
+        for i in range(sessions)
+    ]
+    threads = [threading.Thread(target=b.run, name=f"browser-{i}", daemon=True) for i, b in enumerate(browsers)]
+
+    sampler.start()
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        # Spread connection setup over the ramp so the round doesn't start with a thundering herd
+        time.sleep(args.ramp_sec / sessions)
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = sampler.stop()
+
+    latency = LogHistogram()
+    first = LogHistogram()
+    for browser in browsers:
+        for value in browser.latencies:
+            latency.record(value)
+        if browser.first_transcript_ms is not None:
+            first.record(browser.first_transcript_ms)
+    summary = latency.summary()
+    frames = sum(b.frames for b in browsers)
+    dropped = sum(b.dropped for b in browsers)
+
+    return {
+        "provider": PROVIDERS[provider],
+        "sessions": sessions,
+        "updates": summary["count"],
+        "p50_ms": summary["p50"],
+        "p90_ms": summary["p90"],
+        "p99_ms": summary["p99"],
+        "first_p50_ms": first.summary()["p50"],
+        "no_transcript": sum(1 for b in browsers if b.first_transcript_ms is None),
+        "errors": sum(1 for b in browsers if b.error),
+        "dropped_frames": dropped,
+        "dropped_pct": round(100.0 * dropped / frames, 2) if frames else None,
+        "transcript_bytes_per_session": round(sum(b.transcript_bytes for b in browsers) / sessions),
+        "resyncs": sum(b.resyncs for b in browsers),
+        "cpu_pct_per_session": round(100.0 * cpu / wall / sessions, 2) if cpu is not None else None,
+        "peak_threads": sampler.peak_threads if sampler.available else None,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_mock_app(args):
+    """
+    Start the mock providers in this process and the app as a subprocess pointed at them
+
+    Returns:
+        (app URL, app process, mock servers)
+    """
+    def behavior():
+        return MockBehavior(args.mock_latency_ms, args.mock_jitter_ms, seed=args.seed)
+
+    servers = [
+        MockDeepgramServer(behavior=behavior()).start(),
+        MockAzureRealtimeServer(behavior=behavior()).start(),
+        MockElevenLabsServer(behavior=behavior()).start(),
+    ]
+    deepgram, azure, elevenlabs = servers
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "DEEPGRAM_API_KEY": "mock-deepgram-key-for-load-testing",
+        "DEEPGRAM_URL": f"http://127.0.0.1:{deepgram.port}",
+        "AZURE_OPENAI_API_KEY": "mock-key",
+        "AZURE_OPENAI_WS_URL": f"{azure.url}/openai/realtime",
+        "ELEVENLABS_API_KEY": "mock-key",
+        "ELEVENLABS_WS_URL": f"{elevenlabs.url}/v1/speech-to-text/realtime",
+    })
+    # Run from a scratch directory so the app's log files don't land in the repo
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+    process = subprocess.Popen([sys.executable, os.path.abspath(APP_SCRIPT)], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            urllib.request.urlopen(f"{url}/metrics/latency", timeout=1).close()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                for server in servers:
+                    server.stop()
+                raise RuntimeError(f"App did not start (see {workdir}/voicesearch_app.log)")
+            time.sleep(0.2)
+    print(f"Mock providers + app (pid {process.pid}, logs in {workdir}) at {url}")
+    return url, process, servers
+
+
+def _format_table(rows: List[Dict]) -> str:
+    columns = list(rows[0].keys())
+    cells = [["" if row[c] is None else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths)),
+             "  ".join("-" * w for w in widths)]
+    lines.extend("  ".join(v.ljust(w) for v, w in zip(r, widths)) for r in cells)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO load generator - capacity curve per provider")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="App URL (ignored with --spawn-mock)")
+    parser.add_argument("--server-pid", type=int, default=None, help="App process id, for CPU and thread sampling")
+    parser.add_argument("--spawn-mock", action="store_true", help="Run the mock providers and start the app against them")
+    parser.add_argument("--providers", default="deepgram,azure,elevenlabs", help=f"Comma-separated: {','.join(PROVIDERS)}")
+    parser.add_argument("--sessions", default="1,5,10,25", help="Comma-separated concurrent session counts")
+    parser.add_argument("--language", default="English")
+    parser.add_argument("--wav", nargs="*", default=[], help="16-bit WAV files or recordings, assigned to sessions round-robin")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pacing relative to real time (2.0 = twice as fast)")
+    parser.add_argument("--audio-seconds", type=float, default=6.0, help="Synthetic audio length when no --wav is given")
+    parser.add_argument("--sec-per-word", type=float, default=WORD_AUDIO_SEC, help="Audio seconds per recognised word")
+    parser.add_argument("--tail-sec", type=float, default=2.0, help="Wait for trailing transcripts before stopping")
+    parser.add_argument("--ramp-sec", type=float, default=1.0, help="Spread session starts over this many seconds")
+    parser.add_argument("--protocol", type=int, choices=(1, 2), default=PROTOCOL_LEGACY,
+                        help="Transcript protocol: 1 = full-text updates, 2 = deltas")
+    parser.add_argument("--mock-latency-ms", type=float, default=300.0)
+    parser.add_argument("--mock-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    providers = [p.strip() for p in args.providers.split(",") if p.strip()]
+    unknown = [p for p in providers if p not in PROVIDERS]
+    if unknown:
+        parser.error(f"unknown provider(s): {', '.join(unknown)}")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    session_counts = [int(n) for n in args.sessions.split(",")]
+    audio_files = [load_wav(path) for path in args.wav] or [synthetic_audio(args.audio_seconds)]
+
+    process, servers = None, []
+    url, pid = args.url, args.server_pid
+    if args.spawn_mock:
+        url, process, servers = spawn_mock_app(args)
+        pid = process.pid
+    sampler = ProcessSampler(pid)
+    if not sampler.available:
+        print("Server CPU/thread sampling unavailable (needs --server-pid and /proc)")
+
+    rows = []
+    try:
+        for provider in providers:
+            for sessions in session_counts:
+                row = run_round(url, provider, sessions, args, audio_files, sampler)
+                rows.append(row)
+                if not args.json:
+                    print(f"{row['provider']:<20} {sessions:>4} sessions  p50 {row['p50_ms']} ms  "
+                          f"dropped {row['dropped_frames']}  errors {row['errors']}")
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        for server in servers:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print()
+        print(_format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: threads and context switches per provider session
+
+Opens N idle WebSocket sessions against a local server two ways and samples the
+process for a few seconds:
+  - thread-per-session: the previous ElevenLabs pattern, a thread per session
+    polling ws.recv(timeout=0.1) (Azure's run_forever thread blocks instead of
+    polling, so it costs a thread but fewer wakeups)
+  - shared loop: AsyncWebSocketConnection sessions on one ProviderIOLoop
+
+Reports threads added and voluntary + involuntary context switches per
+session-second (getrusage, Linux/macOS).
+
+Usage:
+    python benchmarks/bench_provider_threads.py [--sessions 200] [--seconds 3]
+"""
+import argparse
+import os
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from websockets.asyncio.server import serve  # noqa: E402
+from websockets.sync.client import connect as sync_connect  # noqa: E402
+
+from provider_io_loop import AsyncWebSocketConnection, ProviderIOLoop  # noqa: E402
+
+
+def context_switches() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def sample(label, sessions, seconds, threads_before):
+    time.sleep(0.5)  # Let connections settle
+    threads = threading.active_count() - threads_before
+    switches_before = context_switches()
+    time.sleep(seconds)
+    switches = context_switches() - switches_before
+    print(f"{label:<22} {threads:>8} threads  {switches / (sessions * seconds):>10.1f} ctx switches/session/sec")
+
+
+def thread_per_session(url, sessions, seconds):
+    stop = threading.Event()
+    ready = threading.Semaphore(0)
+
+    def run():
+        with sync_connect(url) as ws:
+            ready.release()
+            while not stop.is_set():
+                try:
+                    ws.recv(timeout=0.1)
+                except TimeoutError:
+                    continue
+
+    threads_before = threading.active_count()
+    workers = [threading.Thread(target=run, daemon=True) for _ in range(sessions)]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.acquire()
+    # The sync websockets client also runs its own background threads per connection
+    sample("thread-per-session", sessions, seconds, threads_before)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+
+def shared_loop(url, sessions, seconds):
+    threads_before = threading.active_count()
+    io_loop = ProviderIOLoop(name="bench-provider-io")
+    io_loop.start()
+    opened = threading.Semaphore(0)
+    connections = [
+        AsyncWebSocketConnection(url, on_open=lambda conn: opened.release(), name=f"bench:{i}", io_loop=io_loop)
+        for i in range(sessions)
+    ]
+    for conn in connections:
+        conn.start()
+    for _ in connections:
+        opened.acquire()
+    sample("shared loop", sessions, seconds, threads_before)
+    for conn in connections:
+        conn.close()
+    io_loop.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark provider session threading")
+    parser.add_argument("--sessions", type=int, default=200, help="Concurrent idle sessions")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Sampling window")
+    args = parser.parse_args()
+
+    server_loop = ProviderIOLoop(name="bench-server")
+    server_loop.start()
+
+    async def idle(ws):
+        await ws.wait_closed()
+
+    async def start_server():
+        return await serve(idle, "127.0.0.1", 0)
+
+    server = server_loop.run(start_server(), timeout=5)
+    url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    print(f"{args.sessions} idle sessions, {args.seconds:.0f}s sample (server thread excluded)\n")
+
+    thread_per_session(url, args.sessions, args.seconds)
+    shared_loop(url, args.sessions, args.seconds)
+    server_loop.shutdown()
+
+
+if __name__ == "__main__":
+    main()
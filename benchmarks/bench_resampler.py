@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: 24kHz -> 16kHz resampling throughput
+
+Compares the original pure-Python linear interpolation resampler against the
+NumPy polyphase PCM16Resampler on browser-sized frames (1024 samples, as sent by
+audio-processor.js).
+
+Usage:
+    python benchmarks/bench_resampler.py [--frames 2000] [--frame-samples 1024]
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from audio_resampler import PCM16Resampler  # noqa: E402
+
+
+def legacy_resample_24k_to_16k(audio_bytes: bytes) -> bytes:
+    """Original per-sample implementation from voicesearch_app, kept here as the baseline"""
+    num_samples = len(audio_bytes) // 2
+    samples = struct.unpack(f'<{num_samples}h', audio_bytes)
+
+    output_length = int(num_samples * 16000 / 24000)
+    resampled = []
+
+    for i in range(output_length):
+        src_index = i * 24000 / 16000
+        index = int(src_index)
+        frac = src_index - index
+
+        sample1 = samples[index] if index < num_samples else 0
+        sample2 = samples[min(num_samples - 1, index + 1)] if index + 1 < num_samples else sample1
+
+        value = int(sample1 + frac * (sample2 - sample1))
+        value = max(-32768, min(32767, value))
+        resampled.append(value)
+
+    return struct.pack(f'<{len(resampled)}h', *resampled)
+
+
+def make_frames(num_frames: int, frame_samples: int):
+    """Speech-band test signal split into browser-sized PCM16 frames"""
+    total = num_frames * frame_samples
+    t = np.arange(total) / 24000.0
+    signal = 8000 * np.sin(2 * np.pi * 440 * t) + 2000 * np.sin(2 * np.pi * 3100 * t)
+    pcm = signal.astype('<i2').tobytes()
+    step = frame_samples * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+
+def bench(name, fn, frames, frame_samples):
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    elapsed = time.perf_counter() - start
+    samples = len(frames) * frame_samples
+    rate = samples / elapsed
+    per_frame_us = elapsed / len(frames) * 1e6
+    print(f"{name:<28} {rate:>14,.0f} samples/sec  {per_frame_us:>10.1f} us/frame  {rate / 24000:>8.0f}x realtime")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark 24kHz -> 16kHz resampling")
+    parser.add_argument("--frames", type=int, default=2000, help="Number of frames to process")
+    parser.add_argument("--frame-samples", type=int, default=1024, help="Samples per frame")
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.frame_samples)
+    print(f"Resampling {args.frames} frames of {args.frame_samples} samples (24kHz PCM16 -> 16kHz)\n")
+
+    legacy_rate = bench("legacy (struct + loop)", legacy_resample_24k_to_16k, frames, args.frame_samples)
+    resampler = PCM16Resampler(24000, 16000)
+    polyphase_rate = bench("PCM16Resampler (polyphase)", resampler.process, frames, args.frame_samples)
+
+    print(f"\nSpeedup: {polyphase_rate / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
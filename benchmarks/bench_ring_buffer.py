@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: provider audio chunking
+
+Compares the original bytearray path (extend, then bytes(buf[:CHUNK]) and
+buf = buf[CHUNK:] per chunk) against AudioRingBuffer (append, peek, consume).
+Reports time per chunk. Each chunk is base64-encoded as the handlers do, so
+both paths include that unavoidable work.
+
+The backlog is how much audio is already queued when streaming starts, e.g.
+pre-connect audio or a provider that fell behind. The bytearray path re-copies
+the whole remaining backlog for every chunk (buf[CHUNK:] allocates a new
+bytearray), so it slows down as the backlog grows; the ring copies each byte
+in once and out once regardless of backlog.
+
+Usage:
+    python benchmarks/bench_ring_buffer.py [--frames 20000]
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from audio_ring_buffer import AudioRingBuffer  # noqa: E402
+
+
+def legacy_path(frames, chunk_size, backlog):
+    buffer = bytearray(backlog)
+    chunks = 0
+    for frame in frames:
+        buffer.extend(frame)
+        while len(buffer) >= chunk_size:
+            chunk = bytes(buffer[:chunk_size])
+            buffer = buffer[chunk_size:]
+            base64.b64encode(chunk)
+            chunks += 1
+    return chunks
+
+
+def ring_path(frames, chunk_size, backlog):
+    buffer = AudioRingBuffer(len(backlog) + chunk_size * 4, chunk_size)
+    buffer.append(backlog)
+    chunks = 0
+    for frame in frames:
+        buffer.append(frame)
+        while len(buffer) >= chunk_size:
+            base64.b64encode(buffer.peek(chunk_size))
+            buffer.consume(chunk_size)
+            chunks += 1
+    return chunks
+
+
+def time_per_chunk(fn, frames, chunk_size, backlog):
+    start = time.perf_counter()
+    chunks = fn(frames, chunk_size, backlog)
+    return (time.perf_counter() - start) / chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark provider audio chunking")
+    parser.add_argument("--frames", type=int, default=20000, help="Browser frames to push through")
+    args = parser.parse_args()
+
+    scenarios = [
+        # (label, incoming frame bytes, provider chunk bytes)
+        ("Azure: 2048B frames -> 2048B chunks", 2048, 2048),
+        ("ElevenLabs: 1366B frames -> 4096B chunks", 1366, 4096),
+    ]
+    for label, frame_size, chunk_size in scenarios:
+        print(f"\n{label}")
+        print(f"{'backlog':>10}  {'bytearray us/chunk':>18}  {'ring us/chunk':>14}  {'speedup':>8}")
+        frames = [bytes(frame_size)] * args.frames
+        for backlog_chunks in (0, 10, 100, 1000):
+            backlog = bytes(chunk_size * backlog_chunks)
+            legacy_t = time_per_chunk(legacy_path, frames, chunk_size, backlog)
+            ring_t = time_per_chunk(ring_path, frames, chunk_size, backlog)
+            print(f"{backlog_chunks:>7} ch  {legacy_t * 1e6:>18.2f}  {ring_t * 1e6:>14.2f}  {legacy_t / ring_t:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Compare Mode
+Streams one microphone session to every enabled provider at once, so providers are
+compared on the same utterances instead of separate recordings.
+
+handle_audio_stream fans each inbound frame out to all providers in the session
+(bytes conversion and each format conversion in audio_pipeline.py happen once per frame). Every
+transcription_update carries an 'api' tag; the provider handlers are given a
+ProviderTaggedSocketIO so their other events are tagged too, and their transcripts
+feed an UtteranceRace.
+
+UtteranceRace pairs the providers' n-th final transcripts as the same utterance and,
+once every provider has finalised it (or the session ends), reports who finalised
+first and how far behind the others were. Providers that segment speech differently
+can drift apart; the race is meant for short voice-search style utterances.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# toggle_transcription 'api' value that selects compare mode
+COMPARE_API = "Compare All"
+# Providers a compare session streams to, in reporting order
+COMPARE_PROVIDERS = ("Deepgram API", "Azure OpenAI", "ElevenLabs ScribeV2")
+
+
+class ProviderTaggedSocketIO:
+    """
+    SocketIO stand-in handed to a provider handler in compare mode.
+
+    Adds the provider's 'api' tag to every dict payload (unless already set) and
+    reports transcription_update events to the session's race.
+
+    Args:
+        socketio: The real SocketIO instance
+        api: Provider name, e.g. "Azure OpenAI"
+        race: The session's UtteranceRace
+    """
+
+    def __init__(self, socketio, api: str, race: "UtteranceRace"):
+        self.socketio = socketio
+        self.api = api
+        self.race = race
+
+    def emit(self, event: str, data: Any = None, *args, **kwargs):
+        if isinstance(data, dict):
+            data = dict(data)
+            data.setdefault('api', self.api)
+            if event == 'transcription_update':
+                self.race.observe(self.api, data.get('transcription') or "", bool(data.get('final')))
+        return self.socketio.emit(event, data, *args, **kwargs)
+
+
+class _Progress:
+    """One provider's position in the race"""
+
+    def __init__(self):
+        self.finals = 0
+        self.first_update: Optional[float] = None
+        self.last_final_text = ""
+
+
+class UtteranceRace:
+    """
+    Per-utterance latency race between the providers of one compare session.
+
+    Args:
+        session_id: Session ID
+        providers: Providers taking part
+        on_result: Called with (utterance number, results) when an utterance is decided.
+            Results are ordered by finish; each is a dict with api, rank, text,
+            first_update_ms and final_ms (relative to the earliest first update of the
+            utterance across providers) and behind_winner_ms. Providers that never
+            finalised the utterance are listed last with rank None.
+    """
+
+    def __init__(self, session_id: str, providers: Sequence[str],
+                 on_result: Callable[[int, List[Dict[str, Any]]], None]):
+        self.session_id = session_id
+        self.providers = list(providers)
+        self.on_result = on_result
+        self._progress = {api: _Progress() for api in self.providers}
+        # utterance number -> api -> (first_update, final, text)
+        self._pending: Dict[int, Dict[str, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, api: str, text: str, final: bool, now: Optional[float] = None):
+        """Record a transcript update from a provider"""
+        if not text:
+            return
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            progress = self._progress.get(api)
+            if progress is None:
+                return
+            if progress.first_update is None:
+                progress.first_update = now
+            if not final:
+                return
+            utterance = progress.finals + 1
+            progress.finals = utterance
+            # Azure and ElevenLabs send the running transcript - keep only this utterance's part
+            segment = text
+            if progress.last_final_text and text.startswith(progress.last_final_text):
+                segment = text[len(progress.last_final_text):].strip()
+            progress.last_final_text = text
+            self._pending.setdefault(utterance, {})[api] = (progress.first_update, now, segment)
+            progress.first_update = None
+            decided = self._take_decided()
+        self._report(decided)
+
+    def remove(self, api: str):
+        """Drop a provider from the race (e.g. it failed to connect) so it isn't waited for"""
+        with self._lock:
+            if self._progress.pop(api, None) is None:
+                return
+            self.providers.remove(api)
+            for entries in self._pending.values():
+                entries.pop(api, None)
+            decided = self._take_decided()
+        self._report(decided)
+
+    def flush(self):
+        """Report every undecided utterance with whatever results it has (session end)"""
+        with self._lock:
+            decided = sorted(self._pending.items())
+            self._pending.clear()
+        self._report(decided)
+
+    def _take_decided(self) -> List[tuple]:
+        decided = [(n, entries) for n, entries in sorted(self._pending.items())
+                   if entries and all(api in entries for api in self.providers)]
+        for n, _ in decided:
+            del self._pending[n]
+        return decided
+
+    def _report(self, decided: List[tuple]):
+        for utterance, entries in decided:
+            if entries:
+                self.on_result(utterance, self._results(entries))
+
+    def _results(self, entries: Dict[str, tuple]) -> List[Dict[str, Any]]:
+        start = min(first for first, _, _ in entries.values())
+        winner = min(final for _, final, _ in entries.values())
+        ranked = sorted(entries.items(), key=lambda item: item[1][1])
+        results = [{
+            "api": api,
+            "rank": rank,
+            "text": text,
+            "first_update_ms": round((first - start) * 1000, 2),
+            "final_ms": round((final - start) * 1000, 2),
+            "behind_winner_ms": round((final - winner) * 1000, 2),
+        } for rank, (api, (first, final, text)) in enumerate(ranked, 1)]
+        results.extend({"api": api, "rank": None, "text": "", "first_update_ms": None, "final_ms": None,
+                        "behind_winner_ms": None}
+                       for api in self.providers if api not in entries)
+        return results
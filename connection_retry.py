@@ -0,0 +1,197 @@
+"""
+Non-blocking Connection Retry
+Runs provider connection attempts off the Socket.IO handler threads with jittered
+exponential backoff.
+
+Each attempt runs on its provider's connect executor, so a provider whose handshakes
+hang cannot starve the others of threads; the wait between attempts is a
+timer-wheel deadline, so no thread sleeps during backoff. A ConnectionRetry can be
+cancelled at any time (newer start, stop or disconnect) - pending attempts are
+dropped, and an attempt that was already running is torn down via on_abandon if it
+succeeds after cancellation.
+"""
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from flask_socketio import SocketIO
+
+from timer_wheel import WheelTimer, get_timer_wheel
+
+logger = logging.getLogger(__name__)
+
+# Threads available for connection attempts per provider, across all sessions
+STT_CONNECT_WORKERS = int(os.getenv("STT_CONNECT_WORKERS", "8"))
+# Backoff is 2^attempt seconds scaled by a random factor in [1 - jitter, 1 + jitter]
+STT_RETRY_JITTER = float(os.getenv("STT_RETRY_JITTER", "0.5"))
+
+_connect_executors: Dict[str, ThreadPoolExecutor] = {}
+_connect_executors_lock = threading.Lock()
+
+
+def connect_executor_for(service_name: str) -> ThreadPoolExecutor:
+    """
+    Get the bounded connect executor for a provider, creating it on first use
+
+    Args:
+        service_name: Name of the service the attempts connect to
+
+    Returns:
+        ThreadPoolExecutor shared by every session's attempts for that provider
+    """
+    with _connect_executors_lock:
+        executor = _connect_executors.get(service_name)
+        if executor is None:
+            prefix = "stt-connect-" + "".join(c for c in service_name.lower() if c.isalnum())
+            executor = ThreadPoolExecutor(max_workers=STT_CONNECT_WORKERS, thread_name_prefix=prefix)
+            _connect_executors[service_name] = executor
+        return executor
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Jittered exponential backoff: ~1s, ~2s, ~4s, ..."""
+    base = 2 ** attempt
+    return base * random.uniform(1.0 - STT_RETRY_JITTER, 1.0 + STT_RETRY_JITTER)
+
+
+class ConnectionRetry:
+    """
+    Connection attempt sequence for one session and provider
+
+    Args:
+        connect: Callable that returns True on success, False on failure
+        session_id: Session ID for logging and status events
+        service_name: Name of the service for logging
+        on_success: Called (on a worker thread) once a connection attempt succeeds
+        on_failure: Called (on a worker thread) when all attempts are exhausted
+        on_abandon: Called if an attempt succeeds after cancel() - should close the connection
+        socketio_instance: Optional SocketIO instance for emitting retry status to frontend
+        max_retries: Maximum number of retry attempts
+        attempt_lock: Optional lock serialising attempts for the same session, so a newer
+                      sequence never races an older attempt that is still running
+    """
+
+    def __init__(self, connect: Callable[[], bool], session_id: str, service_name: str,
+                 on_success: Callable[[], None], on_failure: Callable[[], None],
+                 on_abandon: Optional[Callable[[], None]] = None,
+                 socketio_instance: Optional[SocketIO] = None,
+                 max_retries: int = 3,
+                 attempt_lock: Optional[threading.Lock] = None):
+        self.connect = connect
+        self.session_id = session_id
+        self.service_name = service_name
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.on_abandon = on_abandon
+        self.socketio = socketio_instance
+        self.max_retries = max(0, max_retries)
+        self.attempt_lock = attempt_lock or threading.Lock()
+        self.attempt = 0
+        self.cancelled = False
+        # Guards cancelled against an attempt deciding its outcome - held briefly, never during connect()
+        self._state_lock = threading.Lock()
+        self._backoff_timer: Optional[WheelTimer] = None
+
+    def start(self) -> 'ConnectionRetry':
+        """Queue the first attempt and return immediately"""
+        logger.info(f"🔄 RETRY_START | Service: {self.service_name} | Session: {self.session_id} | MaxRetries: {self.max_retries}")
+        if self.max_retries == 0:
+            logger.info(f"🔄 RETRY_DISABLED | Service: {self.service_name} | Session: {self.session_id} | Retries disabled, attempting single connection")
+        self._submit()
+        return self
+
+    def cancel(self):
+        """Stop further attempts - safe to call from any thread, any number of times"""
+        with self._state_lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+        if self._backoff_timer:
+            self._backoff_timer.cancel()
+        logger.info(f"🛑 RETRY_CANCELLED | Service: {self.service_name} | Session: {self.session_id} | Attempt: {self.attempt + 1}")
+
+    def _submit(self):
+        if self.cancelled:
+            return
+        try:
+            connect_executor_for(self.service_name).submit(self._run_attempt)
+        except RuntimeError:
+            # Executor shut down during interpreter exit
+            pass
+
+    def _emit_status(self, message: str):
+        if self.socketio and self.session_id and not self.cancelled:
+            self.socketio.emit('transcription_status', {
+                'status': 'retrying',
+                'message': message
+            }, room=self.session_id)
+
+    def _run_attempt(self):
+        with self.attempt_lock:
+            if self.cancelled:
+                return
+            attempt = self.attempt
+            logger.info(f"🔄 RETRY_ATTEMPT | Service: {self.service_name} | Session: {self.session_id} | Attempt: {attempt + 1}/{self.max_retries + 1}")
+            error: Optional[Exception] = None
+            try:
+                result = self.connect()
+            except Exception as e:
+                result = False
+                error = e
+
+            # Decide the outcome once: a cancel() after this point sees a finished attempt,
+            # one before it gets the connection closed - never neither
+            with self._state_lock:
+                cancelled = self.cancelled
+            if cancelled:
+                if result:
+                    logger.info(f"🛑 RETRY_ABANDONED | Service: {self.service_name} | Session: {self.session_id} | Connected after cancel - closing")
+                    if self.on_abandon:
+                        try:
+                            self.on_abandon()
+                        except Exception as e:
+                            logger.warning(f"Error closing abandoned {self.service_name} connection for session {self.session_id}: {e}")
+                return
+
+        if result:
+            if attempt > 0:
+                logger.info(f"✅ RETRY_SUCCESS | Service: {self.service_name} | Session: {self.session_id} | SucceededOnAttempt: {attempt + 1}")
+                # Notify frontend that retry succeeded
+                self._emit_status(f'{self.service_name} connected successfully after retry')
+            else:
+                logger.info(f"✅ RETRY_SUCCESS | Service: {self.service_name} | Session: {self.session_id} | SucceededOnFirstAttempt")
+            self.on_success()
+            return
+
+        if attempt >= self.max_retries:
+            if error:
+                logger.error(f"❌ RETRY_EXHAUSTED_EXCEPTION | Service: {self.service_name} | Session: {self.session_id} | Exception: {type(error).__name__}: {error}")
+            else:
+                logger.error(f"❌ RETRY_EXHAUSTED | Service: {self.service_name} | Session: {self.session_id} | AllAttemptsFailed: {self.max_retries + 1}")
+            self.on_failure()
+            return
+
+        backoff = backoff_seconds(attempt)
+        if error:
+            logger.warning(
+                f"⚠️ RETRY_EXCEPTION | Service: {self.service_name} | Session: {self.session_id} | "
+                f"Attempt: {attempt + 1} | Exception: {type(error).__name__}: {error} | BackoffSeconds: {backoff:.2f}"
+            )
+        else:
+            logger.warning(
+                f"⚠️ RETRY_FAILED | Service: {self.service_name} | Session: {self.session_id} | "
+                f"Attempt: {attempt + 1} | BackoffSeconds: {backoff:.2f} | RetriesLeft: {self.max_retries - attempt}"
+            )
+        # Notify frontend about retry (seamlessly in background)
+        self._emit_status(f'Connecting to {self.service_name}... (attempt {attempt + 2}/{self.max_retries + 1})')
+
+        self.attempt = attempt + 1
+        # Wait out the backoff on the timer wheel instead of sleeping a thread
+        self._backoff_timer = get_timer_wheel().schedule(
+            backoff, self._submit, name=f"retry:{self.service_name}:{self.session_id}"
+        )
+        if self.cancelled:
+            self._backoff_timer.cancel()
@@ -4,31 +4,34 @@ Handles WebSocket connections and audio transcription using ElevenLabs Scribe v2
 Updated to support per-session isolation for multiple concurrent users
 """
 import os
+import asyncio
 import json
 import base64
 import logging
 import threading
 import time
-import asyncio
+from concurrent.futures import Future
 from typing import Optional, TYPE_CHECKING, Dict
 from flask_socketio import SocketIO
+from timer_wheel import WheelTimer, get_timer_wheel
+from audio_ring_buffer import AudioRingBuffer, PRECONNECT_BUFFER_CHUNKS, PRECONNECT_OVERFLOW_POLICY
+from performance_log import get_performance_logger
+from metrics_events import MetricEvent, SESSION_END, SESSION_START, TRANSCRIPTION, TRANSCRIPTION_PARTIAL_FALLBACK
+from latency_metrics import CONNECTION_SETUP, SPEECH_END_TO_FINAL, latency_metrics
+from audio_timeline import AudioTimeline
+from transcript_segments import TranscriptSegments
+from warm_pool import get_warm_pool
 
 logger = logging.getLogger(__name__)
 
-# Configure performance logger (only add handler if not already added)
-performance_logger = logging.getLogger('elevenlabs_performance')
-performance_logger.setLevel(logging.INFO)
-if not performance_logger.handlers:
-    performance_handler = logging.FileHandler('voicesearch_performance.log')
-    performance_formatter = logging.Formatter('%(asctime)s - %(filename)s:%(lineno)d - %(message)s')
-    performance_handler.setFormatter(performance_formatter)
-    performance_logger.addHandler(performance_handler)
-performance_logger.propagate = False
+# Performance logger - records are written to voicesearch_performance.log by the shared background writer
+performance_logger = get_performance_logger('elevenlabs_performance')
+ELEVENLABS_MODEL_NAME = "ElevenLabs Scribe V2"  # Model name recorded in performance metrics
 
 # Try to import websockets for async WebSocket connection
 try:
     import websockets
-    from websockets.sync.client import connect as ws_connect
+    from provider_io_loop import AsyncWebSocketConnection
     WEBSOCKETS_AVAILABLE = True
 except ImportError:
     WEBSOCKETS_AVAILABLE = False
@@ -41,6 +44,11 @@ ELEVENLABS_SILENCE_TIMEOUT_SEC = ELEVENLABS_SILENCE_TIMEOUT_MS / 1000.0
 # Audio configuration - must match ElevenLabs requirements
 ELEVENLABS_SAMPLE_RATE = 16000  # 16kHz for pcm_16000 format
 ELEVENLABS_AUDIO_CHUNK_SIZE = 4096  # Match the working implementation
+ELEVENLABS_BYTES_PER_SECOND = ELEVENLABS_SAMPLE_RATE * 2
+
+# How long a stop waits for the committed transcript of the final segment before closing anyway
+ELEVENLABS_COMMIT_TIMEOUT_MS = int(os.getenv("ELEVENLABS_COMMIT_TIMEOUT_MS", "1000"))
+ELEVENLABS_COMMIT_TIMEOUT_SEC = ELEVENLABS_COMMIT_TIMEOUT_MS / 1000.0
 
 # Session storage for ElevenLabs connections - each session gets isolated state
 elevenlabs_sessions: Dict[str, 'ElevenLabsSession'] = {}
@@ -50,25 +58,30 @@ class ElevenLabsSession:
     def __init__(self, session_id: str, socketio: SocketIO):
         self.session_id = session_id
         self.socketio = socketio
-        self.ws = None
-        self.thread: Optional[threading.Thread] = None
+        self.ws: Optional['AsyncWebSocketConnection'] = None
         self.session_start_time = None
         self.transcription_count = 0
         self.last_transcription_time = None
         self.last_audio_send_time = None
-        self.current_transcript = ""  # Full transcript shown to user (accumulated + current partial)
-        self.accumulated_transcript = ""  # Finalized/committed segments only
+        self.transcript = TranscriptSegments()  # Committed segments + current partial
         self.connection_open = False
         self.session_started = threading.Event()
-        self.silence_timer = None
+        self.silence_timer: Optional[WheelTimer] = None
         self.silence_timer_started = False  # Track if silence timer has been started (to start only on first audio)
         self.language = "Auto"
-        self.audio_buffer = bytearray()
+        # Preallocated ring: pre-connect backlog (overflow drops per policy), then the partial chunk between frames
+        self.audio_buffer = AudioRingBuffer(ELEVENLABS_AUDIO_CHUNK_SIZE * PRECONNECT_BUFFER_CHUNKS, ELEVENLABS_AUDIO_CHUNK_SIZE, overflow=PRECONNECT_OVERFLOW_POLICY)
         self.audio_buffer_lock = threading.Lock()
-        self.stop_event = threading.Event()
+        # Capture time of the audio ElevenLabs received, and when the last committed transcript
+        # arrived while its committed_transcript_with_timestamps (speech end) is still to come
+        self.audio_timeline = AudioTimeline(ELEVENLABS_BYTES_PER_SECOND)
+        self.commit_awaiting_timestamps: Optional[float] = None
         # Track last partial for fallback logging if no committed transcript received
         self.last_partial_text = ""
         self.last_partial_time = None
+        # Connection being closed after stop, and the event its final commit sets (provider I/O loop only)
+        self.closing_ws: Optional['AsyncWebSocketConnection'] = None
+        self.final_commit: Optional[asyncio.Event] = None
         
     def reset_performance_metrics(self):
         """Reset performance tracking for new session"""
@@ -76,10 +89,10 @@ class ElevenLabsSession:
         self.transcription_count = 0
         self.last_transcription_time = None
         self.last_audio_send_time = None
-        self.current_transcript = ""
-        self.accumulated_transcript = ""
+        self.transcript.clear()
         self.last_partial_text = ""
         self.last_partial_time = None
+        self.commit_awaiting_timestamps = None
         self.silence_timer_started = False  # Reset the silence timer started flag
 
 def get_elevenlabs_session(session_id: str, socketio: SocketIO) -> ElevenLabsSession:
@@ -97,7 +110,6 @@ def cleanup_elevenlabs_session(session_id: str):
             # Clean up any active connections
             if session.silence_timer:
                 session.silence_timer.cancel()
-            session.stop_event.set()
             if session.ws:
                 try:
                     session.ws.close()
@@ -107,17 +119,19 @@ def cleanup_elevenlabs_session(session_id: str):
 
 def reset_elevenlabs_silence_timer(session: ElevenLabsSession):
     """Reset the silence timeout timer when transcription is received or audio is sent"""
+    # Re-arm the existing wheel timer in place - no new thread per reset
     if session.silence_timer:
-        session.silence_timer.cancel()
-    session.silence_timer = threading.Timer(ELEVENLABS_SILENCE_TIMEOUT_SEC, lambda: handle_elevenlabs_silence_timeout(session))
-    session.silence_timer.start()
+        session.silence_timer.reset(ELEVENLABS_SILENCE_TIMEOUT_SEC)
+    else:
+        session.silence_timer = get_timer_wheel().schedule(
+            ELEVENLABS_SILENCE_TIMEOUT_SEC, lambda: handle_elevenlabs_silence_timeout(session), name=f"elevenlabs-silence:{session.session_id}"
+        )
     session.silence_timer_started = True
 
 def stop_elevenlabs_silence_timer(session: ElevenLabsSession):
     """Stop the silence timeout timer"""
     if session.silence_timer:
         session.silence_timer.cancel()
-        session.silence_timer = None
     session.silence_timer_started = False
 
 def handle_elevenlabs_silence_timeout(session: ElevenLabsSession):
@@ -127,7 +141,6 @@ def handle_elevenlabs_silence_timeout(session: ElevenLabsSession):
     
     # Close the WebSocket connection
     session.connection_open = False
-    session.stop_event.set()
     
     if session.ws:
         try:
@@ -150,29 +163,26 @@ def handle_elevenlabs_silence_timeout(session: ElevenLabsSession):
             
             time_since_start_ms = (session.last_partial_time - session.session_start_time) * 1000 if session.last_partial_time else session_duration_ms
             
-            performance_logger.info(
-                f"TRANSCRIPTION_PARTIAL_FALLBACK | Session: {session.session_id} | Count: 1 | "
-                f"ResponseTime: {fallback_response_time_ms:.2f}ms | "
-                f"TimeSinceStart: {time_since_start_ms:.2f}ms | "
-                f"Text: \"{session.last_partial_text}\" | "
-                f"Note: VAD did not commit before silence timeout"
-            )
+            performance_logger.info(MetricEvent(
+                TRANSCRIPTION_PARTIAL_FALLBACK, session.session_id, provider="ElevenLabs", model=ELEVENLABS_MODEL_NAME, language=session.language,
+                count=1, response_time_ms=fallback_response_time_ms, time_since_start_ms=time_since_start_ms,
+                text=session.last_partial_text, reason="VAD did not commit before silence timeout"
+            ))
             logger.warning(f"ElevenLabs session ended with uncommitted partial transcript for session {session.session_id}: '{session.last_partial_text}'")
         
         logger.info(
             f"ElevenLabs session ended | Session: {session.session_id} | Duration: {session_duration_ms:.2f}ms | "
             f"TotalTranscriptions: {session.transcription_count} | Reason: SilenceTimeout"
         )
-        performance_logger.info(
-            f"SESSION_END | Session: {session.session_id} | TotalDuration: {session_duration_ms:.2f}ms | "
-            f"TotalTranscriptions: {session.transcription_count} | Reason: SilenceTimeout"
-        )
+        performance_logger.info(MetricEvent(
+            SESSION_END, session.session_id, provider="ElevenLabs", model=ELEVENLABS_MODEL_NAME, language=session.language,
+            duration_ms=session_duration_ms, count=session.transcription_count, reason="SilenceTimeout"
+        ))
         session.session_start_time = None
         session.transcription_count = 0
         session.last_transcription_time = None
         session.last_audio_send_time = None
-        session.current_transcript = ""
-        session.accumulated_transcript = ""
+        session.transcript.clear()
         session.last_partial_text = ""
         session.last_partial_time = None
     
@@ -184,6 +194,94 @@ def handle_elevenlabs_silence_timeout(session: ElevenLabsSession):
     
     stop_elevenlabs_silence_timer(session)
 
+# Language codes for the languages ElevenLabs is pinned to - any other language is auto-detected
+ELEVENLABS_LANGUAGE_CODES = {
+    "English": "en", "German": "de", "Spanish": "es", "French": "fr",
+    "Japanese": "ja", "Portuguese": "pt", "Russian": "ru", "Italian": "it",
+    "Korean": "ko", "Hindi": "hi", "Chinese": "zh", "Dutch": "nl",
+    "Swedish": "sv", "Finnish": "fi", "Danish": "da", "Norwegian": "no"
+}
+
+def elevenlabs_ws_url(language_name: str) -> str:
+    """Realtime WebSocket URL with the session's query parameters for a language ("Auto" for auto-detection)"""
+    # Build WebSocket URL with proper query parameters
+    model_id = "scribe_v2_realtime"
+    # Base URL override (e.g. ws://127.0.0.1:8767/v1/speech-to-text/realtime for the local mock_stt server)
+    base_url = os.getenv("ELEVENLABS_WS_URL", "wss://api.elevenlabs.io/v1/speech-to-text/realtime")
+    ws_url = (
+        f"{base_url}"
+        f"?model_id={model_id}"
+        f"&audio_format=pcm_16000"
+        f"&commit_strategy=vad"
+        f"&include_timestamps=true"
+        f"&vad_silence_threshold_secs=0.5"
+        f"&vad_threshold=0.5"
+    )
+    
+    # Only add language_code for a known language (omit for auto-detection)
+    lang_code = ELEVENLABS_LANGUAGE_CODES.get(language_name)
+    if lang_code:
+        ws_url += f"&language_code={lang_code}"
+    return ws_url
+
+def open_warm_elevenlabs_connection(language_name: str, on_lost) -> Future:
+    """
+    Open an idle ElevenLabs connection for the warm pool (see warm_pool.py)
+    
+    Args:
+        language_name: Language the connection is opened for
+        on_lost: Called with the connection if it closes or fails while idle
+    
+    Returns:
+        Future resolving to the AsyncWebSocketConnection once session_started arrives
+    """
+    if not WEBSOCKETS_AVAILABLE:
+        raise ConnectionError("websockets library not available")
+    api_key = os.getenv("ELEVENLABS_API_KEY")
+    if not api_key:
+        raise ConnectionError("ELEVENLABS_API_KEY environment variable is not set")
+    ready: Future = Future()
+    
+    def settle(ws, error=None):
+        if ready.done():
+            on_lost(ws)
+            return
+        try:
+            if error:
+                ready.set_exception(error)
+            else:
+                ready.set_result(ws)
+        except Exception:
+            # Cancelled by the pool (open timeout)
+            pass
+    
+    def on_message(ws, message):
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        message_type = data.get("type", data.get("message_type"))
+        if message_type == "session_started" and not ready.done():
+            settle(ws)
+        elif message_type in ("error", "auth_error", "quota_exceeded", "transcriber_error", "input_error", "rate_limited"):
+            settle(ws, ConnectionError(f"{message_type}: {data.get('error', data.get('message', 'Unknown error'))}"))
+    
+    # Replaced with the session's callbacks when the connection is claimed
+    ws = AsyncWebSocketConnection(
+        elevenlabs_ws_url(language_name),
+        header={"xi-api-key": api_key},
+        on_message=on_message,
+        on_error=lambda ws, error: settle(ws, error if isinstance(error, Exception) else ConnectionError(str(error))),
+        on_close=lambda ws, code, reason: settle(ws, ConnectionError(f"closed before session_started: {code} - {reason}")),
+        name=f"elevenlabs-warm:{language_name}"
+    )
+    ready.add_done_callback(lambda f: f.cancelled() and ws.close())
+    ws.start()
+    return ready
+
+# Started sessions waiting for a user (WARM_POOL_SIZE > 0), keyed by language
+elevenlabs_warm_pool = get_warm_pool("ElevenLabs", open_warm_elevenlabs_connection, lambda ws: ws.close())
+
 def initialize_elevenlabs_connection(socketio_instance: SocketIO, language_name: str = "Auto", session_id: str = None):
     """
     Initialize ElevenLabs Scribe V2 WebSocket connection
@@ -205,13 +303,17 @@ def initialize_elevenlabs_connection(socketio_instance: SocketIO, language_name:
         return False
     
     session = get_elevenlabs_session(session_id, socketio_instance)
+    session.socketio = socketio_instance  # The session may have been created for another mode (plain / compare)
     session.language = language_name
     session.session_started.clear()
-    session.stop_event.clear()
+    
+    # A previous stop may still be waiting for its final commit - stop waiting and close it now
+    abort_pending_elevenlabs_close(session)
     
     # Clear audio buffer
     with session.audio_buffer_lock:
-        session.audio_buffer = bytearray()
+        session.audio_buffer.clear()
+        session.audio_timeline.reset()
     
     # Get ElevenLabs API key from environment
     api_key = os.getenv("ELEVENLABS_API_KEY")
@@ -235,106 +337,109 @@ def initialize_elevenlabs_connection(socketio_instance: SocketIO, language_name:
     session.reset_performance_metrics()
     session.connection_open = False
     
-    # Build WebSocket URL with proper query parameters
-    model_id = "scribe_v2_realtime"
-    ws_url = (
-        f"wss://api.elevenlabs.io/v1/speech-to-text/realtime"
-        f"?model_id={model_id}"
-        f"&audio_format=pcm_16000"
-        f"&commit_strategy=vad"
-        f"&vad_silence_threshold_secs=0.5"
-        f"&vad_threshold=0.5"
-    )
-    
-    # Only add language_code if not Auto (omit for auto-detection)
-    if language_name and language_name != "Auto":
-        # Map language names to codes
-        lang_map = {
-            "English": "en", "German": "de", "Spanish": "es", "French": "fr",
-            "Japanese": "ja", "Portuguese": "pt", "Russian": "ru", "Italian": "it",
-            "Korean": "ko", "Hindi": "hi", "Chinese": "zh", "Dutch": "nl",
-            "Swedish": "sv", "Finnish": "fi", "Danish": "da", "Norwegian": "no"
-        }
-        lang_code = lang_map.get(language_name)
-        if lang_code:
-            ws_url += f"&language_code={lang_code}"
-    
+    ws_url = elevenlabs_ws_url(language_name)
     logger.info(f"Initializing ElevenLabs connection for session {session.session_id} to: {ws_url}")
     
-    def run_websocket():
-        """Run WebSocket connection in a separate thread"""
-        try:
-            headers = {"xi-api-key": api_key}
-            session.ws = ws_connect(ws_url, additional_headers=headers)
-            logger.info(f"✅ Connected to ElevenLabs Scribe v2 Realtime for session {session.session_id}")
+    def on_message(ws, message):
+        # Ignore late messages from a connection that has been replaced (a closing one still delivers its final commit)
+        if session.ws is ws or session.closing_ws is ws:
+            handle_elevenlabs_message(session, message)
+    
+    def on_error(ws, error):
+        if session.ws is not ws:
+            return
+        if not ws.connected and session.connection_open:
+            logger.info(f"ElevenLabs WebSocket connection closed for session {session.session_id}: {error}")
+            return
+        logger.error(f"ElevenLabs WebSocket error for session {session.session_id}: {error}")
+        session.socketio.emit('transcription_status', {
+            'status': 'error',
+            'message': f'ElevenLabs connection error: {error}'
+        }, room=session.session_id)
+    
+    def on_close(ws, close_status_code, close_msg):
+        logger.info(f"ElevenLabs WebSocket connection closed for session {session.session_id}: {close_status_code} - {close_msg}")
+        if session.ws is not None and session.ws is not ws:
+            return
+        session.connection_open = False
+        stop_elevenlabs_silence_timer(session)
+        if session.session_start_time:
+            session_duration_ms = (time.perf_counter() - session.session_start_time) * 1000
             
-            # Start receiving messages
-            while not session.stop_event.is_set():
-                try:
-                    message = session.ws.recv(timeout=0.1)
-                    if message:
-                        handle_elevenlabs_message(session, message)
-                except TimeoutError:
-                    continue
-                except Exception as e:
-                    if session.stop_event.is_set():
-                        break
-                    error_str = str(e).lower()
-                    if "closed" in error_str or "connection" in error_str:
-                        logger.info(f"ElevenLabs WebSocket connection closed for session {session.session_id}")
-                        break
-                    logger.error(f"Error receiving ElevenLabs message for session {session.session_id}: {e}")
-                    break
-        
-        except Exception as e:
-            logger.error(f"ElevenLabs WebSocket error for session {session.session_id}: {e}")
-            session.socketio.emit('transcription_status', {
-                'status': 'error',
-                'message': f'ElevenLabs connection error: {e}'
-            }, room=session.session_id)
-        finally:
-            session.connection_open = False
-            stop_elevenlabs_silence_timer(session)
-            if session.session_start_time:
-                session_duration_ms = (time.perf_counter() - session.session_start_time) * 1000
+            # If session ends with 0 committed transcripts but we have a partial, log it as fallback
+            if session.transcription_count == 0 and session.last_partial_text:
+                # Calculate response time from last audio send to last partial
+                if session.last_partial_time and session.last_audio_send_time:
+                    fallback_response_time_ms = (session.last_partial_time - session.last_audio_send_time) * 1000
+                else:
+                    fallback_response_time_ms = 0
                 
-                # If session ends with 0 committed transcripts but we have a partial, log it as fallback
-                if session.transcription_count == 0 and session.last_partial_text:
-                    # Calculate response time from last audio send to last partial
-                    if session.last_partial_time and session.last_audio_send_time:
-                        fallback_response_time_ms = (session.last_partial_time - session.last_audio_send_time) * 1000
-                    else:
-                        fallback_response_time_ms = 0
-                    
-                    time_since_start_ms = (session.last_partial_time - session.session_start_time) * 1000 if session.last_partial_time else session_duration_ms
-                    
-                    performance_logger.info(
-                        f"TRANSCRIPTION_PARTIAL_FALLBACK | Session: {session.session_id} | Count: 1 | "
-                        f"ResponseTime: {fallback_response_time_ms:.2f}ms | "
-                        f"TimeSinceStart: {time_since_start_ms:.2f}ms | "
-                        f"Text: \"{session.last_partial_text}\" | "
-                        f"Note: VAD did not commit before session ended"
-                    )
-                    logger.warning(f"ElevenLabs session ended with uncommitted partial transcript for session {session.session_id}: '{session.last_partial_text}'")
+                time_since_start_ms = (session.last_partial_time - session.session_start_time) * 1000 if session.last_partial_time else session_duration_ms
                 
-                performance_logger.info(
-                    f"SESSION_END | Session: {session.session_id} | TotalDuration: {session_duration_ms:.2f}ms | "
-                    f"TotalTranscriptions: {session.transcription_count}"
-                )
+                performance_logger.info(MetricEvent(
+                    TRANSCRIPTION_PARTIAL_FALLBACK, session.session_id, provider="ElevenLabs", model=ELEVENLABS_MODEL_NAME, language=session.language,
+                    count=1, response_time_ms=fallback_response_time_ms, time_since_start_ms=time_since_start_ms,
+                    text=session.last_partial_text, reason="VAD did not commit before session ended"
+                ))
+                logger.warning(f"ElevenLabs session ended with uncommitted partial transcript for session {session.session_id}: '{session.last_partial_text}'")
+            
+            performance_logger.info(MetricEvent(
+                SESSION_END, session.session_id, provider="ElevenLabs", model=ELEVENLABS_MODEL_NAME, language=session.language,
+                duration_ms=session_duration_ms, count=session.transcription_count
+            ))
+    
+    # A pooled connection has already received session_started - take it over
+    # (languages without a code get the same auto-detecting connection as "Auto")
+    connect_start = time.perf_counter()
+    warm_ws = elevenlabs_warm_pool.claim(language_name if language_name in ELEVENLABS_LANGUAGE_CODES else "Auto")
+    if warm_ws and not warm_ws.connected:
+        warm_ws.close()
+        warm_ws = None
+    if warm_ws:
+        session.ws = warm_ws
+        warm_ws.on_message, warm_ws.on_error, warm_ws.on_close = on_message, on_error, on_close
+        logger.info(f"✅ Claimed a warm ElevenLabs Scribe v2 Realtime connection for session {session.session_id}")
+        mark_elevenlabs_session_started(session)
+        latency_metrics.observe(CONNECTION_SETUP, "ElevenLabs", session.language, (time.perf_counter() - connect_start) * 1000)
+        return True
     
-    # Start WebSocket in a separate thread
-    session.thread = threading.Thread(target=run_websocket, daemon=True)
-    session.thread.start()
+    # Connect and receive on the shared provider I/O loop (no thread per session)
+    session.ws = AsyncWebSocketConnection(
+        ws_url,
+        header={"xi-api-key": api_key},
+        on_open=lambda ws: logger.info(f"✅ Connected to ElevenLabs Scribe v2 Realtime for session {session.session_id}"),
+        on_message=on_message,
+        on_error=on_error,
+        on_close=on_close,
+        name=f"elevenlabs:{session.session_id}"
+    )
+    session.ws.start()
     
     # Wait for session to start (with timeout)
     max_wait_time = 5.0
     if session.session_started.wait(timeout=max_wait_time):
         logger.info(f"ElevenLabs WebSocket connection started and session ready for session {session.session_id}")
+        latency_metrics.observe(CONNECTION_SETUP, "ElevenLabs", session.language, (time.perf_counter() - connect_start) * 1000)
         return True
     else:
         logger.warning(f"ElevenLabs session did not start within {max_wait_time}s for session {session.session_id} - connection may still be establishing")
         return True
 
+def mark_elevenlabs_session_started(session: ElevenLabsSession):
+    """The session's connection can take audio (session_started received, or a warm connection claimed)"""
+    session.connection_open = True
+    session.session_started.set()
+    session.session_start_time = time.perf_counter()
+    
+    # NOTE: Silence timer is NOT started here - it will be started when first audio is sent
+    # This prevents false "silence timeout" messages when user hasn't started speaking yet
+    
+    # Log session start
+    performance_logger.info(MetricEvent(SESSION_START, session.session_id, provider="ElevenLabs", model=ELEVENLABS_MODEL_NAME, language=session.language))
+    
+    # Notify frontend that connection is ready
+    session.socketio.emit('transcription_status', {'status': 'started', 'api': 'ElevenLabs ScribeV2'}, room=session.session_id)
+
 def handle_elevenlabs_message(session: ElevenLabsSession, message: str):
     """Handle incoming messages from ElevenLabs for specific session"""
     try:
@@ -350,20 +455,7 @@ def handle_elevenlabs_message(session: ElevenLabsSession, message: str):
             if config:
                 logger.debug(f"   Config for session {session.session_id}: {json.dumps(config, indent=2)}")
             
-            session.connection_open = True
-            session.session_started.set()
-            session.session_start_time = time.perf_counter()
-            
-            # NOTE: Silence timer is NOT started here - it will be started when first audio is sent
-            # This prevents false "silence timeout" messages when user hasn't started speaking yet
-            
-            # Log session start
-            performance_logger.info(
-                f"SESSION_START | Session: {session.session_id} | Language: {session.language} | Model: ElevenLabs Scribe V2 | Timestamp: {time.time()}"
-            )
-            
-            # Notify frontend that connection is ready
-            session.socketio.emit('transcription_status', {'status': 'started', 'api': 'ElevenLabs ScribeV2'}, room=session.session_id)
+            mark_elevenlabs_session_started(session)
         
         elif message_type == "partial_transcript":
             text = data.get("text", "")
@@ -371,34 +463,33 @@ def handle_elevenlabs_message(session: ElevenLabsSession, message: str):
                 # Reset silence timer on partial transcript
                 reset_elevenlabs_silence_timer(session)
                 
-                # Build the full display transcript: accumulated segments + current partial
-                if session.accumulated_transcript and session.accumulated_transcript.strip():
-                    session.current_transcript = session.accumulated_transcript.strip() + " " + text.strip()
-                else:
-                    session.current_transcript = text.strip()
+                # Replace the current partial segment
+                segment_id = session.transcript.set_partial(text)
+                segment = session.transcript.partial
                 
                 # Track last partial for fallback logging if no committed transcript is received
-                session.last_partial_text = session.current_transcript
+                session.last_partial_text = segment
                 session.last_partial_time = time.perf_counter()
                 
-                logger.info(f"ElevenLabs partial transcript for session {session.session_id}: {text} | Display: {session.current_transcript}")
-                # Emit the full transcript (accumulated + partial) for real-time feedback
-                session.socketio.emit('transcription_update', {'transcription': session.current_transcript}, room=session.session_id)
-                logger.info(f"✅ Emitted transcription_update event for session {session.session_id} with partial: '{session.current_transcript}'")
+                logger.debug(f"ElevenLabs partial transcript for session {session.session_id}: Segment {segment_id}: {segment}")
+                # Emit the changed segment (with the full transcript) for real-time feedback
+                session.socketio.emit('transcription_update', session.transcript.update_payload(segment_id, segment, 'ElevenLabs ScribeV2', False), room=session.session_id)
+                logger.debug(f"✅ Emitted transcription_update event for session {session.session_id} with partial segment {segment_id}: '{segment}'")
+        
+        elif message_type == "committed_transcript_with_timestamps" and session.commit_awaiting_timestamps is not None:
+            # Word timings of the segment just committed - time it from the end of its last word
+            observe_elevenlabs_speech_end(session, data.get("words"), session.commit_awaiting_timestamps)
+            session.commit_awaiting_timestamps = None
+            # A pending close held the socket open for these timings
+            signal_elevenlabs_final_commit(session)
         
         elif message_type in ("committed_transcript", "final_transcript", "committed_transcript_with_timestamps"):
             text = data.get("text", "")
+            awaiting_timestamps = False
             if text:
-                # Add this segment to accumulated transcripts
+                # Commit this segment (replaces the partial)
                 # This ensures pauses during speech don't break the transcription
-                if session.accumulated_transcript and session.accumulated_transcript.strip():
-                    # Add space separator and append new segment
-                    session.accumulated_transcript = session.accumulated_transcript.strip() + " " + text.strip()
-                else:
-                    session.accumulated_transcript = text.strip()
-                
-                # Update current_transcript to match accumulated (no pending partial)
-                session.current_transcript = session.accumulated_transcript
+                segment_id = session.transcript.commit(text)
                 
                 current_time = time.perf_counter()
                 
@@ -418,24 +509,36 @@ def handle_elevenlabs_message(session: ElevenLabsSession, message: str):
                 session.last_transcription_time = current_time
                 
                 # Log performance metrics
-                performance_logger.info(
-                    f"TRANSCRIPTION | Session: {session.session_id} | Count: {session.transcription_count} | "
-                    f"ResponseTime: {transcription_response_time_ms:.2f}ms | "
-                    f"TimeSinceStart: {time_since_start_ms:.2f}ms | "
-                    f"TimeSinceLast: {time_since_last_ms:.2f}ms | "
-                    f"Text: \"{session.current_transcript}\""
-                )
+                performance_logger.info(MetricEvent(
+                    TRANSCRIPTION, session.session_id, provider="ElevenLabs", model=ELEVENLABS_MODEL_NAME, language=session.language,
+                    count=session.transcription_count, response_time_ms=transcription_response_time_ms,
+                    time_since_start_ms=time_since_start_ms, time_since_last_ms=time_since_last_ms,
+                    text=text.strip()
+                ))
+                
+                if message_type == "committed_transcript_with_timestamps":
+                    observe_elevenlabs_speech_end(session, data.get("words"), current_time)
+                else:
+                    # include_timestamps=true: the word timings follow in committed_transcript_with_timestamps
+                    session.commit_awaiting_timestamps = current_time
+                    awaiting_timestamps = True
                 
                 # Reset silence timer
                 reset_elevenlabs_silence_timer(session)
                 
-                logger.info(f"ElevenLabs committed transcript for session {session.session_id}: {text} | Accumulated: {session.accumulated_transcript}")
-                # Send the accumulated transcript to the frontend
-                session.socketio.emit('transcription_update', {'transcription': session.current_transcript}, room=session.session_id)
-                logger.info(f"✅ Emitted transcription_update event for session {session.session_id} with final: '{session.current_transcript}'")
+                logger.info(f"ElevenLabs committed transcript for session {session.session_id}: Segment {segment_id}: {text} | Segments: {len(session.transcript.segments)}")
+                # Send the committed segment (with the full transcript) to the frontend
+                session.socketio.emit('transcription_update', session.transcript.update_payload(segment_id, text.strip(), 'ElevenLabs ScribeV2', True), room=session.session_id)
+                logger.info(f"✅ Emitted transcription_update event for session {session.session_id} with final segment {segment_id}")
+            # An empty commit still answers a pending close's explicit commit request; a commit
+            # whose word timings are still to come keeps it open until they arrive
+            if not awaiting_timestamps:
+                signal_elevenlabs_final_commit(session)
         
         elif message_type == "commit_throttled":
             logger.warning(f"⚠️ ElevenLabs commit throttled for session {session.session_id}")
+            # No committed transcript will follow - don't hold a pending close until its deadline
+            signal_elevenlabs_final_commit(session)
         
         elif message_type in ("error", "auth_error", "quota_exceeded", "transcriber_error", "input_error", "rate_limited"):
             error = data.get("error", data.get("message", "Unknown error"))
@@ -445,6 +548,7 @@ def handle_elevenlabs_message(session: ElevenLabsSession, message: str):
                 'status': 'error',
                 'message': f'ElevenLabs error: {error}'
             }, room=session.session_id)
+            signal_elevenlabs_final_commit(session)
         else:
             logger.debug(f"🔍 ElevenLabs message type '{message_type}' for session {session.session_id}: {json.dumps(data)[:200]}")
     
@@ -453,13 +557,32 @@ def handle_elevenlabs_message(session: ElevenLabsSession, message: str):
     except Exception as e:
         logger.error(f"Error processing ElevenLabs message for session {session.session_id}: {e}")
 
-def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None) -> bool:
+def observe_elevenlabs_speech_end(session: ElevenLabsSession, words, committed_at: float):
+    """
+    Record the speech-end-to-final latency of a committed segment
+    
+    Args:
+        session: ElevenLabsSession the segment belongs to
+        words: 'words' of committed_transcript_with_timestamps (start/end in seconds of the audio stream)
+        committed_at: perf_counter() time the committed transcript arrived
+    """
+    ends = [word.get("end") for word in words or [] if word.get("type", "word") == "word" and word.get("end") is not None]
+    if not ends:
+        return
+    latency_ms = session.audio_timeline.latency_ms(ends[-1], now=committed_at)
+    if latency_ms is None:
+        return
+    latency_metrics.observe(SPEECH_END_TO_FINAL, "ElevenLabs", session.language, latency_ms)
+    performance_logger.info(f"SPEECH_END_TO_FINAL | Session: {session.session_id} | Provider: ElevenLabs | Latency: {latency_ms:.2f}ms")
+
+def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None, captured_at: Optional[float] = None) -> bool:
     """
     Send audio data to ElevenLabs WebSocket for specific session
     
     Args:
         audio_data: Audio data in bytes (PCM16 format, 16kHz)
         session_id: Session ID for user isolation
+        captured_at: perf_counter() time the last sample was captured (default: now)
     
     Returns:
         bool: True if audio was sent successfully
@@ -482,29 +605,21 @@ def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None) -> bool:
     if not session.connection_open:
         # Buffer audio while connection is establishing
         with session.audio_buffer_lock:
-            session.audio_buffer.extend(audio_data)
-            if len(session.audio_buffer) > ELEVENLABS_AUDIO_CHUNK_SIZE * 10:
-                session.audio_buffer = session.audio_buffer[-ELEVENLABS_AUDIO_CHUNK_SIZE * 5:]
-        logger.debug(f"ElevenLabs connection establishing for session {session.session_id} - buffered {len(audio_data)} bytes")
+            dropped = session.audio_buffer.append(audio_data)
+            session.audio_timeline.record_buffered(len(audio_data), dropped, session.audio_buffer.overflow, captured_at)
+        logger.debug(f"ElevenLabs connection establishing for session {session.session_id} - buffered {len(audio_data)} bytes (total buffer: {len(session.audio_buffer)} bytes, dropped: {session.audio_buffer.dropped_bytes} bytes)")
         return False
     
     try:
-        # Add incoming data to buffer
+        # Chunk the backlog and the frame as base64 (ElevenLabs format) - views are only valid under the lock,
+        # and nothing is dropped while connected
         with session.audio_buffer_lock:
-            session.audio_buffer.extend(audio_data)
+            chunks = session.audio_buffer.send_through(audio_data, lambda chunk: base64.b64encode(chunk).decode('utf-8'))
+            session.audio_timeline.record(len(audio_data), captured_at)
         
         # Send buffered audio in chunks
         bytes_sent = 0
-        while True:
-            with session.audio_buffer_lock:
-                if len(session.audio_buffer) < ELEVENLABS_AUDIO_CHUNK_SIZE:
-                    break
-                chunk = bytes(session.audio_buffer[:ELEVENLABS_AUDIO_CHUNK_SIZE])
-                session.audio_buffer = session.audio_buffer[ELEVENLABS_AUDIO_CHUNK_SIZE:]
-            
-            # Encode audio as base64 (ElevenLabs format)
-            audio_base64 = base64.b64encode(chunk).decode('utf-8')
-            
+        for audio_base64 in chunks:
             # Message format per ElevenLabs API
             message = {
                 "message_type": "input_audio_chunk",
@@ -522,7 +637,7 @@ def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None) -> bool:
                 reset_elevenlabs_silence_timer(session)
             
             session.ws.send(json.dumps(message))
-            bytes_sent += len(chunk)
+            bytes_sent += ELEVENLABS_AUDIO_CHUNK_SIZE
         
         if bytes_sent > 0:
             logger.debug(f"📤 Sent {bytes_sent} bytes to ElevenLabs for session {session.session_id}")
@@ -541,8 +656,75 @@ def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None) -> bool:
             logger.error(f"Error sending audio to ElevenLabs for session {session.session_id}: {e}")
         return False
 
+def note_elevenlabs_gated_audio(session_id: str = None) -> None:
+    """
+    Account for audio the VAD gate withheld from ElevenLabs for a session.
+    Starts the silence timer as the first audio send would have, so a session in which
+    nobody speaks still times out.
+    
+    Args:
+        session_id: Session ID for user isolation
+    """
+    with elevenlabs_sessions_lock:
+        session = elevenlabs_sessions.get(session_id)
+    if session and session.session_started.is_set() and not session.silence_timer_started:
+        reset_elevenlabs_silence_timer(session)
+
+def signal_elevenlabs_final_commit(session: ElevenLabsSession):
+    """Wake a close that is waiting for the final commit (called on the provider I/O loop)"""
+    if session.final_commit:
+        session.final_commit.set()
+
+def abort_pending_elevenlabs_close(session: ElevenLabsSession):
+    """Stop waiting for a previous connection's final commit so it closes right away"""
+    closing_ws, final_commit = session.closing_ws, session.final_commit
+    session.closing_ws = None
+    session.final_commit = None
+    if closing_ws and final_commit:
+        closing_ws.io_loop.call_soon(final_commit.set)
+
+async def close_elevenlabs_after_final_commit(session: ElevenLabsSession, ws: 'AsyncWebSocketConnection', final_commit: asyncio.Event):
+    """
+    Wait (on the provider I/O loop) for the committed transcript requested by close_elevenlabs_connection,
+    and its word timings, up to ELEVENLABS_COMMIT_TIMEOUT_MS, then close the WebSocket
+    """
+    wait_start = time.perf_counter()
+    try:
+        await asyncio.wait_for(final_commit.wait(), ELEVENLABS_COMMIT_TIMEOUT_SEC)
+        outcome = "Committed"
+    except asyncio.TimeoutError:
+        outcome = "Deadline"
+    wait_ms = (time.perf_counter() - wait_start) * 1000
+    
+    if session.closing_ws is ws:
+        session.closing_ws = None
+        session.final_commit = None
+        if session.commit_awaiting_timestamps is not None:
+            logger.warning(f"⚠️ ElevenLabs word timings for the final commit did not arrive for session {session.session_id} - no speech-end latency recorded")
+            session.commit_awaiting_timestamps = None
+        # Reset transcript now that the final segment has been delivered
+        session.transcript.clear()
+    else:
+        # A new connection was started meanwhile and cut the wait short
+        outcome = "Superseded"
+    
+    performance_logger.info(
+        f"FINAL_COMMIT | Session: {session.session_id} | Outcome: {outcome} | "
+        f"WaitTime: {wait_ms:.2f}ms | Timeout: {ELEVENLABS_COMMIT_TIMEOUT_MS}ms"
+    )
+    logger.info(f"Closing ElevenLabs WebSocket connection for session {session.session_id} after final commit wait ({outcome}, {wait_ms:.0f}ms)")
+    ws.close()
+    logger.info(f"🔌 ElevenLabs disconnected for session {session.session_id}")
+
 def close_elevenlabs_connection(session_id: str = None):
-    """Close ElevenLabs WebSocket connection for specific session"""
+    """
+    Close ElevenLabs WebSocket connection for specific session
+    
+    Returns immediately. If the connection is open, the remaining buffered audio is sent with an
+    explicit commit and the socket is closed once the committed transcript and its word timings
+    arrive (or after
+    ELEVENLABS_COMMIT_TIMEOUT_MS) on the provider I/O loop.
+    """
     if not session_id:
         logger.warning("Session ID is required for ElevenLabs connection closing")
         return
@@ -555,29 +737,43 @@ def close_elevenlabs_connection(session_id: str = None):
     
     # Get WebSocket reference before any changes
     ws_to_close = session.ws
+    was_open = session.connection_open
     
-    # Wait briefly for VAD to commit any pending transcripts before closing
-    # VAD (Voice Activity Detection) handles commits automatically when it detects silence
-    # We just need to give it time to process the final audio
-    if ws_to_close and session.connection_open:
-        import time
-        # Wait longer than vad_silence_threshold_secs (0.5s) to ensure VAD has time to commit
-        logger.info(f"Waiting for ElevenLabs VAD to commit any pending transcripts for session {session.session_id}")
-        time.sleep(1.0)  # 1000ms wait for VAD to detect silence and commit
-    
-    # NOW signal stop (after we've had a chance to receive committed transcript)
-    session.stop_event.set()
+    # Stop accepting audio for this connection
     session.connection_open = False
+    session.ws = None
     
     # Stop silence timer
     stop_elevenlabs_silence_timer(session)
     
-    # Clear audio buffer
+    # Take whatever audio is left over (less than one chunk) so it goes out with the commit
     with session.audio_buffer_lock:
-        session.audio_buffer = bytearray()
-    
-    # Clear session WebSocket reference
-    session.ws = None
+        remaining = min(len(session.audio_buffer), ELEVENLABS_AUDIO_CHUNK_SIZE)
+        tail_audio = bytes(session.audio_buffer.peek(remaining)) if was_open else b""
+        session.audio_buffer.clear()
+    
+    if ws_to_close and was_open and ws_to_close.connected:
+        # Ask for an explicit commit instead of waiting for VAD to notice the silence
+        abort_pending_elevenlabs_close(session)
+        session.closing_ws = ws_to_close
+        session.final_commit = asyncio.Event()
+        try:
+            ws_to_close.send(json.dumps({
+                "message_type": "input_audio_chunk",
+                "audio_base_64": base64.b64encode(tail_audio).decode('utf-8'),
+                "commit": True,
+                "sample_rate": ELEVENLABS_SAMPLE_RATE
+            }))
+            logger.info(f"Requested final ElevenLabs commit for session {session.session_id} ({len(tail_audio)} bytes of remaining audio)")
+            ws_to_close.io_loop.submit(
+                close_elevenlabs_after_final_commit(session, ws_to_close, session.final_commit),
+                name=f"elevenlabs-close:{session.session_id}"
+            )
+            return
+        except ConnectionError as e:
+            logger.debug(f"ElevenLabs connection closed before final commit for session {session.session_id}: {e}")
+            session.closing_ws = None
+            session.final_commit = None
     
     # Close WebSocket
     if ws_to_close:
@@ -588,7 +784,6 @@ def close_elevenlabs_connection(session_id: str = None):
             logger.debug(f"Error closing ElevenLabs connection for session {session.session_id} (may be already closed): {e}")
     
     # Reset transcript
-    session.current_transcript = ""
-    session.accumulated_transcript = ""
+    session.transcript.clear()
     
-    logger.info(f"🔌 ElevenLabs disconnected for session {session.session_id}")
\ No newline at end of file
+    logger.info(f"🔌 ElevenLabs disconnected for session {session.session_id}")
@@ -0,0 +1,194 @@
+"""
+In-process Latency Histograms
+Log-bucketed (HDR-style) histograms of provider latency, keyed by metric, provider and
+language, for comparing Deepgram, Azure OpenAI and ElevenLabs without scraping the
+performance log.
+
+Each histogram has a fixed array of buckets whose width grows geometrically
+(LATENCY_BUCKETS_PER_OCTAVE per doubling, ~4% relative error with the default 16), so
+recording a value is one log2() and one increment and memory doesn't grow with traffic.
+
+Recorded metrics (milliseconds):
+    first_transcript_latency_ms  Session start to the first transcript
+    response_time_ms             Last audio sent to each transcript (ResponseTime)
+    time_since_last_ms           Gap between consecutive transcripts (TimeSinceLast)
+    connection_setup_ms          Provider connection start to ready
+    speech_end_to_final_ms       Capture of the end of speech to its final transcript
+                                 (provider timestamps aligned with audio_timeline.AudioTimeline)
+
+Transcription metrics are picked up from the MetricEvents logged to the performance
+loggers (see LatencyHistogramHandler); connection setup and speech-end-to-final are
+recorded by the handlers.
+"""
+import logging
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from metrics_events import MetricEvent, TRANSCRIPTION, TRANSCRIPTION_COMPLETED
+
+FIRST_TRANSCRIPT_LATENCY = "first_transcript_latency_ms"
+RESPONSE_TIME = "response_time_ms"
+TIME_SINCE_LAST = "time_since_last_ms"
+CONNECTION_SETUP = "connection_setup_ms"
+SPEECH_END_TO_FINAL = "speech_end_to_final_ms"
+
+# Bucket resolution and range (values outside the range land in the first/last bucket)
+LATENCY_BUCKETS_PER_OCTAVE = int(os.getenv("LATENCY_BUCKETS_PER_OCTAVE", "16"))
+LATENCY_MIN_MS = 0.1
+LATENCY_MAX_MS = 600000.0
+# Distinct (metric, provider, language) series kept; further languages are recorded as "other"
+LATENCY_MAX_SERIES = int(os.getenv("LATENCY_MAX_SERIES", "256"))
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LogHistogram:
+    """
+    Fixed-size histogram with logarithmically spaced buckets.
+
+    Args:
+        min_value: Lower edge of the first bucket
+        max_value: Values above this are counted in the last bucket
+        buckets_per_octave: Buckets per doubling of the value
+    """
+
+    def __init__(self, min_value: float = LATENCY_MIN_MS, max_value: float = LATENCY_MAX_MS,
+                 buckets_per_octave: int = LATENCY_BUCKETS_PER_OCTAVE):
+        self.min_value = min_value
+        self.buckets_per_octave = buckets_per_octave
+        self.counts = [0] * (int(math.log2(max_value / min_value) * buckets_per_octave) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float):
+        """Add one value - O(1)"""
+        if value > self.min_value:
+            index = min(int(math.log2(value / self.min_value) * self.buckets_per_octave), len(self.counts) - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile q (0-1), or None if empty"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                # Geometric midpoint of the bucket, kept within the observed range
+                value = self.min_value * 2 ** ((index + 0.5) / self.buckets_per_octave)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Count, sum, min, max, mean and p50/p90/p99"""
+        data: Dict[str, Optional[float]] = {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "min": round(self.min, 3) if self.count else None,
+            "max": round(self.max, 3) if self.count else None,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+        }
+        for q in QUANTILES:
+            value = self.percentile(q)
+            data[f"p{int(q * 100)}"] = round(value, 3) if value is not None else None
+        return data
+
+
+class LatencyMetrics:
+    """Thread-safe registry of LogHistograms keyed by (metric, provider, language)"""
+
+    def __init__(self, max_series: int = LATENCY_MAX_SERIES):
+        self.max_series = max_series
+        self._histograms: Dict[Tuple[str, str, str], LogHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, provider: str, language: str, value_ms: Optional[float]):
+        """Record one latency value"""
+        if value_ms is None:
+            return
+        key = (metric, provider or "unknown", language or "unknown")
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                if len(self._histograms) >= self.max_series:
+                    key = (metric, key[1], "other")
+                    histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = LogHistogram()
+            histogram.record(value_ms)
+
+    def observe_event(self, event: MetricEvent):
+        """Record the latencies carried by a transcription event"""
+        if event.kind != TRANSCRIPTION and event.kind != TRANSCRIPTION_COMPLETED:
+            return
+        self.observe(RESPONSE_TIME, event.provider, event.language, event.response_time_ms)
+        if event.count == 1:
+            self.observe(FIRST_TRANSCRIPT_LATENCY, event.provider, event.language, event.time_since_start_ms)
+        else:
+            self.observe(TIME_SINCE_LAST, event.provider, event.language, event.time_since_last_ms)
+
+    def snapshot(self) -> List[Dict]:
+        """Summary of every series, for the JSON endpoint"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [
+                {"metric": metric, "provider": provider, "language": language, **histogram.summary()}
+                for (metric, provider, language), histogram in items
+            ]
+
+    def prometheus_text(self) -> str:
+        """Every series as Prometheus summaries (text exposition format 0.0.4)"""
+        lines: List[str] = []
+        by_metric: Dict[str, List[Dict]] = {}
+        for series in self.snapshot():
+            by_metric.setdefault(series["metric"], []).append(series)
+        for metric, series_list in by_metric.items():
+            name = f"stt_{metric}"
+            lines.append(f"# HELP {name} {metric.replace('_', ' ')} per provider and language")
+            lines.append(f"# TYPE {name} summary")
+            for series in series_list:
+                labels = f'provider="{_escape(series["provider"])}",language="{_escape(series["language"])}"'
+                for q in QUANTILES:
+                    value = series[f"p{int(q * 100)}"]
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {value if value is not None else "NaN"}')
+                lines.append(f"{name}_sum{{{labels}}} {series['sum']}")
+                lines.append(f"{name}_count{{{labels}}} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LatencyHistogramHandler(logging.Handler):
+    """Logging handler that feeds MetricEvents logged to a performance logger into the histograms"""
+
+    def __init__(self, metrics: "LatencyMetrics"):
+        super().__init__()
+        self.metrics = metrics
+
+    def emit(self, record: logging.LogRecord):
+        if isinstance(record.msg, MetricEvent):
+            self.metrics.observe_event(record.msg)
+
+
+# Process-wide histograms served by the /metrics routes
+latency_metrics = LatencyMetrics()
+latency_handler = LatencyHistogramHandler(latency_metrics)
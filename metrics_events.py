@@ -0,0 +1,243 @@
+"""
+Structured Performance Metrics Events
+Typed records for the session/transcription metrics written to the performance log,
+and the encoders the performance log writer uses for them.
+
+Callers log a MetricEvent instead of an f-string:
+
+    performance_logger.info(MetricEvent(TRANSCRIPTION, session.session_id, provider="Deepgram",
+                                        response_time_ms=..., text=transcript))
+
+The event only stores raw values - it is turned into text, JSON or bytes on the writer
+thread, so nothing is formatted on the callback thread. Plain string log lines (errors,
+timeouts, ...) go through the same writer and are written as kind "LOG".
+
+Output formats (PERF_LOG_FORMAT):
+    text    Legacy pipe-delimited lines ("TRANSCRIPTION | Session: ... | ResponseTime: 304.78ms ...")
+    jsonl   One JSON object per line
+    binary  Length-prefixed records, read back with read_binary_events()
+
+Binary record layout (little-endian):
+    uint32 payload length, then payload:
+    uint8 kind code, float64 timestamp, uint32 count,
+    float64 response_time_ms, time_since_start_ms, time_since_last_ms, duration_ms (NaN = not set),
+    then session, provider, model, language, text, reason, extra (JSON) as uint32 length + UTF-8
+"""
+import json
+import logging
+import math
+import struct
+import time
+from typing import Any, Dict, Iterator, Optional
+
+# Event kinds
+SESSION_START = "SESSION_START"
+TRANSCRIPTION = "TRANSCRIPTION"
+TRANSCRIPTION_COMPLETED = "TRANSCRIPTION_COMPLETED"
+TRANSCRIPTION_PARTIAL_FALLBACK = "TRANSCRIPTION_PARTIAL_FALLBACK"
+SESSION_END = "SESSION_END"
+COMPARE_RACE = "COMPARE_RACE"  # One provider's result in a compare-mode utterance race
+LOG = "LOG"  # Plain string log line
+
+_KIND_CODES = {LOG: 0, SESSION_START: 1, TRANSCRIPTION: 2, TRANSCRIPTION_COMPLETED: 3,
+               TRANSCRIPTION_PARTIAL_FALLBACK: 4, SESSION_END: 5, COMPARE_RACE: 6}
+_CODE_KINDS = {code: kind for kind, code in _KIND_CODES.items()}
+
+# Label of the transcript text in the legacy line (Azure's completed segments are "Segment")
+_TEXT_LABELS = {TRANSCRIPTION_COMPLETED: "Segment"}
+
+_HEADER = struct.Struct("<BdIdddd")
+_LENGTH = struct.Struct("<I")
+_NOT_SET = float("nan")
+
+
+class MetricEvent:
+    """
+    One performance metrics record.
+
+    Args:
+        kind: SESSION_START, TRANSCRIPTION, TRANSCRIPTION_COMPLETED, TRANSCRIPTION_PARTIAL_FALLBACK,
+              SESSION_END or COMPARE_RACE
+        session: Session ID
+        provider: "Deepgram", "Azure OpenAI" or "ElevenLabs"
+        model: Model name
+        language: Language name or code
+        count: Transcription number (transcriptions), total transcriptions (SESSION_END) or
+               utterance number (COMPARE_RACE)
+        response_time_ms: Time from the last audio sent to this transcript
+        time_since_start_ms: Time since the session started
+        time_since_last_ms: Time since the previous transcript
+        duration_ms: Session duration (SESSION_END)
+        text: Transcript text
+        reason: Why the session ended, if not a normal close (SESSION_END), or a note on
+                how the transcript was obtained (transcriptions)
+        extra: Additional provider-specific fields, appended to the legacy line as Key: "value"
+        timestamp: Wall-clock time of the event (default: now)
+    """
+
+    __slots__ = ("kind", "session", "provider", "model", "language", "count", "response_time_ms",
+                 "time_since_start_ms", "time_since_last_ms", "duration_ms", "text", "reason",
+                 "extra", "timestamp")
+
+    def __init__(self, kind: str, session: str, provider: str = "", model: str = "", language: str = "",
+                 count: int = 0, response_time_ms: Optional[float] = None,
+                 time_since_start_ms: Optional[float] = None, time_since_last_ms: Optional[float] = None,
+                 duration_ms: Optional[float] = None, text: str = "", reason: str = "",
+                 extra: Optional[Dict[str, Any]] = None, timestamp: Optional[float] = None):
+        self.kind = kind
+        self.session = session
+        self.provider = provider
+        self.model = model
+        self.language = language
+        self.count = count
+        self.response_time_ms = response_time_ms
+        self.time_since_start_ms = time_since_start_ms
+        self.time_since_last_ms = time_since_last_ms
+        self.duration_ms = duration_ms
+        self.text = text
+        self.reason = reason
+        self.extra = extra
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def transcript_length(self) -> int:
+        return len(self.text)
+
+    def __str__(self) -> str:
+        # LogRecord.getMessage() calls this on the writer thread
+        return self.to_text()
+
+    def __repr__(self) -> str:
+        return f"MetricEvent({self.to_dict()!r})"
+
+    def to_text(self) -> str:
+        """Legacy pipe-delimited performance log line"""
+        if self.kind == SESSION_START:
+            return (f"SESSION_START | Session: {self.session} | Language: {self.language} | "
+                    f"Model: {self.model} | Timestamp: {self.timestamp}")
+        if self.kind == SESSION_END:
+            line = (f"SESSION_END | Session: {self.session} | TotalDuration: {self.duration_ms:.2f}ms | "
+                    f"TotalTranscriptions: {self.count}")
+            return line + (f" | Reason: {self.reason}" if self.reason else "")
+        if self.kind == LOG:
+            return self.text
+
+        parts = [self.kind, f"Session: {self.session}", f"Count: {self.count}"]
+        if self.kind == COMPARE_RACE:
+            parts.insert(2, f"Provider: {self.provider}")
+        if self.response_time_ms is not None:
+            parts.append(f"ResponseTime: {self.response_time_ms:.2f}ms")
+        if self.time_since_start_ms is not None:
+            parts.append(f"TimeSinceStart: {self.time_since_start_ms:.2f}ms")
+        if self.time_since_last_ms is not None:
+            parts.append(f"TimeSinceLast: {self.time_since_last_ms:.2f}ms")
+        parts.append(f"{_TEXT_LABELS.get(self.kind, 'Text')}: \"{self.text}\"")
+        if self.extra:
+            parts.extend(f"{key}: \"{value}\"" for key, value in self.extra.items())
+        if self.reason:
+            parts.append(f"Note: {self.reason}")
+        return " | ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fields as a JSON-serialisable dict (unset metrics are omitted)"""
+        data: Dict[str, Any] = {"kind": self.kind, "ts": self.timestamp, "session": self.session}
+        for key in ("provider", "model", "language", "text", "reason"):
+            value = getattr(self, key)
+            if value:
+                data[key] = value
+        if self.kind != SESSION_START and self.kind != LOG:
+            data["count"] = self.count
+        for key in ("response_time_ms", "time_since_start_ms", "time_since_last_ms", "duration_ms"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = round(value, 3)
+        if self.text:
+            data["transcript_length"] = len(self.text)
+        if self.extra:
+            data["extra"] = self.extra
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetricEvent":
+        """Rebuild an event from to_dict() output (e.g. a JSON Lines record)"""
+        return cls(data["kind"], data.get("session", ""), provider=data.get("provider", ""),
+                   model=data.get("model", ""), language=data.get("language", ""),
+                   count=data.get("count", 0), response_time_ms=data.get("response_time_ms"),
+                   time_since_start_ms=data.get("time_since_start_ms"),
+                   time_since_last_ms=data.get("time_since_last_ms"), duration_ms=data.get("duration_ms"),
+                   text=data.get("text", ""), reason=data.get("reason", ""), extra=data.get("extra"),
+                   timestamp=data.get("ts"))
+
+
+def event_from_record(record: logging.LogRecord) -> MetricEvent:
+    """The MetricEvent logged in a record, or a LOG event wrapping a plain string message"""
+    if isinstance(record.msg, MetricEvent):
+        return record.msg
+    return MetricEvent(LOG, "", text=record.getMessage(), timestamp=record.created)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats performance log records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = event_from_record(record).to_dict()
+        data["source"] = f"{record.filename}:{record.lineno}"
+        if record.levelno != logging.INFO:
+            data["level"] = record.levelname
+        return json.dumps(data, ensure_ascii=False)
+
+
+def _pack_str(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return _LENGTH.pack(len(encoded)) + encoded
+
+
+def _metric(value: Optional[float]) -> float:
+    return _NOT_SET if value is None else value
+
+
+def encode_binary(event: MetricEvent) -> bytes:
+    """Length-prefixed binary record for one event"""
+    payload = b"".join([
+        _HEADER.pack(_KIND_CODES.get(event.kind, 0), event.timestamp, event.count,
+                     _metric(event.response_time_ms), _metric(event.time_since_start_ms),
+                     _metric(event.time_since_last_ms), _metric(event.duration_ms)),
+        _pack_str(event.session), _pack_str(event.provider), _pack_str(event.model),
+        _pack_str(event.language), _pack_str(event.text), _pack_str(event.reason),
+        _pack_str(json.dumps(event.extra) if event.extra else ""),
+    ])
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_binary(payload: bytes) -> MetricEvent:
+    """Decode one record payload (without its length prefix)"""
+    code, timestamp, count, response, since_start, since_last, duration = _HEADER.unpack_from(payload)
+    offset = _HEADER.size
+    strings = []
+    for _ in range(7):
+        (length,) = _LENGTH.unpack_from(payload, offset)
+        offset += _LENGTH.size
+        strings.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    session, provider, model, language, text, reason, extra = strings
+    return MetricEvent(_CODE_KINDS.get(code, LOG), session, provider=provider, model=model, language=language,
+                       count=count, response_time_ms=None if math.isnan(response) else response,
+                       time_since_start_ms=None if math.isnan(since_start) else since_start,
+                       time_since_last_ms=None if math.isnan(since_last) else since_last,
+                       duration_ms=None if math.isnan(duration) else duration,
+                       text=text, reason=reason, extra=json.loads(extra) if extra else None,
+                       timestamp=timestamp)
+
+
+def read_binary_events(path: str) -> Iterator[MetricEvent]:
+    """Read every event from a binary performance log (a truncated last record is skipped)"""
+    with open(path, "rb") as f:
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(prefix)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield decode_binary(payload)
@@ -0,0 +1,26 @@
+"""
+Local Mock STT Servers
+Stand-ins for the Deepgram, Azure OpenAI Realtime and ElevenLabs Scribe v2 WebSocket
+APIs, so the app can be run and load-tested offline without API keys.
+
+Each server recognises scripted utterances from the amount of audio it receives and
+can inject latency, jitter, provider errors and dropped connections (see MockBehavior).
+
+Run all three:
+    python -m mock_stt --latency-ms 300 --jitter-ms 100
+
+then start the app with the printed DEEPGRAM_URL / AZURE_OPENAI_WS_URL / ELEVENLABS_WS_URL.
+"""
+from mock_stt.base import MockBehavior, MockSTTServer, MOCK_UTTERANCES
+from mock_stt.azure import MockAzureRealtimeServer
+from mock_stt.deepgram import MockDeepgramServer
+from mock_stt.elevenlabs import MockElevenLabsServer
+
+__all__ = [
+    "MockBehavior",
+    "MockSTTServer",
+    "MockAzureRealtimeServer",
+    "MockDeepgramServer",
+    "MockElevenLabsServer",
+    "MOCK_UTTERANCES",
+]
@@ -0,0 +1,52 @@
+"""
+Run the mock Deepgram, Azure OpenAI and ElevenLabs servers until interrupted
+
+    python -m mock_stt [--latency-ms 300] [--jitter-ms 100] [--error-rate 0.01] [--disconnect-rate 0.001]
+"""
+import argparse
+import logging
+import time
+
+from mock_stt import MockAzureRealtimeServer, MockBehavior, MockDeepgramServer, MockElevenLabsServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock STT provider servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--deepgram-port", type=int, default=8765)
+    parser.add_argument("--azure-port", type=int, default=8766)
+    parser.add_argument("--elevenlabs-port", type=int, default=8767)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Transcript delay after the audio that completes a word")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- variation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability per message of a provider error")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="Probability per message of dropping the connection")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    def behavior():
+        return MockBehavior(args.latency_ms, args.jitter_ms, args.error_rate, args.disconnect_rate, args.seed)
+
+    servers = [
+        MockDeepgramServer(args.host, args.deepgram_port, behavior()).start(),
+        MockAzureRealtimeServer(args.host, args.azure_port, behavior()).start(),
+        MockElevenLabsServer(args.host, args.elevenlabs_port, behavior()).start(),
+    ]
+    deepgram, azure, elevenlabs = servers
+    print("Mock STT servers running. Start the app with:")
+    print(f"  DEEPGRAM_API_KEY=mock DEEPGRAM_URL=http://{args.host}:{deepgram.port}")
+    print(f"  AZURE_OPENAI_API_KEY=mock AZURE_OPENAI_WS_URL={azure.url}/openai/realtime")
+    print(f"  ELEVENLABS_API_KEY=mock ELEVENLABS_WS_URL={elevenlabs.url}/v1/speech-to-text/realtime")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
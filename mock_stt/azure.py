@@ -0,0 +1,70 @@
+"""
+Mock Azure OpenAI Realtime transcription server (/openai/realtime)
+
+Speaks the events azure_openai_handler uses: transcription_session.update ->
+transcription_session.updated, input_audio_buffer.append in, and per utterance
+input_audio_buffer.speech_started / speech_stopped / committed, conversation.item.created,
+conversation.item.input_audio_transcription.delta (one per word) and .completed.
+"""
+import base64
+import json
+import uuid
+
+from websockets.asyncio.server import ServerConnection
+
+from mock_stt.base import DelayedSender, MockSTTServer, ScriptedTranscript
+
+# Audio sent to Azure: 24kHz PCM16 mono
+AZURE_MOCK_BYTES_PER_SECOND = 48000
+
+
+class MockAzureRealtimeServer(MockSTTServer):
+    """Mock Azure OpenAI Realtime server - point AZURE_OPENAI_WS_URL at ws://host:port/openai/realtime"""
+
+    name = "azure"
+
+    async def handle(self, ws: ServerConnection):
+        sender = DelayedSender(ws, self.behavior)
+        transcript = ScriptedTranscript(AZURE_MOCK_BYTES_PER_SECOND)
+        audio_ms = 0.0
+        item_id = None
+
+        def event(event_type: str, **fields) -> str:
+            return json.dumps({"type": event_type, "event_id": f"event_{uuid.uuid4().hex[:12]}", **fields})
+
+        async for message in ws:
+            if await self.maybe_disconnect(ws):
+                break
+            data = json.loads(message)
+            if self.behavior.inject_error():
+                sender.send_later(event("error", error={"type": "server_error", "message": "Mock injected error"}))
+                continue
+
+            event_type = data.get("type")
+            if event_type == "transcription_session.update":
+                sender.send_later(event("transcription_session.updated", session=data.get("session", {})), delay=0)
+            elif event_type == "input_audio_buffer.append":
+                n = len(base64.b64decode(data.get("audio", "")))
+                audio_ms += n / AZURE_MOCK_BYTES_PER_SECOND * 1000
+                was_silent = not transcript.words
+                if not transcript.add_audio(n):
+                    continue
+                if was_silent:
+                    item_id = f"item_{uuid.uuid4().hex[:12]}"
+                    sender.send_later(event("input_audio_buffer.speech_started", audio_start_ms=int(audio_ms), item_id=item_id), delay=0)
+                if transcript.utterance_complete:
+                    # Server VAD ends the turn, then the transcript streams in word by word
+                    sender.send_later(event("input_audio_buffer.speech_stopped", audio_end_ms=int(audio_ms), item_id=item_id), delay=0)
+                    sender.send_later(event("input_audio_buffer.committed", item_id=item_id, previous_item_id=None), delay=0)
+                    sender.send_later(event("conversation.item.created", item={
+                        "id": item_id, "type": "message", "role": "user",
+                        "content": [{"type": "input_audio", "transcript": None}],
+                    }), delay=0)
+                    for i, word in enumerate(transcript.words):
+                        piece = word if i == 0 else f" {word}"
+                        sender.send_later(event("conversation.item.input_audio_transcription.delta",
+                                                item_id=item_id, content_index=0, delta=piece))
+                    sender.send_later(event("conversation.item.input_audio_transcription.completed",
+                                            item_id=item_id, content_index=0, transcript=transcript.text), delay=0)
+                    transcript.next_utterance()
+        sender.cancel()
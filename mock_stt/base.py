@@ -0,0 +1,212 @@
+"""
+Shared machinery for the mock STT servers: fault/latency injection settings, a
+per-connection ordered delayed sender, and a WebSocket server hosted on its own
+ProviderIOLoop thread.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, List, Optional
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+
+from provider_io_loop import ProviderIOLoop
+
+logger = logging.getLogger(__name__)
+
+# Scripted utterances the mock servers "recognise", one word per WORD_AUDIO_SEC of audio
+MOCK_UTTERANCES = [
+    "hello world how are you",
+    "i'm looking for a product",
+    "can you help me find something",
+    "what time is it now please",
+]
+WORD_AUDIO_SEC = 0.4
+
+
+class MockBehavior:
+    """
+    Latency and fault injection for a mock server.
+
+    Args:
+        latency_ms: Delay between the audio that completes a word and its transcript
+        jitter_ms: Random +/- variation added to latency_ms (responses stay in order)
+        error_rate: Probability per received message of answering with a provider error
+        disconnect_rate: Probability per received message of dropping the connection (close 1011)
+        seed: Random seed, for reproducible runs
+    """
+
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 disconnect_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.disconnect_rate = disconnect_rate
+        self.random = random.Random(seed)
+
+    def delay_sec(self) -> float:
+        jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def inject_error(self) -> bool:
+        return self.error_rate > 0 and self.random.random() < self.error_rate
+
+    def inject_disconnect(self) -> bool:
+        return self.disconnect_rate > 0 and self.random.random() < self.disconnect_rate
+
+
+class ScriptedTranscript:
+    """
+    Turns a byte count of received audio into words of the scripted utterances.
+
+    Args:
+        bytes_per_second: Audio rate the provider receives (PCM16: 2 x sample rate)
+    """
+
+    def __init__(self, bytes_per_second: int):
+        self.bytes_per_word = int(bytes_per_second * WORD_AUDIO_SEC)
+        self.utterance_index = 0
+        self.words: List[str] = []
+        self._pending_bytes = 0
+
+    @property
+    def utterance(self) -> List[str]:
+        return MOCK_UTTERANCES[self.utterance_index % len(MOCK_UTTERANCES)].split()
+
+    def add_audio(self, n: int) -> int:
+        """Count received audio; returns how many new words it completed"""
+        self._pending_bytes += n
+        new_words = 0
+        while self._pending_bytes >= self.bytes_per_word and len(self.words) < len(self.utterance):
+            self._pending_bytes -= self.bytes_per_word
+            self.words.append(self.utterance[len(self.words)])
+            new_words += 1
+        return new_words
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.words)
+
+    @property
+    def utterance_complete(self) -> bool:
+        return len(self.words) >= len(self.utterance)
+
+    def next_utterance(self):
+        self.utterance_index += 1
+        self.words = []
+        self._pending_bytes = 0
+
+
+class DelayedSender:
+    """
+    Sends messages on a connection after the injected latency, in the order they were queued.
+
+    Args:
+        ws: Server connection
+        behavior: Latency settings
+    """
+
+    def __init__(self, ws: ServerConnection, behavior: MockBehavior):
+        self.ws = ws
+        self.behavior = behavior
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._last_due = 0.0
+        self._task = asyncio.create_task(self._run())
+
+    def send_later(self, message: Any, delay: Optional[float] = None):
+        """Queue a message (str/bytes) for sending after the injected latency"""
+        due = time.monotonic() + (self.behavior.delay_sec() if delay is None else delay)
+        # Jitter must not reorder responses
+        self._last_due = max(due, self._last_due)
+        self._queue.put_nowait((self._last_due, message))
+
+    async def drain(self):
+        """Wait until everything queued has been sent"""
+        await self._queue.join()
+
+    def cancel(self):
+        self._task.cancel()
+
+    async def _run(self):
+        while True:
+            due, message = await self._queue.get()
+            try:
+                wait = due - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self.ws.send(message)
+            except Exception as e:
+                logger.debug(f"Mock server send failed: {e}")
+            finally:
+                self._queue.task_done()
+
+
+class MockSTTServer:
+    """
+    Base class for a mock provider WebSocket server running on its own thread.
+
+    Subclasses implement handle(ws) for one client connection.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free one - see .port after start())
+        behavior: Latency and fault injection settings
+    """
+
+    name = "mock"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, behavior: Optional[MockBehavior] = None):
+        self.host = host
+        self.port = port
+        self.behavior = behavior or MockBehavior()
+        self.connections = 0
+        self.io_loop = ProviderIOLoop(name=f"mock-{self.name}")
+        self._server: Optional[Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> "MockSTTServer":
+        """Start listening; returns self"""
+        self.io_loop.start()
+        self._server = self.io_loop.run(self._serve(), timeout=5)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"🧪 MOCK_STT_START | Provider: {self.name} | URL: {self.url}")
+        return self
+
+    async def _serve(self) -> Server:
+        return await serve(self._handle, self.host, self.port)
+
+    async def _handle(self, ws: ServerConnection):
+        self.connections += 1
+        try:
+            await self.handle(ws)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Mock {self.name} connection ended: {type(e).__name__}: {e}")
+
+    async def handle(self, ws: ServerConnection):
+        raise NotImplementedError
+
+    async def maybe_disconnect(self, ws: ServerConnection) -> bool:
+        """Apply disconnect injection; True if the connection was dropped"""
+        if self.behavior.inject_disconnect():
+            await ws.close(1011, "mock disconnect")
+            return True
+        return False
+
+    def stop(self):
+        """Close the server and every open connection"""
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        if self._server:
+            try:
+                self.io_loop.run(close(), timeout=5)
+            except Exception as e:
+                logger.warning(f"Error stopping mock {self.name} server: {e}")
+        self.io_loop.shutdown()
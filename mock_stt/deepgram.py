@@ -0,0 +1,99 @@
+"""
+Mock Deepgram listen/live server (/v1/listen)
+
+Speaks the subset of the protocol the Deepgram SDK's live client uses:
+binary audio in, KeepAlive / Finalize / CloseStream control messages, Results out
+(interim results only when the client asked for interim_results=true), Metadata on close.
+
+The scripted audio has no pauses, so endpointing=<ms> is modelled as that much extra delay
+before a speech_final result, and with utterance_end_ms an UtteranceEnd follows each one.
+"""
+import json
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+from websockets.asyncio.server import ServerConnection
+
+from mock_stt.base import WORD_AUDIO_SEC, DelayedSender, MockSTTServer, ScriptedTranscript
+
+# Browser audio forwarded to Deepgram: 24kHz PCM16 mono
+DEEPGRAM_MOCK_BYTES_PER_SECOND = 48000
+
+
+class MockDeepgramServer(MockSTTServer):
+    """Mock Deepgram live transcription server - point DEEPGRAM_URL at http://host:port"""
+
+    name = "deepgram"
+
+    async def handle(self, ws: ServerConnection):
+        query = parse_qs(urlparse(ws.request.path).query)
+        interim_results = query.get("interim_results", ["false"])[0] == "true"
+        endpointing = query.get("endpointing", ["10"])[0]
+        endpointing_sec = int(endpointing) / 1000.0 if endpointing.isdigit() else 0.0
+        utterance_end = interim_results and "utterance_end_ms" in query
+        model = query.get("model", ["nova-3"])[0]
+        request_id = str(uuid.uuid4())
+        sender = DelayedSender(ws, self.behavior)
+        transcript = ScriptedTranscript(DEEPGRAM_MOCK_BYTES_PER_SECOND)
+        audio_seconds = 0.0
+
+        def results(text: str, is_final: bool, speech_final: bool, from_finalize: bool = False) -> str:
+            # The utterance's words are the audio received so far, ending now
+            duration = len(transcript.words) * WORD_AUDIO_SEC
+            message = {
+                "type": "Results",
+                "channel_index": [0, 1],
+                "duration": duration,
+                "start": max(0.0, audio_seconds - duration),
+                "is_final": is_final,
+                "speech_final": speech_final,
+                "channel": {"alternatives": [{"transcript": text, "confidence": 0.99, "words": []}]},
+                "metadata": {
+                    "request_id": request_id,
+                    "model_info": {"name": f"general-{model}", "version": "mock", "arch": model},
+                    "model_uuid": "00000000-0000-0000-0000-000000000000",
+                },
+            }
+            if from_finalize:
+                message["from_finalize"] = True
+            return json.dumps(message)
+
+        async for message in ws:
+            if await self.maybe_disconnect(ws):
+                break
+            if self.behavior.inject_error():
+                sender.send_later(json.dumps({
+                    "type": "Error", "description": "Mock injected error", "message": "mock", "variant": "mock"
+                }))
+                continue
+
+            if isinstance(message, bytes):
+                audio_seconds += len(message) / DEEPGRAM_MOCK_BYTES_PER_SECOND
+                if transcript.add_audio(len(message)):
+                    if transcript.utterance_complete:
+                        sender.send_later(results(transcript.text, True, True), self.behavior.delay_sec() + endpointing_sec)
+                        if utterance_end:
+                            sender.send_later(json.dumps({
+                                "type": "UtteranceEnd", "channel": [0, 1], "last_word_end": audio_seconds,
+                            }), 0.0)
+                        transcript.next_utterance()
+                    elif interim_results:
+                        sender.send_later(results(transcript.text, False, False))
+                continue
+
+            control = json.loads(message).get("type")
+            if control == "Finalize" and transcript.words:
+                sender.send_later(results(transcript.text, True, True, from_finalize=True))
+                transcript.next_utterance()
+            elif control == "CloseStream":
+                if transcript.words:
+                    sender.send_later(results(transcript.text, True, True))
+                sender.send_later(json.dumps({
+                    "type": "Metadata", "transaction_key": "deprecated", "request_id": request_id,
+                    "sha256": "", "created": "", "duration": audio_seconds, "channels": 1,
+                }))
+                await sender.drain()
+                await ws.close()
+                break
+            # KeepAlive needs no reply
+        sender.cancel()
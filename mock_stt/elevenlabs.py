@@ -0,0 +1,71 @@
+"""
+Mock ElevenLabs Scribe v2 Realtime server (/v1/speech-to-text/realtime)
+
+Speaks the messages elevenlabs_handler uses: session_started on connect,
+input_audio_chunk in (with optional commit), partial_transcript per recognised word,
+committed_transcript when the utterance ends (VAD) or a commit is requested (followed by
+committed_transcript_with_timestamps when the client asked for include_timestamps=true),
+and commit_throttled when a commit arrives with nothing to commit.
+"""
+import base64
+import json
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+from websockets.asyncio.server import ServerConnection
+
+from mock_stt.base import WORD_AUDIO_SEC, DelayedSender, MockSTTServer, ScriptedTranscript
+
+# Audio sent to ElevenLabs: 16kHz PCM16 mono
+ELEVENLABS_MOCK_BYTES_PER_SECOND = 32000
+
+
+class MockElevenLabsServer(MockSTTServer):
+    """Mock ElevenLabs realtime server - point ELEVENLABS_WS_URL at ws://host:port/v1/speech-to-text/realtime"""
+
+    name = "elevenlabs"
+
+    async def handle(self, ws: ServerConnection):
+        include_timestamps = parse_qs(urlparse(ws.request.path).query).get("include_timestamps", ["false"])[0] == "true"
+        sender = DelayedSender(ws, self.behavior)
+        transcript = ScriptedTranscript(ELEVENLABS_MOCK_BYTES_PER_SECOND)
+        audio_seconds = 0.0
+        sender.send_later(json.dumps({
+            "message_type": "session_started",
+            "session_id": uuid.uuid4().hex,
+            "config": {"sample_rate": 16000, "audio_format": "pcm_16000", "model_id": "scribe_v2_realtime"},
+        }), delay=0)
+
+        async for message in ws:
+            if await self.maybe_disconnect(ws):
+                break
+            data = json.loads(message)
+            if self.behavior.inject_error():
+                sender.send_later(json.dumps({"message_type": "transcriber_error", "error": "Mock injected error"}))
+                continue
+            if data.get("message_type") != "input_audio_chunk":
+                continue
+
+            n = len(base64.b64decode(data.get("audio_base_64", "")))
+            audio_seconds += n / ELEVENLABS_MOCK_BYTES_PER_SECOND
+            if transcript.add_audio(n):
+                sender.send_later(json.dumps({"message_type": "partial_transcript", "text": transcript.text}))
+            if transcript.utterance_complete or (data.get("commit") and transcript.words):
+                sender.send_later(json.dumps({"message_type": "committed_transcript", "text": transcript.text}))
+                if include_timestamps:
+                    # The words are the audio received so far, ending now
+                    count = len(transcript.words)
+                    words = [{"text": word, "type": "word", "logprob": 0.0,
+                              "start": max(0.0, audio_seconds - (count - i) * WORD_AUDIO_SEC),
+                              "end": max(0.0, audio_seconds - (count - i - 1) * WORD_AUDIO_SEC)}
+                             for i, word in enumerate(transcript.words)]
+                    sender.send_later(json.dumps({
+                        "message_type": "committed_transcript_with_timestamps", "text": transcript.text,
+                        "language_code": "en", "words": words,
+                    }))
+                transcript.next_utterance()
+            elif data.get("commit"):
+                sender.send_later(json.dumps({
+                    "message_type": "commit_throttled", "error": "Commit request ignored: not enough audio to commit"
+                }))
+        sender.cancel()
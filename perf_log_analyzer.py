@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Performance Log Analyzer
+Offline provider comparison report from voicesearch_performance.log (text or JSON Lines
+format, including older logs without session IDs such as voicesearch_performance.log.sample).
+
+The log is streamed line by line: only sessions that are still open are kept in memory,
+and latencies go into fixed-size LogHistograms, so memory stays constant however large the
+log is. --since/--until binary-search the file for the first line in range (the log is
+written in timestamp order by a single writer) instead of reading it from the start.
+
+Usage:
+    python perf_log_analyzer.py voicesearch_performance.log
+    python perf_log_analyzer.py voicesearch_performance.log --format csv --since "2026-01-05 16:55"
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from latency_metrics import LogHistogram
+from metrics_events import (
+    MetricEvent, LOG, SESSION_END, SESSION_START, TRANSCRIPTION, TRANSCRIPTION_COMPLETED
+)
+
+SILENCE_TIMEOUT = "SILENCE_TIMEOUT"
+RECONNECT_REQUEST = "RECONNECT_REQUEST"
+_TRANSCRIPT_KINDS = (TRANSCRIPTION, TRANSCRIPTION_COMPLETED)
+_KINDS = (SESSION_START, SESSION_END, SILENCE_TIMEOUT, RECONNECT_REQUEST) + _TRANSCRIPT_KINDS
+
+# "2026-01-05 16:52:07,548 - voicesearch_app.py:389 - SESSION_START | Session: ... | ..."
+# (the "file:line - " part is missing in older logs)
+_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (?:([\w.]+\.py):\d+ - )?([A-Z_]+) \| (.*)$")
+_TEXT_TS_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) ")
+_JSON_TS_RE = re.compile(r'"ts": ([0-9.]+)')
+
+# Which provider wrote a line, by source file or model name
+_SOURCE_PROVIDERS = {
+    "voicesearch_app.py": "Deepgram",
+    "azure_openai_handler.py": "Azure OpenAI",
+    "elevenlabs_handler.py": "ElevenLabs",
+}
+_TEXT_KEYS = ("Text", "Segment")
+ALL_LANGUAGES = "*"
+
+
+def _parse_time(value: str) -> float:
+    """Epoch seconds from a log timestamp ("2026-01-05 16:52:07,548")"""
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S,%f").timestamp()
+
+
+def parse_time_arg(value: str) -> float:
+    """Epoch seconds from a --since/--until value (ISO date/time or epoch seconds)"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace(",", ".")).timestamp()
+
+
+def line_timestamp(line: str) -> Optional[float]:
+    """Timestamp of a text or JSON Lines record, or None for lines without one"""
+    match = _TEXT_TS_RE.match(line)
+    if match:
+        return _parse_time(match.group(1))
+    if line.startswith("{"):
+        match = _JSON_TS_RE.search(line)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def provider_name(value: str) -> str:
+    """Normalise a provider/model/source name to Deepgram, Azure OpenAI or ElevenLabs"""
+    lowered = value.lower()
+    if "deepgram" in lowered or lowered.startswith("nova") or lowered.startswith("voicesearch_app"):
+        return "Deepgram"
+    if "azure" in lowered or lowered.startswith("gpt"):
+        return "Azure OpenAI"
+    if "eleven" in lowered or "scribe" in lowered:
+        return "ElevenLabs"
+    return value or "unknown"
+
+
+def _ms(value: str) -> Optional[float]:
+    try:
+        return float(value.strip().rstrip("ms"))
+    except ValueError:
+        return None
+
+
+def _event_from_body(kind: str, body: str, timestamp: float, source: str) -> MetricEvent:
+    """Build an event from the "Key: value | ..." part of a text line"""
+    fields: Dict[str, str] = {}
+    for part in body.split(" | "):
+        key, _, value = part.partition(": ")
+        if key in _TEXT_KEYS:
+            break  # Transcript text may itself contain " | "
+        fields[key] = value
+    model = fields.get("Model", "")
+    provider = provider_name(fields.get("Provider") or _SOURCE_PROVIDERS.get(source, "") or model)
+    count = fields.get("Count") or fields.get("TotalTranscriptions") or "0"
+    return MetricEvent(
+        kind, fields.get("Session", ""), provider=provider, model=model, language=fields.get("Language", ""),
+        count=int(count) if count.isdigit() else 0,
+        response_time_ms=_ms(fields["ResponseTime"]) if "ResponseTime" in fields else None,
+        time_since_start_ms=_ms(fields["TimeSinceStart"]) if "TimeSinceStart" in fields else None,
+        time_since_last_ms=_ms(fields["TimeSinceLast"]) if "TimeSinceLast" in fields else None,
+        duration_ms=_ms(fields["TotalDuration"]) if "TotalDuration" in fields else None,
+        reason=fields.get("Reason", ""), timestamp=timestamp
+    )
+
+
+def parse_line(line: str) -> Optional[MetricEvent]:
+    """Event for one log line, or None if it isn't one the report uses"""
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        source = data.get("source", "").split(":")[0]
+        if data.get("kind") == LOG:
+            # Plain string lines (SILENCE_TIMEOUT, RECONNECT_REQUEST, ...) carry the text line
+            kind, _, body = data.get("text", "").partition(" | ")
+            if kind not in _KINDS:
+                return None
+            return _event_from_body(kind, body, data["ts"], source)
+        if data.get("kind") not in _KINDS:
+            return None
+        event = MetricEvent.from_dict(data)
+        event.provider = provider_name(event.provider or _SOURCE_PROVIDERS.get(source, "") or event.model)
+        return event
+
+    match = _LINE_RE.match(line)
+    if not match or match.group(3) not in _KINDS:
+        return None
+    timestamp, source, kind, body = match.groups()
+    return _event_from_body(kind, body, _parse_time(timestamp), source or "")
+
+
+def find_offset(f: IO[bytes], since: float) -> int:
+    """Byte offset of the first line with a timestamp >= since (binary search over a time-ordered log)"""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+
+    def first_line_at_or_after(pos: int) -> Tuple[int, Optional[float]]:
+        f.seek(pos)
+        if pos:
+            f.seek(pos - 1)
+            f.readline()  # Skip to the start of the next line
+        while True:
+            start = f.tell()
+            raw = f.readline()
+            if not raw:
+                return size, None
+            ts = line_timestamp(raw.decode("utf-8", errors="replace"))
+            if ts is not None:
+                return start, ts
+
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        _, ts = first_line_at_or_after(mid)
+        if ts is None or ts >= since:
+            hi = mid
+        else:
+            lo = mid + 1
+    return first_line_at_or_after(lo)[0]
+
+
+def iter_events(path: str, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[MetricEvent]:
+    """Stream events from a log file, limited to [since, until]"""
+    with open(path, "rb") as f:
+        f.seek(find_offset(f, since) if since is not None else 0)
+        for raw in f:
+            event = parse_line(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+            if event is None:
+                continue
+            if until is not None and event.timestamp > until:
+                return  # Time-ordered: nothing later is in range
+            yield event
+
+
+class GroupStats:
+    """Aggregates for one provider (or provider + language)"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.transcripts = 0
+        self.silence_timeouts = 0
+        self.reconnects = 0
+        self.first_transcript = LogHistogram()
+        self.response_time = LogHistogram()
+        self.time_since_last = LogHistogram()
+
+    def row(self) -> Dict[str, Optional[float]]:
+        def p(histogram: LogHistogram, q: float) -> Optional[float]:
+            value = histogram.percentile(q)
+            return round(value, 1) if value is not None else None
+
+        return {
+            "sessions": self.sessions,
+            "transcripts": self.transcripts,
+            "transcripts_per_session": round(self.transcripts / self.sessions, 2) if self.sessions else None,
+            "ttft_p50_ms": p(self.first_transcript, 0.5),
+            "ttft_p90_ms": p(self.first_transcript, 0.9),
+            "ttft_p99_ms": p(self.first_transcript, 0.99),
+            "response_p50_ms": p(self.response_time, 0.5),
+            "response_p90_ms": p(self.response_time, 0.9),
+            "response_p99_ms": p(self.response_time, 0.99),
+            "since_last_p50_ms": p(self.time_since_last, 0.5),
+            "since_last_p90_ms": p(self.time_since_last, 0.9),
+            "silence_timeouts": self.silence_timeouts,
+            "silence_timeout_rate": round(self.silence_timeouts / self.sessions, 3) if self.sessions else None,
+            "reconnects": self.reconnects,
+        }
+
+
+class _Timeline:
+    """One open session: what's needed to fold it into the report when it ends"""
+
+    __slots__ = ("provider", "language", "transcripts", "first_transcript_ms", "silence_timeout")
+
+    def __init__(self, provider: str, language: str):
+        self.provider = provider
+        self.language = language
+        self.transcripts = 0
+        self.first_transcript_ms: Optional[float] = None
+        self.silence_timeout = False
+
+
+class Report:
+    """Per-provider and per-provider/language statistics built from a stream of events"""
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, str], GroupStats] = {}
+        self.open_sessions: Dict[Tuple[str, str], _Timeline] = {}
+        self.events = 0
+        self._legacy_provider = "unknown"
+
+    def _groups_for(self, provider: str, language: str) -> List[GroupStats]:
+        keys = [(provider, ALL_LANGUAGES), (provider, language or "unknown")]
+        return [self.groups.setdefault(key, GroupStats()) for key in keys]
+
+    def add(self, event: MetricEvent):
+        self.events += 1
+        if not event.session:
+            # Older logs have no session IDs or source files: sessions are sequential and
+            # only SESSION_START names the model, so later lines belong to the last one started
+            if event.kind == SESSION_START:
+                self._legacy_provider = event.provider
+            elif event.provider == "unknown":
+                event.provider = self._legacy_provider
+        key = (event.provider, event.session)
+        timeline = self.open_sessions.get(key)
+
+        if event.kind == SESSION_START:
+            if timeline:
+                self._close(key)
+            self.open_sessions[key] = _Timeline(event.provider, event.language)
+        elif event.kind in _TRANSCRIPT_KINDS:
+            language = timeline.language if timeline else "unknown"
+            for group in self._groups_for(event.provider, language):
+                if event.response_time_ms is not None:
+                    group.response_time.record(event.response_time_ms)
+                if event.count > 1 and event.time_since_last_ms is not None:
+                    group.time_since_last.record(event.time_since_last_ms)
+            if timeline:
+                timeline.transcripts += 1
+                if timeline.first_transcript_ms is None and event.time_since_start_ms is not None:
+                    timeline.first_transcript_ms = event.time_since_start_ms
+        elif event.kind == SILENCE_TIMEOUT:
+            if timeline:
+                timeline.silence_timeout = True
+        elif event.kind == RECONNECT_REQUEST:
+            language = timeline.language if timeline else "unknown"
+            for group in self._groups_for(event.provider, language):
+                group.reconnects += 1
+        elif event.kind == SESSION_END:
+            if timeline:
+                if event.reason == "SilenceTimeout":
+                    timeline.silence_timeout = True
+                self._close(key)
+
+    def _close(self, key: Tuple[str, str]):
+        timeline = self.open_sessions.pop(key)
+        for group in self._groups_for(timeline.provider, timeline.language):
+            group.sessions += 1
+            group.transcripts += timeline.transcripts
+            group.silence_timeouts += timeline.silence_timeout
+            if timeline.first_transcript_ms is not None:
+                group.first_transcript.record(timeline.first_transcript_ms)
+
+    def finish(self):
+        """Close sessions the log ends in the middle of"""
+        for key in list(self.open_sessions):
+            self._close(key)
+
+    def rows(self) -> List[Dict]:
+        return [
+            {"provider": provider, "language": language, **stats.row()}
+            for (provider, language), stats in sorted(self.groups.items())
+        ]
+
+
+def analyze(path: str, since: Optional[float] = None, until: Optional[float] = None) -> Report:
+    """Build a report from a performance log"""
+    report = Report()
+    for event in iter_events(path, since, until):
+        report.add(event)
+    report.finish()
+    return report
+
+
+def _format_table(rows: List[Dict]) -> str:
+    if not rows:
+        return "No sessions found"
+    columns = list(rows[0].keys())
+    cells = [["" if row[c] is None else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths)),
+             "  ".join("-" * w for w in widths)]
+    lines.extend("  ".join(v.ljust(w) for v, w in zip(r, widths)) for r in cells)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare provider latency from a performance log")
+    parser.add_argument("log", nargs="?", default="voicesearch_performance.log", help="Performance log (text or JSON Lines)")
+    parser.add_argument("--format", choices=("table", "csv", "json"), default="table", help="Output format")
+    parser.add_argument("--since", help="Only lines at or after this time (e.g. \"2026-01-05 16:55\" or epoch seconds)")
+    parser.add_argument("--until", help="Only lines at or before this time")
+    args = parser.parse_args(argv)
+
+    since = parse_time_arg(args.since) if args.since else None
+    until = parse_time_arg(args.until) if args.until else None
+    rows = analyze(args.log, since, until).rows()
+
+    if args.format == "json":
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    elif args.format == "csv":
+        if rows:
+            writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        print(_format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
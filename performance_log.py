@@ -0,0 +1,239 @@
+"""
+Asynchronous Performance Log Sink
+Single writer for voicesearch_performance.log shared by the app, Azure and ElevenLabs
+modules, replacing one FileHandler per module on the same file.
+
+Loggers get a QueueHandler that only enqueues the record - formatting and disk writes
+happen on one background QueueListener thread, so provider callbacks never wait on
+the disk. The queue is bounded: when it is full, records are dropped and counted
+rather than blocking, and the writer reports the drop count in the log itself. The
+file is flushed in batches (every PERF_LOG_BATCH_SIZE records, or after
+PERF_LOG_FLUSH_INTERVAL_MS of quiet) instead of after every line.
+
+Records carrying a MetricEvent are also rendered on the writer thread, as legacy text,
+JSON Lines or binary depending on PERF_LOG_FORMAT.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from latency_metrics import latency_handler
+from metrics_events import JsonLinesFormatter, encode_binary, event_from_record
+
+PERFORMANCE_LOG_FORMAT = '%(asctime)s - %(filename)s:%(lineno)d - %(message)s'
+
+# Output format: text (legacy pipe-delimited lines), jsonl or binary - see metrics_events.py
+PERF_LOG_FORMAT = os.getenv("PERF_LOG_FORMAT", "text").lower()
+# Directory for the app and performance logs (default: the working directory)
+VOICESEARCH_LOG_DIR = os.getenv("VOICESEARCH_LOG_DIR", "")
+PERFORMANCE_LOG_FILES = {
+    "text": os.path.join(VOICESEARCH_LOG_DIR, 'voicesearch_performance.log'),
+    "jsonl": os.path.join(VOICESEARCH_LOG_DIR, 'voicesearch_performance.jsonl'),
+    "binary": os.path.join(VOICESEARCH_LOG_DIR, 'voicesearch_performance.bin'),
+}
+
+# Records buffered in memory before new ones are dropped
+PERF_LOG_QUEUE_SIZE = int(os.getenv("PERF_LOG_QUEUE_SIZE", "10000"))
+# Records written between flushes
+PERF_LOG_BATCH_SIZE = int(os.getenv("PERF_LOG_BATCH_SIZE", "64"))
+# Flush a partial batch once the queue has been idle this long
+PERF_LOG_FLUSH_INTERVAL_MS = int(os.getenv("PERF_LOG_FLUSH_INTERVAL_MS", "200"))
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records that don't fit are counted and discarded"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record can be queued as-is and
+        # formatted on the writer thread instead of the caller's
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _BatchedFileHandler(logging.FileHandler):
+    """FileHandler that flushes every batch_size records instead of every record"""
+
+    def __init__(self, filename: str, batch_size: int, mode: str = 'a'):
+        super().__init__(filename, mode=mode)
+        self.batch_size = max(1, batch_size)
+        self.written = 0
+        self._unflushed = 0
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.encode(record))
+            self.written += 1
+            self._unflushed += 1
+            if self._unflushed >= self.batch_size:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def encode(self, record: logging.LogRecord):
+        return self.format(record) + self.terminator
+
+    def flush(self):
+        if self._unflushed:
+            super().flush()
+            self._unflushed = 0
+
+
+class _BatchedBinaryFileHandler(_BatchedFileHandler):
+    """Batched handler writing length-prefixed binary event records"""
+
+    def __init__(self, filename: str, batch_size: int):
+        super().__init__(filename, batch_size, mode='ab')
+
+    def encode(self, record: logging.LogRecord) -> bytes:
+        return encode_binary(event_from_record(record))
+
+
+def _make_file_handler(path: str, log_format: str, batch_size: int) -> _BatchedFileHandler:
+    """Writer-side handler for an output format"""
+    if log_format == "binary":
+        return _BatchedBinaryFileHandler(path, batch_size)
+    handler = _BatchedFileHandler(path, batch_size)
+    if log_format == "jsonl":
+        handler.setFormatter(JsonLinesFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(PERFORMANCE_LOG_FORMAT))
+    return handler
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle"""
+
+    def __init__(self, log_queue: queue.Queue, handler: _BatchedFileHandler, flush_interval_sec: float, on_idle):
+        super().__init__(log_queue, handler, respect_handler_level=True)
+        self.flush_interval_sec = flush_interval_sec
+        self._on_idle = on_idle
+
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval_sec)
+            except queue.Empty:
+                if not block:
+                    raise
+                self._on_idle()
+
+    def enqueue_sentinel(self):
+        # Wait for room - the sentinel must not be dropped like a record
+        self.queue.put(self._sentinel)
+
+
+class PerformanceLogSink:
+    """
+    Queue + single writer thread for one performance log file.
+
+    Args:
+        path: Log file path (default: voicesearch_performance.log/.jsonl/.bin for the format,
+              in VOICESEARCH_LOG_DIR)
+        log_format: "text", "jsonl" or "binary"
+        queue_size: Records buffered before new ones are dropped
+        batch_size: Records written between flushes
+        flush_interval_ms: Idle time after which a partial batch is flushed
+    """
+
+    def __init__(self, path: Optional[str] = None, log_format: str = PERF_LOG_FORMAT,
+                 queue_size: int = PERF_LOG_QUEUE_SIZE, batch_size: int = PERF_LOG_BATCH_SIZE,
+                 flush_interval_ms: int = PERF_LOG_FLUSH_INTERVAL_MS):
+        if log_format not in PERFORMANCE_LOG_FILES:
+            raise ValueError(f"Unknown performance log format: {log_format}")
+        self.path = path or PERFORMANCE_LOG_FILES[log_format]
+        self.log_format = log_format
+        self.queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.handler = _DroppingQueueHandler(self.queue)
+        self.file_handler = _make_file_handler(self.path, log_format, batch_size)
+        self.listener = _BatchingQueueListener(self.queue, self.file_handler, flush_interval_ms / 1000.0, self._flush)
+        self._reported_dropped = 0
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread (idempotent)"""
+        with self._lock:
+            if not self._running:
+                self.listener.start()
+                self._running = True
+
+    def stop(self):
+        """Write everything still queued, flush and close the file"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            self.listener.stop()
+        self._flush()
+        self.file_handler.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Queued, written and dropped record counts"""
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.file_handler.written,
+            "dropped": self.handler.dropped,
+        }
+
+    def _flush(self):
+        """Runs on the writer thread: report new drops, then flush the file"""
+        dropped = self.handler.dropped
+        if dropped > self._reported_dropped:
+            record = logging.LogRecord(
+                "performance_log", logging.WARNING, __file__, 0,
+                f"PERF_LOG_DROPPED | Dropped: {dropped - self._reported_dropped} | TotalDropped: {dropped} | QueueSize: {self.queue.maxsize}",
+                None, None
+            )
+            record.created = time.time()
+            self.file_handler.handle(record)
+            self._reported_dropped = dropped
+        self.file_handler.flush()
+
+
+# Shared sink for the whole process - every performance logger writes through it
+_shared_sink: Optional[PerformanceLogSink] = None
+_shared_sink_lock = threading.Lock()
+
+
+def get_performance_sink() -> PerformanceLogSink:
+    """Get the process-wide performance log sink, starting its writer on first use"""
+    global _shared_sink
+    with _shared_sink_lock:
+        if _shared_sink is None:
+            _shared_sink = PerformanceLogSink()
+            _shared_sink.start()
+            atexit.register(_shared_sink.stop)
+        return _shared_sink
+
+
+def get_performance_logger(name: str) -> logging.Logger:
+    """
+    Get a logger whose records go to the shared performance log (not the root logger)
+    and whose MetricEvents also update the in-process latency histograms
+    """
+    performance_logger = logging.getLogger(name)
+    performance_logger.setLevel(logging.INFO)
+    sink = get_performance_sink()
+    for handler in (sink.handler, latency_handler):
+        if handler not in performance_logger.handlers:
+            performance_logger.addHandler(handler)
+    performance_logger.propagate = False  # Don't propagate to root logger
+    return performance_logger
@@ -0,0 +1,303 @@
+"""
+Shared Provider I/O Loop
+Hosts every provider WebSocket (Deepgram, ElevenLabs, Azure OpenAI) as coroutines on a
+shared asyncio event loop, replacing the receive thread (or run_forever thread) each
+session used to own.
+
+Socket.IO handler threads never block on provider sockets: outgoing messages are queued
+with AsyncOutbox.put() / AsyncWebSocketConnection.send() and drained in order by one
+coroutine per connection, and other work is scheduled with ProviderIOLoop.submit(). All
+of these are thread-safe and return immediately. Callbacks from a connection run on the
+loop thread and must not block.
+"""
+import asyncio
+import logging
+import os
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional
+
+from websockets.asyncio.client import ClientConnection, connect as ws_connect
+
+logger = logging.getLogger(__name__)
+
+# Number of event loops (one thread each) provider connections are spread over
+PROVIDER_IO_LOOPS = max(1, int(os.getenv("PROVIDER_IO_LOOPS", "1")))
+# Outgoing messages queued per connection before new ones are dropped (~40s of audio chunks)
+PROVIDER_OUTBOX_MAX = int(os.getenv("PROVIDER_OUTBOX_MAX", "500"))
+# Seconds to wait for a provider WebSocket handshake
+PROVIDER_OPEN_TIMEOUT_SEC = float(os.getenv("PROVIDER_OPEN_TIMEOUT_SEC", "10"))
+
+
+def _log_failure(name: str, future: Future):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error:
+        logger.error(f"❌ PROVIDER_IO_ERROR | Task: {name} | Exception: {type(error).__name__}: {error}")
+
+
+class ProviderIOLoop:
+    """
+    asyncio event loop running on its own daemon thread.
+
+    Args:
+        name: Thread name (also used in log lines)
+    """
+
+    def __init__(self, name: str = "provider-io"):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the loop thread (idempotent)"""
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine, name: str = "") -> Future:
+        """
+        Schedule a coroutine on the loop from any thread
+
+        Args:
+            coro: Coroutine to run
+            name: If set, a failure is logged under this name (for fire-and-forget work)
+
+        Returns:
+            concurrent.futures.Future for the coroutine's result
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if name:
+            future.add_done_callback(lambda f: _log_failure(name, f))
+        return future
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block the calling (non-loop) thread for its result"""
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("ProviderIOLoop.run() called from the loop thread would deadlock")
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, callback: Callable[..., Any], *args):
+        """Run a plain callback on the loop thread as soon as possible"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def shutdown(self):
+        """Cancel everything running on the loop and stop it; open connections are dropped"""
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not self._thread:
+            return
+        try:
+            self.run(cancel_all(), timeout=1.0)
+        except Exception as e:
+            logger.warning(f"Error cancelling {self.name} tasks on shutdown: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=1.0)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+_CLOSE = object()
+
+
+class AsyncOutbox:
+    """
+    Ordered queue of outgoing messages for one connection, drained by a single coroutine
+    so messages are sent in the order they were put, whichever thread put them.
+
+    Args:
+        io_loop: Loop the drain coroutine runs on
+        send: Coroutine function that sends one message
+        name: Name for logging
+        on_error: Called on the loop thread with the exception if a send fails;
+                  later messages are discarded
+        max_pending: Messages queued before new ones are dropped
+    """
+
+    def __init__(self, io_loop: ProviderIOLoop, send: Callable[[Any], Awaitable[Any]], name: str = "",
+                 on_error: Optional[Callable[[Exception], None]] = None, max_pending: int = PROVIDER_OUTBOX_MAX):
+        self.io_loop = io_loop
+        self.name = name
+        self.max_pending = max_pending
+        self.closed = False
+        self.dropped = 0
+        self._send = send
+        self._on_error = on_error
+        self._failed = False
+        self._then: Optional[Callable[[], Awaitable[Any]]] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.done = io_loop.submit(self._drain(), name=f"outbox:{name}")
+
+    def put(self, message: Any):
+        """Queue a message for sending - thread-safe, never blocks"""
+        if self.closed:
+            raise ConnectionError(f"{self.name} connection is closed")
+        self.io_loop.call_soon(self._enqueue, message)
+
+    def close(self, then: Optional[Callable[[], Awaitable[Any]]] = None):
+        """Send what is already queued, then await then() (e.g. the socket close) and stop"""
+        if self.closed:
+            return
+        self.closed = True
+        self._then = then
+        self.io_loop.call_soon(self._queue.put_nowait, _CLOSE)
+
+    def _enqueue(self, message: Any):
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"⚠️ OUTBOX_FULL | Connection: {self.name} | Pending: {self._queue.qsize()} | Dropped: {self.dropped}")
+            return
+        self._queue.put_nowait(message)
+
+    async def _drain(self):
+        while True:
+            message = await self._queue.get()
+            if message is _CLOSE:
+                if self._then:
+                    await self._then()
+                return
+            if self._failed:
+                continue
+            try:
+                await self._send(message)
+            except Exception as e:
+                self._failed = True
+                if self._on_error:
+                    self._on_error(e)
+                else:
+                    logger.warning(f"⚠️ OUTBOX_SEND_FAILED | Connection: {self.name} | Exception: {type(e).__name__}: {e}")
+
+
+class AsyncWebSocketConnection:
+    """
+    Client WebSocket hosted on a ProviderIOLoop, with websocket-client style callbacks.
+
+    Callbacks run on the loop thread and receive the connection as their first argument:
+        on_open(conn), on_message(conn, message), on_error(conn, error), on_close(conn, code, reason)
+    on_close is called once the connection has been open, however it ends.
+
+    Args:
+        url: WebSocket URL
+        header: Extra HTTP headers for the handshake
+        name: Name for logging
+        io_loop: Loop to run on (default: get_provider_loop(name))
+    """
+
+    def __init__(self, url: str, header: Optional[Dict[str, str]] = None,
+                 on_open: Optional[Callable] = None, on_message: Optional[Callable] = None,
+                 on_error: Optional[Callable] = None, on_close: Optional[Callable] = None,
+                 name: str = "", io_loop: Optional[ProviderIOLoop] = None):
+        self.url = url
+        self.header = header or {}
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_error = on_error
+        self.on_close = on_close
+        self.name = name
+        self.io_loop = io_loop or get_provider_loop(name)
+        self._ws: Optional[ClientConnection] = None
+        self._outbox: Optional[AsyncOutbox] = None
+        self._future: Optional[Future] = None
+        self._close_requested = False
+
+    @property
+    def connected(self) -> bool:
+        """True between the handshake completing and close() / the socket closing"""
+        return self._outbox is not None and not self._outbox.closed
+
+    def start(self) -> Future:
+        """Connect and run the receive loop on the I/O loop; returns immediately"""
+        self._future = self.io_loop.submit(self._run(), name=f"ws:{self.name}")
+        return self._future
+
+    def send(self, message):
+        """Queue a text or binary message - thread-safe, never blocks"""
+        if not self._outbox:
+            raise ConnectionError(f"{self.name} WebSocket is not connected")
+        self._outbox.put(message)
+
+    def close(self):
+        """Close after already-queued messages are sent - thread-safe, never blocks"""
+        self._close_requested = True
+        if self._outbox:
+            self._outbox.close(then=self._close_socket)
+        elif self._future:
+            # Still connecting - abandon the handshake
+            self._future.cancel()
+
+    async def _close_socket(self):
+        if self._ws:
+            await self._ws.close()
+
+    def _callback(self, callback: Optional[Callable], *args):
+        if not callback:
+            return
+        try:
+            callback(self, *args)
+        except Exception as e:
+            logger.error(f"Error in {self.name} WebSocket callback {callback.__name__}: {type(e).__name__}: {e}")
+            logger.exception("Full traceback:")
+
+    async def _run(self):
+        try:
+            self._ws = await ws_connect(self.url, additional_headers=self.header, open_timeout=PROVIDER_OPEN_TIMEOUT_SEC)
+        except Exception as e:
+            self._callback(self.on_error, e)
+            return
+
+        self._outbox = AsyncOutbox(self.io_loop, self._ws.send, name=self.name,
+                                   on_error=lambda e: self._callback(self.on_error, e))
+        if self._close_requested:
+            self._outbox.close(then=self._close_socket)
+        else:
+            self._callback(self.on_open)
+
+        try:
+            async for message in self._ws:
+                self._callback(self.on_message, message)
+        except asyncio.CancelledError:
+            # close() raced the handshake finishing - don't leave the socket open
+            await self._ws.close()
+            raise
+        except Exception as e:
+            # ConnectionClosedError - abnormal close (normal closes end the loop quietly)
+            self._callback(self.on_error, e)
+        finally:
+            self._outbox.close()
+            self._callback(self.on_close, self._ws.close_code, self._ws.close_reason)
+
+
+# Shared loops for the whole process - connections are spread over them by name
+_provider_loops: List[ProviderIOLoop] = []
+_provider_loops_lock = threading.Lock()
+
+
+def get_provider_loop(key: str = "") -> ProviderIOLoop:
+    """Get the process-wide I/O loop for a connection key (session ID), starting loops on first use"""
+    with _provider_loops_lock:
+        if not _provider_loops:
+            for i in range(PROVIDER_IO_LOOPS):
+                io_loop = ProviderIOLoop(name=f"provider-io-{i}")
+                io_loop.start()
+                _provider_loops.append(io_loop)
+            logger.info(f"🔌 PROVIDER_IO_START | Loops: {PROVIDER_IO_LOOPS}")
+    # Stable spread: the same key always lands on the same loop
+    return _provider_loops[zlib.crc32(key.encode()) % len(_provider_loops)]
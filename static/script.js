@@ -22,6 +22,9 @@ const RECONNECTION_TIMEOUT_MS = 5000; // 5 seconds max wait for reconnection res
 const SPEECH_THRESHOLD = 0.02; // Volume threshold to consider as speech (0.0 to 1.0)
 const SERVICE_TIMEOUT_MS = 5000; // 5 seconds timeout for Azure OpenAI (needs more time than Deepgram)
 const MAX_RECONNECT_ATTEMPTS = 3; // Maximum automatic reconnection attempts per session
+const MEDIA_RECORDER_MIME_TYPE = "audio/webm;codecs=opus";
+const MEDIA_RECORDER_TIMESLICE_MS = 250; // Compressed chunk length - shorter chunks reach the providers sooner
+let serverAudioCodecs = ["pcm16"]; // Updated by the server's audio_formats event on connect
 
 // Recent Transcriptions - localStorage key and max items
 const RECENT_TRANSCRIPTIONS_KEY = 'voiceTranscribe_recentTranscriptions';
@@ -392,16 +395,26 @@ function renderRecentTranscriptions() {
 }
 
 // Connect to SocketIO on the same port as the web server
-socket = io();
+// Ask for transcript protocol 2 (deltas); older servers ignore it and send full-text updates
+socket = io({ auth: { transcript_protocol: 2 } });
 
 socket.on("connect", () => {
   console.log("Client: Connected to SocketIO server");
+  // Delta sequence numbers are per connection
+  transcriptSeq = 0;
+  deltaSegments = {};
 });
 
 socket.on("disconnect", () => {
   console.log("Client: Disconnected from SocketIO server");
 });
 
+// audio_stream codecs the server accepts - Opus is only sent when the server can decode it
+socket.on("audio_formats", (data) => {
+  serverAudioCodecs = (data && data.codecs) || ["pcm16"];
+  console.log(`Client: Server accepts audio codecs ${serverAudioCodecs.join(", ")}`);
+});
+
 socket.on("connect_error", (error) => {
   console.error("Client: SocketIO connection error:", error);
 });
@@ -473,10 +486,13 @@ socket.on("silence_timeout", (data) => {
 });
 
 let currentTranscription = ""; // Store accumulated transcription
+let transcriptSegments = []; // Segment texts by segment_id (Azure OpenAI / ElevenLabs, or any provider with deltas)
+let transcriptSeq = 0; // Last transcription_delta applied (protocol 2)
+let deltaSegments = {}; // api -> segment_id -> text, rebuilt from deltas (protocol 2)
 let isTranscribing = false; // Track if we're currently transcribing
 let stopTimeout = null; // Timeout for delayed stop
 
-socket.on("transcription_update", (data) => {
+function handleTranscriptionUpdate(data) {
   // Reset service timeout whenever we get data
   lastTranscriptionTime = Date.now();
   hideStatusMessage();
@@ -497,7 +513,12 @@ socket.on("transcription_update", (data) => {
       const apiSelect = document.getElementById("apiSelect");
       const selectedAPI = apiSelect ? apiSelect.value : "Deepgram API";
 
-      if (selectedAPI === "ElevenLabs ScribeV2") {
+      if (typeof data.segment_id === "number" && typeof data.segment === "string") {
+        // Segment updates (every provider, full text or deltas): update only the segment that changed
+        // (partials replace their segment until it is committed)
+        transcriptSegments[data.segment_id] = data.segment.trim();
+        currentTranscription = transcriptSegments.filter(Boolean).join(" ");
+      } else if (selectedAPI === "ElevenLabs ScribeV2") {
         // ElevenLabs backend sends already-accumulated transcripts
         // (handles pauses/segments server-side to combine into single response)
         currentTranscription = newTranscription;
@@ -571,6 +592,51 @@ socket.on("transcription_update", (data) => {
       }
     }
   }
+}
+
+socket.on("transcription_update", handleTranscriptionUpdate);
+
+// Transcript protocol 2: the server sends one delta per segment change instead of the full text
+socket.on("transcription_delta", (delta) => {
+  if (delta.seq <= transcriptSeq) return; // Already covered by a snapshot
+  if (delta.seq !== transcriptSeq + 1) {
+    // Missed deltas - ask for the full transcripts and drop deltas until the snapshot arrives
+    console.warn(`Transcript delta gap (expected ${transcriptSeq + 1}, got ${delta.seq}) - resyncing`);
+    socket.emit("transcription_resync");
+    return;
+  }
+  transcriptSeq = delta.seq;
+  const segments = deltaSegments[delta.api] || (deltaSegments[delta.api] = {});
+  const text = delta.op === "append" ? (segments[delta.segment_id] || "") + delta.text : delta.text;
+  segments[delta.segment_id] = text;
+  handleTranscriptionUpdate({
+    transcription: text,
+    api: delta.api,
+    final: delta.op === "commit",
+    segment_id: delta.segment_id,
+    segment: text
+  });
+});
+
+socket.on("transcription_snapshot", (snapshot) => {
+  transcriptSeq = snapshot.seq;
+  deltaSegments = {};
+  for (const [api, transcript] of Object.entries(snapshot.transcripts)) {
+    const segments = transcript.segments.slice();
+    if (transcript.partial) segments.push(transcript.partial);
+    deltaSegments[api] = Object.assign({}, segments);
+  }
+  const apiSelect = document.getElementById("apiSelect");
+  const selectedAPI = apiSelect ? apiSelect.value : "Deepgram API";
+  const segments = deltaSegments[selectedAPI];
+  if (!segments || ignoreIncomingTranscription) return;
+  transcriptSegments = Object.values(segments);
+  currentTranscription = transcriptSegments.filter(Boolean).join(" ");
+  const searchInput = document.getElementById("searchInput");
+  if (searchInput) {
+    searchInput.value = currentTranscription;
+    searchInput.dispatchEvent(new Event('input', { bubbles: true }));
+  }
 });
 
 function showStatusMessage(msg) {
@@ -643,7 +709,7 @@ async function getMicrophone(useWebAudio = false) {
       audioStream = stream;
       return { type: 'webaudio', stream: stream };
     } else {
-      return { type: 'mediarecorder', recorder: new MediaRecorder(stream, { mimeType: "audio/webm" }) };
+      return { type: 'mediarecorder', recorder: new MediaRecorder(stream, { mimeType: MEDIA_RECORDER_MIME_TYPE }) };
     }
   } catch (error) {
     console.error("Error accessing microphone:", error);
@@ -687,14 +753,16 @@ async function openMicrophone(microphone, socket, useWebAudio = false) {
 
         audioProcessor.port.onmessage = (event) => {
           if (!isRecording && !isInitializing) return;
-          const { type, data } = event.data;
-          if (type === 'audio' && data) {
+          const { type } = event.data;
+          if (type === 'audio' && event.data.data) {
+            const data = frameAudioChunk(event.data.data);
             if (connectionReady) {
               socket.emit("audio_stream", data);
             } else {
               pendingAudioChunks.push(data);
               const maxChunks = 120;
               if (pendingAudioChunks.length > maxChunks) {
+                // The server counts the dropped frame as missing from the seq gap
                 pendingAudioChunks.shift();
               }
             }
@@ -723,25 +791,53 @@ async function openMicrophone(microphone, socket, useWebAudio = false) {
       microphone.recorder.ondataavailable = async (event) => {
         if (!isRecording && !isInitializing) return;
         if (event.data.size > 0) {
+          // Number and timestamp the chunk before the async read so chunks stay in order
+          const seq = audioFrameSeq++;
+          const captureMs = performance.timeOrigin + performance.now();
           const arrayBuffer = await event.data.arrayBuffer();
           if (socket.connected) {
-            socket.emit("audio_stream", arrayBuffer);
+            socket.emit("audio_stream", frameAudioChunk(arrayBuffer, AUDIO_CODEC_OPUS_WEBM, 48000, seq, captureMs));
           }
         }
       };
-      microphone.recorder.start(1000); // 1-second chunks for Deepgram/other
+      microphone.recorder.start(MEDIA_RECORDER_TIMESLICE_MS);
     });
   } else {
     throw new Error("Unknown microphone type");
   }
 }
 
+// Binary audio framing (see audio_framing.py): 20-byte header + audio payload, so the
+// server can detect lost/reordered frames and knows when each frame was captured
+const AUDIO_FRAME_HEADER_BYTES = 20;
+const AUDIO_FRAME_SAMPLE_RATE = 24000;
+const AUDIO_CODEC_PCM16 = 1; // PCM16 little-endian mono
+const AUDIO_CODEC_OPUS_WEBM = 2; // MediaRecorder Opus in WebM, decoded by the server
+let audioFrameSeq = 0; // Restarts with every recording
+
+function frameAudioChunk(audioBuffer, codec = AUDIO_CODEC_PCM16, sampleRate = AUDIO_FRAME_SAMPLE_RATE,
+                         seq = audioFrameSeq++, captureMs = performance.timeOrigin + performance.now()) {
+  const frame = new Uint8Array(AUDIO_FRAME_HEADER_BYTES + audioBuffer.byteLength);
+  const header = new DataView(frame.buffer);
+  header.setUint8(0, 0x41); // Magic "AF"
+  header.setUint8(1, 0x46);
+  header.setUint8(2, 1); // Version
+  header.setUint8(3, codec);
+  header.setUint32(4, seq, true);
+  header.setUint32(8, sampleRate, true);
+  // Capture time of the frame's last sample (the worklet posts each chunk as soon as it is full)
+  header.setFloat64(12, captureMs, true);
+  frame.set(new Uint8Array(audioBuffer), AUDIO_FRAME_HEADER_BYTES);
+  return frame.buffer;
+}
+
 async function startRecording() {
   if (isRecording || isInitializing) return;
 
   isInitializing = true;
   pendingStop = false;
   isRecording = true;
+  audioFrameSeq = 0;
 
   // Reset Tracking Variables
   lastSpeechTime = 0;
@@ -767,6 +863,8 @@ async function startRecording() {
   connectionReady = false;
   pendingAudioChunks = [];
   currentTranscription = "";
+  transcriptSegments = [];
+  deltaSegments = {}; // The server starts new segments on start
   ignoreIncomingTranscription = false;
 
   const searchInput = document.getElementById("searchInput");
@@ -777,7 +875,10 @@ async function startRecording() {
   syncRecordingModeUI();
 
   const apiSelect = document.getElementById("apiSelect");
-  const useWebAudio = apiSelect && (apiSelect.value === "Azure OpenAI" || apiSelect.value === "ElevenLabs ScribeV2");
+  // MediaRecorder (Opus, ~10x less uplink than PCM16) when the server can decode it, else Web Audio PCM16
+  const useWebAudio = (apiSelect && (apiSelect.value === "Azure OpenAI" || apiSelect.value === "ElevenLabs ScribeV2"))
+    || !serverAudioCodecs.includes("opus_webm")
+    || !MediaRecorder.isTypeSupported(MEDIA_RECORDER_MIME_TYPE);
 
   if (!useWebAudio) {
     connectionReady = true;
@@ -1085,6 +1186,7 @@ const cancelRecordingHandler = () => {
   awaitingReconnectionResult = false;
   reconnectAttempts = 0;
   currentTranscription = "";
+  transcriptSegments = [];
   hideStatusMessage();
 
   if (searchInput) {
@@ -1172,6 +1274,7 @@ document.addEventListener("DOMContentLoaded", () => {
       searchInput.value = "";
     }
     currentTranscription = "";
+    transcriptSegments = [];
 
     languageSelect.innerHTML = '';
 
@@ -0,0 +1,46 @@
+"""
+Shared test setup: keep test runs out of the real logs (the app and performance logs go to
+a temporary directory) and helpers used by several test scripts
+"""
+import os
+import tempfile
+import time
+
+os.environ["VOICESEARCH_LOG_DIR"] = tempfile.mkdtemp(prefix="voicesearch-test-logs-")
+
+from flask import Flask
+from flask_socketio import SocketIO
+
+
+class RecordingSocketIO(SocketIO):
+    """SocketIO that records what the handlers emit"""
+
+    def __init__(self):
+        super().__init__(Flask(__name__), async_mode='threading')
+        self.emitted = []
+
+    def emit(self, event, *args, **kwargs):
+        self.emitted.append((event, args[0] if args else None))
+
+    def transcripts(self):
+        return [data['transcription'] for event, data in self.emitted if event == 'transcription_update']
+
+
+class EmitRecorder:
+    """Records emits instead of sending them"""
+
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data=None, **kwargs):
+        self.emitted.append((event, data, kwargs))
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll condition() until it is true or timeout seconds pass; returns whether it became true"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
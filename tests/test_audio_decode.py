@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the streaming WebM / Ogg Opus demuxers and the decode pool
+"""
+import struct
+import sys
+from audio_decode import AudioDecodePool, OggOpusDemuxer, WebMOpusDemuxer, sniff_codec
+from audio_framing import CODEC_OPUS_OGG, CODEC_OPUS_WEBM
+
+OPUS_HEAD = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", 312, 48000, 0, 0)
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def ebml(element_id: bytes, body: bytes) -> bytes:
+    """EBML element with an 8-byte size field"""
+    return element_id + (0x01 << 56 | len(body)).to_bytes(8, "big") + body
+
+
+def simple_block(track: int, flags: int, payload: bytes) -> bytes:
+    return ebml(b"\xa3", bytes([0x80 | track]) + b"\x00\x00" + bytes([flags]) + payload)
+
+
+def build_webm():
+    """A MediaRecorder-like stream: unknown-size Segment and Cluster, a video track, lacing"""
+    tracks = ebml(b"\x16\x54\xae\x6b",
+                  ebml(b"\xae", ebml(b"\xd7", b"\x01") + ebml(b"\x86", b"V_VP8"))
+                  + ebml(b"\xae", ebml(b"\xd7", b"\x02") + ebml(b"\x86", b"A_OPUS") + ebml(b"\x63\xa2", OPUS_HEAD)))
+    xiph = [b"x" * 300, b"yyy", b"zzzzz"]
+    ebml_laced = [b"a" * 10, b"b" * 12, b"c" * 7]
+    cluster = (b"\x1f\x43\xb6\x75" + UNKNOWN_SIZE
+               + ebml(b"\xe7", b"\x00")
+               + simple_block(2, 0x80, b"pkt1")
+               + simple_block(1, 0x80, b"video frame")
+               + simple_block(2, 0x82, bytes([2, 255, 45, 3]) + b"".join(xiph))
+               + ebml(b"\xa0", ebml(b"\xa1", bytes([0x82, 0x00, 0x00, 0x06, 2, 0x8a, 0x80 | 65]) + b"".join(ebml_laced))))
+    stream = (ebml(b"\x1a\x45\xdf\xa3", ebml(b"\x42\x82", b"webm"))
+              + b"\x18\x53\x80\x67" + UNKNOWN_SIZE
+              + ebml(b"\xec", b"\x00" * 5000)  # Void, skipped while it streams past
+              + tracks + cluster)
+    return stream, [b"pkt1"] + xiph + ebml_laced
+
+
+def ogg_page(header_type: int, serial: int, seq: int, lacing, body: bytes) -> bytes:
+    return struct.pack("<4sBBqIIIB", b"OggS", 0, header_type, 0, serial, seq, 0, len(lacing)) + bytes(lacing) + body
+
+
+def build_ogg():
+    """Opus in Ogg: header pages, a packet continued across pages, a second stream to ignore"""
+    tags = b"OpusTags" + b"\x00" * 8
+    long_packet = b"L" * 600
+    stream = (ogg_page(0x02, 7, 0, [len(OPUS_HEAD)], OPUS_HEAD)
+              + ogg_page(0x02, 9, 0, [4], b"skip")
+              + ogg_page(0x00, 7, 1, [len(tags)], tags)
+              + ogg_page(0x00, 7, 2, [20, 255, 255], b"s" * 20 + long_packet[:510])
+              + ogg_page(0x00, 9, 1, [3], b"xyz")
+              + ogg_page(0x01, 7, 3, [90, 10], long_packet[510:] + b"t" * 10))
+    return stream, [b"s" * 20, long_packet, b"t" * 10]
+
+
+def feed_in_chunks(demuxer, stream: bytes, size: int):
+    packets = []
+    for i in range(0, len(stream), size):
+        packets.extend(demuxer.feed(stream[i:i + size]))
+    return packets
+
+
+def test_webm_demux_streaming():
+    """Test that WebM Opus packets come out the same however the stream is chunked"""
+    print("🧪 Testing streaming WebM demux...")
+    stream, expected = build_webm()
+    for size in (len(stream), 1000, 7, 1):
+        demuxer = WebMOpusDemuxer()
+        packets = feed_in_chunks(demuxer, stream, size)
+        assert packets == expected, f"❌ Wrong packets with {size}-byte chunks: {[len(p) for p in packets]}"
+        assert demuxer.track_number == 2 and demuxer.channels == 1 and demuxer.pre_skip == 312, "❌ Wrong Opus track info"
+        assert len(demuxer._buffer) < 1000, f"❌ Demuxer held {len(demuxer._buffer)} bytes - the Void should not be buffered"
+    print("✅ WebM packets demuxed incrementally, other tracks and elements skipped")
+
+
+def test_ogg_demux_streaming():
+    """Test that Ogg Opus packets span pages and other streams are ignored"""
+    print("\n🧪 Testing streaming Ogg demux...")
+    stream, expected = build_ogg()
+    for size in (len(stream), 13, 1):
+        demuxer = OggOpusDemuxer()
+        packets = feed_in_chunks(demuxer, stream, size)
+        assert packets == expected, f"❌ Wrong packets with {size}-byte chunks: {[len(p) for p in packets]}"
+        assert demuxer.serial == 7 and demuxer.pre_skip == 312, "❌ Wrong Opus stream info"
+    try:
+        OggOpusDemuxer().feed(b"garbage" * 10)
+        raise AssertionError("❌ Non-Ogg data should be rejected")
+    except ValueError:
+        pass
+    print("✅ Ogg packets reassembled across pages")
+
+
+def test_sniff_and_pool_errors():
+    """Test container sniffing and that the worker pool reports bad streams"""
+    print("\n🧪 Testing codec sniffing and decode errors...")
+    assert sniff_codec(build_webm()[0]) == CODEC_OPUS_WEBM, "❌ WebM not recognised"
+    assert sniff_codec(memoryview(build_ogg()[0])) == CODEC_OPUS_OGG, "❌ Ogg not recognised"
+    assert sniff_codec(b"\x00\x01" * 512) is None, "❌ PCM should not look compressed"
+
+    pool = AudioDecodePool(workers=1)
+    try:
+        future = pool.decode("bad_stream", b"\x00" * 64, CODEC_OPUS_WEBM, reset=True)
+        try:
+            future.result(timeout=60)
+            raise AssertionError("❌ Invalid EBML should fail to decode")
+        except ValueError:
+            pass
+        stats = pool.stats.snapshot()
+        assert stats["errors"] == 1 and stats["chunks"] == 0, f"❌ Error not counted: {stats}"
+        assert "stt_audio_decode_errors_total 1" in pool.stats.prometheus_text(), "❌ Error count missing from /metrics"
+    finally:
+        pool.shutdown()
+    print("✅ Containers sniffed, decode errors surface on the future")
+
+
+if __name__ == "__main__":
+    try:
+        test_webm_demux_streaming()
+        test_ogg_demux_streaming()
+        test_sniff_and_pool_errors()
+        print("\n🎊 ALL TESTS PASSED! Audio decode is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
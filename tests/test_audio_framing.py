@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script to verify binary audio framing and frame sequence tracking
+"""
+import sys
+from audio_framing import (
+    CODEC_PCM16, FRAME_HEADER_SIZE, AudioFrameTracker, encode_audio_frame, parse_audio_frame,
+)
+
+PCM = bytes(range(256)) * 8  # 1024 samples
+
+def test_roundtrip_without_copy():
+    """Test that a framed payload parses back and the audio is a view, not a copy"""
+    print("🧪 Testing frame encode/parse...")
+    data = encode_audio_frame(7, PCM, sample_rate=24000, capture_ms=1700000000123.5)
+    assert len(data) == FRAME_HEADER_SIZE + len(PCM) == 20 + 2048, "❌ Unexpected frame size"
+    frame = parse_audio_frame(data)
+    assert (frame.seq, frame.sample_rate, frame.codec, frame.capture_ms) == (7, 24000, CODEC_PCM16, 1700000000123.5), \
+        "❌ Header fields don't round-trip"
+    assert isinstance(frame.payload, memoryview) and frame.payload.obj is data, "❌ Payload should be a view of the message"
+    assert frame.payload == PCM, "❌ Payload doesn't round-trip"
+    print("✅ Frame parsed without copying the audio")
+
+def test_raw_and_invalid_payloads():
+    """Test that raw PCM passes as un-framed and unknown versions are rejected"""
+    print("\n🧪 Testing raw and invalid payloads...")
+    assert parse_audio_frame(PCM) is None, "❌ Raw PCM should not parse as a frame"
+    assert parse_audio_frame(b"AF") is None, "❌ Too-short data should not parse as a frame"
+    assert parse_audio_frame(bytearray(encode_audio_frame(0, PCM))) is not None, "❌ bytearray frames should parse"
+    bad = bytearray(encode_audio_frame(0, PCM))
+    bad[2] = 9
+    try:
+        parse_audio_frame(bytes(bad))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("❌ Unsupported version should raise ValueError")
+    print("✅ Raw PCM accepted, unknown versions rejected")
+
+def test_gaps_and_late_frames():
+    """Test missing frame counting and dropping of late frames"""
+    print("\n🧪 Testing gap and late frame detection...")
+    tracker = AudioFrameTracker()
+    results = [tracker.observe(parse_audio_frame(encode_audio_frame(seq, PCM, capture_ms=0)), arrival=1.0)
+               for seq in (0, 1, 2, 5, 3, 6, 6)]
+    assert results == [True, True, True, True, False, True, False], f"❌ Unexpected accept/drop {results}"
+    stats = tracker.summary()
+    assert (stats["frames"], stats["missing"], stats["late"]) == (5, 2, 2), f"❌ Unexpected counts {stats}"
+    assert stats["uplink_p50_ms"] is None, "❌ Frames without capture times have no uplink delay"
+    tracker.reset()
+    assert tracker.observe(parse_audio_frame(encode_audio_frame(0, PCM))), "❌ New recording should restart at seq 0"
+    print("✅ Gaps and late frames detected")
+
+def test_capture_clock_mapping():
+    """Test the clock offset estimate, capture time mapping and uplink delay"""
+    print("\n🧪 Testing capture clock mapping...")
+    tracker = AudioFrameTracker()
+    # Client clock is 1000s ahead of perf_counter; network delay 20ms, 5ms, 50ms
+    for seq, (capture_ms, delay) in enumerate(((1000_000.0, 0.020), (1000_042.7, 0.005), (1000_085.3, 0.050))):
+        frame = parse_audio_frame(encode_audio_frame(seq, PCM, capture_ms=capture_ms))
+        tracker.observe(frame, arrival=capture_ms / 1000 - 1000 + delay)
+    assert abs(tracker.clock_offset - (-1000 + 0.005)) < 1e-6, f"❌ Offset should come from the fastest frame, got {tracker.clock_offset}"
+    assert abs(tracker.capture_time(1000_085.3) - (0.0853 + 0.005)) < 1e-6, "❌ Wrong capture time mapping"
+    age = tracker.capture_age_ms(now=0.0853 + 0.2)
+    assert abs(age - 195.0) < 0.01, f"❌ Capture age should be 195ms, got {age}"
+    stats = tracker.summary()
+    assert 40 < stats["uplink_p99_ms"] < 50, f"❌ Uplink p99 should reflect the slowest frame, got {stats}"
+    print(f"✅ Clock offset estimated, uplink p99 {stats['uplink_p99_ms']:.1f}ms")
+
+if __name__ == "__main__":
+    try:
+        test_roundtrip_without_copy()
+        test_raw_and_invalid_payloads()
+        test_gaps_and_late_frames()
+        test_capture_clock_mapping()
+        print("\n🎊 ALL TESTS PASSED! Audio framing is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-provider audio pipelines: stage planning, sharing and output
+"""
+import sys
+import numpy as np
+from audio_pipeline import AudioFormat, AudioPipeline, plan_audio_pipeline
+from audio_resampler import PCM16Resampler
+
+RATE = 24000
+FRAME = 1024  # samples, like audio-processor.js
+FORMATS = {
+    "Deepgram API": AudioFormat(24000),
+    "Azure OpenAI": AudioFormat(24000),
+    "ElevenLabs ScribeV2": AudioFormat(16000),
+}
+
+
+def _speech(seconds=1.0):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * 440 * t) * 8000).astype('<i2').tobytes()
+
+
+def test_noop_stages_skipped():
+    """Test that providers already in the browser format get the frame untouched"""
+    print("🧪 Testing no-op stage skipping...")
+    pipeline = AudioPipeline(AudioFormat(RATE), FORMATS, gain_db=0)
+    assert pipeline.stage_count == 1, f"❌ Only ElevenLabs should need a stage, got {pipeline.stage_count}"
+    frame = _speech()[:FRAME * 2]
+    out = pipeline.process(frame, ["Deepgram API", "Azure OpenAI"])
+    assert out["Deepgram API"] is frame and out["Azure OpenAI"] is frame, "❌ 24kHz providers should get the input as is"
+    assert pipeline.output_bytes("ElevenLabs ScribeV2", 3000) == 2000, "❌ Wrong 16kHz byte count"
+    print("✅ No-op stages left out")
+
+
+def test_shared_stages_and_output():
+    """Test that shared stages run once and chunked output matches a direct resample"""
+    print("\n🧪 Testing shared stages...")
+    pipeline = AudioPipeline(AudioFormat(RATE), FORMATS, gain_db=6.0)
+    # Deepgram and Azure share one gain stage; ElevenLabs has resample -> gain
+    assert pipeline.stage_count == 3, f"❌ Expected 3 stages, got {pipeline.stage_count}"
+
+    audio = _speech()
+    reference = PCM16Resampler(RATE, 16000)
+    gain = 10 ** (6.0 / 20)
+    outputs = {"Deepgram API": [], "Azure OpenAI": [], "ElevenLabs ScribeV2": []}
+    expected_16k = []
+    for i in range(0, len(audio), FRAME * 2):
+        frame = audio[i:i + FRAME * 2]
+        out = pipeline.process(frame, list(FORMATS))
+        assert out["Deepgram API"] is out["Azure OpenAI"], "❌ Same-format providers should share one output"
+        for name, data in out.items():
+            outputs[name].append(data)
+        expected_16k.append(reference.process(frame))
+
+    amplified = np.frombuffer(b"".join(outputs["Azure OpenAI"]), dtype='<i2')
+    source = np.frombuffer(audio, dtype='<i2')
+    assert np.max(np.abs(amplified - np.rint(source * gain))) <= 1, "❌ Gain not applied"
+    resampled = np.frombuffer(b"".join(outputs["ElevenLabs ScribeV2"]), dtype='<i2').astype(np.float64)
+    expected = np.frombuffer(b"".join(expected_16k), dtype='<i2') * gain
+    assert len(resampled) == len(expected), "❌ Resampled length differs from a direct resample"
+    assert np.max(np.abs(resampled - expected)) <= 2, "❌ Resample + gain output differs from a direct resample"
+
+    loud = np.full(FRAME, 30000, dtype='<i2').tobytes()
+    clipped = np.frombuffer(pipeline.process(loud, ["Azure OpenAI"])["Azure OpenAI"], dtype='<i2')
+    assert clipped.max() == 32767, "❌ Gain should clip to the PCM16 range"
+    print("✅ Shared stages run once, output matches")
+
+
+def test_lazy_reset_and_plan_cache():
+    """Test that only requested providers' stages run, reset, and plans are cached"""
+    print("\n🧪 Testing lazy evaluation and plan caching...")
+    pipeline = AudioPipeline(AudioFormat(RATE), FORMATS, gain_db=0)
+    audio = _speech(0.2)
+    pipeline.process(audio, ["Deepgram API"])  # Must not feed the ElevenLabs resampler
+    first = pipeline.process(audio, ["ElevenLabs ScribeV2"])["ElevenLabs ScribeV2"]
+    assert first == PCM16Resampler(RATE, 16000).process(audio), "❌ Stages of unrequested providers should not run"
+    pipeline.reset(["ElevenLabs ScribeV2"])
+    assert pipeline.process(audio, ["ElevenLabs ScribeV2"])["ElevenLabs ScribeV2"] == first, "❌ Reset should restart the stream"
+
+    before = plan_audio_pipeline.cache_info().hits
+    AudioPipeline(AudioFormat(RATE), dict(reversed(list(FORMATS.items()))), gain_db=0)
+    assert plan_audio_pipeline.cache_info().hits == before + 1, "❌ Same formats should reuse the cached plan"
+    try:
+        AudioPipeline(AudioFormat(RATE), {"Stereo": AudioFormat(RATE, channels=2)})
+        raise AssertionError("❌ Unsupported conversions should be rejected")
+    except ValueError:
+        pass
+    print("✅ Lazy stages, reset and cached plans work")
+
+
+if __name__ == "__main__":
+    try:
+        test_noop_stages_skipped()
+        test_shared_stages_and_output()
+        test_lazy_reset_and_plan_cache()
+        print("\n🎊 ALL TESTS PASSED! Audio pipeline is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script to verify session audio recording and replay
+"""
+import sys
+import os
+import tempfile
+import threading
+import time
+from audio_recorder import AudioRecorder, load_recording, replay
+
+def _record(directory, frames, queue_size=100):
+    recorder = AudioRecorder(directory, queue_size=queue_size)
+    path = recorder.start("sid1", "Azure OpenAI", "English")
+    for frame in frames:
+        recorder.write("sid1", frame)
+    recorder.stop("sid1")
+    recorder.close()
+    return recorder, path
+
+def test_disabled_without_directory():
+    """Test that the recorder does nothing unless a directory is configured"""
+    print("🧪 Testing recorder disabled by default...")
+    recorder = AudioRecorder("")
+    assert recorder.start("sid1") is None, "❌ Disabled recorder should not start"
+    recorder.write("sid1", b"\x00\x00")
+    recorder.close()
+    assert recorder.stats()["written"] == 0, "❌ Disabled recorder should not write"
+    print("✅ Recorder is opt-in")
+
+def test_record_and_load():
+    """Test that frames, arrival times and metadata round-trip through WAV + sidecar"""
+    print("\n🧪 Testing record and load...")
+    frames = [bytes([i]) * 2048 for i in range(10)]
+    with tempfile.TemporaryDirectory() as directory:
+        recorder, path = _record(directory, frames)
+        assert os.path.exists(path), "❌ WAV file missing"
+        assert os.path.exists(path[:-4] + ".json"), "❌ Sidecar missing"
+        recording = load_recording(path)
+        assert recording.audio == b"".join(frames), "❌ Audio mismatch"
+        assert [size for _, size in recording.frames] == [2048] * 10, "❌ Frame sizes mismatch"
+        arrivals = [t for t, _ in recording.frames]
+        assert arrivals == sorted(arrivals), "❌ Arrival times should be ordered"
+        assert recording.metadata["provider"] == "Azure OpenAI", "❌ Metadata missing"
+        assert recording.metadata["dropped"] == 0, "❌ No frames should be dropped"
+        assert abs(recording.duration_sec - 20480 / 48000) < 1e-9, "❌ Wrong duration"
+        assert recorder.stats()["written"] == 10, "❌ Written count mismatch"
+    print("✅ Recording round-trips")
+
+def test_full_queue_drops_frames():
+    """Test that a full queue drops frames instead of blocking the audio path"""
+    print("\n🧪 Testing drops when the writer falls behind...")
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = AudioRecorder(directory, queue_size=5)
+        # Hold the writer while it opens the file so the queue fills up
+        blocker = threading.Event()
+        original_open = recorder._open
+        recorder._open = lambda rec: (blocker.wait(), original_open(rec))
+        path = recorder.start("sid1")
+        start = time.perf_counter()
+        for _ in range(50):
+            recorder.write("sid1", b"\x00" * 100)
+        assert time.perf_counter() - start < 0.5, "❌ write() should never block"
+        blocker.set()
+        recorder.stop("sid1")
+        recorder.close()
+        recording = load_recording(path)
+        dropped = recorder.stats()["dropped"]
+        assert dropped > 0, "❌ Expected dropped frames"
+        assert recording.metadata["dropped"] == dropped, "❌ Sidecar should record drops"
+        assert len(recording.frames) + dropped == 50, "❌ Frames lost without being counted"
+    print(f"✅ {dropped} frames dropped and counted")
+
+def test_wav_without_sidecar():
+    """Test that a plain WAV file replays as 1024-sample real-time frames"""
+    print("\n🧪 Testing plain WAV load...")
+    import wave
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "plain.wav")
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(24000)
+            wav.writeframes(b"\x01\x00" * 2500)
+        recording = load_recording(path)
+        assert [size for _, size in recording.frames] == [2048, 2048, 904], "❌ Unexpected framing"
+        assert abs(recording.frames[0][0] - 1024 / 24) < 1e-6, "❌ First frame should arrive after 1024 samples"
+    print("✅ Plain WAV framed like the browser")
+
+def test_replay_pacing():
+    """Test replay sends identical frames at original and accelerated pacing"""
+    print("\n🧪 Testing replay pacing...")
+    frames = [bytes([i]) * 960 for i in range(5)]
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = AudioRecorder(directory)
+        path = recorder.start("sid1")
+        for frame in frames:
+            recorder.write("sid1", frame)
+            time.sleep(0.05)
+        recorder.close()
+        recording = load_recording(path)
+
+    sent = []
+    start = time.perf_counter()
+    assert replay(recording, sent.append) == 5, "❌ All frames should be sent"
+    original = time.perf_counter() - start
+    assert sent == frames, "❌ Replayed frames differ"
+    assert original >= recording.frames[-1][0] / 1000 - 0.01, f"❌ Replay too fast ({original:.3f}s)"
+
+    start = time.perf_counter()
+    replay(recording, lambda frame: None, speed=4.0)
+    fast = time.perf_counter() - start
+    assert fast < original / 2, f"❌ 4x replay not faster ({fast:.3f}s vs {original:.3f}s)"
+
+    stop = threading.Event()
+    stop.set()
+    assert replay(recording, sent.append, speed=0, stop_event=stop) == 0, "❌ stop_event should end replay"
+    print(f"✅ Replay took {original:.3f}s at 1x and {fast:.3f}s at 4x")
+
+if __name__ == "__main__":
+    try:
+        test_disabled_without_directory()
+        test_record_and_load()
+        test_full_queue_drops_frames()
+        test_wav_without_sidecar()
+        test_replay_pacing()
+        print("\n🎊 ALL TESTS PASSED! Audio recorder is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
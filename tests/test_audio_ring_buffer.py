@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the provider audio ring buffer
+"""
+import base64
+import json
+import sys
+from flask import Flask
+from flask_socketio import SocketIO
+import azure_openai_handler
+import elevenlabs_handler
+from audio_ring_buffer import AudioRingBuffer, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST
+
+class FakeOpenSocket:
+    """Stands in for an open provider WebSocket: records the JSON messages sent"""
+
+    def __init__(self):
+        self.connected = True
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(json.loads(message))
+
+def test_chunks_in_order_across_wrap():
+    """Test that chunks come out in order, including ones that wrap around the ring"""
+    print("🧪 Testing ring buffer ordering across wrap-around...")
+    ring = AudioRingBuffer(10, 4)
+    stream = bytes(range(200))
+    out = bytearray()
+    pos = 0
+    for size in [3, 5, 1, 6, 2, 7, 4] * 10:
+        ring.append(stream[pos:pos + size])
+        pos += size
+        while len(ring) >= 4:
+            out += ring.peek(4)
+            ring.consume(4)
+    out += ring.peek(len(ring))
+
+    assert bytes(out) == stream[:pos], "❌ Output should match input byte for byte"
+    assert ring.dropped_bytes == 0, f"❌ Nothing should be dropped, got {ring.dropped_bytes}"
+    print(f"✅ {pos} bytes round-tripped through a 10 byte ring")
+
+def test_drop_oldest_keeps_recent_audio():
+    """Test that drop_oldest discards whole samples from the front"""
+    print("\n🧪 Testing drop_oldest overflow...")
+    ring = AudioRingBuffer(8, 8, overflow=OVERFLOW_DROP_OLDEST)
+    ring.append(b"abcdef")
+    dropped = ring.append(b"XYZ")
+
+    # 1 byte short, rounded up to a whole 2-byte sample
+    assert dropped == 2, f"❌ Expected 2 bytes dropped, got {dropped}"
+    assert bytes(ring.peek(len(ring))) == b"cdefXYZ", f"❌ Unexpected contents {bytes(ring.peek(len(ring)))}"
+
+    dropped = ring.append(bytes(20))
+    assert len(ring) == 8 and dropped == 7 + 12, f"❌ Oversized append should keep its last 8 bytes (dropped {dropped})"
+    print("✅ Oldest audio discarded in sample-aligned steps")
+
+def test_drop_newest_keeps_buffered_audio():
+    """Test that drop_newest discards the incoming bytes that don't fit"""
+    print("\n🧪 Testing drop_newest overflow...")
+    ring = AudioRingBuffer(8, 8, overflow=OVERFLOW_DROP_NEWEST)
+    ring.append(b"abcde")
+    dropped = ring.append(b"XYZW")
+
+    assert dropped == 2, f"❌ Expected 2 bytes dropped, got {dropped}"
+    assert bytes(ring.peek(len(ring))) == b"abcdeXY", f"❌ Unexpected contents {bytes(ring.peek(len(ring)))}"
+    assert ring.dropped_bytes == 2, "❌ dropped_bytes should accumulate"
+    print("✅ Incoming overflow discarded, buffered audio kept")
+
+def test_send_through_never_drops():
+    """Test that frames larger than the ring pass through whole, backlog first"""
+    print("\n🧪 Testing send_through with oversized frames...")
+    ring = AudioRingBuffer(8, 4)
+    stream = bytes(range(100))
+    ring.append(stream[:6])  # Pre-connect backlog
+    out = bytearray()
+    pos = 6
+    for size in [1, 30, 2, 9, 40]:
+        for chunk in ring.send_through(stream[pos:pos + size], bytes):
+            assert len(chunk) == 4, f"❌ Only whole chunks should come out, got {len(chunk)} bytes"
+            out += chunk
+        pos += size
+        assert len(ring) < 4, f"❌ Only a partial chunk should stay buffered, got {len(ring)} bytes"
+    out += ring.peek(len(ring))
+
+    assert bytes(out) == stream[:pos], "❌ Output should match input byte for byte"
+    assert ring.dropped_bytes == 0, f"❌ Nothing should be dropped, got {ring.dropped_bytes}"
+    print(f"✅ {pos} bytes passed through an 8 byte ring without drops")
+
+def test_open_connections_send_oversized_frames_whole():
+    """Test that a frame larger than the pre-connect capacity reaches an open Azure / ElevenLabs connection whole"""
+    print("\n🧪 Testing oversized frames on open provider connections...")
+    socketio = SocketIO(Flask(__name__), async_mode='threading')
+    frame = bytes(range(256)) * 200  # 51200 bytes - more than either pre-connect buffer holds
+    cases = [
+        (azure_openai_handler, azure_openai_handler.get_azure_session("ring_azure", socketio),
+         azure_openai_handler.send_audio_to_azure_openai, "audio", azure_openai_handler.azure_sessions),
+        (elevenlabs_handler, elevenlabs_handler.get_elevenlabs_session("ring_elevenlabs", socketio),
+         elevenlabs_handler.send_audio_to_elevenlabs, "audio_base_64", elevenlabs_handler.elevenlabs_sessions),
+    ]
+    for handler, session, send, field, sessions in cases:
+        try:
+            assert len(frame) > session.audio_buffer.capacity, "❌ Frame should exceed the ring capacity"
+            session.ws = FakeOpenSocket()
+            session.connection_open = True
+            session.silence_timer_started = True
+            assert send(frame, session.session_id), f"❌ {handler.__name__} send failed"
+            sent = b"".join(base64.b64decode(message[field]) for message in session.ws.sent)
+            with session.audio_buffer_lock:
+                sent += bytes(session.audio_buffer.peek(len(session.audio_buffer)))
+            assert sent == frame, f"❌ {handler.__name__} lost audio on an open connection ({len(sent)} of {len(frame)} bytes)"
+            assert session.audio_buffer.dropped_bytes == 0, f"❌ {handler.__name__} dropped {session.audio_buffer.dropped_bytes} bytes"
+        finally:
+            session.ws = None
+            sessions.pop(session.session_id, None)
+    print("✅ Oversized frames sent whole on open connections")
+
+if __name__ == "__main__":
+    try:
+        test_chunks_in_order_across_wrap()
+        test_drop_oldest_keeps_recent_audio()
+        test_drop_newest_keeps_buffered_audio()
+        test_send_through_never_drops()
+        test_open_connections_send_oversized_frames_whole()
+        print("\n🎊 ALL TESTS PASSED! Ring buffer is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
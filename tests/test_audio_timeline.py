@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the audio timeline and speech-end-to-final latency alignment
+"""
+import json
+import sys
+from flask import Flask
+from flask_socketio import SocketIO
+import elevenlabs_handler
+from audio_ring_buffer import OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST
+from audio_timeline import AudioTimeline
+from elevenlabs_handler import get_elevenlabs_session, handle_elevenlabs_message
+from latency_metrics import SPEECH_END_TO_FINAL, latency_metrics
+
+RATE = 1000  # bytes per second, so 1 byte = 1ms
+
+def test_offsets_map_to_capture_time():
+    """Test that stream offsets map back from each chunk's capture time, across gaps"""
+    print("🧪 Testing offset to capture time mapping...")
+    timeline = AudioTimeline(RATE)
+    timeline.record(100, end_time=10.1)   # stream 0.0-0.1s captured 10.0-10.1
+    timeline.record(100, end_time=10.2)   # 0.1-0.2s captured 10.1-10.2
+    # Gated silence: the next chunk the provider receives was captured 5s later
+    timeline.record(100, end_time=15.3)   # 0.2-0.3s captured 15.2-15.3
+    assert abs(timeline.time_at(0.05) - 10.05) < 1e-9, "❌ Offset inside the first chunk maps wrong"
+    assert abs(timeline.time_at(0.2) - 10.2) < 1e-9, "❌ Chunk boundary should map to the earlier chunk's end"
+    assert abs(timeline.time_at(0.25) - 15.25) < 1e-9, "❌ Offset after a gap should map to the later capture"
+    assert timeline.time_at(0.5) is None, "❌ Offsets past the recorded audio can't be mapped"
+    assert abs(timeline.latency_ms(0.25, now=15.75) - 500.0) < 1e-6, "❌ Latency should be arrival - capture"
+    assert abs(timeline.duration - 0.3) < 1e-9, "❌ Wrong stream duration"
+    print("✅ Offsets map to capture times, gaps included")
+
+def test_buffer_drops_and_trimming():
+    """Test that pre-connect drops shift the stream and old chunks are forgotten"""
+    print("\n🧪 Testing dropped audio and trimming...")
+    timeline = AudioTimeline(RATE)
+    timeline.record_buffered(100, 0, OVERFLOW_DROP_OLDEST, end_time=1.1)
+    timeline.record_buffered(100, 50, OVERFLOW_DROP_OLDEST, end_time=1.2)  # oldest 50 bytes never sent
+    assert abs(timeline.time_at(0.0) - 1.05) < 1e-9, "❌ Stream start should skip the dropped oldest audio"
+
+    timeline = AudioTimeline(RATE)
+    timeline.record_buffered(100, 40, OVERFLOW_DROP_NEWEST, end_time=1.1)  # newest 40 bytes never sent
+    timeline.record_buffered(100, 0, OVERFLOW_DROP_NEWEST, end_time=1.3)
+    assert abs(timeline.time_at(0.06) - 1.06) < 1e-9, "❌ Kept head of the chunk should end before its capture end"
+    assert abs(timeline.time_at(0.07) - 1.21) < 1e-9, "❌ Next chunk should follow the kept head"
+
+    timeline = AudioTimeline(RATE, max_chunks=4)
+    for i in range(1, 6):
+        timeline.record(100, end_time=float(i))
+    assert timeline.time_at(0.1) is None, "❌ Trimmed chunks can't be mapped"
+    assert abs(timeline.time_at(0.45) - 4.95) < 1e-9, "❌ Remembered chunks should still map"
+    timeline.reset()
+    assert timeline.time_at(0.0) is None and timeline.duration == 0, "❌ Reset should forget the stream"
+    print("✅ Drops shift the stream, trimmed audio is forgotten")
+
+def test_elevenlabs_commit_timed_from_last_word():
+    """Test that committed_transcript_with_timestamps times the commit without committing twice"""
+    print("\n🧪 Testing ElevenLabs speech-end latency...")
+    latency_metrics.reset()
+    session = get_elevenlabs_session("timeline_session", SocketIO(Flask(__name__), async_mode='threading'))
+    session.reset_performance_metrics()
+    # 1s of 16kHz audio in two chunks, captured 100.0-101.0
+    session.audio_timeline.record(16000, end_time=100.5)
+    session.audio_timeline.record(16000, end_time=101.0)
+    handle_elevenlabs_message(session, json.dumps({"message_type": "committed_transcript", "text": "hello world"}))
+    committed_at = session.commit_awaiting_timestamps
+    assert committed_at is not None, "❌ Commit should wait for its word timings"
+    handle_elevenlabs_message(session, json.dumps({
+        "message_type": "committed_transcript_with_timestamps", "text": "hello world",
+        "words": [{"text": "hello", "type": "word", "start": 0.1, "end": 0.4},
+                  {"text": " ", "type": "spacing", "start": 0.4, "end": 0.5},
+                  {"text": "world", "type": "word", "start": 0.5, "end": 0.8}],
+    }))
+    elevenlabs_handler.elevenlabs_sessions.pop("timeline_session", None)
+    assert session.transcript.segments == ["hello world"], f"❌ Segment should be committed once, got {session.transcript.segments}"
+    series = [s for s in latency_metrics.snapshot() if s["metric"] == SPEECH_END_TO_FINAL]
+    assert len(series) == 1 and series[0]["provider"] == "ElevenLabs" and series[0]["count"] == 1, f"❌ Expected one sample, got {series}"
+    expected_ms = (committed_at - 100.8) * 1000
+    assert abs(series[0]["p50"] - expected_ms) / expected_ms < 0.05, f"❌ Latency should be measured from the last word's end, got {series[0]}"
+    latency_metrics.reset()
+    print("✅ Speech end to final recorded once per segment")
+
+if __name__ == "__main__":
+    try:
+        test_offsets_map_to_capture_time()
+        test_buffer_drops_and_trimming()
+        test_elevenlabs_commit_timed_from_last_word()
+        print("\n🎊 ALL TESTS PASSED! Audio timeline is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
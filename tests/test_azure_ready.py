@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script to verify Azure OpenAI connection readiness reporting
+"""
+import os
+import socket
+import sys
+import time
+from flask import Flask
+from flask_socketio import SocketIO
+import azure_openai_handler
+from azure_openai_handler import azure_sessions, initialize_azure_openai_connection
+
+def test_failed_connection_returns_false_immediately():
+    """Test that a connection that can't open reports failure as soon as it fails, not True after 5s"""
+    print("🧪 Testing Azure readiness on connection failure...")
+    # Reserve a local port and close it so connecting is refused
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    saved = {key: os.environ.get(key) for key in ("AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT")}
+    os.environ["AZURE_OPENAI_API_KEY"] = "test-key"
+    os.environ["AZURE_OPENAI_ENDPOINT"] = f"https://127.0.0.1:{port}/"
+    try:
+        started = time.perf_counter()
+        result = initialize_azure_openai_connection(SocketIO(Flask(__name__), async_mode='threading'), "Auto", "ready_session")
+        elapsed = time.perf_counter() - started
+
+        assert result is False, "❌ A connection that never opened should report failure so it is retried"
+        assert elapsed < azure_openai_handler.AZURE_READY_TIMEOUT_SEC / 2, f"❌ Failure should be reported immediately (took {elapsed:.2f}s)"
+        session = azure_sessions["ready_session"]
+        assert session.ws is None and not session.connection_open, "❌ Failed connection should be dropped"
+        print(f"✅ Failure reported in {elapsed * 1000:.0f}ms")
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        azure_sessions.pop("ready_session", None)
+
+if __name__ == "__main__":
+    try:
+        test_failed_connection_returns_false_immediately()
+        print("\n🎊 ALL TESTS PASSED! Azure readiness is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
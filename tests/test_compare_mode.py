@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script to verify compare mode tagging and the per-utterance latency race
+"""
+import sys
+from conftest import EmitRecorder
+from compare_mode import ProviderTaggedSocketIO, UtteranceRace
+from metrics_events import COMPARE_RACE, MetricEvent
+
+PROVIDERS = ["Deepgram API", "Azure OpenAI", "ElevenLabs ScribeV2"]
+
+def _race(providers=PROVIDERS):
+    results = []
+    race = UtteranceRace("sid1", providers, lambda utterance, ranked: results.append((utterance, ranked)))
+    return race, results
+
+def test_race_ranks_providers():
+    """Test that an utterance is decided once every provider finalises it"""
+    print("🧪 Testing utterance race ranking...")
+    race, results = _race()
+    race.observe("ElevenLabs ScribeV2", "hello", False, now=10.0)
+    race.observe("Azure OpenAI", "hello world", False, now=10.2)
+    race.observe("ElevenLabs ScribeV2", "hello world", True, now=10.5)
+    race.observe("Deepgram API", "hello world", True, now=10.3)
+    assert not results, "❌ Race decided before all providers finalised"
+    race.observe("Azure OpenAI", "hello world", True, now=10.9)
+    assert len(results) == 1, "❌ Race should be decided"
+    utterance, ranked = results[0]
+    assert utterance == 1, "❌ First utterance should be number 1"
+    assert [r["api"] for r in ranked] == ["Deepgram API", "ElevenLabs ScribeV2", "Azure OpenAI"], "❌ Wrong ranking"
+    assert [r["rank"] for r in ranked] == [1, 2, 3], "❌ Wrong ranks"
+    assert ranked[0]["behind_winner_ms"] == 0, "❌ Winner should be 0ms behind"
+    assert ranked[2]["behind_winner_ms"] == 600.0, f"❌ Wrong gap {ranked[2]['behind_winner_ms']}"
+    assert ranked[1]["first_update_ms"] == 0.0, "❌ Earliest first update should be the race start"
+    assert ranked[2]["first_update_ms"] == 200.0, "❌ Wrong first update offset"
+    assert ranked[0]["final_ms"] == 300.0, "❌ Wrong final offset"
+    print("✅ Providers ranked by final transcript time")
+
+def test_race_extracts_segment_from_running_transcript():
+    """Test that accumulated transcripts are reduced to the current utterance"""
+    print("\n🧪 Testing running transcript segments...")
+    race, results = _race(["Azure OpenAI"])
+    race.observe("Azure OpenAI", "hello world", True, now=1.0)
+    race.observe("Azure OpenAI", "hello world how are you", True, now=2.0)
+    assert [ranked[0]["text"] for _, ranked in results] == ["hello world", "how are you"], "❌ Segments not extracted"
+    assert [utterance for utterance, _ in results] == [1, 2], "❌ Utterances should be numbered in order"
+    print("✅ Segments extracted")
+
+def test_race_remove_and_flush():
+    """Test that failed providers are not waited for and unfinished utterances are flushed"""
+    print("\n🧪 Testing remove and flush...")
+    race, results = _race()
+    race.observe("Deepgram API", "one", True, now=1.0)
+    race.observe("Azure OpenAI", "one", True, now=1.2)
+    race.remove("ElevenLabs ScribeV2")
+    assert len(results) == 1 and len(results[0][1]) == 2, "❌ Removing a provider should decide the utterance"
+
+    race.observe("Deepgram API", "two", True, now=2.0)
+    race.flush()
+    assert len(results) == 2, "❌ Flush should report the unfinished utterance"
+    ranked = results[1][1]
+    assert ranked[0]["api"] == "Deepgram API" and ranked[0]["rank"] == 1, "❌ Finished provider should rank first"
+    assert ranked[1]["api"] == "Azure OpenAI" and ranked[1]["rank"] is None, "❌ Unfinished provider should be unranked"
+    race.flush()
+    assert len(results) == 2, "❌ Flush should not report twice"
+    print("✅ Remove and flush work")
+
+def test_tagged_socketio():
+    """Test that handler emits are tagged with the provider and feed the race"""
+    print("\n🧪 Testing provider tagging...")
+    race, results = _race(["ElevenLabs ScribeV2"])
+    socketio = EmitRecorder()
+    tagged = ProviderTaggedSocketIO(socketio, "ElevenLabs ScribeV2", race)
+    tagged.emit('transcription_status', {'status': 'started'}, room="sid1")
+    payload = {'transcription': 'hi there', 'final': True}
+    tagged.emit('transcription_update', payload, room="sid1")
+    assert socketio.emitted[0][1] == {'status': 'started', 'api': 'ElevenLabs ScribeV2'}, "❌ Status not tagged"
+    assert socketio.emitted[1][1]['api'] == 'ElevenLabs ScribeV2', "❌ Transcript not tagged"
+    assert socketio.emitted[1][2] == {'room': 'sid1'}, "❌ Emit kwargs not passed through"
+    assert 'api' not in payload, "❌ Caller's payload should not be modified"
+    assert len(results) == 1, "❌ Final transcript should reach the race"
+    print("✅ Emits tagged and observed")
+
+def test_race_event_text():
+    """Test the performance log line of a race result"""
+    print("\n🧪 Testing COMPARE_RACE log line...")
+    line = MetricEvent(COMPARE_RACE, "sid1", provider="Azure OpenAI", count=2, text="how are you",
+                       extra={"Rank": 1, "BehindWinner": "0.00ms"}).to_text()
+    assert line == 'COMPARE_RACE | Session: sid1 | Provider: Azure OpenAI | Count: 2 | Text: "how are you" | Rank: "1" | BehindWinner: "0.00ms"', \
+        f"❌ Unexpected line {line}"
+    print("✅ Race line rendered")
+
+if __name__ == "__main__":
+    try:
+        test_race_ranks_providers()
+        test_race_extracts_segment_from_running_transcript()
+        test_race_remove_and_flush()
+        test_tagged_socketio()
+        test_race_event_text()
+        print("\n🎊 ALL TESTS PASSED! Compare mode is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script to verify background connection retries
+"""
+import sys
+import threading
+import time
+import connection_retry
+from connection_retry import ConnectionRetry
+
+def _fast_backoff(attempt):
+    return 0.02
+
+def test_retries_until_success_without_blocking():
+    """Test that start() returns immediately and failed attempts are retried"""
+    print("🧪 Testing background retry...")
+    connection_retry.backoff_seconds, original = _fast_backoff, connection_retry.backoff_seconds
+    try:
+        attempts = []
+        done = threading.Event()
+
+        def connect():
+            attempts.append(time.monotonic())
+            return len(attempts) == 3
+
+        started = time.monotonic()
+        ConnectionRetry(connect, "retry_session", "Test", on_success=done.set, on_failure=done.set, max_retries=3).start()
+        assert time.monotonic() - started < 0.05, "❌ start() should not wait for the connection"
+
+        assert done.wait(2.0), "❌ Retry sequence should finish"
+        assert len(attempts) == 3, f"❌ Expected 3 attempts, got {len(attempts)}"
+        print(f"✅ Connected on attempt {len(attempts)} without blocking the caller")
+    finally:
+        connection_retry.backoff_seconds = original
+
+class CancelOnReleaseLock:
+    """Attempt lock that cancels its retry the moment an attempt releases it"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.retry = None
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+        self.retry.cancel()
+
+def test_cancel_stops_retries_and_abandons_late_success():
+    """Test that cancel() drops pending attempts and closes a connection that succeeds after cancel"""
+    print("\n🧪 Testing retry cancellation...")
+    connection_retry.backoff_seconds, original = _fast_backoff, connection_retry.backoff_seconds
+    try:
+        outcomes = []
+
+        # Cancelled while waiting out the backoff: no further attempts
+        attempts = []
+        retry = ConnectionRetry(lambda: attempts.append(1) and False, "cancel_session", "Test",
+                                on_success=lambda: outcomes.append("success"),
+                                on_failure=lambda: outcomes.append("failure"), max_retries=5).start()
+        time.sleep(0.01)
+        retry.cancel()
+        time.sleep(0.2)
+        assert len(attempts) == 1, f"❌ Expected no attempts after cancel, got {len(attempts)}"
+
+        # Cancelled while an attempt is running: the late success is abandoned
+        in_attempt = threading.Event()
+        release = threading.Event()
+        abandoned = threading.Event()
+
+        def slow_connect():
+            in_attempt.set()
+            release.wait(1.0)
+            return True
+
+        retry = ConnectionRetry(slow_connect, "abandon_session", "Test",
+                                on_success=lambda: outcomes.append("success"),
+                                on_failure=lambda: outcomes.append("failure"),
+                                on_abandon=abandoned.set).start()
+        assert in_attempt.wait(1.0), "❌ Attempt should have started"
+        retry.cancel()
+        release.set()
+
+        assert abandoned.wait(1.0), "❌ Connection made after cancel should be abandoned"
+        assert outcomes == [], f"❌ Cancelled retries should not report an outcome, got {outcomes}"
+
+        # Cancelled right after the attempt releases its lock: the connection is reported or closed, never leaked
+        settled = []
+        cancel_on_release = CancelOnReleaseLock()
+        retry = ConnectionRetry(lambda: True, "race_session", "Test",
+                                on_success=lambda: settled.append("success"),
+                                on_failure=lambda: settled.append("failure"),
+                                on_abandon=lambda: settled.append("abandon"),
+                                attempt_lock=cancel_on_release)
+        cancel_on_release.retry = retry
+        retry.start()
+        time.sleep(0.2)
+        assert len(settled) == 1, f"❌ Connection made around cancel was leaked: {settled}"
+        print("✅ Cancel stops pending retries and closes late connections")
+    finally:
+        connection_retry.backoff_seconds = original
+
+def test_hung_provider_does_not_starve_others():
+    """Test that attempts hanging on one provider leave other providers' connects running"""
+    print("\n🧪 Testing per-provider connect executors...")
+    release = threading.Event()
+    connected = threading.Event()
+    hung = [ConnectionRetry(lambda: release.wait(5.0), f"hung_session_{i}", "Hung",
+                            on_success=lambda: None, on_failure=lambda: None, max_retries=0).start()
+            for i in range(connection_retry.STT_CONNECT_WORKERS + 1)]
+    try:
+        ConnectionRetry(lambda: True, "other_session", "Other",
+                        on_success=connected.set, on_failure=lambda: None, max_retries=0).start()
+        assert connected.wait(1.0), "❌ Other provider's connect waited behind hung handshakes"
+    finally:
+        release.set()
+        for retry in hung:
+            retry.cancel()
+    print("✅ Each provider connects on its own bounded executor")
+
+if __name__ == "__main__":
+    try:
+        test_retries_until_success_without_blocking()
+        test_cancel_stops_retries_and_abandons_late_success()
+        test_hung_provider_does_not_starve_others()
+        print("\n🎊 ALL TESTS PASSED! Connection retries are working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
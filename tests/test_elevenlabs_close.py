@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script to verify ElevenLabs stop waits for the final commit without blocking
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from flask import Flask
+from flask_socketio import SocketIO
+from websockets.asyncio.server import serve
+import elevenlabs_handler
+from elevenlabs_handler import close_elevenlabs_connection, get_elevenlabs_session, handle_elevenlabs_message
+from latency_metrics import SPEECH_END_TO_FINAL, latency_metrics
+from provider_io_loop import AsyncWebSocketConnection, ProviderIOLoop
+
+# Word timings follow the committed transcript (include_timestamps=true) after this delay
+TIMESTAMPS_DELAY_SEC = 0.1
+
+def _run_scenario(session_id, reply_to_commit, send_timestamps=True):
+    """Open a session against a local fake ElevenLabs server, stop it and report what happened"""
+    io_loop = ProviderIOLoop(name=f"test-{session_id}")
+    io_loop.start()
+    received = []
+    closed = threading.Event()
+
+    async def fake_elevenlabs(ws):
+        async for message in ws:
+            data = json.loads(message)
+            received.append(data)
+            if data.get("commit") and reply_to_commit:
+                await ws.send(json.dumps({"message_type": "committed_transcript", "text": "final words"}))
+                if send_timestamps:
+                    await asyncio.sleep(TIMESTAMPS_DELAY_SEC)
+                    await ws.send(json.dumps({
+                        "message_type": "committed_transcript_with_timestamps", "text": "final words",
+                        "words": [{"text": "final", "type": "word", "start": 0.0, "end": 0.002},
+                                  {"text": "words", "type": "word", "start": 0.002, "end": 0.005}],
+                    }))
+
+    async def start():
+        return await serve(fake_elevenlabs, "127.0.0.1", 0)
+
+    server = io_loop.run(start(), timeout=5)
+    url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    session = get_elevenlabs_session(session_id, SocketIO(Flask(__name__), async_mode='threading'))
+    opened = threading.Event()
+    session.ws = AsyncWebSocketConnection(
+        url,
+        on_open=lambda ws: opened.set(),
+        on_message=lambda ws, message: handle_elevenlabs_message(session, message),
+        on_close=lambda ws, code, reason: closed.set(),
+        io_loop=io_loop
+    )
+    session.ws.start()
+    assert opened.wait(5), "❌ Fake ElevenLabs connection should open"
+    session.connection_open = True
+    session.audio_timeline.record(200)
+    session.transcript.commit("earlier")
+    session.audio_buffer.append(b"\x01\x00" * 100)
+
+    started = time.perf_counter()
+    close_elevenlabs_connection(session_id)
+    return_ms = (time.perf_counter() - started) * 1000
+    assert closed.wait(5), "❌ Connection should be closed"
+    closed_ms = (time.perf_counter() - started) * 1000
+
+    async def stop_server():
+        server.close()
+        await server.wait_closed()
+    io_loop.run(stop_server(), timeout=5)
+    io_loop.shutdown()
+    elevenlabs_handler.elevenlabs_sessions.pop(session_id, None)
+    assert session.commit_awaiting_timestamps is None, "❌ Closing should not leave a commit waiting for timings"
+    return received, return_ms, closed_ms
+
+def test_close_returns_immediately_and_closes_on_commit():
+    """Test that stop sends an explicit commit and closes as soon as the committed transcript and its timings arrive"""
+    print("🧪 Testing event-driven final commit...")
+    latency_metrics.reset()
+    received, return_ms, closed_ms = _run_scenario("commit_session", reply_to_commit=True)
+
+    assert return_ms < 50, f"❌ close_elevenlabs_connection should not block (took {return_ms:.1f}ms)"
+    commits = [m for m in received if m.get("commit")]
+    assert len(commits) == 1, f"❌ Expected one commit message, got {received}"
+    assert len(commits[0]["audio_base_64"]) > 0, "❌ Remaining buffered audio should be sent with the commit"
+    assert closed_ms < elevenlabs_handler.ELEVENLABS_COMMIT_TIMEOUT_MS / 2, f"❌ Should close on commit, not deadline ({closed_ms:.0f}ms)"
+    assert closed_ms >= TIMESTAMPS_DELAY_SEC * 1000, f"❌ Should stay open for the word timings (closed after {closed_ms:.0f}ms)"
+    series = [s for s in latency_metrics.snapshot() if s["metric"] == SPEECH_END_TO_FINAL]
+    assert len(series) == 1 and series[0]["count"] == 1, f"❌ Final commit should record its speech-end latency, got {series}"
+    latency_metrics.reset()
+    print(f"✅ Returned in {return_ms:.1f}ms, closed {closed_ms:.0f}ms after stop")
+
+def test_close_gives_up_at_deadline():
+    """Test that a missing commit doesn't hold the connection open past the deadline"""
+    print("\n🧪 Testing final commit deadline...")
+    original = elevenlabs_handler.ELEVENLABS_COMMIT_TIMEOUT_SEC
+    elevenlabs_handler.ELEVENLABS_COMMIT_TIMEOUT_SEC = 0.2
+    try:
+        _, return_ms, closed_ms = _run_scenario("deadline_session", reply_to_commit=False)
+    finally:
+        elevenlabs_handler.ELEVENLABS_COMMIT_TIMEOUT_SEC = original
+
+    assert return_ms < 50, f"❌ close_elevenlabs_connection should not block (took {return_ms:.1f}ms)"
+    assert 200 <= closed_ms < 1000, f"❌ Should close at the 200ms deadline, closed after {closed_ms:.0f}ms"
+    print(f"✅ Closed {closed_ms:.0f}ms after stop with no commit")
+
+    elevenlabs_handler.ELEVENLABS_COMMIT_TIMEOUT_SEC = 0.2
+    try:
+        _, _, closed_ms = _run_scenario("no_timestamps_session", reply_to_commit=True, send_timestamps=False)
+    finally:
+        elevenlabs_handler.ELEVENLABS_COMMIT_TIMEOUT_SEC = original
+    assert 200 <= closed_ms < 1000, f"❌ Missing word timings should hold the close until the deadline, closed after {closed_ms:.0f}ms"
+    print(f"✅ Closed {closed_ms:.0f}ms after stop when word timings never came")
+
+if __name__ == "__main__":
+    try:
+        test_close_returns_immediately_and_closes_on_commit()
+        test_close_gives_up_at_deadline()
+        print("\n🎊 ALL TESTS PASSED! ElevenLabs close is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
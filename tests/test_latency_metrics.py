@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the per-provider latency histograms and /metrics routes
+"""
+import sys
+import random
+from latency_metrics import (
+    LogHistogram, LatencyMetrics, latency_metrics,
+    CONNECTION_SETUP, FIRST_TRANSCRIPT_LATENCY, RESPONSE_TIME, TIME_SINCE_LAST
+)
+from metrics_events import MetricEvent, SESSION_START, TRANSCRIPTION
+
+def test_histogram_percentiles():
+    """Test that percentiles are within the bucket error and memory stays fixed"""
+    print("🧪 Testing log-bucketed histogram percentiles...")
+    histogram = LogHistogram()
+    buckets = len(histogram.counts)
+    rng = random.Random(7)
+    values = sorted(rng.uniform(1, 2000) for _ in range(100000))
+    for value in values:
+        histogram.record(value)
+
+    assert len(histogram.counts) == buckets, "❌ Bucket array should not grow"
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        approx = histogram.percentile(q)
+        assert abs(approx - exact) / exact < 0.05, f"❌ p{int(q * 100)} {approx:.1f} too far from {exact:.1f}"
+    assert LogHistogram().percentile(0.5) is None, "❌ Empty histogram should have no percentile"
+    print(f"✅ p50/p90/p99 within 5% using {buckets} fixed buckets")
+
+def test_events_feed_series():
+    """Test that transcription events and connection timings land in the right series"""
+    print("\n🧪 Testing metric series from events...")
+    metrics = LatencyMetrics()
+    metrics.observe_event(MetricEvent(SESSION_START, "s1", provider="Deepgram", language="English"))
+    metrics.observe_event(MetricEvent(TRANSCRIPTION, "s1", provider="Deepgram", language="English", count=1,
+                                      response_time_ms=300, time_since_start_ms=1200, time_since_last_ms=0))
+    metrics.observe_event(MetricEvent(TRANSCRIPTION, "s1", provider="Deepgram", language="English", count=2,
+                                      response_time_ms=250, time_since_start_ms=2000, time_since_last_ms=800))
+    metrics.observe(CONNECTION_SETUP, "Azure OpenAI", "Auto", 420)
+
+    series = {(s["metric"], s["provider"], s["language"]): s for s in metrics.snapshot()}
+    assert series[(RESPONSE_TIME, "Deepgram", "English")]["count"] == 2, "❌ Both response times should be recorded"
+    assert series[(FIRST_TRANSCRIPT_LATENCY, "Deepgram", "English")]["count"] == 1, "❌ Only the first transcript counts"
+    assert series[(TIME_SINCE_LAST, "Deepgram", "English")]["max"] == 800, "❌ TimeSinceLast should skip the first transcript"
+    assert series[(CONNECTION_SETUP, "Azure OpenAI", "Auto")]["p50"] == 420, "❌ Single value should be its own p50"
+
+    text = metrics.prometheus_text()
+    assert "# TYPE stt_response_time_ms summary" in text, "❌ Missing TYPE line"
+    assert 'stt_response_time_ms_count{provider="Deepgram",language="English"} 2' in text, f"❌ Missing count line:\n{text}"
+    assert 'stt_connection_setup_ms{provider="Azure OpenAI",language="Auto",quantile="0.99"} 420' in text, \
+        f"❌ Missing quantile line:\n{text}"
+    print("✅ Events recorded per metric, provider and language")
+
+def test_metrics_routes():
+    """Test the Prometheus and JSON routes"""
+    print("\n🧪 Testing /metrics routes...")
+    from voicesearch_app import app
+    latency_metrics.reset()
+    latency_metrics.observe(RESPONSE_TIME, "ElevenLabs", "Auto", 310)
+    client = app.test_client()
+
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain', f"❌ Unexpected response {response}"
+    assert 'stt_response_time_ms_count{provider="ElevenLabs",language="Auto"} 1' in response.get_data(as_text=True), \
+        "❌ Prometheus output missing the series"
+
+    response = client.get('/metrics/latency')
+    series = response.get_json()["series"]
+    assert series[0]["provider"] == "ElevenLabs" and series[0]["p99"] == 310, f"❌ Unexpected JSON {series}"
+    latency_metrics.reset()
+    print("✅ Prometheus text and JSON served")
+
+if __name__ == "__main__":
+    try:
+        test_histogram_percentiles()
+        test_events_feed_series()
+        test_metrics_routes()
+        print("\n🎊 ALL TESTS PASSED! Latency metrics are working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script to verify structured performance metrics events and their output formats
+"""
+import sys
+import os
+import json
+import logging
+import tempfile
+from metrics_events import (
+    MetricEvent, SESSION_END, SESSION_START, TRANSCRIPTION, TRANSCRIPTION_PARTIAL_FALLBACK, read_binary_events
+)
+from performance_log import PerformanceLogSink
+
+def _write_events(log_format, events):
+    """Log events (plus one plain string line) through a sink; returns the file path and a cleanup dir"""
+    tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(tmp.name, f"perf.{log_format}")
+    sink = PerformanceLogSink(path, log_format=log_format, flush_interval_ms=20)
+    sink.start()
+    test_logger = logging.getLogger(f"test_metrics_{log_format}")
+    test_logger.setLevel(logging.INFO)
+    test_logger.handlers = [sink.handler]
+    test_logger.propagate = False
+    for event in events:
+        test_logger.info(event)
+    test_logger.error("ERROR | Session: abc | Message: boom")
+    sink.stop()
+    return path, tmp
+
+def _sample_events():
+    return [
+        MetricEvent(SESSION_START, "abc", provider="Deepgram", model="nova-3", language="English", timestamp=1700000000.5),
+        MetricEvent(TRANSCRIPTION, "abc", provider="Deepgram", model="nova-3", language="English", count=1,
+                    response_time_ms=304.784, time_since_start_ms=1333.333, time_since_last_ms=0, text="Hello world"),
+        MetricEvent(SESSION_END, "abc", provider="Deepgram", duration_ms=4889.0, count=1, reason="SilenceTimeout"),
+    ]
+
+def test_legacy_text_lines():
+    """Test that events render exactly like the old f-string lines"""
+    print("🧪 Testing legacy text rendering...")
+    start, transcription, end = _sample_events()
+    assert start.to_text() == "SESSION_START | Session: abc | Language: English | Model: nova-3 | Timestamp: 1700000000.5", \
+        f"❌ Unexpected SESSION_START line: {start.to_text()}"
+    assert transcription.to_text() == (
+        "TRANSCRIPTION | Session: abc | Count: 1 | ResponseTime: 304.78ms | TimeSinceStart: 1333.33ms | "
+        "TimeSinceLast: 0.00ms | Text: \"Hello world\""
+    ), f"❌ Unexpected TRANSCRIPTION line: {transcription.to_text()}"
+    assert end.to_text() == "SESSION_END | Session: abc | TotalDuration: 4889.00ms | TotalTranscriptions: 1 | Reason: SilenceTimeout", \
+        f"❌ Unexpected SESSION_END line: {end.to_text()}"
+    fallback = MetricEvent(TRANSCRIPTION_PARTIAL_FALLBACK, "abc", count=1, response_time_ms=5, time_since_start_ms=10,
+                           text="hi", reason="VAD did not commit before session ended")
+    assert fallback.to_text().endswith("Text: \"hi\" | Note: VAD did not commit before session ended"), \
+        f"❌ Unexpected fallback line: {fallback.to_text()}"
+
+    path, tmp = _write_events("text", _sample_events())
+    with open(path) as f:
+        lines = f.read().splitlines()
+    tmp.cleanup()
+    assert len(lines) == 4 and lines[1].endswith(transcription.to_text()), f"❌ Unexpected text log: {lines}"
+    print("✅ Legacy text lines unchanged")
+
+def test_jsonl_sink():
+    """Test that the JSON Lines sink keeps every field"""
+    print("\n🧪 Testing JSON Lines sink...")
+    path, tmp = _write_events("jsonl", _sample_events())
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    tmp.cleanup()
+
+    assert [r["kind"] for r in records] == ["SESSION_START", "TRANSCRIPTION", "SESSION_END", "LOG"], \
+        f"❌ Unexpected kinds: {[r['kind'] for r in records]}"
+    transcription = records[1]
+    assert transcription["response_time_ms"] == 304.784 and transcription["transcript_length"] == 11, \
+        f"❌ Metrics should be kept as numbers: {transcription}"
+    assert transcription["provider"] == "Deepgram" and transcription["language"] == "English", \
+        f"❌ Provider/language missing: {transcription}"
+    assert records[3]["level"] == "ERROR" and records[3]["text"] == "ERROR | Session: abc | Message: boom", \
+        f"❌ Plain lines should be LOG records: {records[3]}"
+    assert MetricEvent.from_dict(transcription).to_text() == _sample_events()[1].to_text(), \
+        "❌ from_dict should round-trip"
+    print("✅ JSON Lines records carry typed fields")
+
+def test_binary_sink():
+    """Test that the binary sink round-trips events"""
+    print("\n🧪 Testing binary sink...")
+    originals = _sample_events()
+    path, tmp = _write_events("binary", originals)
+    events = list(read_binary_events(path))
+    tmp.cleanup()
+
+    assert len(events) == 4, f"❌ Expected 4 records, got {len(events)}"
+    for original, decoded in zip(originals, events):
+        assert decoded.to_dict() == original.to_dict(), f"❌ Round-trip mismatch: {original!r} != {decoded!r}"
+    assert events[2].response_time_ms is None, "❌ Unset metrics should stay unset"
+    assert events[3].text == "ERROR | Session: abc | Message: boom", f"❌ Unexpected LOG record: {events[3]!r}"
+    print("✅ Binary records decode to the same events")
+
+if __name__ == "__main__":
+    try:
+        test_legacy_text_lines()
+        test_jsonl_sink()
+        test_binary_sink()
+        print("\n🎊 ALL TESTS PASSED! Metrics events are working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
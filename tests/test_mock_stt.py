@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local mock STT servers against the real provider clients/handlers
+"""
+import sys
+import os
+import json
+from conftest import RecordingSocketIO, wait_for
+from deepgram import DeepgramClient, DeepgramClientOptions, LiveOptions, LiveTranscriptionEvents
+from websockets.sync.client import connect
+from mock_stt import MockAzureRealtimeServer, MockBehavior, MockDeepgramServer, MockElevenLabsServer
+from provider_io_loop import ProviderIOLoop
+
+def _with_env(values, func):
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        return func()
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+def test_deepgram_sdk_against_mock():
+    """Test that the Deepgram SDK live client gets Results from the mock server"""
+    print("🧪 Testing Deepgram SDK against mock server...")
+    server = MockDeepgramServer(behavior=MockBehavior(latency_ms=20)).start()
+    io_loop = ProviderIOLoop(name="test-deepgram-client")
+    io_loop.start()
+    transcripts = []
+    try:
+        client = DeepgramClient("mock-key", DeepgramClientOptions(url=f"http://127.0.0.1:{server.port}"))
+        connection = client.listen.asyncwebsocket.v("1")
+
+        async def on_transcript(self, result, **kwargs):
+            transcripts.append(result.channel.alternatives[0].transcript)
+
+        connection.on(LiveTranscriptionEvents.Transcript, on_transcript)
+        assert io_loop.run(connection.start(LiveOptions(model="nova-3", language="en")), timeout=5), "❌ SDK failed to connect"
+        for _ in range(10):
+            io_loop.run(connection.send(bytes(9600)), timeout=5)  # 2s of 24kHz PCM16
+        assert wait_for(lambda: transcripts), "❌ No transcript received"
+        io_loop.run(connection.finish(), timeout=5)
+        assert transcripts == ["hello world how are you"], f"❌ Unexpected transcripts {transcripts}"
+        print(f"✅ Deepgram SDK received {transcripts}")
+    finally:
+        io_loop.shutdown()
+        server.stop()
+
+def test_deepgram_interim_results_against_mock():
+    """Test that interim results come before the final, followed by UtteranceEnd"""
+    print("\n🧪 Testing Deepgram interim results and UtteranceEnd...")
+    server = MockDeepgramServer(behavior=MockBehavior(latency_ms=20)).start()
+    io_loop = ProviderIOLoop(name="test-deepgram-interim")
+    io_loop.start()
+    events = []
+    try:
+        client = DeepgramClient("mock-key", DeepgramClientOptions(url=f"http://127.0.0.1:{server.port}"))
+        connection = client.listen.asyncwebsocket.v("1")
+
+        async def on_transcript(self, result, **kwargs):
+            events.append((result.channel.alternatives[0].transcript, result.is_final))
+
+        async def on_utterance_end(self, utterance_end, **kwargs):
+            events.append(("<utterance end>", utterance_end.last_word_end))
+
+        connection.on(LiveTranscriptionEvents.Transcript, on_transcript)
+        connection.on(LiveTranscriptionEvents.UtteranceEnd, on_utterance_end)
+        options = LiveOptions(model="nova-3", language="en", encoding="linear16", sample_rate=24000, channels=1,
+                              interim_results=True, endpointing="10", utterance_end_ms="1000")
+        assert io_loop.run(connection.start(options), timeout=5), "❌ SDK failed to connect"
+        for _ in range(10):
+            io_loop.run(connection.send(bytes(9600)), timeout=5)  # 2s of 24kHz PCM16
+        assert wait_for(lambda: len(events) >= 6), f"❌ Expected 4 interims, a final and UtteranceEnd, got {events}"
+        io_loop.run(connection.finish(), timeout=5)
+        assert events[0] == ("hello", False), f"❌ First result should be an interim of the first word, got {events[0]}"
+        assert events[4] == ("hello world how are you", True), f"❌ Final should follow the interims, got {events}"
+        assert events[5][0] == "<utterance end>" and abs(events[5][1] - 2.0) < 1e-6, f"❌ UtteranceEnd should follow the final, got {events[5]}"
+        print("✅ Deepgram interims arrived word by word before the final")
+    finally:
+        io_loop.shutdown()
+        server.stop()
+
+def test_elevenlabs_handler_against_mock():
+    """Test the ElevenLabs handler end to end against the mock server via ELEVENLABS_WS_URL"""
+    print("\n🧪 Testing ElevenLabs handler against mock server...")
+    from elevenlabs_handler import close_elevenlabs_connection, initialize_elevenlabs_connection, send_audio_to_elevenlabs
+    server = MockElevenLabsServer(behavior=MockBehavior(latency_ms=20)).start()
+    socketio = RecordingSocketIO()
+    env = {"ELEVENLABS_API_KEY": "mock-key", "ELEVENLABS_WS_URL": f"{server.url}/v1/speech-to-text/realtime"}
+    try:
+        assert _with_env(env, lambda: initialize_elevenlabs_connection(socketio, "English", "mock_el")), "❌ Connection failed"
+        for _ in range(25):
+            send_audio_to_elevenlabs(bytes(3200), "mock_el")  # 2.5s of 16kHz PCM16 (5 words + unsent remainder)
+        assert wait_for(lambda: "hello world how are you" in socketio.transcripts()), \
+            f"❌ Committed transcript not emitted: {socketio.transcripts()}"
+        assert "hello" in socketio.transcripts(), "❌ Partial transcripts should be emitted word by word"
+        close_elevenlabs_connection("mock_el")
+        print(f"✅ ElevenLabs handler emitted {len(socketio.transcripts())} updates")
+    finally:
+        server.stop()
+
+def test_azure_handler_against_mock():
+    """Test the Azure handler end to end against the mock server via AZURE_OPENAI_WS_URL"""
+    print("\n🧪 Testing Azure OpenAI handler against mock server...")
+    from azure_openai_handler import close_azure_openai_connection, initialize_azure_openai_connection, send_audio_to_azure_openai
+    server = MockAzureRealtimeServer(behavior=MockBehavior(latency_ms=20)).start()
+    socketio = RecordingSocketIO()
+    env = {"AZURE_OPENAI_API_KEY": "mock-key", "AZURE_OPENAI_WS_URL": f"{server.url}/openai/realtime"}
+    try:
+        assert _with_env(env, lambda: initialize_azure_openai_connection(socketio, "Auto", "mock_az")), "❌ Connection failed"
+        for _ in range(25):
+            send_audio_to_azure_openai(bytes(4800), "mock_az")  # 2.5s of 24kHz PCM16 (5 words + unsent remainder)
+        assert wait_for(lambda: "hello world how are you" in socketio.transcripts()), \
+            f"❌ Completed transcript not emitted: {socketio.transcripts()}"
+        close_azure_openai_connection("mock_az")
+        print(f"✅ Azure handler emitted {socketio.transcripts()[-1]!r}")
+    finally:
+        server.stop()
+
+def test_fault_injection():
+    """Test that error and disconnect injection reach the client"""
+    print("\n🧪 Testing fault injection...")
+    server = MockElevenLabsServer(behavior=MockBehavior(latency_ms=0, error_rate=1.0)).start()
+    try:
+        with connect(server.url) as ws:
+            assert json.loads(ws.recv(timeout=2))["message_type"] == "session_started", "❌ Expected session_started"
+            ws.send(json.dumps({"message_type": "input_audio_chunk", "audio_base_64": "", "sample_rate": 16000}))
+            assert json.loads(ws.recv(timeout=2))["message_type"] == "transcriber_error", "❌ Expected injected error"
+    finally:
+        server.stop()
+
+    server = MockAzureRealtimeServer(behavior=MockBehavior(disconnect_rate=1.0)).start()
+    try:
+        with connect(server.url) as ws:
+            ws.send(json.dumps({"type": "transcription_session.update", "session": {}}))
+            try:
+                ws.recv(timeout=2)
+                assert False, "❌ Connection should have been dropped"
+            except Exception as e:
+                assert getattr(getattr(e, "rcvd", None), "code", None) == 1011, f"❌ Expected close 1011, got {e!r}"
+    finally:
+        server.stop()
+    print("✅ Errors and disconnects injected")
+
+if __name__ == "__main__":
+    try:
+        test_deepgram_sdk_against_mock()
+        test_deepgram_interim_results_against_mock()
+        test_elevenlabs_handler_against_mock()
+        test_azure_handler_against_mock()
+        test_fault_injection()
+        print("\n🎊 ALL TESTS PASSED! Mock STT servers are working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the offline performance log analyzer
+"""
+import sys
+import os
+import json
+import tempfile
+from metrics_events import MetricEvent, SESSION_END, SESSION_START, TRANSCRIPTION
+from perf_log_analyzer import analyze, find_offset, line_timestamp, parse_time_arg
+
+SAMPLE_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "voicesearch_performance.log.sample")
+
+def _rows(report):
+    return {(row["provider"], row["language"]): row for row in report.rows()}
+
+def test_sample_log():
+    """Test the report for the shipped sample log (older format without session IDs)"""
+    print("🧪 Testing analyzer on voicesearch_performance.log.sample...")
+    rows = _rows(analyze(SAMPLE_LOG))
+    deepgram = rows[("Deepgram", "*")]
+    assert deepgram["sessions"] == 7 and deepgram["transcripts"] == 19, f"❌ Unexpected totals: {deepgram}"
+    assert deepgram["silence_timeouts"] == 2, f"❌ Expected 2 silence timeouts: {deepgram}"
+    assert rows[("Deepgram", "Spanish")]["ttft_p50_ms"] == 3865.1, f"❌ Unexpected Spanish TTFT: {rows[('Deepgram', 'Spanish')]}"
+    assert set(rows) == {("Deepgram", "*"), ("Deepgram", "English"), ("Deepgram", "Hindi"), ("Deepgram", "Spanish")}, \
+        f"❌ Unexpected groups: {sorted(rows)}"
+    print("✅ 7 sessions, 19 transcripts, 2 silence timeouts")
+
+def test_interleaved_sessions():
+    """Test that interleaved sessions from different providers are kept apart"""
+    print("\n🧪 Testing interleaved multi-provider sessions...")
+    lines = [
+        '2026-02-01 10:00:00,000 - voicesearch_app.py:389 - SESSION_START | Session: a | Language: English | Model: nova-3 | Timestamp: 1',
+        '2026-02-01 10:00:00,100 - elevenlabs_handler.py:362 - SESSION_START | Session: b | Language: Auto | Model: ElevenLabs Scribe V2 | Timestamp: 1',
+        '2026-02-01 10:00:01,000 - voicesearch_app.py:430 - TRANSCRIPTION | Session: a | Count: 1 | ResponseTime: 300.00ms | TimeSinceStart: 1000.00ms | TimeSinceLast: 0.00ms | Text: "a | b"',
+        '2026-02-01 10:00:01,500 - elevenlabs_handler.py:422 - TRANSCRIPTION | Session: b | Count: 1 | ResponseTime: 200.00ms | TimeSinceStart: 1400.00ms | TimeSinceLast: 0.00ms | Text: "hi"',
+        '2026-02-01 10:00:02,000 - voicesearch_app.py:762 - RECONNECT_REQUEST | Session: a | Provider: Deepgram API',
+        '2026-02-01 10:00:03,000 - elevenlabs_handler.py:129 - SILENCE_TIMEOUT | Session: b | Timeout: 4000ms',
+        '2026-02-01 10:00:03,001 - elevenlabs_handler.py:168 - SESSION_END | Session: b | TotalDuration: 2900.00ms | TotalTranscriptions: 1 | Reason: SilenceTimeout',
+        '2026-02-01 10:00:04,000 - voicesearch_app.py:449 - SESSION_END | Session: a | TotalDuration: 4000.00ms | TotalTranscriptions: 1',
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "perf.log")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        rows = _rows(analyze(path))
+
+    deepgram, elevenlabs = rows[("Deepgram", "English")], rows[("ElevenLabs", "Auto")]
+    assert deepgram["ttft_p50_ms"] == 1000 and deepgram["reconnects"] == 1, f"❌ Unexpected Deepgram row: {deepgram}"
+    assert elevenlabs["ttft_p50_ms"] == 1400 and elevenlabs["silence_timeout_rate"] == 1.0, f"❌ Unexpected ElevenLabs row: {elevenlabs}"
+    assert deepgram["silence_timeouts"] == 0, "❌ Silence timeout attributed to the wrong session"
+    print("✅ Sessions reconstructed per provider")
+
+def test_since_until_binary_search():
+    """Test that --since/--until select the same events as a linear scan, from JSON Lines too"""
+    print("\n🧪 Testing --since/--until on a JSON Lines log...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "perf.jsonl")
+        with open(path, "w") as f:
+            for i in range(500):
+                t = 1800000000.0 + i * 10
+                events = [
+                    MetricEvent(SESSION_START, f"s{i}", provider="Azure OpenAI", language="Auto", timestamp=t),
+                    MetricEvent(TRANSCRIPTION, f"s{i}", provider="Azure OpenAI", language="Auto", count=1,
+                                response_time_ms=100 + i, time_since_start_ms=900, timestamp=t + 1),
+                    MetricEvent(SESSION_END, f"s{i}", provider="Azure OpenAI", duration_ms=2000, count=1, timestamp=t + 2),
+                ]
+                for event in events:
+                    f.write(json.dumps(event.to_dict()) + "\n")
+
+        with open(path, "rb") as f:
+            offset = find_offset(f, 1800000000.0 + 2500)
+            f.seek(offset)
+            assert line_timestamp(f.readline().decode()) == 1800000000.0 + 2500, "❌ Binary search landed on the wrong line"
+
+        rows = _rows(analyze(path, since=1800000000.0 + 1000, until=1800000000.0 + 1992))
+    azure = rows[("Azure OpenAI", "*")]
+    assert azure["sessions"] == 100 and azure["transcripts"] == 100, f"❌ Expected sessions 100-199 only: {azure}"
+    assert parse_time_arg("2026-01-05 16:55") == parse_time_arg("2026-01-05T16:55:00"), "❌ Time argument formats disagree"
+    print("✅ Range filter matches 100 of 500 sessions")
+
+if __name__ == "__main__":
+    try:
+        test_sample_log()
+        test_interleaved_sessions()
+        test_since_until_binary_search()
+        print("\n🎊 ALL TESTS PASSED! Performance log analyzer is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared asynchronous performance log sink
+"""
+import sys
+import os
+import logging
+import tempfile
+import threading
+from performance_log import PerformanceLogSink
+
+def _logger_for(sink, name):
+    test_logger = logging.getLogger(name)
+    test_logger.setLevel(logging.INFO)
+    test_logger.handlers = [sink.handler]
+    test_logger.propagate = False
+    return test_logger
+
+def test_concurrent_loggers_share_one_writer():
+    """Test that records from several loggers and threads land as whole lines in one file"""
+    print("🧪 Testing concurrent performance loggers...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "perf.log")
+        sink = PerformanceLogSink(path, queue_size=10000, batch_size=16, flush_interval_ms=20)
+        sink.start()
+        loggers = [_logger_for(sink, f"test_perf_{i}") for i in range(3)]
+
+        def worker(n):
+            for i in range(200):
+                loggers[n % 3].info(f"TRANSCRIPTION | Session: worker-{n} | Seq: {i} | " + "x" * 200)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sink.stop()
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 1200, f"❌ Expected 1200 lines, got {len(lines)}"
+        assert all(line.endswith("x" * 200) and "TRANSCRIPTION | Session: worker-" in line for line in lines), \
+            "❌ Every line should be one whole record"
+        assert "test_performance_log.py:" in lines[0], f"❌ Caller's file:line should be kept, got {lines[0][:80]}"
+        assert sink.stats()["dropped"] == 0, "❌ Nothing should be dropped"
+    print("✅ 1200 records from 6 threads written as intact lines")
+
+def test_full_queue_drops_and_reports():
+    """Test that a full queue drops records without blocking and the drop count is logged"""
+    print("\n🧪 Testing bounded queue drop counter...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "perf.log")
+        sink = PerformanceLogSink(path, queue_size=3, batch_size=64, flush_interval_ms=20)
+        test_logger = _logger_for(sink, "test_perf_drop")
+        # Writer not started yet, so only the first 3 records fit
+        for i in range(10):
+            test_logger.info(f"SESSION_START | Seq: {i}")
+        assert sink.stats()["dropped"] == 7, f"❌ Expected 7 dropped, got {sink.stats()['dropped']}"
+
+        sink.start()
+        sink.stop()
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 4, f"❌ Expected 3 records + 1 drop report, got {lines}"
+        assert "PERF_LOG_DROPPED | Dropped: 7" in lines[-1], f"❌ Drop report missing, got {lines[-1]}"
+    print("✅ Overflow counted and reported in the log")
+
+if __name__ == "__main__":
+    try:
+        test_concurrent_loggers_share_one_writer()
+        test_full_queue_drops_and_reports()
+        print("\n🎊 ALL TESTS PASSED! Performance log sink is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script to verify provider WebSockets hosted on the shared I/O loop
+"""
+import asyncio
+import sys
+import threading
+from websockets.asyncio.server import serve
+from provider_io_loop import AsyncWebSocketConnection, ProviderIOLoop
+
+def _start_echo_server(io_loop):
+    """Local echo server on its own loop - returns its ws:// URL"""
+    async def echo(ws):
+        async for message in ws:
+            await ws.send(message)
+
+    async def start():
+        return await serve(echo, "127.0.0.1", 0)
+
+    server = io_loop.run(start(), timeout=5)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"ws://127.0.0.1:{port}"
+
+def test_connections_share_one_loop_thread():
+    """Test that several connections are served without a thread per connection and keep message order"""
+    print("🧪 Testing shared I/O loop connections...")
+    server_loop = ProviderIOLoop(name="test-echo-server")
+    server_loop.start()
+    client_loop = ProviderIOLoop(name="test-provider-io")
+    client_loop.start()
+    server, url = _start_echo_server(server_loop)
+    try:
+        threads_before = threading.active_count()
+        received = {i: [] for i in range(5)}
+        callback_threads = set()
+        opened = []
+        closed = []
+        all_open = threading.Event()
+        done = threading.Event()
+
+        def on_open(conn):
+            opened.append(conn.index)
+            if len(opened) == 5:
+                all_open.set()
+
+        def on_message(conn, message):
+            callback_threads.add(threading.current_thread().name)
+            received[conn.index].append(message)
+            if all(len(messages) == 50 for messages in received.values()):
+                done.set()
+
+        connections = []
+        for i in range(5):
+            conn = AsyncWebSocketConnection(
+                url,
+                on_open=on_open,
+                on_message=on_message,
+                on_close=lambda conn, code, reason: closed.append(code),
+                name=f"test:{i}",
+                io_loop=client_loop
+            )
+            conn.index = i
+            connections.append(conn)
+            conn.start()
+        assert all_open.wait(5), "❌ All connections should open"
+
+        assert threading.active_count() <= threads_before + 1, "❌ Connections should not start threads of their own"
+
+        # Send from this (non-loop) thread - send() only queues
+        for n in range(50):
+            for conn in connections:
+                conn.send(f"{conn.index}:{n}")
+        assert done.wait(5), "❌ All echoes should arrive"
+
+        for i, messages in received.items():
+            assert messages == [f"{i}:{n}" for n in range(50)], f"❌ Messages out of order for connection {i}"
+        assert callback_threads == {"test-provider-io"}, f"❌ Callbacks should run on the loop thread, got {callback_threads}"
+
+        for conn in connections:
+            conn.close()
+        client_loop.run(_wait_until(lambda: len(closed) == 5), timeout=5)
+        assert not any(conn.connected for conn in connections), "❌ Connections should report closed"
+        assert closed == [1000] * 5, f"❌ Expected normal close codes, got {closed}"
+        print(f"✅ 5 connections, 250 ordered messages, callbacks on one loop thread")
+    finally:
+        server_loop.run(_close_server(server), timeout=5)
+        client_loop.shutdown()
+        server_loop.shutdown()
+
+async def _wait_until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.01)
+
+async def _close_server(server):
+    server.close()
+    await server.wait_closed()
+
+def test_send_after_close_raises():
+    """Test that sending on a closed connection fails fast instead of queueing"""
+    print("\n🧪 Testing send after close...")
+    conn = AsyncWebSocketConnection("ws://127.0.0.1:9", name="test:unconnected", io_loop=ProviderIOLoop())
+    try:
+        conn.send("hello")
+        assert False, "❌ send() before connecting should raise"
+    except ConnectionError as e:
+        assert "not connected" in str(e), f"❌ Unexpected error: {e}"
+    print("✅ send() raises ConnectionError when not connected")
+
+if __name__ == "__main__":
+    try:
+        test_connections_share_one_loop_thread()
+        test_send_after_close_raises()
+        print("\n🎊 ALL TESTS PASSED! Provider I/O loop is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared timer wheel used for silence and keep-alive timers
+"""
+import sys
+import threading
+import time
+from timer_wheel import TimerWheel
+
+def _make_wheel():
+    wheel = TimerWheel(tick_ms=5, max_workers=2, name="test-wheel")
+    wheel.start()
+    return wheel
+
+def test_timer_fires_after_deadline():
+    """Test that timers fire once, never before their deadline"""
+    print("🧪 Testing timer firing...")
+    wheel = _make_wheel()
+    fired = threading.Event()
+    fired_at = []
+    start = time.monotonic()
+
+    wheel.schedule(0.05, lambda: (fired_at.append(time.monotonic()), fired.set()))
+
+    assert fired.wait(1.0), "❌ Timer should have fired"
+    elapsed = fired_at[0] - start
+    assert elapsed >= 0.05, f"❌ Timer fired early after {elapsed * 1000:.1f}ms"
+    stats = wheel.stats()
+    assert stats["pending"] == 0, "❌ No timers should be pending after firing"
+    assert stats["fired"] == 1, "❌ Exactly one timer should have fired"
+
+    wheel.shutdown()
+    print(f"✅ Timer fired after {elapsed * 1000:.1f}ms (late by {stats['late_max_ms']:.1f}ms)")
+
+def test_reset_postpones_and_cancel_prevents():
+    """Test that reset() re-arms the same handle and cancel() stops it"""
+    print("\n🧪 Testing timer reset and cancel...")
+    wheel = _make_wheel()
+    calls = []
+
+    timer = wheel.schedule(0.1, lambda: calls.append("reset"))
+    for _ in range(4):
+        time.sleep(0.04)
+        timer.reset(0.1)
+    assert calls == [], "❌ Reset timer should not have fired yet"
+    assert wheel.stats()["pending"] == 1, "❌ Re-arming should not add timers"
+
+    cancelled = wheel.schedule(0.05, lambda: calls.append("cancelled"))
+    cancelled.cancel()
+
+    time.sleep(0.25)
+    assert calls == ["reset"], f"❌ Expected only the reset timer to fire, got {calls}"
+
+    wheel.shutdown()
+    print("✅ Reset postpones the deadline and cancel prevents firing")
+
+def test_many_timers_across_levels():
+    """Test that deadlines beyond the first wheel level cascade down and fire"""
+    print("\n🧪 Testing cascading timers...")
+    wheel = TimerWheel(tick_ms=1, max_workers=2, name="test-wheel")
+    wheel.start()
+    results = []
+    lock = threading.Lock()
+
+    # 1ms ticks: level 0 covers 256ms, so these exercise the level 1 cascade
+    for i in range(200):
+        delay = 0.01 + (i % 20) * 0.03
+        start = time.monotonic()
+        def callback(start=start, delay=delay):
+            with lock:
+                results.append(time.monotonic() - start - delay)
+        wheel.schedule(delay, callback)
+
+    time.sleep(1.0)
+    assert len(results) == 200, f"❌ Expected 200 timers to fire, got {len(results)}"
+    assert min(results) >= 0, "❌ No timer should fire before its deadline"
+
+    wheel.shutdown()
+    print(f"✅ All 200 timers fired (max lateness {max(results) * 1000:.1f}ms)")
+
+if __name__ == "__main__":
+    try:
+        test_timer_fires_after_deadline()
+        test_reset_postpones_and_cancel_prevents()
+        test_many_timers_across_levels()
+        print("\n🎊 ALL TESTS PASSED! Timer wheel is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
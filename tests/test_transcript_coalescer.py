@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the coalescing transcription_update emitter
+"""
+import sys
+import time
+from conftest import EmitRecorder
+from timer_wheel import TimerWheel
+from transcript_coalescer import CoalescingEmitter
+
+def _update(text, final=False, api="Azure OpenAI"):
+    return {'transcription': text, 'api': api, 'final': final}
+
+def _emitter(min_interval_ms=40):
+    wheel = TimerWheel(tick_ms=5, max_workers=1, name="test-coalesce")
+    wheel.start()
+    recorder = EmitRecorder()
+    return CoalescingEmitter(recorder, min_interval_ms, wheel=wheel), recorder, wheel
+
+def _texts(recorder):
+    return [data['transcription'] for event, data, _ in recorder.emitted if event == 'transcription_update']
+
+def test_superseded_partials_are_dropped():
+    """Test that a burst of partials sends the first now and only the latest after the interval"""
+    print("🧪 Testing partial coalescing...")
+    emitter, recorder, wheel = _emitter()
+    try:
+        for text in ("a", "a b", "a b c", "a b c d"):
+            emitter.emit('transcription_update', _update(text), room="sid1")
+        assert _texts(recorder) == ["a"], f"❌ Only the first partial should go out at once, got {_texts(recorder)}"
+        time.sleep(0.15)
+        assert _texts(recorder) == ["a", "a b c d"], f"❌ Held partial should be the latest, got {_texts(recorder)}"
+        stats = emitter.snapshot()
+        assert stats == [{"provider": "Azure OpenAI", "emitted": 2, "coalesced": 2}], f"❌ Wrong counts {stats}"
+        assert recorder.emitted[1][2] == {'room': "sid1"}, "❌ Held partial should keep its room"
+    finally:
+        wheel.shutdown()
+    print("✅ Superseded partials dropped")
+
+def test_final_is_immediate():
+    """Test that a final is sent at once and replaces a held partial"""
+    print("\n🧪 Testing final flush...")
+    emitter, recorder, wheel = _emitter(min_interval_ms=200)
+    try:
+        emitter.emit('transcription_update', _update("hello"), room="sid1")
+        emitter.emit('transcription_update', _update("hello wor"), room="sid1")
+        emitter.emit('transcription_update', _update("Hello world.", final=True), room="sid1")
+        assert _texts(recorder) == ["hello", "Hello world."], f"❌ Final should be sent at once, got {_texts(recorder)}"
+        time.sleep(0.3)
+        assert _texts(recorder) == ["hello", "Hello world."], "❌ The superseded partial should never be sent"
+        # Streams are independent per provider and per session
+        emitter.emit('transcription_update', _update("hi", api="ElevenLabs ScribeV2"), room="sid1")
+        emitter.emit('transcription_update', _update("hey"), room="sid2")
+        assert _texts(recorder)[-2:] == ["hi", "hey"], "❌ Other providers/sessions should not be held"
+    finally:
+        wheel.shutdown()
+    print("✅ Finals are never delayed")
+
+def test_passthrough_and_disable():
+    """Test that other events pass through and interval 0 disables coalescing"""
+    print("\n🧪 Testing pass-through...")
+    emitter, recorder, wheel = _emitter(min_interval_ms=0)
+    try:
+        emitter.emit('transcription_status', {'status': 'started'}, room="sid1")
+        for text in ("a", "a b", "a b c"):
+            emitter.emit('transcription_update', _update(text), room="sid1")
+        assert [event for event, _, _ in recorder.emitted] == ['transcription_status'] + ['transcription_update'] * 3, \
+            "❌ Everything should be sent at once"
+        assert 'stt_transcript_updates_total{provider="Azure OpenAI",outcome="emitted"} 3' in emitter.prometheus_text(), \
+            "❌ Emits should be counted"
+    finally:
+        wheel.shutdown()
+    print("✅ Pass-through works")
+
+def test_remove_drops_held_partial():
+    """Test that a disconnected session's held partial is not sent"""
+    print("\n🧪 Testing session removal...")
+    emitter, recorder, wheel = _emitter(min_interval_ms=50)
+    try:
+        emitter.emit('transcription_update', _update("a"), room="sid1")
+        emitter.emit('transcription_update', _update("a b"), room="sid1")
+        emitter.remove("sid1")
+        time.sleep(0.15)
+        assert _texts(recorder) == ["a"], f"❌ Held partial should be dropped, got {_texts(recorder)}"
+    finally:
+        wheel.shutdown()
+    print("✅ Held partial dropped on disconnect")
+
+if __name__ == "__main__":
+    try:
+        test_superseded_partials_are_dropped()
+        test_final_is_immediate()
+        test_passthrough_and_disable()
+        test_remove_drops_held_partial()
+        print("\n🎊 ALL TESTS PASSED! Coalescing emitter is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the delta-based transcript wire protocol
+"""
+import sys
+from conftest import EmitRecorder
+from transcript_protocol import (
+    PROTOCOL_DELTA, PROTOCOL_LEGACY, TranscriptDeltaDecoder, TranscriptDeltaEncoder, TranscriptSocketIO,
+    negotiate_protocol, payload_size,
+)
+from transcript_segments import TranscriptSegments
+
+def test_negotiation():
+    """Test protocol negotiation from the connect auth payload"""
+    print("🧪 Testing protocol negotiation...")
+    assert negotiate_protocol(None) == PROTOCOL_LEGACY, "❌ No auth should mean legacy"
+    assert negotiate_protocol({"transcript_protocol": 2}) == PROTOCOL_DELTA, "❌ Client asked for deltas"
+    assert negotiate_protocol({"transcript_protocol": "9"}) == PROTOCOL_DELTA, "❌ Should cap at the supported version"
+    assert negotiate_protocol({"transcript_protocol": "x"}) == PROTOCOL_LEGACY, "❌ Malformed version should mean legacy"
+    assert negotiate_protocol("token") == PROTOCOL_LEGACY, "❌ Non-dict auth should mean legacy"
+    print("✅ Negotiation works")
+
+def test_encoder_ops():
+    """Test append / replace / commit deltas for segment and running-text payloads"""
+    print("\n🧪 Testing delta encoding...")
+    encoder = TranscriptDeltaEncoder()
+    store = TranscriptSegments()
+    deltas = []
+    for piece, final in (("Hello", False), (" world", False), ("Hello world.", True), (" How", False)):
+        if final:
+            segment_id = store.commit(piece)
+            segment = piece
+        else:
+            segment_id = store.append_partial(piece)
+            segment = store.partial
+        deltas.append(encoder.encode(store.update_payload(segment_id, segment, "Azure OpenAI", final)))
+    assert [d['op'] for d in deltas] == ["replace", "append", "commit", "replace"], f"❌ Wrong ops {deltas}"
+    assert deltas[1]['text'] == " world", "❌ Append should carry only the new text"
+    assert [d['segment_id'] for d in deltas] == [0, 0, 0, 1], "❌ Wrong segment ids"
+    assert [d['seq'] for d in deltas] == [1, 2, 3, 4], "❌ seq should count every delta"
+
+    # Deepgram sends one result per event, without segment fields
+    dg = encoder.encode({'transcription': "hi there", 'api': "Deepgram API", 'final': False})
+    dg_final = encoder.encode({'transcription': "Hi there.", 'api': "Deepgram API", 'final': True})
+    assert (dg['segment_id'], dg['op']) == (0, "replace"), f"❌ Unexpected delta {dg}"
+    assert (dg_final['segment_id'], dg_final['op'], dg_final['seq']) == (0, "commit", 6), f"❌ Unexpected delta {dg_final}"
+    print("✅ Deltas encoded")
+
+def test_decoder_roundtrip_and_resync():
+    """Test that a client rebuilds the transcript and recovers from a gap with a snapshot"""
+    print("\n🧪 Testing decoding, gap detection and resync...")
+    encoder = TranscriptDeltaEncoder()
+    decoder = TranscriptDeltaDecoder()
+    updates = [("one", False), ("one two", False), ("One two.", True), ("three", False), ("three four", False)]
+    deltas = [encoder.encode({'transcription': f"x {text}", 'segment': text, 'api': "ElevenLabs ScribeV2", 'final': final})
+              for text, final in updates]
+    for delta in deltas[:3]:
+        assert decoder.apply(delta), "❌ In-order delta should apply"
+    assert decoder.text("ElevenLabs ScribeV2") == "One two.", "❌ Wrong text after commit"
+    assert not decoder.apply(deltas[4]), "❌ Gap should be detected"
+    decoder.load_snapshot(encoder.snapshot())
+    assert decoder.text("ElevenLabs ScribeV2") == "One two. three four", "❌ Snapshot should restore the transcript"
+    assert decoder.apply(deltas[3]), "❌ Deltas covered by the snapshot should be ignored"
+    assert decoder.text("ElevenLabs ScribeV2") == "One two. three four", "❌ Old delta should not change the text"
+    print("✅ Decoder rebuilt the transcript")
+
+def test_socketio_wrapper_routes_by_protocol():
+    """Test that only protocol 2 rooms get deltas and legacy rooms keep full-text updates"""
+    print("\n🧪 Testing per-session protocol routing...")
+    recorder = EmitRecorder()
+    wrapper = TranscriptSocketIO(recorder)
+    wrapper.set_protocol("new", PROTOCOL_DELTA)
+    wrapper.set_protocol("old", PROTOCOL_LEGACY)
+    payload = {'transcription': "a long running transcript", 'api': "Azure OpenAI", 'final': False,
+               'segment_id': 3, 'segment': "transcript"}
+    wrapper.emit('transcription_update', payload, room="old")
+    wrapper.emit('transcription_update', payload, room="new")
+    wrapper.emit('transcription_status', {'status': 'started'}, room="new")
+    events = [(event, kwargs['room']) for event, _, kwargs in recorder.emitted]
+    assert events == [('transcription_update', "old"), ('transcription_delta', "new"), ('transcription_status', "new")], \
+        f"❌ Unexpected events {events}"
+    delta = recorder.emitted[1][1]
+    assert payload_size(delta) < payload_size(payload), "❌ Delta should be smaller than the full update"
+
+    wrapper.resync("new")
+    event, snapshot, kwargs = recorder.emitted[-1]
+    assert event == 'transcription_snapshot' and kwargs['room'] == "new", "❌ Resync should send a snapshot"
+    assert snapshot == {'seq': 1, 'transcripts': {"Azure OpenAI": {'segments': [], 'partial': "transcript"}}}, \
+        f"❌ Unexpected snapshot {snapshot}"
+    wrapper.remove("new")
+    assert wrapper.protocol("new") == PROTOCOL_LEGACY, "❌ Removed session should fall back to legacy"
+    print("✅ Deltas sent only to sessions that negotiated them")
+
+if __name__ == "__main__":
+    try:
+        test_negotiation()
+        test_encoder_ops()
+        test_decoder_roundtrip_and_resync()
+        test_socketio_wrapper_routes_by_protocol()
+        print("\n🎊 ALL TESTS PASSED! Transcript protocol is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the transcript segment store
+"""
+import sys
+from transcript_segments import TranscriptSegments
+
+def test_partials_and_commits():
+    """Test that partials replace the tail and commits append segments"""
+    print("🧪 Testing partials and commits...")
+    transcript = TranscriptSegments()
+    assert transcript.text == "", "❌ New transcript should be empty"
+
+    assert transcript.set_partial(" hello ") == 0, "❌ First partial should be segment 0"
+    assert transcript.text == "hello", f"❌ Unexpected text '{transcript.text}'"
+    transcript.set_partial("hello wor")
+    assert transcript.text == "hello wor", "❌ Partial should replace the tail"
+    assert transcript.commit("Hello world. ") == 0, "❌ Commit should take the partial's id"
+    assert transcript.partial == "", "❌ Commit should clear the partial"
+
+    assert transcript.append_partial(" How") == 1, "❌ Next partial should be segment 1"
+    transcript.append_partial(" are")
+    assert transcript.text == "Hello world. How are", f"❌ Unexpected text '{transcript.text}'"
+    assert transcript.commit("How are you?") == 1, "❌ Second commit should be segment 1"
+    assert transcript.text == "Hello world. How are you?", f"❌ Unexpected text '{transcript.text}'"
+    assert transcript.segments == ["Hello world.", "How are you?"], "❌ Segments should be stored stripped"
+    print("✅ Segments tracked correctly")
+
+def test_committed_text_cached_until_commit():
+    """Test that the joined committed text is only rebuilt after a commit"""
+    print("\n🧪 Testing committed text cache...")
+    transcript = TranscriptSegments()
+    for i in range(100):
+        transcript.commit(f"segment {i}")
+    committed = transcript.committed_text
+    for i in range(10):
+        transcript.set_partial(f"partial {i}")
+        assert transcript.committed_text is committed, "❌ Partials should not rebuild the committed text"
+    assert transcript.text.endswith("segment 99 partial 9"), "❌ Text should end with the partial"
+    transcript.commit("segment 100")
+    assert transcript.committed_text is not committed, "❌ Commit should invalidate the cache"
+    assert transcript.committed_text.endswith("segment 99 segment 100"), "❌ Cache should include the new segment"
+    print("✅ Cache invalidated only on commit")
+
+def test_empty_commit_and_clear():
+    """Test empty commits, dropping the partial and clearing"""
+    print("\n🧪 Testing empty commit and clear...")
+    transcript = TranscriptSegments()
+    transcript.commit("one")
+    transcript.set_partial("two")
+    assert transcript.commit("   ") == 1, "❌ Empty commit should return the next id"
+    assert transcript.segments == ["one"] and transcript.partial == "", "❌ Empty commit should only drop the partial"
+    transcript.set_partial("three")
+    transcript.clear_partial()
+    assert transcript.text == "one", "❌ clear_partial should keep committed segments"
+    transcript.clear()
+    assert transcript.text == "" and transcript.partial_id == 0, "❌ clear should forget everything"
+    print("✅ Empty commit and clear handled")
+
+def test_update_payload():
+    """Test the transcription_update payload for a segment change"""
+    print("\n🧪 Testing update payload...")
+    transcript = TranscriptSegments()
+    transcript.commit("first")
+    segment_id = transcript.set_partial("second")
+    payload = transcript.update_payload(segment_id, transcript.partial, "ElevenLabs ScribeV2", False)
+    assert payload == {
+        'transcription': "first second",
+        'api': "ElevenLabs ScribeV2",
+        'final': False,
+        'segment_id': 1,
+        'segment': "second",
+    }, f"❌ Unexpected payload {payload}"
+    print("✅ Payload carries the full text and the changed segment")
+
+if __name__ == "__main__":
+    try:
+        test_partials_and_commits()
+        test_committed_text_cached_until_commit()
+        test_empty_commit_and_clear()
+        test_update_payload()
+        print("\n🎊 ALL TESTS PASSED! Transcript segment store is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
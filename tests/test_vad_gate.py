@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the server-side VAD gate
+"""
+import sys
+import numpy as np
+from vad_gate import VadGate, VadSavings, frame_features
+
+RATE = 24000
+FRAME = 1024  # samples, like audio-processor.js
+
+def _frames(signal):
+    pcm = np.clip(signal, -32768, 32767).astype('<i2').tobytes()
+    return [pcm[i:i + FRAME * 2] for i in range(0, len(pcm) - FRAME * 2 + 1, FRAME * 2)]
+
+def _noise(seconds, level, seed=0):
+    return np.random.default_rng(seed).normal(0, level, int(seconds * RATE))
+
+def _voice(seconds, level=6000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return level * (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t))
+
+def test_frame_features():
+    """Test level and zero-crossing rate of known signals"""
+    print("🧪 Testing frame features...")
+    tone = 16384 * np.sin(2 * np.pi * 200 * np.arange(FRAME) / RATE)
+    level, zcr = frame_features(_frames(tone)[0])
+    assert -9.5 < level < -8.5, f"❌ Unexpected level {level:.1f} dBFS"
+    assert zcr < 0.05, f"❌ Low tone should have a low ZCR, got {zcr:.3f}"
+    level, zcr = frame_features(bytes(2048))
+    assert level == float("-inf") and zcr == 0.0, "❌ Digital silence should have no level"
+    _, zcr = frame_features(_frames(_noise(0.1, 1000))[0])
+    assert zcr > 0.4, f"❌ White noise should have a high ZCR, got {zcr:.3f}"
+    print("✅ Features computed")
+
+def test_gate_forwards_speech_with_padding():
+    """Test that silence is gated and speech is forwarded with pre-roll and hangover"""
+    print("\n🧪 Testing gate with pre-roll and hangover...")
+    gate = VadGate(RATE, preroll_ms=300, hangover_ms=800)
+    silence_before = _frames(_noise(2.0, 30))
+    speech = _frames(_voice(1.0) + _noise(1.0, 30, seed=1))
+    silence_after = _frames(_noise(3.0, 30, seed=2))
+
+    assert all(gate.process(f) == [] for f in silence_before), "❌ Leading silence should be gated"
+    onset = gate.process(speech[0])
+    assert gate.is_open, "❌ Gate should open on speech"
+    preroll_ms = (len(onset) - 1) * FRAME / RATE * 1000
+    assert 300 <= preroll_ms < 300 + FRAME / RATE * 1000, f"❌ Pre-roll of {preroll_ms:.0f}ms"
+    assert onset[:-1] == silence_before[-(len(onset) - 1):], "❌ Pre-roll should be the audio just before the onset"
+    assert onset[-1] == speech[0], "❌ Onset frame should be forwarded"
+    forwarded = [gate.process(f) for f in speech[1:]]
+    assert all(out for out in forwarded), "❌ Speech should be forwarded"
+
+    trailing = [gate.process(f) for f in silence_after]
+    hangover_frames = sum(1 for out in trailing if out)
+    hangover_ms = hangover_frames * FRAME / RATE * 1000
+    assert not gate.is_open, "❌ Gate should close after the hangover"
+    assert 700 <= hangover_ms <= 900, f"❌ Hangover of {hangover_ms:.0f}ms"
+    assert gate.bytes_saved > gate.bytes_forwarded, "❌ Most of the silent stream should be saved"
+    assert gate.bytes_in == gate.bytes_saved + gate.bytes_forwarded, "❌ Byte counts don't add up"
+    print(f"✅ Forwarded {gate.bytes_forwarded} bytes, saved {gate.bytes_saved} bytes")
+
+def test_noise_floor_adapts():
+    """Test that steady background noise doesn't hold the gate open"""
+    print("\n🧪 Testing noise floor adaptation...")
+    gate = VadGate(RATE)
+    background = _frames(_noise(15.0, 400))  # ~ -38 dBFS, above the absolute floor
+    results = [gate.process(f) for f in background]
+    assert not gate.is_open, "❌ Gate should close once it learns the noise floor"
+    assert sum(1 for out in results[-50:] if out) == 0, "❌ Steady noise should be gated"
+    assert -45 < gate.noise_floor_db < -30, f"❌ Noise floor {gate.noise_floor_db:.1f} dBFS"
+    onset = gate.process(_frames(_voice(0.1) + _noise(0.1, 400, seed=3))[0])
+    assert onset, "❌ Speech over the noise floor should open the gate"
+    print(f"✅ Noise floor settled at {gate.noise_floor_db:.1f} dBFS")
+    gate.reset()
+    assert not gate.is_open and gate.bytes_in == 0, "❌ Reset should start a new stream"
+
+def test_savings_counters():
+    """Test per-provider forwarded/saved counters and their Prometheus text"""
+    print("\n🧪 Testing savings counters...")
+    savings = VadSavings()
+    assert savings.prometheus_text() == "", "❌ No output before the gate runs"
+    savings.record("Deepgram API", forwarded=100)
+    savings.record("Deepgram API", saved=300)
+    savings.record("ElevenLabs ScribeV2", saved=200)
+    snapshot = {s["provider"]: s for s in savings.snapshot()}
+    assert snapshot["Deepgram API"] == {"provider": "Deepgram API", "forwarded_bytes": 100, "saved_bytes": 300}, "❌ Wrong totals"
+    text = savings.prometheus_text()
+    assert 'stt_vad_saved_bytes_total{provider="ElevenLabs ScribeV2"} 200' in text, "❌ Missing counter"
+    assert "# TYPE stt_vad_forwarded_bytes_total counter" in text, "❌ Missing TYPE line"
+    print("✅ Counters exported")
+
+if __name__ == "__main__":
+    try:
+        test_frame_features()
+        test_gate_forwards_speech_with_padding()
+        test_noise_floor_adapts()
+        test_savings_counters()
+        print("\n🎊 ALL TESTS PASSED! VAD gate is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the warm provider connection pool: claims, refill, keep-alive and retirement
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from conftest import RecordingSocketIO, wait_for
+from mock_stt import MockAzureRealtimeServer, MockBehavior, MockElevenLabsServer
+from warm_pool import WarmPool
+
+
+class FakeConnection:
+    """Stands in for a provider connection: records keep-alives and close"""
+
+    def __init__(self, key):
+        self.key = key
+        self.keep_alives = 0
+        self.closed = False
+
+
+class FakeProvider:
+    """Opener, closer and keep-alive for a WarmPool, with connections that open instantly or never"""
+
+    def __init__(self, fail=False, hang=False):
+        self.fail = fail
+        self.hang = hang
+        self.opened = []
+        self.on_lost = None
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def open(self, key, on_lost):
+        self.on_lost = on_lost
+        future = Future()
+        if self.fail:
+            future.set_exception(ConnectionError("handshake refused"))
+        elif self.hang:
+            self.pending.append(future)
+        else:
+            connection = FakeConnection(key)
+            with self.lock:
+                self.opened.append(connection)
+            future.set_result(connection)
+        return future
+
+    def close(self, connection):
+        connection.closed = True
+
+    def keep_alive(self, connection):
+        connection.keep_alives += 1
+
+
+def _pool(provider, **kwargs):
+    return WarmPool("Fake", provider.open, provider.close, provider.keep_alive, **kwargs)
+
+
+def _final_apis(socketio, text):
+    """APIs that emitted text as a final transcript"""
+    return {data['api'] for event, data in socketio.emitted
+            if event == 'transcription_update' and data['final'] and data['transcription'] == text}
+
+
+def test_claim_and_refill():
+    """Test that claims hand out ready connections and the pool refills behind them"""
+    print("🧪 Testing claim and refill...")
+    provider = FakeProvider()
+    pool = _pool(provider, size=2, max_idle_sec=60)
+    try:
+        pool.warm("English")
+        assert pool.idle_count("English") == 2, "❌ warm() should open size connections"
+        first = pool.claim("English")
+        assert isinstance(first, FakeConnection) and not first.closed, "❌ Claim should return a ready connection"
+        assert pool.idle_count("English") == 2, "❌ A claim should be refilled"
+        for _ in range(3):
+            assert pool.claim("German") is None, "❌ A key that was never warmed should miss"
+        assert pool.idle_count("German") == 0 and all(c.key == "English" for c in provider.opened), \
+            "❌ A miss must not open connections for a key that was never warmed"
+        stats = pool.stats()
+        assert (stats["hits"], stats["misses"], stats["opened"]) == (1, 3, 3), f"❌ Wrong counters: {stats}"
+        assert WarmPool("Off", provider.open, provider.close, size=0).claim("English") is None, "❌ Size 0 disables the pool"
+    finally:
+        pool.shutdown()
+    assert all(c.closed for c in provider.opened if c is not first), "❌ Shutdown should close idle connections"
+    assert not first.closed, "❌ Shutdown must not close claimed connections"
+    print("✅ Claims hit, misses open nothing, refill keeps warmed keys full")
+
+
+def test_keep_alive_and_retirement():
+    """Test that idle connections get KeepAlives and are retired and replaced"""
+    print("\n🧪 Testing keep-alive and retirement...")
+    provider = FakeProvider()
+    pool = _pool(provider, size=1, max_idle_sec=0.35, keep_alive_sec=0.1)
+    try:
+        pool.warm("English")
+        originals = list(provider.opened)
+        assert wait_for(lambda: all(c.closed for c in originals)), "❌ Idle connections should be retired"
+        assert all(c.keep_alives >= 2 for c in originals), f"❌ Missing KeepAlives: {[c.keep_alives for c in originals]}"
+        assert wait_for(lambda: pool.idle_count("English") == 1), "❌ Warmed key should be replaced after retirement"
+        claimed = pool.claim("English")
+        keep_alives = claimed.keep_alives
+        time.sleep(0.5)
+        assert claimed.keep_alives == keep_alives and not claimed.closed, "❌ A claimed connection is the caller's"
+        assert pool.stats()["retired"] >= 1, f"❌ Retirements not counted: {pool.stats()}"
+    finally:
+        pool.shutdown()
+    print("✅ KeepAlives sent while idle, connections retired and replaced")
+
+
+def test_lost_failed_and_timed_out():
+    """Test that lost connections are replaced and failing opens back off"""
+    print("\n🧪 Testing lost connections, failures and open timeouts...")
+    provider = FakeProvider()
+    pool = _pool(provider, size=1, max_idle_sec=60)
+    try:
+        pool.warm("English")
+        lost = provider.opened[0]
+        provider.on_lost(lost)
+        assert lost.closed and pool.idle_count("English") == 1 and pool.stats()["lost"] == 1, "❌ Lost connection not replaced"
+        claimed = pool.claim("English")
+        provider.on_lost(claimed)  # Its Close event after the session is done with it
+        assert not claimed.closed and pool.stats()["lost"] == 1, "❌ on_lost must ignore claimed connections"
+    finally:
+        pool.shutdown()
+
+    failing = FakeProvider(fail=True)
+    pool = _pool(failing, size=1)
+    try:
+        pool.warm("English")
+        for _ in range(5):
+            assert pool.claim("English") is None, "❌ Nothing to claim when opens fail"
+        assert pool.stats()["failed"] == 1, f"❌ Claims should not retry during backoff: {pool.stats()}"
+    finally:
+        pool.shutdown()
+
+    hanging = FakeProvider(hang=True)
+    pool = _pool(hanging, size=1, open_timeout_sec=0.1)
+    try:
+        pool.warm("English")
+        assert wait_for(lambda: pool.stats()["failed"] == 1), "❌ An open that never finishes should time out"
+        assert hanging.pending[0].cancelled(), "❌ Timed out open should be cancelled"
+        assert pool.stats()["opening"] == 0, "❌ Timed out open still counted as opening"
+    finally:
+        pool.shutdown()
+    print("✅ Lost connections replaced, failures back off, slow opens abandoned")
+
+
+def test_handlers_claim_warm_connections():
+    """Test that the Azure and ElevenLabs handlers start on a warm connection from the mock servers"""
+    print("\n🧪 Testing handlers claiming warm connections...")
+    from azure_openai_handler import azure_warm_pool, close_azure_openai_connection, initialize_azure_openai_connection, send_audio_to_azure_openai
+    from elevenlabs_handler import close_elevenlabs_connection, elevenlabs_warm_pool, initialize_elevenlabs_connection, send_audio_to_elevenlabs
+    azure = MockAzureRealtimeServer(behavior=MockBehavior(latency_ms=20)).start()
+    elevenlabs = MockElevenLabsServer(behavior=MockBehavior(latency_ms=20)).start()
+    env = {
+        "AZURE_OPENAI_API_KEY": "mock-key", "AZURE_OPENAI_WS_URL": f"{azure.url}/openai/realtime",
+        "ELEVENLABS_API_KEY": "mock-key", "ELEVENLABS_WS_URL": f"{elevenlabs.url}/v1/speech-to-text/realtime",
+    }
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    socketio = RecordingSocketIO()
+    try:
+        azure_warm_pool.size = elevenlabs_warm_pool.size = 1
+        azure_warm_pool.warm("")
+        elevenlabs_warm_pool.warm("English")
+        assert wait_for(lambda: azure_warm_pool.idle_count("") == 1 and elevenlabs_warm_pool.idle_count("English") == 1), \
+            "❌ Pools did not fill from the mock servers"
+
+        assert initialize_azure_openai_connection(socketio, "Auto", "warm_az"), "❌ Azure start failed"
+        assert initialize_elevenlabs_connection(socketio, "English", "warm_el"), "❌ ElevenLabs start failed"
+        assert azure_warm_pool.stats()["hits"] == 1 and elevenlabs_warm_pool.stats()["hits"] == 1, "❌ Starts should claim"
+        assert ("transcription_status", {'status': 'started', 'api': 'ElevenLabs ScribeV2'}) in socketio.emitted, \
+            "❌ ElevenLabs 'started' status not emitted for a warm connection"
+        for _ in range(25):
+            send_audio_to_azure_openai(bytes(4800), "warm_az")  # 2.5s of 24kHz PCM16
+            send_audio_to_elevenlabs(bytes(3200), "warm_el")  # 2.5s of 16kHz PCM16
+        assert wait_for(lambda: _final_apis(socketio, "hello world how are you") == {"Azure OpenAI", "ElevenLabs ScribeV2"}), \
+            f"❌ Final transcripts not received on claimed connections: {socketio.transcripts()}"
+        close_azure_openai_connection("warm_az")
+        close_elevenlabs_connection("warm_el")
+    finally:
+        for pool in (azure_warm_pool, elevenlabs_warm_pool):
+            pool.size = 0
+            pool.shutdown()
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        azure.stop()
+        elevenlabs.stop()
+    print("✅ Handlers transcribe on claimed warm connections")
+
+
+if __name__ == "__main__":
+    try:
+        test_claim_and_refill()
+        test_keep_alive_and_retirement()
+        test_lost_failed_and_timed_out()
+        test_handlers_claim_warm_connections()
+        print("\n🎊 ALL TESTS PASSED! Warm connection pool is working correctly.")
+
+    except Exception as e:
+        print(f"\n❌ TEST FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,308 @@
+"""
+Shared Hierarchical Timer Wheel
+Single-threaded deadline scheduler used for silence timeouts and keep-alives across
+all provider handlers, replacing one threading.Timer (and OS thread) per deadline.
+
+Timers live in a hierarchical wheel (256 slots at the base level, 64 slots at each
+higher level). Scheduling, re-arming and cancelling a timer are O(1) set operations
+and never start a thread; expired callbacks run on a small shared worker pool so a
+slow callback cannot delay other deadlines.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Wheel resolution in milliseconds - deadlines fire within one tick of their due time
+TIMER_WHEEL_TICK_MS = int(os.getenv("TIMER_WHEEL_TICK_MS", "10"))
+# Worker threads that run expired callbacks
+TIMER_WHEEL_WORKERS = int(os.getenv("TIMER_WHEEL_WORKERS", "4"))
+# How often the shared wheel logs its pending count and lateness (0 disables)
+TIMER_WHEEL_STATS_INTERVAL_SEC = float(os.getenv("TIMER_WHEEL_STATS_INTERVAL_SEC", "60"))
+
+# Level 0 has 2^8 slots, each higher level 2^6 slots (Linux-style cascading wheel)
+_ROOT_BITS = 8
+_LEVEL_BITS = 6
+_NUM_LEVELS = 4
+_ROOT_SIZE = 1 << _ROOT_BITS
+_LEVEL_SIZE = 1 << _LEVEL_BITS
+_ROOT_MASK = _ROOT_SIZE - 1
+_LEVEL_MASK = _LEVEL_SIZE - 1
+
+
+class WheelTimer:
+    """
+    Handle for a deadline registered with a TimerWheel.
+
+    Mirrors the parts of threading.Timer the handlers use (cancel()), plus reset()
+    to re-arm the same handle without allocating a new one.
+    """
+    __slots__ = ("wheel", "callback", "deadline", "expires_tick", "bucket", "name")
+
+    def __init__(self, wheel: 'TimerWheel', callback: Callable[[], None], name: str = ""):
+        self.wheel = wheel
+        self.callback = callback
+        self.deadline = 0.0
+        self.expires_tick = 0
+        self.bucket: Optional[Set['WheelTimer']] = None
+        self.name = name
+
+    def reset(self, delay_sec: float):
+        """Re-arm the timer to fire delay_sec from now (works whether pending, fired or cancelled)"""
+        self.wheel.rearm(self, delay_sec)
+
+    def cancel(self):
+        """Cancel the timer if it is pending"""
+        self.wheel.cancel(self)
+
+    @property
+    def pending(self) -> bool:
+        return self.bucket is not None
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel driven by a single background thread.
+
+    All bookkeeping happens under one lock; the thread sleeps until the next tick while
+    timers are pending and blocks indefinitely when there are none.
+    """
+
+    def __init__(self, tick_ms: int = TIMER_WHEEL_TICK_MS, max_workers: int = TIMER_WHEEL_WORKERS, name: str = "timer-wheel"):
+        self.tick_sec = tick_ms / 1000.0
+        self.name = name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._levels: List[List[Set[WheelTimer]]] = [[set() for _ in range(_ROOT_SIZE)]] + [
+            [set() for _ in range(_LEVEL_SIZE)] for _ in range(_NUM_LEVELS - 1)
+        ]
+        self._origin = time.monotonic()
+        self._current_tick = 0  # Last tick that has been processed
+        self._sleep_until_tick = 0  # Tick the wheel thread will next wake at (0 while awake)
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Stats
+        self._fired = 0
+        self._late_total_sec = 0.0
+        self._late_max_sec = 0.0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def start(self):
+        """Start the wheel thread (idempotent)"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def schedule(self, delay_sec: float, callback: Callable[[], None], name: str = "") -> WheelTimer:
+        """
+        Register a callback to run once after delay_sec
+
+        Returns:
+            WheelTimer handle that can be reset() or cancel()ed
+        """
+        timer = WheelTimer(self, callback, name)
+        self.rearm(timer, delay_sec)
+        return timer
+
+    def rearm(self, timer: WheelTimer, delay_sec: float):
+        """Move timer to a new deadline delay_sec from now - O(1)"""
+        now = time.monotonic()
+        deadline = now + max(0.0, delay_sec)
+        with self._lock:
+            if timer.bucket is not None:
+                timer.bucket.discard(timer)
+                timer.bucket = None
+                self._pending -= 1
+            if self._pending == 0:
+                # Wheel was idle - move its base to now so the thread doesn't replay idle ticks
+                self._current_tick = max(self._current_tick, int((now - self._origin) / self.tick_sec))
+            timer.deadline = deadline
+            # Round up so a timer never fires before its deadline
+            timer.expires_tick = max(self._current_tick + 1, -int(-(deadline - self._origin) // self.tick_sec))
+            self._insert(timer)
+            self._pending += 1
+            if self._sleep_until_tick and timer.expires_tick < self._sleep_until_tick:
+                self._wakeup.notify()
+
+    def cancel(self, timer: WheelTimer):
+        """Remove timer from the wheel if pending - O(1)"""
+        with self._lock:
+            if timer.bucket is not None:
+                timer.bucket.discard(timer)
+                timer.bucket = None
+                self._pending -= 1
+
+    def stats(self) -> Dict[str, float]:
+        """Pending timer count and firing lateness (how long after its deadline each timer ran)"""
+        with self._lock:
+            fired = self._fired
+            return {
+                "pending": self._pending,
+                "fired": fired,
+                "late_avg_ms": (self._late_total_sec / fired * 1000) if fired else 0.0,
+                "late_max_ms": self._late_max_sec * 1000,
+                "tick_ms": self.tick_sec * 1000,
+            }
+
+    def shutdown(self):
+        """Stop the wheel thread and worker pool; pending timers are dropped"""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Internals (called with self._lock held)
+    # ------------------------------------------------------------------
+    def _insert(self, timer: WheelTimer):
+        expires = timer.expires_tick
+        delta = expires - (self._current_tick + 1)
+        if delta < _ROOT_SIZE:
+            bucket = self._levels[0][expires & _ROOT_MASK]
+        else:
+            level = 1
+            while level < _NUM_LEVELS - 1 and delta >= 1 << (_ROOT_BITS + _LEVEL_BITS * level):
+                level += 1
+            # Deadlines beyond the top level's range land in some top slot and are
+            # simply re-inserted each time that slot cascades until they come in range
+            shift = _ROOT_BITS + _LEVEL_BITS * (level - 1)
+            bucket = self._levels[level][(expires >> shift) & _LEVEL_MASK]
+        bucket.add(timer)
+        timer.bucket = bucket
+
+    def _cascade(self, level: int, index: int):
+        """Redistribute a higher-level slot into lower levels; returns True if it wrapped to 0"""
+        bucket = self._levels[level][index]
+        timers = list(bucket)
+        bucket.clear()
+        for timer in timers:
+            self._insert(timer)
+        return index == 0
+
+    def _advance(self, target_tick: int) -> List[WheelTimer]:
+        """Process ticks up to target_tick and return the timers that expired"""
+        expired: List[WheelTimer] = []
+        if self._pending == 0:
+            # Nothing to do - jump straight to now
+            self._current_tick = max(self._current_tick, target_tick)
+            return expired
+
+        while self._current_tick < target_tick and self._pending > 0:
+            tick = self._current_tick + 1
+            root_index = tick & _ROOT_MASK
+            if root_index == 0:
+                # Level 0 wrapped - pull the next slot of each higher level down
+                level = 1
+                while level < _NUM_LEVELS:
+                    shift = _ROOT_BITS + _LEVEL_BITS * (level - 1)
+                    if not self._cascade(level, (tick >> shift) & _LEVEL_MASK):
+                        break
+                    level += 1
+
+            bucket = self._levels[0][root_index]
+            if bucket:
+                for timer in bucket:
+                    timer.bucket = None
+                expired.extend(bucket)
+                self._pending -= len(bucket)
+                bucket.clear()
+            self._current_tick = tick
+
+        if self._pending == 0:
+            self._current_tick = max(self._current_tick, target_tick)
+        return expired
+
+    def _next_event_tick(self) -> int:
+        """Next tick that has expiring timers or needs a cascade (at most one wheel turn away)"""
+        tick = self._current_tick + 1
+        for _ in range(_ROOT_SIZE):
+            index = tick & _ROOT_MASK
+            if index == 0 or self._levels[0][index]:
+                return tick
+            tick += 1
+        return tick
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._running:
+                    return
+                target_tick = int((time.monotonic() - self._origin) / self.tick_sec)
+                expired = self._advance(target_tick)
+
+                if not expired:
+                    if self._pending == 0:
+                        self._sleep_until_tick = sys.maxsize
+                        self._wakeup.wait()
+                    else:
+                        self._sleep_until_tick = self._next_event_tick()
+                        next_tick_time = self._origin + self._sleep_until_tick * self.tick_sec
+                        self._wakeup.wait(max(0.0, next_tick_time - time.monotonic()))
+                    self._sleep_until_tick = 0
+                    continue
+
+            for timer in expired:
+                try:
+                    self._executor.submit(self._fire, timer, timer.deadline)
+                except RuntimeError:
+                    # Executor shut down during interpreter exit
+                    return
+
+    def _fire(self, timer: WheelTimer, deadline: float):
+        late = time.monotonic() - deadline
+        with self._lock:
+            # Skip if the timer was re-armed or cancelled after it expired
+            if timer.bucket is not None or timer.deadline != deadline:
+                return
+            self._fired += 1
+            if late > 0:
+                self._late_total_sec += late
+                if late > self._late_max_sec:
+                    self._late_max_sec = late
+        try:
+            timer.callback()
+        except Exception as e:
+            logger.error(f"Timer callback {timer.name or timer.callback} raised: {type(e).__name__}: {e}")
+            logger.exception("Full traceback:")
+
+
+# Shared scheduler for the whole process - all provider modules register deadlines here
+_shared_wheel: Optional[TimerWheel] = None
+_shared_wheel_lock = threading.Lock()
+
+
+def _log_stats(timer: WheelTimer):
+    stats = timer.wheel.stats()
+    logger.info(
+        f"⏱️ TIMER_WHEEL | Pending: {stats['pending']} | Fired: {stats['fired']} | "
+        f"LateAvg: {stats['late_avg_ms']:.2f}ms | LateMax: {stats['late_max_ms']:.2f}ms"
+    )
+    timer.reset(TIMER_WHEEL_STATS_INTERVAL_SEC)
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Get the process-wide timer wheel, starting it on first use"""
+    global _shared_wheel
+    with _shared_wheel_lock:
+        if _shared_wheel is None:
+            _shared_wheel = TimerWheel()
+            _shared_wheel.start()
+            if TIMER_WHEEL_STATS_INTERVAL_SEC > 0:
+                stats_timer = WheelTimer(_shared_wheel, lambda: _log_stats(stats_timer), name="stats")
+                stats_timer.reset(TIMER_WHEEL_STATS_INTERVAL_SEC)
+        return _shared_wheel
@@ -0,0 +1,170 @@
+"""
+Coalescing Transcript Emitter
+Rate-limits transcription_update per session and provider.
+
+Azure emits an update for every transcription delta and ElevenLabs for every partial,
+often several within a few milliseconds, and each one costs a Socket.IO emit (JSON
+encoding, room lookup, a write per client). CoalescingEmitter sends at most one partial
+update per TRANSCRIPT_MIN_INTERVAL_MS for each (session, provider):
+  - a partial arriving sooner is held; a newer partial replaces the held one (the
+    superseded one is counted as coalesced and never sent)
+  - the held partial is sent by a timer on the shared timer wheel once the interval
+    has passed since the last send
+  - final / committed updates are always sent immediately, replacing any held partial
+
+Every other event passes straight through. Emitted and coalesced counts per provider
+are served at /metrics, to trade UI smoothness against server load.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from timer_wheel import TimerWheel, WheelTimer, get_timer_wheel
+
+# Minimum time between partial transcription_update emits per session and provider (0 disables)
+TRANSCRIPT_MIN_INTERVAL_MS = float(os.getenv("TRANSCRIPT_MIN_INTERVAL_MS", "40"))
+
+
+class _Stream:
+    """Coalescing state of one provider's updates to one session"""
+    __slots__ = ("last_emit", "pending", "timer")
+
+    def __init__(self):
+        self.last_emit = 0.0
+        self.pending: Optional[Tuple[Any, tuple, dict]] = None
+        self.timer: Optional[WheelTimer] = None
+
+
+class _Room:
+    """Coalescing state of one session - its lock also keeps its emits in order"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.streams: Dict[str, _Stream] = {}
+
+
+class CoalescingEmitter:
+    """
+    SocketIO stand-in that coalesces partial transcription_update events.
+
+    Args:
+        socketio: SocketIO (or wrapper) to send through
+        min_interval_ms: Minimum time between partial updates per session and provider
+        wheel: Timer wheel for delayed sends (the shared one by default)
+    """
+
+    def __init__(self, socketio, min_interval_ms: float = TRANSCRIPT_MIN_INTERVAL_MS,
+                 wheel: Optional[TimerWheel] = None):
+        self.socketio = socketio
+        self.min_interval = min_interval_ms / 1000.0
+        self._wheel = wheel
+        self._rooms: Dict[str, _Room] = {}
+        self._rooms_lock = threading.Lock()
+        self._emitted: Dict[str, int] = {}
+        self._coalesced: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+
+    def emit(self, event: str, data: Any = None, *args, **kwargs):
+        room_id = kwargs.get('room')
+        if (event != 'transcription_update' or not isinstance(data, dict) or room_id is None
+                or self.min_interval <= 0):
+            if event == 'transcription_update' and isinstance(data, dict):
+                self._count(data.get('api', ""), emitted=1)
+            return self.socketio.emit(event, data, *args, **kwargs)
+
+        api = data.get('api', "")
+        room = self._room(room_id)
+        now = time.perf_counter()
+        with room.lock:
+            stream = room.streams.get(api)
+            if stream is None:
+                stream = room.streams[api] = _Stream()
+
+            if data.get('final'):
+                # A final supersedes any held partial and is never delayed
+                if stream.pending is not None:
+                    stream.pending = None
+                    stream.timer.cancel()
+                    self._count(api, coalesced=1)
+                self._send(stream, now, data, args, kwargs)
+                return
+
+            if stream.pending is not None:
+                # A send is already scheduled - it will carry this newer partial instead
+                stream.pending = (data, args, kwargs)
+                self._count(api, coalesced=1)
+                return
+
+            wait = stream.last_emit + self.min_interval - now
+            if wait <= 0:
+                self._send(stream, now, data, args, kwargs)
+                return
+
+            stream.pending = (data, args, kwargs)
+            if stream.timer is None:
+                wheel = self._wheel or get_timer_wheel()
+                stream.timer = wheel.schedule(wait, lambda: self._flush(room, api), name="transcript-coalesce")
+            else:
+                stream.timer.reset(wait)
+
+    def _send(self, stream: _Stream, now: float, data: Any, args: tuple, kwargs: dict):
+        # Called with the room lock held
+        stream.last_emit = now
+        self._count(data.get('api', ""), emitted=1)
+        self.socketio.emit('transcription_update', data, *args, **kwargs)
+
+    def _flush(self, room: _Room, api: str):
+        with room.lock:
+            stream = room.streams.get(api)
+            if stream is None or stream.pending is None:
+                return
+            data, args, kwargs = stream.pending
+            stream.pending = None
+            self._send(stream, time.perf_counter(), data, args, kwargs)
+
+    def _room(self, room_id: str) -> _Room:
+        with self._rooms_lock:
+            room = self._rooms.get(room_id)
+            if room is None:
+                room = self._rooms[room_id] = _Room()
+            return room
+
+    def remove(self, room_id: str):
+        """Forget a disconnected session, dropping any held partials"""
+        with self._rooms_lock:
+            room = self._rooms.pop(room_id, None)
+        if room is None:
+            return
+        with room.lock:
+            for stream in room.streams.values():
+                stream.pending = None
+                if stream.timer is not None:
+                    stream.timer.cancel()
+
+    def _count(self, api: str, emitted: int = 0, coalesced: int = 0):
+        with self._counts_lock:
+            self._emitted[api] = self._emitted.get(api, 0) + emitted
+            self._coalesced[api] = self._coalesced.get(api, 0) + coalesced
+
+    def snapshot(self) -> List[Dict]:
+        """Emitted and coalesced transcription_update counts per provider"""
+        with self._counts_lock:
+            providers = sorted(set(self._emitted) | set(self._coalesced))
+            return [{"provider": p, "emitted": self._emitted.get(p, 0), "coalesced": self._coalesced.get(p, 0)}
+                    for p in providers]
+
+    def prometheus_text(self) -> str:
+        """Counters in Prometheus text exposition format (empty until a transcript is emitted)"""
+        series = self.snapshot()
+        if not series:
+            return ""
+        name = "stt_transcript_updates_total"
+        lines = [
+            f"# HELP {name} transcription_update events per provider, emitted or coalesced away",
+            f"# TYPE {name} counter",
+        ]
+        for item in series:
+            for outcome in ("emitted", "coalesced"):
+                lines.append(f'{name}{{provider="{item["provider"]}",outcome="{outcome}"}} {item[outcome]}')
+        return "\n".join(lines) + "\n"
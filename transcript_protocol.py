@@ -0,0 +1,221 @@
+"""
+Transcript Wire Protocol
+Opt-in delta protocol for transcripts, negotiated when the Socket.IO client connects.
+
+Protocol 1 (default, legacy): every change is a transcription_update carrying the
+full transcript - tens of KB per partial in a long dictation.
+
+Protocol 2: clients connect with auth {"transcript_protocol": 2} and receive
+transcription_delta events instead, one per segment change:
+
+    {"api": "Azure OpenAI", "seq": 42, "segment_id": 3, "op": "append", "text": " world"}
+
+  - replace: the segment's text is now `text`
+  - append: `text` is appended to the segment
+  - commit: the segment is final, with text `text`
+
+Segments are numbered per provider from 0; a new recording (toggle start) starts again
+at 0. `seq` counts every delta sent to the session (across providers) from 1; a client
+that sees a gap emits transcription_resync and gets a transcription_snapshot back:
+
+    {"seq": 57, "transcripts": {"Azure OpenAI": {"segments": [...], "partial": "..."}}}
+
+after which deltas with a higher seq apply on top of it.
+
+TranscriptSocketIO wraps the app's SocketIO: the provider handlers keep emitting
+transcription_update and it is translated for rooms that negotiated protocol 2.
+"""
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from transcript_segments import TranscriptSegments
+
+PROTOCOL_LEGACY = 1
+PROTOCOL_DELTA = 2
+SUPPORTED_PROTOCOL = PROTOCOL_DELTA
+
+
+def negotiate_protocol(auth: Any) -> int:
+    """
+    Protocol version for a connecting client
+
+    Args:
+        auth: The Socket.IO connect auth payload (may be None or malformed)
+
+    Returns:
+        The highest supported version not above the one the client asked for
+    """
+    if not isinstance(auth, dict):
+        return PROTOCOL_LEGACY
+    try:
+        requested = int(auth.get("transcript_protocol", PROTOCOL_LEGACY))
+    except (TypeError, ValueError):
+        return PROTOCOL_LEGACY
+    return max(PROTOCOL_LEGACY, min(requested, SUPPORTED_PROTOCOL))
+
+
+class TranscriptDeltaEncoder:
+    """
+    Turns one session's transcription_update payloads into sequenced deltas.
+
+    Keeps a mirror of each provider's segments (from the payloads alone, so it works
+    for providers that send the running transcript and for those that send one
+    utterance at a time) to choose between append and replace and to answer resyncs.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.transcripts: Dict[str, TranscriptSegments] = {}
+        self.lock = threading.Lock()
+
+    def encode(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Delta for a transcription_update payload (call with lock held to keep seq order on the wire)
+
+        Args:
+            payload: transcription_update payload - 'segment' is used when present
+                (Azure OpenAI / ElevenLabs), otherwise 'transcription' is the segment text
+
+        Returns:
+            The transcription_delta payload
+        """
+        api = payload.get('api', "")
+        text = payload['segment'] if 'segment' in payload else payload.get('transcription') or ""
+        text = text.strip()
+        transcript = self.transcripts.setdefault(api, TranscriptSegments())
+        segment_id = transcript.partial_id
+        previous = transcript.partial
+        if payload.get('final'):
+            op = "commit"
+            transcript.commit(text)
+        elif previous and text.startswith(previous):
+            op = "append"
+            transcript.set_partial(text)
+            text = text[len(previous):]
+        else:
+            op = "replace"
+            transcript.set_partial(text)
+        self.seq += 1
+        return {'api': api, 'seq': self.seq, 'segment_id': segment_id, 'op': op, 'text': text}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """transcription_snapshot payload (call with lock held)"""
+        return {
+            'seq': self.seq,
+            'transcripts': {
+                api: {'segments': list(transcript.segments), 'partial': transcript.partial}
+                for api, transcript in self.transcripts.items()
+            },
+        }
+
+    def reset(self):
+        """Start new transcripts (new recording) - seq keeps counting"""
+        with self.lock:
+            self.transcripts.clear()
+
+
+class TranscriptSocketIO:
+    """
+    SocketIO stand-in that sends transcription_update as deltas to protocol 2 rooms.
+
+    Args:
+        socketio: The real SocketIO instance
+    """
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self._encoders: Dict[str, TranscriptDeltaEncoder] = {}
+        self._lock = threading.Lock()
+
+    def set_protocol(self, session_id: str, version: int):
+        """Record the protocol a session negotiated at connect"""
+        with self._lock:
+            if version >= PROTOCOL_DELTA:
+                self._encoders[session_id] = TranscriptDeltaEncoder()
+            else:
+                self._encoders.pop(session_id, None)
+
+    def protocol(self, session_id: str) -> int:
+        return PROTOCOL_DELTA if session_id in self._encoders else PROTOCOL_LEGACY
+
+    def encoder(self, session_id: str) -> Optional[TranscriptDeltaEncoder]:
+        return self._encoders.get(session_id)
+
+    def remove(self, session_id: str):
+        """Forget a disconnected session"""
+        with self._lock:
+            self._encoders.pop(session_id, None)
+
+    def emit(self, event: str, data: Any = None, *args, **kwargs):
+        if event == 'transcription_update' and isinstance(data, dict):
+            encoder = self._encoders.get(kwargs.get('room'))
+            if encoder is not None:
+                # Encode and send under the lock so seq order matches send order across provider threads
+                with encoder.lock:
+                    return self.socketio.emit('transcription_delta', encoder.encode(data), *args, **kwargs)
+        return self.socketio.emit(event, data, *args, **kwargs)
+
+    def resync(self, session_id: str):
+        """Send a session its current transcripts after it detected a gap"""
+        encoder = self._encoders.get(session_id)
+        if encoder is None:
+            return
+        with encoder.lock:
+            self.socketio.emit('transcription_snapshot', encoder.snapshot(), room=session_id)
+
+
+class TranscriptDeltaDecoder:
+    """
+    Client side of protocol 2 (mirrors static/script.js), used by the load generator and tests.
+
+    Tracks each provider's segments and the last seq, and reports gaps.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.segments: Dict[str, Dict[int, str]] = {}
+
+    def apply(self, delta: Dict[str, Any]) -> bool:
+        """
+        Apply one transcription_delta
+
+        Returns:
+            False if deltas were missed (seq gap) - the caller should request a resync;
+            the delta is not applied then
+        """
+        if delta['seq'] <= self.seq:
+            return True  # Already covered by a snapshot
+        if delta['seq'] != self.seq + 1:
+            return False
+        self.seq = delta['seq']
+        segments = self.segments.setdefault(delta['api'], {})
+        if delta['op'] == "append":
+            segments[delta['segment_id']] = segments.get(delta['segment_id'], "") + delta['text']
+        else:
+            segments[delta['segment_id']] = delta['text']
+        return True
+
+    def load_snapshot(self, snapshot: Dict[str, Any]):
+        """Replace all state with a transcription_snapshot"""
+        self.seq = snapshot['seq']
+        self.segments = {}
+        for api, transcript in snapshot['transcripts'].items():
+            segments = dict(enumerate(transcript['segments']))
+            if transcript['partial']:
+                segments[len(transcript['segments'])] = transcript['partial']
+            self.segments[api] = segments
+
+    def reset(self):
+        """New recording - segments start again at 0"""
+        self.segments = {}
+
+    def text(self, api: str) -> str:
+        """Full transcript of one provider"""
+        segments = self.segments.get(api, {})
+        return " ".join(segments[i].strip() for i in sorted(segments) if segments[i].strip())
+
+
+def payload_size(data: Any) -> int:
+    """Approximate wire size of an event payload (its JSON encoding), in bytes"""
+    return len(json.dumps(data, separators=(",", ":")).encode("utf-8"))
@@ -0,0 +1,119 @@
+"""
+Transcript Segment Store
+Session transcript kept as a list of committed segments plus one mutable partial tail,
+instead of re-concatenating the whole accumulated string on every delta/partial/commit.
+
+Segments are numbered in order; the partial tail always carries the id the segment will
+get once committed. The joined committed text is cached and only rebuilt after a
+commit, so a partial update costs one join of (committed, tail) regardless of how many
+segments the session has, and nothing is re-stripped or re-copied per segment.
+
+Handlers emit the changed segment (segment_id + segment text) with every
+transcription_update, so clients can update one segment instead of re-rendering the
+full transcript.
+"""
+from typing import Any, Dict, List, Optional
+
+
+class TranscriptSegments:
+    """Committed transcript segments plus the current partial segment"""
+
+    def __init__(self):
+        self.segments: List[str] = []
+        self._partial = ""
+        self._committed_text: Optional[str] = ""
+
+    @property
+    def partial(self) -> str:
+        """Current (uncommitted) segment text"""
+        return self._partial.strip()
+
+    @property
+    def partial_id(self) -> int:
+        """Segment id the partial tail will have once committed"""
+        return len(self.segments)
+
+    @property
+    def committed_text(self) -> str:
+        """All committed segments joined with spaces (cached until the next commit)"""
+        if self._committed_text is None:
+            self._committed_text = " ".join(self.segments)
+        return self._committed_text
+
+    @property
+    def text(self) -> str:
+        """Full transcript shown to the user: committed segments + partial tail"""
+        committed = self.committed_text
+        partial = self.partial
+        if committed and partial:
+            return f"{committed} {partial}"
+        return committed or partial
+
+    def set_partial(self, text: str) -> int:
+        """
+        Replace the partial tail (e.g. an ElevenLabs partial_transcript)
+
+        Returns:
+            The partial segment's id
+        """
+        self._partial = text
+        return len(self.segments)
+
+    def append_partial(self, piece: str) -> int:
+        """
+        Extend the partial tail (e.g. an Azure transcription delta)
+
+        Returns:
+            The partial segment's id
+        """
+        self._partial += piece
+        return len(self.segments)
+
+    def clear_partial(self):
+        """Drop the partial tail without committing it"""
+        self._partial = ""
+
+    def commit(self, text: str) -> int:
+        """
+        Commit a finished segment, replacing the partial tail
+
+        Args:
+            text: Final text of the segment (whitespace is stripped; empty text commits nothing)
+
+        Returns:
+            The committed segment's id (the next segment's id if nothing was committed)
+        """
+        self._partial = ""
+        text = text.strip()
+        if not text:
+            return len(self.segments)
+        self.segments.append(text)
+        self._committed_text = None
+        return len(self.segments) - 1
+
+    def clear(self):
+        """Forget the whole transcript (new recording)"""
+        self.segments = []
+        self._partial = ""
+        self._committed_text = ""
+
+    def update_payload(self, segment_id: int, segment: str, api: str, final: bool) -> Dict[str, Any]:
+        """
+        transcription_update payload for a change to one segment
+
+        Args:
+            segment_id: Id of the changed segment
+            segment: Its current text
+            api: Provider name
+            final: True when the segment was committed
+
+        Returns:
+            Payload with the full 'transcription' plus 'segment_id' and 'segment'
+        """
+        return {
+            'transcription': self.text,
+            'api': api,
+            'final': final,
+            'segment_id': segment_id,
+            'segment': segment,
+        }
@@ -0,0 +1,205 @@
+"""
+Server-side VAD Gate
+Per-session energy / zero-crossing voice activity detection in front of the provider
+send paths, so long silences are not streamed to (and billed by) the providers.
+
+Each inbound PCM16 frame is classified with NumPy: it is speech when its RMS level is
+VAD_SNR_DB above the adaptive noise floor (and above VAD_ENERGY_DB), or slightly below
+that with a speech-like zero-crossing rate (weak fricative onsets). The gate opens on
+speech and forwards:
+  - a pre-roll of the last VAD_PREROLL_MS of audio before the onset, so the start of
+    the first word is not clipped
+  - every frame until VAD_HANGOVER_MS after the last speech frame, so word endings and
+    the trailing silence the providers' own VAD needs to end a turn still get through
+
+Enabled with VAD_GATE=true. Bytes forwarded and saved are counted per provider and
+served with the latency metrics at /metrics.
+"""
+import collections
+import math
+import os
+import threading
+from typing import Deque, Dict, List
+
+import numpy as np
+
+VAD_GATE_ENABLED = os.getenv("VAD_GATE", "false").lower() in ("1", "true", "yes")
+# Absolute minimum level for speech (dBFS)
+VAD_ENERGY_DB = float(os.getenv("VAD_ENERGY_DB", "-50"))
+# Speech must be this far above the adaptive noise floor (dB)
+VAD_SNR_DB = float(os.getenv("VAD_SNR_DB", "12"))
+# Audio kept before a speech onset and forwarded after the last speech frame
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "300"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "800"))
+
+# Frames up to this many dB below the threshold still count as speech when their
+# zero-crossing rate (crossings per sample) is in the fricative range
+VAD_ZCR_MARGIN_DB = 6.0
+VAD_ZCR_MIN = 0.15
+VAD_ZCR_MAX = 0.45
+# Noise floor tracking: follow drops quickly, rises slowly (so speech doesn't raise it).
+# Speech frames still pull it up very slowly, so steady background noise louder than
+# the initial floor is learned (in ~10s) instead of holding the gate open forever.
+NOISE_FLOOR_INITIAL_DB = -70.0
+NOISE_FLOOR_FALL = 0.2
+NOISE_FLOOR_RISE = 0.02
+NOISE_FLOOR_SPEECH_RISE = 0.005
+
+BROWSER_SAMPLE_RATE = 24000
+
+
+def frame_features(frame: bytes):
+    """
+    Level and zero-crossing rate of a PCM16 frame
+
+    Args:
+        frame: Little-endian mono PCM16 audio
+
+    Returns:
+        (RMS level in dBFS, zero crossings per sample)
+    """
+    samples = np.frombuffer(frame, dtype='<i2', count=len(frame) // 2).astype(np.float32)
+    if samples.size == 0:
+        return -math.inf, 0.0
+    rms = math.sqrt(float(np.dot(samples, samples)) / samples.size)
+    level_db = 20.0 * math.log10(rms / 32768.0) if rms > 0 else -math.inf
+    signs = np.signbit(samples)
+    zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / samples.size
+    return level_db, zcr
+
+
+class VadGate:
+    """
+    Energy / zero-crossing VAD gate for one session's audio stream.
+
+    Args:
+        sample_rate: Sample rate of the PCM16 frames
+        preroll_ms: Audio kept before a speech onset
+        hangover_ms: Audio forwarded after the last speech frame
+        energy_db: Absolute minimum speech level (dBFS)
+        snr_db: Required level above the noise floor (dB)
+    """
+
+    def __init__(self, sample_rate: int = BROWSER_SAMPLE_RATE, preroll_ms: int = VAD_PREROLL_MS,
+                 hangover_ms: int = VAD_HANGOVER_MS, energy_db: float = VAD_ENERGY_DB, snr_db: float = VAD_SNR_DB):
+        self.bytes_per_ms = sample_rate * 2 / 1000.0
+        self.preroll_bytes = int(preroll_ms * self.bytes_per_ms)
+        self.hangover_ms = hangover_ms
+        self.energy_db = energy_db
+        self.snr_db = snr_db
+        self._preroll: Deque[bytes] = collections.deque()
+        self._preroll_size = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new stream (gate closed, noise floor, pre-roll and byte counts cleared)"""
+        self.is_open = False
+        self.bytes_in = 0
+        self.bytes_forwarded = 0
+        self.noise_floor_db = NOISE_FLOOR_INITIAL_DB
+        self._hangover_left_ms = 0.0
+        self._preroll.clear()
+        self._preroll_size = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_forwarded
+
+    def is_speech(self, frame: bytes) -> bool:
+        """Classify a frame and update the noise floor"""
+        level_db, zcr = frame_features(frame)
+        threshold = max(self.energy_db, self.noise_floor_db + self.snr_db)
+        speech = level_db >= threshold or (
+            level_db >= threshold - VAD_ZCR_MARGIN_DB and VAD_ZCR_MIN <= zcr <= VAD_ZCR_MAX
+        )
+        if level_db > -math.inf:
+            if level_db < self.noise_floor_db:
+                rate = NOISE_FLOOR_FALL
+            else:
+                rate = NOISE_FLOOR_SPEECH_RISE if speech else NOISE_FLOOR_RISE
+            self.noise_floor_db += rate * (level_db - self.noise_floor_db)
+        return speech
+
+    def process(self, frame: bytes) -> List[bytes]:
+        """
+        Gate one frame
+
+        Args:
+            frame: Little-endian mono PCM16 audio
+
+        Returns:
+            Frames to forward now, in order - empty while gated, the pre-roll plus this
+            frame on a speech onset, otherwise just this frame
+        """
+        self.bytes_in += len(frame)
+        speech = self.is_speech(frame)
+
+        if self.is_open:
+            if speech:
+                self._hangover_left_ms = self.hangover_ms
+            else:
+                self._hangover_left_ms -= len(frame) / self.bytes_per_ms
+                if self._hangover_left_ms <= 0:
+                    self.is_open = False
+            self.bytes_forwarded += len(frame)
+            return [frame]
+
+        if not speech:
+            # Keep the most recent audio for the next onset
+            self._preroll.append(frame)
+            self._preroll_size += len(frame)
+            while self._preroll and self._preroll_size - len(self._preroll[0]) >= self.preroll_bytes:
+                self._preroll_size -= len(self._preroll.popleft())
+            return []
+
+        self.is_open = True
+        self._hangover_left_ms = self.hangover_ms
+        frames = list(self._preroll)
+        frames.append(frame)
+        self._preroll.clear()
+        self._preroll_size = 0
+        self.bytes_forwarded += sum(len(f) for f in frames)
+        return frames
+
+
+class VadSavings:
+    """Process-wide audio bytes forwarded and saved by the VAD gate, per provider"""
+
+    def __init__(self):
+        self._forwarded: Dict[str, int] = {}
+        self._saved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, forwarded: int = 0, saved: int = 0):
+        with self._lock:
+            self._forwarded[provider] = self._forwarded.get(provider, 0) + forwarded
+            self._saved[provider] = self._saved.get(provider, 0) + saved
+
+    def snapshot(self) -> List[Dict]:
+        """Forwarded and saved bytes per provider"""
+        with self._lock:
+            providers = sorted(set(self._forwarded) | set(self._saved))
+            return [{"provider": p, "forwarded_bytes": self._forwarded.get(p, 0), "saved_bytes": self._saved.get(p, 0)}
+                    for p in providers]
+
+    def prometheus_text(self) -> str:
+        """Counters in Prometheus text exposition format (empty until the gate has run)"""
+        series = self.snapshot()
+        if not series:
+            return ""
+        lines: List[str] = []
+        for key, name, help_text in (("forwarded_bytes", "stt_vad_forwarded_bytes_total", "Audio bytes forwarded by the VAD gate"),
+                                     ("saved_bytes", "stt_vad_saved_bytes_total", "Audio bytes withheld by the VAD gate")):
+            lines.append(f"# HELP {name} {help_text} per provider")
+            lines.append(f"# TYPE {name} counter")
+            for item in series:
+                lines.append(f'{name}{{provider="{item["provider"]}"}} {item[key]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._forwarded.clear()
+            self._saved.clear()
+
+
+vad_savings = VadSavings()
@@ -3,15 +3,34 @@ import os
 import time
 import threading
 import json
-from typing import TYPE_CHECKING, Optional, cast
-from flask import Flask, render_template, request
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import TYPE_CHECKING, Dict, List, Optional, cast
+from flask import Flask, Response, jsonify, render_template, request
 from flask_socketio import SocketIO
 from dotenv import load_dotenv
 from deepgram import (
     DeepgramClient,
+    DeepgramClientOptions,
     LiveTranscriptionEvents,
     LiveOptions
 )
+from audio_pipeline import AudioFormat, AudioPipeline
+from timer_wheel import WheelTimer, get_timer_wheel
+from connection_retry import ConnectionRetry
+from provider_io_loop import AsyncOutbox, PROVIDER_OPEN_TIMEOUT_SEC, get_provider_loop
+from performance_log import VOICESEARCH_LOG_DIR, get_performance_logger
+from metrics_events import COMPARE_RACE, MetricEvent, SESSION_END, SESSION_START, TRANSCRIPTION
+from latency_metrics import CONNECTION_SETUP, SPEECH_END_TO_FINAL, latency_metrics
+from audio_recorder import get_audio_recorder
+from compare_mode import COMPARE_API, COMPARE_PROVIDERS, ProviderTaggedSocketIO, UtteranceRace
+from vad_gate import VAD_GATE_ENABLED, VadGate, vad_savings
+from transcript_protocol import TranscriptSocketIO, negotiate_protocol
+from transcript_coalescer import CoalescingEmitter
+from audio_framing import CODEC_NAMES, CODEC_OPUS_OGG, CODEC_OPUS_WEBM, CODEC_PCM16, AudioFrameTracker, parse_audio_frame
+from audio_decode import OPUS_AVAILABLE, get_audio_decode_pool, sniff_codec
+from audio_timeline import AudioTimeline
+from transcript_segments import TranscriptSegments
+from warm_pool import WARM_POOL_LANGUAGES, WARM_POOL_SIZE, get_warm_pool, warm_pool_prometheus_text
 
 # Import Azure OpenAI handler
 # Define stub functions first to satisfy type checker
@@ -19,7 +38,7 @@ def initialize_azure_openai_connection(socketio_instance: SocketIO, language_nam
     """Stub function - will be replaced if import succeeds"""
     return False
 
-def send_audio_to_azure_openai(audio_data: bytes, session_id: str = None) -> bool:
+def send_audio_to_azure_openai(audio_data: bytes, session_id: str = None, captured_at: Optional[float] = None) -> bool:
     """Stub function - will be replaced if import succeeds"""
     return False
 
@@ -48,7 +67,7 @@ def initialize_elevenlabs_connection(socketio_instance: SocketIO, language_name:
     """Stub function - will be replaced if import succeeds"""
     return False
 
-def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None) -> bool:
+def send_audio_to_elevenlabs(audio_data: bytes, session_id: str = None, captured_at: Optional[float] = None) -> bool:
     """Stub function - will be replaced if import succeeds"""
     return False
 
@@ -56,62 +75,29 @@ def close_elevenlabs_connection(session_id: str = None) -> None:
     """Stub function - will be replaced if import succeeds"""
     pass
 
+def note_elevenlabs_gated_audio(session_id: str = None) -> None:
+    """Stub function - will be replaced if import succeeds"""
+    pass
+
 try:
     from elevenlabs_handler import (
         initialize_elevenlabs_connection as _init_elevenlabs,
         send_audio_to_elevenlabs as _send_elevenlabs,
-        close_elevenlabs_connection as _close_elevenlabs
+        close_elevenlabs_connection as _close_elevenlabs,
+        note_elevenlabs_gated_audio as _note_elevenlabs_gated
     )
     # Replace stub functions with real ones
     initialize_elevenlabs_connection = _init_elevenlabs
     send_audio_to_elevenlabs = _send_elevenlabs
     close_elevenlabs_connection = _close_elevenlabs
+    note_elevenlabs_gated_audio = _note_elevenlabs_gated
     ELEVENLABS_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"ElevenLabs handler not available: {e}")
     ELEVENLABS_AVAILABLE = False
 
-
-def resample_audio_24k_to_16k(audio_bytes: bytes) -> bytes:
-    """
-    Resample PCM16 audio from 24kHz to 16kHz for ElevenLabs
-    Uses simple linear interpolation for downsampling
-    
-    Args:
-        audio_bytes: PCM16 audio data at 24kHz
-    
-    Returns:
-        PCM16 audio data at 16kHz
-    """
-    import struct
-    
-    # Convert bytes to int16 samples
-    num_samples = len(audio_bytes) // 2
-    samples = struct.unpack(f'<{num_samples}h', audio_bytes)
-    
-    # Resample ratio: 16000/24000 = 2/3
-    output_length = int(num_samples * 16000 / 24000)
-    resampled = []
-    
-    for i in range(output_length):
-        src_index = i * 24000 / 16000
-        index = int(src_index)
-        frac = src_index - index
-        
-        sample1 = samples[index] if index < num_samples else 0
-        sample2 = samples[min(num_samples - 1, index + 1)] if index + 1 < num_samples else sample1
-        
-        # Linear interpolation
-        value = int(sample1 + frac * (sample2 - sample1))
-        # Clamp to int16 range
-        value = max(-32768, min(32767, value))
-        resampled.append(value)
-    
-    # Convert back to bytes
-    return struct.pack(f'<{len(resampled)}h', *resampled)
-
 if TYPE_CHECKING:
-    from deepgram.clients import LiveClient
+    from deepgram.clients import AsyncListenWebSocketClient
 
 # Load environment variables
 load_dotenv()
@@ -130,7 +116,7 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
     handlers=[
-        logging.FileHandler('voicesearch_app.log')
+        logging.FileHandler(os.path.join(VOICESEARCH_LOG_DIR, 'voicesearch_app.log'))
         # Removed StreamHandler to prevent duplicate entries
     ],
     force=True  # Python 3.8+: Forces reconfiguration even if root logger was already configured
@@ -138,23 +124,30 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Configure performance logger (only add handler if not already added)
-performance_logger = logging.getLogger('performance')
-performance_logger.setLevel(logging.INFO)
-if not performance_logger.handlers:
-    performance_handler = logging.FileHandler('voicesearch_performance.log')
-    performance_formatter = logging.Formatter('%(asctime)s - %(filename)s:%(lineno)d - %(message)s')
-    performance_handler.setFormatter(performance_formatter)
-    performance_logger.addHandler(performance_handler)
-performance_logger.propagate = False  # Don't propagate to root logger
+# Performance logger - records are written to voicesearch_performance.log by the shared background writer
+performance_logger = get_performance_logger('performance')
+
+# Opt-in recorder for inbound session audio (enabled by AUDIO_RECORD_DIR) - see audio_recorder.py
+audio_recorder = get_audio_recorder()
+
+# Worker processes decoding Opus audio from the browser (started on the first compressed chunk) - see audio_decode.py
+audio_decode_pool = get_audio_decode_pool()
+# audio_stream codecs accepted, advertised to clients on connect
+ACCEPTED_AUDIO_CODECS = [CODEC_PCM16] + ([CODEC_OPUS_WEBM, CODEC_OPUS_OGG] if OPUS_AVAILABLE else [])
 
 # Initialize Flask app
 # Use threading mode to avoid gevent/eventlet monkey-patching conflicts with Deepgram's synchronous WebSocket client
 # Threading mode doesn't monkey-patch, which is safer for synchronous WebSocket libraries
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins='*', async_mode='threading')
+# Transcripts go out through this wrapper: full-text updates, or deltas for clients that negotiated them
+transcript_socketio = TranscriptSocketIO(socketio)
+# Handlers emit through this: partial updates are rate-limited per session before the protocol wrapper
+transcript_emitter = CoalescingEmitter(transcript_socketio)
 
 API_KEY = os.getenv("DEEPGRAM_API_KEY")
+# Deepgram API base URL override (e.g. http://127.0.0.1:8765 for the local mock_stt server)
+DEEPGRAM_URL = os.getenv("DEEPGRAM_URL", "")
 
 if not API_KEY:
     logger.warning("DEEPGRAM_API_KEY environment variable is not set - Deepgram API will not work")
@@ -169,6 +162,28 @@ else:
 SILENCE_TIMEOUT_MS = int(os.getenv("SILENCE_TIMEOUT", "5000"))  # Default 5 seconds if not set
 SILENCE_TIMEOUT_SEC = SILENCE_TIMEOUT_MS / 1000.0
 
+# Deepgram KeepAlive interval (Deepgram closes idle connections after ~10-12s)
+KEEP_ALIVE_INTERVAL_SEC = 8.0
+
+# Deepgram streaming behaviour: interim results (partials while the user speaks), endpointing
+# (ms of silence that finalises speech - Deepgram's default 10, "false" disables; higher values stop
+# pauses splitting an utterance but delay its final) and utterance_end_ms (word gap that sends
+# UtteranceEnd - needs interim results, minimum 1000)
+DEEPGRAM_INTERIM_RESULTS = os.getenv("DEEPGRAM_INTERIM_RESULTS", "true").lower() in ("1", "true", "yes")
+DEEPGRAM_ENDPOINTING_MS = os.getenv("DEEPGRAM_ENDPOINTING_MS", "10")
+DEEPGRAM_UTTERANCE_END_MS = os.getenv("DEEPGRAM_UTTERANCE_END_MS", "1000")
+
+# Browser audio: 24kHz PCM16 mono (compressed audio is decoded to it)
+BROWSER_AUDIO_FORMAT = AudioFormat(24000)
+BROWSER_BYTES_PER_SECOND = BROWSER_AUDIO_FORMAT.bytes_per_second
+
+# Audio format each provider is sent - audio_pipeline.py converts the browser audio to it
+PROVIDER_AUDIO_FORMATS = {
+    "Deepgram API": AudioFormat(24000),
+    "Azure OpenAI": AudioFormat(24000),
+    "ElevenLabs ScribeV2": AudioFormat(16000),
+}
+
 # Get STT retry configuration from environment
 STT_RETRY_COUNT = int(os.getenv("STT_RETRY_COUNT", "3"))  # Default 3 retries
 
@@ -176,78 +191,44 @@ STT_RETRY_COUNT = int(os.getenv("STT_RETRY_COUNT", "3"))  # Default 3 retries
 HOST = os.getenv("HOST", "0.0.0.0")  # Default to 0.0.0.0 for external access
 PORT = int(os.getenv("PORT", "8000"))  # Default to port 8000
 
-def retry_with_backoff(func, max_retries=STT_RETRY_COUNT, session_id=None, service_name="Service", socketio_instance=None):
+def start_connection_retry(session, connect, service_name, on_success, on_failure, on_abandon=None, alongside=False):
     """
-    Retry a function with exponential backoff.
+    Start connecting to a provider in the background with jittered exponential backoff.
+    Any in-flight attempt for this session is cancelled first; the Socket.IO handler returns immediately.
     
     Args:
-        func: Callable that returns True on success, False on failure
-        max_retries: Maximum number of retry attempts
-        session_id: Session ID for logging
-        service_name: Name of the service for logging
-        socketio_instance: Optional SocketIO instance for emitting retry status to frontend
-    
-    Returns:
-        bool: True if successful, False if all retries exhausted
+        session: UserSession the connection belongs to
+        connect: Callable that returns True on success, False on failure
+        service_name: Name of the service for logging and status messages
+        on_success: Called once connected
+        on_failure: Called when all retries are exhausted
+        on_abandon: Called if an attempt connects after being cancelled - should close the connection
+        alongside: Only cancel in-flight attempts for the same service (compare mode connects to all providers)
     """
-    logger.info(f"🔄 RETRY_START | Service: {service_name} | Session: {session_id} | MaxRetries: {max_retries}")
-    
-    if max_retries <= 0:
-        logger.info(f"🔄 RETRY_DISABLED | Service: {service_name} | Session: {session_id} | Retries disabled, attempting single connection")
-        return func()
-    
-    for attempt in range(max_retries + 1):  # +1 for initial attempt
-        logger.info(f"🔄 RETRY_ATTEMPT | Service: {service_name} | Session: {session_id} | Attempt: {attempt + 1}/{max_retries + 1}")
-        try:
-            result = func()
-            if result:
-                if attempt > 0:
-                    logger.info(f"✅ RETRY_SUCCESS | Service: {service_name} | Session: {session_id} | SucceededOnAttempt: {attempt + 1}")
-                    # Notify frontend that retry succeeded
-                    if socketio_instance and session_id:
-                        socketio_instance.emit('transcription_status', {
-                            'status': 'retrying',
-                            'message': f'{service_name} connected successfully after retry'
-                        }, room=session_id)
-                else:
-                    logger.info(f"✅ RETRY_SUCCESS | Service: {service_name} | Session: {session_id} | SucceededOnFirstAttempt")
-                return True
-            
-            if attempt < max_retries:
-                backoff_seconds = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s, ...
-                logger.warning(
-                    f"⚠️ RETRY_FAILED | Service: {service_name} | Session: {session_id} | "
-                    f"Attempt: {attempt + 1} | BackoffSeconds: {backoff_seconds} | RetriesLeft: {max_retries - attempt}"
-                )
-                # Notify frontend about retry (seamlessly in background)
-                if socketio_instance and session_id:
-                    socketio_instance.emit('transcription_status', {
-                        'status': 'retrying',
-                        'message': f'Connecting to {service_name}... (attempt {attempt + 2}/{max_retries + 1})'
-                    }, room=session_id)
-                time.sleep(backoff_seconds)
-            else:
-                logger.error(f"❌ RETRY_EXHAUSTED | Service: {service_name} | Session: {session_id} | AllAttemptsFailed: {max_retries + 1}")
-                return False
-        except Exception as e:
-            if attempt < max_retries:
-                backoff_seconds = 2 ** attempt
-                logger.warning(
-                    f"⚠️ RETRY_EXCEPTION | Service: {service_name} | Session: {session_id} | "
-                    f"Attempt: {attempt + 1} | Exception: {type(e).__name__}: {e} | BackoffSeconds: {backoff_seconds}"
-                )
-                # Notify frontend about retry
-                if socketio_instance and session_id:
-                    socketio_instance.emit('transcription_status', {
-                        'status': 'retrying',
-                        'message': f'Connecting to {service_name}... (attempt {attempt + 2}/{max_retries + 1})'
-                    }, room=session_id)
-                time.sleep(backoff_seconds)
-            else:
-                logger.error(f"❌ RETRY_EXHAUSTED_EXCEPTION | Service: {service_name} | Session: {session_id} | Exception: {type(e).__name__}: {e}")
-                return False
-    
-    return False
+    if alongside:
+        retry = session.connection_retries.pop(service_name, None)
+        if retry:
+            retry.cancel()
+    else:
+        cancel_connection_retry(session)
+    session.connection_retries[service_name] = ConnectionRetry(
+        connect,
+        session_id=session.session_id,
+        service_name=service_name,
+        on_success=on_success,
+        on_failure=on_failure,
+        on_abandon=on_abandon,
+        socketio_instance=socketio,
+        max_retries=STT_RETRY_COUNT,
+        attempt_lock=session.connect_locks.setdefault(service_name, threading.Lock())
+    ).start()
+
+def cancel_connection_retry(session):
+    """Cancel any in-flight connection attempts for this session (newer start, stop or disconnect)"""
+    retries = list(session.connection_retries.values())
+    session.connection_retries.clear()
+    for retry in retries:
+        retry.cancel()
 
 # User session storage - each user gets their own isolated state
 user_sessions = {}
@@ -256,15 +237,36 @@ sessions_lock = threading.Lock()
 class UserSession:
     def __init__(self, session_id):
         self.session_id = session_id
-        self.dg_connection: Optional['LiveClient'] = None
+        self.dg_connection: Optional['AsyncListenWebSocketClient'] = None
+        self.dg_outbox: Optional[AsyncOutbox] = None  # Audio and KeepAlive messages queued for dg_connection
+        self.dg_timeline = AudioTimeline(BROWSER_BYTES_PER_SECOND)  # Capture time of the audio sent on dg_connection
+        self.dg_transcript = TranscriptSegments()  # Deepgram finals + current interim result
         self.session_start_time = None
         self.transcription_count = 0
         self.last_transcription_time = None
         self.last_audio_send_time = None
-        self.silence_timer = None
-        self.keep_alive_timer = None
+        self.silence_timer: Optional[WheelTimer] = None
+        self.keep_alive_timer: Optional[WheelTimer] = None
         self.current_api_provider = "Deepgram API"
         self.silence_timer_started = False  # Track if silence timer has been started (to start only on first audio)
+        self.connection_retries: Dict[str, ConnectionRetry] = {}  # In-flight connection attempts by service
+        self.connect_locks: Dict[str, threading.Lock] = {}  # Serialise connection attempts per service for this session
+        # Compare mode: providers receiving this session's audio and their per-utterance latency race
+        self.compare_providers: List[str] = []
+        self.compare_race: Optional[UtteranceRace] = None
+        # Server-side VAD gate in front of the provider sends (VAD_GATE=true)
+        self.vad_gate: Optional[VadGate] = VadGate() if VAD_GATE_ENABLED else None
+        # Sequence, loss and capture-time tracking of framed audio_stream payloads
+        self.audio_frames = AudioFrameTracker()
+        # Compressed audio: container codec of the recording's stream (None until the first chunk),
+        # whether the next chunk starts a new stream, and decode cost of the recording
+        self.compressed_codec: Optional[int] = None
+        self.decode_reset = True
+        self.decode_audio_sec = 0.0
+        self.decode_cpu_sec = 0.0
+        self.decode_errors = 0
+        # Conversion of the browser audio to each provider's format (stateful across frames)
+        self.audio_pipeline = AudioPipeline(BROWSER_AUDIO_FORMAT, PROVIDER_AUDIO_FORMATS)
         
     def reset_performance_metrics(self):
         """Reset performance tracking for new session"""
@@ -287,33 +289,32 @@ def cleanup_user_session(session_id):
         if session_id in user_sessions:
             session = user_sessions[session_id]
             # Clean up any active connections
+            cancel_connection_retry(session)
             stop_keep_alive(session)
             if session.silence_timer:
                 session.silence_timer.cancel()
-            if session.dg_connection:
-                try:
-                    session.dg_connection.finish()
-                except Exception as e:
-                    logger.error(f"Error closing connection for session {session_id}: {e}")
+            finish_deepgram_connection(session)
             del user_sessions[session_id]
 
 # Initialize Deepgram client (simplified to match reference implementation)
 # Only initialize if API_KEY is available
-deepgram = DeepgramClient(API_KEY) if API_KEY else None
+deepgram = DeepgramClient(API_KEY, DeepgramClientOptions(url=DEEPGRAM_URL)) if API_KEY else None
 
 def reset_silence_timer(session):
     """Reset the silence timeout timer when transcription is received or audio is sent"""
+    # Re-arm the existing wheel timer in place - no new thread per reset
     if session.silence_timer:
-        session.silence_timer.cancel()
-    session.silence_timer = threading.Timer(SILENCE_TIMEOUT_SEC, lambda: handle_silence_timeout(session))
-    session.silence_timer.start()
+        session.silence_timer.reset(SILENCE_TIMEOUT_SEC)
+    else:
+        session.silence_timer = get_timer_wheel().schedule(
+            SILENCE_TIMEOUT_SEC, lambda: handle_silence_timeout(session), name=f"silence:{session.session_id}"
+        )
     session.silence_timer_started = True
 
 def stop_silence_timer(session):
     """Stop the silence timeout timer"""
     if session.silence_timer:
         session.silence_timer.cancel()
-        session.silence_timer = None
     session.silence_timer_started = False
 
 def handle_silence_timeout(session):
@@ -322,20 +323,16 @@ def handle_silence_timeout(session):
     performance_logger.info(f"SILENCE_TIMEOUT | Session: {session.session_id} | Timeout: {SILENCE_TIMEOUT_MS}ms")
     
     if session.dg_connection:
-        try:
-            session.dg_connection.finish()
-            logger.info(f"Deepgram connection finished due to silence timeout for session {session.session_id}")
-        except Exception as e:
-            logger.error(f"Error finishing Deepgram connection on timeout for session {session.session_id}: {e}")
-        session.dg_connection = None
+        finish_deepgram_connection(session)
+        logger.info(f"Deepgram connection finished due to silence timeout for session {session.session_id}")
     
     # Clean up session tracking
     if session.session_start_time:
         session_duration_ms = (time.perf_counter() - session.session_start_time) * 1000
-        performance_logger.info(
-            f"SESSION_END | Session: {session.session_id} | TotalDuration: {session_duration_ms:.2f}ms | "
-            f"TotalTranscriptions: {session.transcription_count} | Reason: SilenceTimeout"
-        )
+        performance_logger.info(MetricEvent(
+            SESSION_END, session.session_id, provider="Deepgram", duration_ms=session_duration_ms,
+            count=session.transcription_count, reason="SilenceTimeout"
+        ))
         session.session_start_time = None
         session.transcription_count = 0
         session.last_transcription_time = None
@@ -350,26 +347,25 @@ def handle_silence_timeout(session):
 
 def start_keep_alive(session):
     """Start the keep-alive timer to prevent Deepgram connection timeouts"""
-    if session.keep_alive_timer:
-        session.keep_alive_timer.cancel()
-    
     # Send KeepAlive every 8 seconds (Deepgram timeout is usually 10-12s)
-    session.keep_alive_timer = threading.Timer(8.0, lambda: send_keep_alive(session))
-    session.keep_alive_timer.daemon = True
-    session.keep_alive_timer.start()
+    if session.keep_alive_timer:
+        session.keep_alive_timer.reset(KEEP_ALIVE_INTERVAL_SEC)
+    else:
+        session.keep_alive_timer = get_timer_wheel().schedule(
+            KEEP_ALIVE_INTERVAL_SEC, lambda: send_keep_alive(session), name=f"keepalive:{session.session_id}"
+        )
 
 def stop_keep_alive(session):
     """Stop the keep-alive timer"""
     if session.keep_alive_timer:
         session.keep_alive_timer.cancel()
-        session.keep_alive_timer = None
 
 def send_keep_alive(session):
     """Send KeepAlive message to Deepgram"""
-    if session.dg_connection:
+    if session.dg_outbox:
         try:
             # Send KeepAlive JSON message
-            session.dg_connection.send(json.dumps({"type": "KeepAlive"}))
+            session.dg_outbox.put(json.dumps({"type": "KeepAlive"}))
             # logger.debug(f"Sent KeepAlive to Deepgram for session {session.session_id}")
             
             # Reschedule next KeepAlive
@@ -380,6 +376,22 @@ def send_keep_alive(session):
     else:
         stop_keep_alive(session)
 
+def finish_deepgram_connection(session):
+    """Finish the Deepgram connection on the provider I/O loop once queued audio is sent - never blocks"""
+    connection, outbox = session.dg_connection, session.dg_outbox
+    session.dg_connection = None
+    session.dg_outbox = None
+    if outbox and connection:
+        outbox.close(then=connection.finish)
+    elif connection:
+        get_provider_loop(session.session_id).submit(connection.finish(), name=f"deepgram-finish:{session.session_id}")
+
+def close_deepgram_connection(session):
+    """Stop timers and finish the Deepgram connection for a session"""
+    stop_silence_timer(session)
+    stop_keep_alive(session)
+    finish_deepgram_connection(session)
+
 # Language configuration dictionary
 LANGUAGES = {
     "English": ("nova-3", "en-US"),
@@ -401,17 +413,115 @@ LANGUAGES = {
     "Hindi-English": ("nova", "hi-Latn")
 }
 
+def deepgram_speech_end(result):
+    """
+    Where the speech of a Deepgram result ends in the audio stream
+    
+    Args:
+        result: LiveResultResponse
+    
+    Returns:
+        Seconds from the start of the stream: the end of the last word, else start + duration
+    """
+    words = getattr(result.channel.alternatives[0], "words", None)
+    if words:
+        return words[-1].end
+    start = getattr(result, "start", None)
+    duration = getattr(result, "duration", None)
+    if start is None or duration is None:
+        return None
+    return start + duration
+
+def deepgram_live_options(model, language_code):
+    """
+    Live transcription options for a language
+    
+    Args:
+        model: Deepgram model (from LANGUAGES)
+        language_code: Deepgram language code (from LANGUAGES)
+    
+    Returns:
+        LiveOptions
+    """
+    # Raw audio in the declared format (compressed browser audio is decoded first), so Deepgram
+    # doesn't have to detect it
+    audio_format = PROVIDER_AUDIO_FORMATS["Deepgram API"]
+    return LiveOptions(
+        model=model, 
+        language=language_code,
+        encoding=audio_format.encoding,
+        sample_rate=audio_format.sample_rate,
+        channels=audio_format.channels,
+        interim_results=DEEPGRAM_INTERIM_RESULTS,
+        endpointing=DEEPGRAM_ENDPOINTING_MS if DEEPGRAM_ENDPOINTING_MS.lower() != "false" else False,
+        utterance_end_ms=DEEPGRAM_UTTERANCE_END_MS if DEEPGRAM_INTERIM_RESULTS and DEEPGRAM_UTTERANCE_END_MS else None
+    )
+
+def attach_deepgram_connection(session, io_loop):
+    """Start sending on a session's started Deepgram connection (audio outbox and KeepAlives)"""
+    session.dg_timeline.reset()
+    session.dg_transcript.clear()
+    session.dg_outbox = AsyncOutbox(io_loop, session.dg_connection.send, name=f"deepgram:{session.session_id}")
+    
+    # Start KeepAlive mechanism
+    start_keep_alive(session)
+
+def open_warm_deepgram_connection(language_name, on_lost):
+    """
+    Start an idle Deepgram connection for the warm pool (see warm_pool.py)
+    
+    Args:
+        language_name: Language the connection is configured for (a LANGUAGES key)
+        on_lost: Called with the handle if the connection closes or fails while idle
+    
+    Returns:
+        Future resolving to (connection, io_loop) once started
+    """
+    if not deepgram:
+        raise ConnectionError("Deepgram client not initialized - API_KEY is missing")
+    model, language_code = LANGUAGES.get(language_name, LANGUAGES["English"])
+    connection = deepgram.listen.asyncwebsocket.v("1")
+    io_loop = get_provider_loop(f"deepgram-warm:{language_name}")
+    handle = (connection, io_loop)
+
+    # Registered for the connection's lifetime - on_lost ignores a connection that has been claimed
+    async def on_idle_close(self, close, **kwargs):
+        on_lost(handle)
+
+    async def on_idle_error(self, error, **kwargs):
+        on_lost(handle)
+
+    connection.on(LiveTranscriptionEvents.Close, on_idle_close)  # type: ignore[arg-type]
+    connection.on(LiveTranscriptionEvents.Error, on_idle_error)  # type: ignore[arg-type]
+
+    async def start():
+        if await connection.start(deepgram_live_options(model, language_code)) is False:
+            raise ConnectionError("Deepgram start() returned False")
+        return handle
+
+    future = io_loop.submit(start())
+    future.add_done_callback(lambda f: f.cancelled() and close_warm_deepgram_connection(handle))
+    return future
+
+def close_warm_deepgram_connection(handle):
+    connection, io_loop = handle
+    io_loop.submit(connection.finish(), name="deepgram-warm-finish")
+
+def keep_alive_warm_deepgram_connection(handle):
+    connection, io_loop = handle
+    io_loop.submit(connection.keep_alive(), name="deepgram-warm-keepalive")
+
+# Started Deepgram connections waiting for a session (WARM_POOL_SIZE > 0), keyed by language
+deepgram_warm_pool = get_warm_pool("Deepgram", open_warm_deepgram_connection, close_warm_deepgram_connection,
+                                   keep_alive_warm_deepgram_connection)
+
 def initialize_deepgram_connection(session, language_name="English"):
     logger.info(f"Initializing Deepgram connection for session {session.session_id} with language: {language_name}")
     
     # Close existing connection if any
     if session.dg_connection:
-        try:
-            logger.info(f"Closing existing Deepgram connection for session {session.session_id}")
-            session.dg_connection.finish()
-        except Exception as e:
-            logger.warning(f"Error closing existing connection for session {session.session_id}: {e}")
-        session.dg_connection = None
+        logger.info(f"Closing existing Deepgram connection for session {session.session_id}")
+        finish_deepgram_connection(session)
     
     # Reset performance tracking for new session
     session.reset_performance_metrics()
@@ -423,6 +533,7 @@ def initialize_deepgram_connection(session, language_name="English"):
         # Default to English if language not found
         model, language_code = LANGUAGES["English"]
         logger.warning(f"Language '{language_name}' not found, defaulting to English for session {session.session_id}")
+        language_name = "English"
     
     logger.info(f"Initializing Deepgram for session {session.session_id} with model: {model}, language: {language_code}")
     
@@ -431,32 +542,45 @@ def initialize_deepgram_connection(session, language_name="English"):
         logger.error(f"Deepgram client not initialized - API_KEY is missing for session {session.session_id}")
         return False
     
-    try:
-        connection =  deepgram.listen.live.v("1") #deepgram.listen.websocket.v("1")
-        logger.info(f"Deepgram Live connection object created successfully for session {session.session_id}")
-    except Exception as e:
-        logger.error(f"Failed to create Deepgram Live connection object for session {session.session_id}: {type(e).__name__}: {e}")
-        logger.exception("Full traceback:")
-        return False
+    # A pooled connection has already been started with this language's options
+    connect_start = time.perf_counter()
+    warm = deepgram_warm_pool.claim(language_name)
+    if warm:
+        connection, io_loop = warm
+        logger.info(f"Claimed a warm Deepgram connection for session {session.session_id}")
+    else:
+        try:
+            # asyncio client - runs on the shared provider I/O loop instead of its own listen/keep-alive threads
+            connection = deepgram.listen.asyncwebsocket.v("1")
+            logger.info(f"Deepgram Live connection object created successfully for session {session.session_id}")
+        except Exception as e:
+            logger.error(f"Failed to create Deepgram Live connection object for session {session.session_id}: {type(e).__name__}: {e}")
+            logger.exception("Full traceback:")
+            return False
     
-    # Type cast to help type checker understand this is a LiveClient
+    # Type cast to help type checker understand this is an AsyncListenWebSocketClient
     if TYPE_CHECKING:
-        from deepgram.clients import LiveClient
-        connection = cast('LiveClient', connection)
+        from deepgram.clients import AsyncListenWebSocketClient
+        connection = cast('AsyncListenWebSocketClient', connection)
     
     # Update session connection
     session.dg_connection = connection
 
     # Create callbacks with captured session, model and language_name values
-    def on_open(self, open, **kwargs):
+    # They run on the provider I/O loop and must not block
+    def mark_open(open):
         logger.info(f"Deepgram connection opened for session {session.session_id}: {open}")
         session.session_start_time = time.perf_counter()
-        performance_logger.info(f"SESSION_START | Session: {session.session_id} | Language: {language_name} | Model: {model} | Timestamp: {time.time()}")
+        performance_logger.info(MetricEvent(SESSION_START, session.session_id, provider="Deepgram", model=model, language=language_name))
         # NOTE: Silence timer is NOT started here - it will be started when first audio is received
         # This prevents false "silence timeout" messages when user hasn't started speaking yet
 
-    def on_message(self, result, **kwargs):
+    async def on_open(self, open, **kwargs):
+        mark_open(open)
+
+    async def on_message(self, result, **kwargs):
         transcript = result.channel.alternatives[0].transcript
+        is_final = bool(getattr(result, "is_final", True))
         if len(transcript) > 0:
             # Reset silence timer when transcription is received
             reset_silence_timer(session)
@@ -464,6 +588,13 @@ def initialize_deepgram_connection(session, language_name="English"):
             # Calculate time since session start and time since last transcription
             current_time = time.perf_counter()
             
+            # An interim result replaces the current segment until Deepgram finalises it
+            if is_final:
+                segment_id = session.dg_transcript.commit(transcript)
+            else:
+                segment_id = session.dg_transcript.set_partial(transcript)
+            update = session.dg_transcript.update_payload(segment_id, transcript.strip(), 'Deepgram API', is_final)
+            
             # Check if this is a late-arriving transcription after session ended (e.g., during reconnect)
             # This can happen when a reconnect triggers on_close which resets metrics,
             # but a transcription from the old connection still arrives
@@ -474,71 +605,104 @@ def initialize_deepgram_connection(session, language_name="English"):
                 )
                 # Still emit the transcription to the client (it's useful data)
                 # but skip performance logging since metrics would be invalid (0.00ms)
-                socketio.emit('transcription_update', {'transcription': transcript}, room=session.session_id)
+                transcript_emitter.emit('transcription_update', update, room=session.session_id)
                 return
             
-            time_since_start_ms = (current_time - session.session_start_time) * 1000
-            
-            # Calculate time since last transcription (response latency)
-            if session.last_transcription_time:
-                time_since_last_ms = (current_time - session.last_transcription_time) * 1000
+            # Only final results count as transcriptions - interim results are previews of the segment
+            if is_final:
+                time_since_start_ms = (current_time - session.session_start_time) * 1000
+                
+                # Calculate time since last transcription (response latency)
+                if session.last_transcription_time:
+                    time_since_last_ms = (current_time - session.last_transcription_time) * 1000
+                else:
+                    time_since_last_ms = 0
+                
+                # Calculate transcription response time (time from audio send to transcription received)
+                transcription_response_time_ms = (current_time - session.last_audio_send_time) * 1000
+                
+                session.transcription_count += 1
+                session.last_transcription_time = current_time
+                
+                # Speech end (its last word, else the end of the result's audio) to this final transcript
+                extra = None
+                speech_end_latency_ms = session.dg_timeline.latency_ms(deepgram_speech_end(result), now=current_time)
+                if speech_end_latency_ms is not None:
+                    latency_metrics.observe(SPEECH_END_TO_FINAL, "Deepgram", language_name, speech_end_latency_ms)
+                    extra = {"SpeechEndToFinal": f"{speech_end_latency_ms:.2f}ms"}
+                
+                # Log performance metrics with transcription response time
+                performance_logger.info(MetricEvent(
+                    TRANSCRIPTION, session.session_id, provider="Deepgram", model=model, language=language_name,
+                    count=session.transcription_count, response_time_ms=transcription_response_time_ms,
+                    time_since_start_ms=time_since_start_ms, time_since_last_ms=time_since_last_ms, text=transcript,
+                    extra=extra
+                ))
+                
+                logger.info(f"Deepgram received transcript for session {session.session_id}: {transcript}")
             else:
-                time_since_last_ms = 0
-            
-            # Calculate transcription response time (time from audio send to transcription received)
-            transcription_response_time_ms = (current_time - session.last_audio_send_time) * 1000
-            
-            session.transcription_count += 1
-            session.last_transcription_time = current_time
-            
-            # Log performance metrics with transcription response time
-            performance_logger.info(
-                f"TRANSCRIPTION | Session: {session.session_id} | Count: {session.transcription_count} | "
-                f"ResponseTime: {transcription_response_time_ms:.2f}ms | "
-                f"TimeSinceStart: {time_since_start_ms:.2f}ms | "
-                f"TimeSinceLast: {time_since_last_ms:.2f}ms | "
-                f"Text: \"{transcript}\""
-            )
-            
-            logger.info(f"Deepgram received transcript for session {session.session_id}: {transcript}")
+                logger.debug(f"Deepgram interim transcript for session {session.session_id}: {transcript}")
             # Send transcription ONLY to the specific user who is speaking
-            socketio.emit('transcription_update', {'transcription': transcript}, room=session.session_id)
+            if session.compare_race:
+                session.compare_race.observe("Deepgram API", transcript, is_final, now=current_time)
+            transcript_emitter.emit('transcription_update', update, room=session.session_id)
+
+    async def on_utterance_end(self, utterance_end, **kwargs):
+        # Word gap of utterance_end_ms - the end of the utterance even when endpointing missed it in noise
+        last_word_end = getattr(utterance_end, "last_word_end", None)
+        logger.debug(f"Deepgram utterance end for session {session.session_id} (last word end: {last_word_end}s)")
+        if session.dg_transcript.partial:
+            logger.info(f"Deepgram utterance ended with an interim result still open for session {session.session_id}: "
+                        f"{session.dg_transcript.partial}")
 
-    def on_close(self, close, **kwargs):
+    async def on_close(self, close, **kwargs):
         logger.info(f"Deepgram connection closed for session {session.session_id}: {close}")
         # Stop silence timer when connection closes
         stop_silence_timer(session)
         stop_keep_alive(session)
         if session.session_start_time:
             session_duration_ms = (time.perf_counter() - session.session_start_time) * 1000
-            performance_logger.info(
-                f"SESSION_END | Session: {session.session_id} | TotalDuration: {session_duration_ms:.2f}ms | "
-                f"TotalTranscriptions: {session.transcription_count}"
-            )
+            performance_logger.info(MetricEvent(
+                SESSION_END, session.session_id, provider="Deepgram", model=model, language=language_name,
+                duration_ms=session_duration_ms, count=session.transcription_count
+            ))
             session.session_start_time = None
             session.transcription_count = 0
             session.last_transcription_time = None
             session.last_audio_send_time = None
 
-    def on_error(self, error, **kwargs):
+    async def on_error(self, error, **kwargs):
         logger.error(f"Deepgram connection error for session {session.session_id}: {error}")
         performance_logger.error(f"ERROR | Session: {session.session_id} | Message: {error}")
 
     connection.on(LiveTranscriptionEvents.Open, on_open)  # type: ignore[arg-type]
     connection.on(LiveTranscriptionEvents.Transcript, on_message)  # type: ignore[arg-type]
+    connection.on(LiveTranscriptionEvents.UtteranceEnd, on_utterance_end)  # type: ignore[arg-type]
     connection.on(LiveTranscriptionEvents.Close, on_close)  # type: ignore[arg-type]
     connection.on(LiveTranscriptionEvents.Error, on_error)  # type: ignore[arg-type]
     
-    # Define the options for the live transcription
-    options = LiveOptions(
-        model=model, 
-        language=language_code
-    )
+    if warm:
+        # The pooled connection opened before these callbacks were registered
+        mark_open("warm pool")
+        latency_metrics.observe(CONNECTION_SETUP, "Deepgram", language_name, (time.perf_counter() - connect_start) * 1000)
+        attach_deepgram_connection(session, io_loop)
+        return True
+    
+    options = deepgram_live_options(model, language_code)
     
     try:
         logger.info(f"Attempting to start Deepgram Live connection for session {session.session_id}...")
         logger.info(f"API Key present: {bool(API_KEY)}, Length: {len(API_KEY) if API_KEY else 0}")
-        if connection.start(options) is False:
+        io_loop = get_provider_loop(session.session_id)
+        start_future = io_loop.submit(connection.start(options))
+        try:
+            started = start_future.result(timeout=PROVIDER_OPEN_TIMEOUT_SEC + 5)
+        except FuturesTimeoutError:
+            start_future.cancel()
+            logger.error(f"Timed out starting Deepgram connection for session {session.session_id}")
+            session.dg_connection = None
+            return False
+        if started is False:
             logger.error(f"Failed to start Deepgram connection for session {session.session_id} - start() returned False")
             logger.error("This could be due to:")
             logger.error("1. Invalid API key")
@@ -549,10 +713,12 @@ def initialize_deepgram_connection(session, language_name="English"):
             return False
         
         logger.info(f"Deepgram connection started successfully for session {session.session_id}")
-        
-        # Start KeepAlive mechanism
-        start_keep_alive(session)
-        
+        latency_metrics.observe(CONNECTION_SETUP, "Deepgram", language_name, (time.perf_counter() - connect_start) * 1000)
+        if session.dg_connection is not connection:
+            # Replaced or closed while starting
+            io_loop.submit(connection.finish(), name=f"deepgram-finish:{session.session_id}")
+            return False
+        attach_deepgram_connection(session, io_loop)
         return True
     except Exception as e:
         logger.error(f"Exception while starting Deepgram connection for session {session.session_id}: {type(e).__name__}: {e}")
@@ -566,6 +732,17 @@ def index():
     logger.info("Serving index page")
     return render_template('index.html')
 
+@app.route('/metrics')
+def metrics():
+    """Provider latency histograms and audio/transcript counters in Prometheus text format"""
+    return Response(latency_metrics.prometheus_text() + vad_savings.prometheus_text() + transcript_emitter.prometheus_text()
+                    + audio_decode_pool.stats.prometheus_text() + warm_pool_prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/latency')
+def metrics_latency():
+    """Provider latency p50/p90/p99 per metric, provider and language as JSON"""
+    return jsonify({"series": latency_metrics.snapshot()})
+
 # Store current API provider for audio routing - now per session
 @socketio.on('audio_stream')
 def handle_audio_stream(data):
@@ -575,13 +752,42 @@ def handle_audio_stream(data):
     """
     # Get user session
     session = get_user_session(request.sid)
+    # When the frame's last sample was captured (perf_counter) - its arrival unless the frame says
+    captured_at = None
     
     # Extract audio bytes
-    # The browser sends audio as ArrayBuffer/bytes directly
-    if isinstance(data, bytes):
-        audio_bytes = data
-    elif isinstance(data, bytearray):
-        audio_bytes = bytes(data)
+    # The browser sends framed audio (see audio_framing.py) or, from older clients, raw PCM16
+    # or un-framed MediaRecorder WebM chunks
+    if isinstance(data, (bytes, bytearray)):
+        try:
+            frame = parse_audio_frame(data)
+        except ValueError as e:
+            logger.warning(f"Dropping audio frame for session {session.session_id}: {e}")
+            return
+        if frame is None:
+            codec = session.compressed_codec or sniff_codec(data)
+            if codec:
+                decode_audio(session, data, codec, time.perf_counter())
+                return
+            audio_bytes = bytes(data) if isinstance(data, bytearray) else data
+        else:
+            if not session.audio_frames.observe(frame):
+                logger.debug(f"Dropping late audio frame {frame.seq} for session {session.session_id}")
+                return
+            if frame.has_capture_time:
+                captured_at = session.audio_frames.capture_time(frame.capture_ms)
+            if frame.codec in (CODEC_OPUS_WEBM, CODEC_OPUS_OGG):
+                if frame.seq == 0:
+                    # First frame of a recording: a new container stream, header first
+                    session.decode_reset = True
+                decode_audio(session, frame.payload, frame.codec, captured_at or time.perf_counter())
+                return
+            if frame.codec != CODEC_PCM16 or frame.sample_rate != 24000:
+                logger.warning(f"Unsupported audio frame format for session {session.session_id}: "
+                               f"codec {frame.codec}, {frame.sample_rate}Hz")
+                return
+            # A view into the message - the audio is not copied on the way to the providers
+            audio_bytes = frame.payload
     elif isinstance(data, dict):
         # If data is a dict, try to get audio bytes
         audio_bytes = data.get("audio")
@@ -598,11 +804,155 @@ def handle_audio_stream(data):
             logger.error(f"Error converting audio data to bytes for session {session.session_id}: {e}")
             return
     
+    process_audio(session, audio_bytes, captured_at)
+
+def process_audio(session, audio_bytes, captured_at=None):
+    """
+    Record, gate and route one frame of PCM16 24kHz audio to the session's providers
+    
+    Args:
+        session: UserSession the audio belongs to
+        audio_bytes: PCM16 24kHz mono audio (received, or decoded from the browser's Opus)
+        captured_at: perf_counter() time its last sample was captured (default: now)
+    """
+    # Capture the inbound audio for replay (only enqueues - the recorder writes in the background)
+    audio_recorder.write(session.session_id, audio_bytes)
+    
     # Route audio to appropriate API based on current provider for this session
-    if session.current_api_provider == "Azure OpenAI":
+    if session.current_api_provider == COMPARE_API:
+        # Fan the frame out to every provider in the session. Each send only enqueues, so the
+        # providers receive it concurrently; each conversion runs once per frame
+        api_providers = session.compare_providers
+    else:
+        api_providers = [session.current_api_provider]
+    
+    frames = [audio_bytes]
+    if session.vad_gate:
+        # Only speech (plus pre-roll and hangover padding) goes to the providers
+        was_open = session.vad_gate.is_open
+        frames = session.vad_gate.process(audio_bytes)
+        if not frames:
+            note_gated_audio(session, api_providers, len(audio_bytes), gate_closed=was_open)
+            return
+    
+    if captured_at is None:
+        captured_at = time.perf_counter()
+    # Pre-roll frames released by the gate were captured before this one, back to back
+    pending_bytes = sum(len(frame) for frame in frames)
+    for frame in frames:
+        pending_bytes -= len(frame)
+        frame_captured_at = captured_at - pending_bytes / BROWSER_BYTES_PER_SECOND
+        converted = session.audio_pipeline.process(frame, api_providers)
+        for api_provider in api_providers:
+            if session.vad_gate:
+                vad_savings.record(api_provider, forwarded=len(converted[api_provider]))
+            route_audio(session, api_provider, converted[api_provider], frame_captured_at)
+
+def decode_audio(session, data, codec, captured_at):
+    """
+    Queue a chunk of the session's compressed audio stream for decoding; the decoded PCM is
+    processed like received PCM once the worker returns it
+    
+    Args:
+        session: UserSession the audio belongs to
+        data: Container bytes (the next piece of the recording's WebM / Ogg stream)
+        codec: CODEC_OPUS_WEBM or CODEC_OPUS_OGG
+        captured_at: perf_counter() time the chunk's last sample was captured
+    """
+    if not OPUS_AVAILABLE:
+        if session.compressed_codec is None:
+            logger.warning(f"Dropping {CODEC_NAMES.get(codec, codec)} audio for session {session.session_id} - "
+                           f"opuslib is not installed")
+        session.compressed_codec = codec
+        return
+    session.compressed_codec = codec
+    reset, session.decode_reset = session.decode_reset, False
+    future = audio_decode_pool.decode(session.session_id, data, codec, reset=reset)
+    # Runs on the pool's result thread, in chunk order
+    future.add_done_callback(lambda f: on_audio_decoded(session, f, captured_at))
+
+def on_audio_decoded(session, future, captured_at):
+    """Feed decoded audio into the normal PCM path"""
+    try:
+        pcm, cpu_seconds = future.result()
+    except Exception as e:
+        # A broken stream fails every chunk after it - warn once per recording
+        if not session.decode_errors:
+            logger.warning(f"Failed to decode {CODEC_NAMES.get(session.compressed_codec, session.compressed_codec)} "
+                           f"audio for session {session.session_id}: {e}")
+        session.decode_errors += 1
+        return
+    session.decode_audio_sec += len(pcm) / BROWSER_BYTES_PER_SECOND
+    session.decode_cpu_sec += cpu_seconds
+    if pcm:
+        process_audio(session, pcm, captured_at)
+
+def log_audio_decode(session):
+    """Log the decode cost of the recording that ended (compressed audio only), then start counting afresh"""
+    audio_sec, cpu_sec, errors = session.decode_audio_sec, session.decode_cpu_sec, session.decode_errors
+    session.decode_audio_sec = 0.0
+    session.decode_cpu_sec = 0.0
+    session.decode_errors = 0
+    if audio_sec <= 0 and not errors:
+        return
+    cost_ms = cpu_sec * 1000 / audio_sec if audio_sec > 0 else 0.0
+    performance_logger.info(
+        f"AUDIO_DECODE | Session: {session.session_id} | Codec: {CODEC_NAMES.get(session.compressed_codec)} | "
+        f"Audio: {audio_sec:.2f}s | DecodeCPU: {cpu_sec * 1000:.2f}ms | "
+        f"CostPerAudioSec: {cost_ms:.2f}ms | Errors: {errors}"
+    )
+
+def log_audio_frames(session):
+    """Log frame loss and uplink delay of the recording that ended, then start counting afresh"""
+    stats = session.audio_frames.summary()
+    if not stats["frames"]:
+        return
+    session.audio_frames.reset()
+    uplink = ""
+    if stats["uplink_p50_ms"] is not None:
+        uplink = f" | UplinkP50: {stats['uplink_p50_ms']:.2f}ms | UplinkP99: {stats['uplink_p99_ms']:.2f}ms"
+    performance_logger.info(
+        f"AUDIO_FRAMES | Session: {session.session_id} | Frames: {stats['frames']} | "
+        f"Missing: {stats['missing']} | Late: {stats['late']}{uplink}"
+    )
+
+def note_gated_audio(session, api_providers, browser_bytes, gate_closed):
+    """
+    Account for a frame the VAD gate withheld
+    
+    Args:
+        session: UserSession the audio belongs to
+        api_providers: Providers that would have received the frame
+        browser_bytes: Size of the withheld frame
+        gate_closed: True if the gate closed on this frame (speech just ended)
+    """
+    for api_provider in api_providers:
+        vad_savings.record(api_provider, saved=session.audio_pipeline.output_bytes(api_provider, browser_bytes))
+        if api_provider == "ElevenLabs ScribeV2":
+            note_elevenlabs_gated_audio(session.session_id)
+        elif api_provider != "Azure OpenAI" and session.dg_outbox:
+            # Deepgram: the silence timeout still counts from the first audio, and KeepAlive
+            # holds the connection open while no audio flows (re-armed every KEEP_ALIVE_INTERVAL_SEC)
+            if not session.silence_timer_started:
+                reset_silence_timer(session)
+            if gate_closed:
+                send_keep_alive(session)
+
+def route_audio(session, api_provider, audio_bytes, captured_at=None):
+    """
+    Send one inbound audio frame to a provider connection of the session
+    
+    Args:
+        session: UserSession the audio belongs to
+        api_provider: "Deepgram API", "Azure OpenAI" or "ElevenLabs ScribeV2"
+        audio_bytes: Audio in the provider's format (PROVIDER_AUDIO_FORMATS)
+        captured_at: perf_counter() time its last sample was captured (default: now), for the
+            provider's audio timeline
+    """
+    if api_provider == "Azure OpenAI":
         if AZURE_OPENAI_AVAILABLE:
             # Note: Azure OpenAI expects PCM16 format at 24kHz
-            success = send_audio_to_azure_openai(audio_bytes, session.session_id)
+            success = send_audio_to_azure_openai(audio_bytes, session.session_id, captured_at)
             if success:
                 logger.debug(f"✅ Audio stream data sent to Azure OpenAI for session {session.session_id} ({len(audio_bytes)} bytes)")
             else:
@@ -610,20 +960,18 @@ def handle_audio_stream(data):
                 logger.debug(f"⏳ Audio not sent yet - Azure OpenAI connection establishing for session {session.session_id} ({len(audio_bytes)} bytes)")
         else:
             logger.warning(f"Audio stream received but Azure OpenAI is not available for session {session.session_id}")
-    elif session.current_api_provider == "ElevenLabs ScribeV2":
+    elif api_provider == "ElevenLabs ScribeV2":
         if ELEVENLABS_AVAILABLE:
-            # ElevenLabs expects PCM16 format at 16kHz - need to resample from 24kHz
-            # The browser sends 24kHz, ElevenLabs needs 16kHz
-            resampled_audio = resample_audio_24k_to_16k(audio_bytes)
-            success = send_audio_to_elevenlabs(resampled_audio, session.session_id)
+            # Already resampled to 16kHz by the session's audio pipeline
+            success = send_audio_to_elevenlabs(audio_bytes, session.session_id, captured_at)
             if success:
-                logger.debug(f"✅ Audio stream data sent to ElevenLabs for session {session.session_id} ({len(resampled_audio)} bytes)")
+                logger.debug(f"✅ Audio stream data sent to ElevenLabs for session {session.session_id} ({len(audio_bytes)} bytes)")
             else:
                 logger.debug(f"⏳ Audio not sent yet - ElevenLabs connection establishing for session {session.session_id} ({len(audio_bytes)} bytes)")
         else:
             logger.warning(f"Audio stream received but ElevenLabs is not available for session {session.session_id}")
     else:  # Default to Deepgram API
-        if session.dg_connection:
+        if session.dg_outbox:
             try:
                 # Start silence timer on first audio (if not already started)
                 # Timer is only RESET when transcription is received (indicating speech)
@@ -632,13 +980,146 @@ def handle_audio_stream(data):
                     reset_silence_timer(session)
                 # Track when audio is sent to Deepgram for response time calculation
                 session.last_audio_send_time = time.perf_counter()
-                session.dg_connection.send(audio_bytes)
+                session.dg_outbox.put(audio_bytes)
+                session.dg_timeline.record(len(audio_bytes), captured_at)
                 logger.debug(f"Audio stream data sent to Deepgram for session {session.session_id} ({len(audio_bytes)} bytes)")
             except Exception as e:
                 logger.error(f"Error sending audio data to Deepgram for session {session.session_id}: {e}")
         else:
             logger.warning(f"Audio stream received but Deepgram connection is not initialized for session {session.session_id}")
 
+def close_provider_connection(session, api_provider):
+    """Close a session's connection to one provider (flushing any final transcript)"""
+    if api_provider == "Azure OpenAI":
+        logger.info(f"Stopping Azure OpenAI connection for session {session.session_id}")
+        close_azure_openai_connection(session.session_id)
+    elif api_provider == "ElevenLabs ScribeV2":
+        logger.info(f"Stopping ElevenLabs connection for session {session.session_id}")
+        if ELEVENLABS_AVAILABLE:
+            close_elevenlabs_connection(session.session_id)
+    else:  # Default to Deepgram API
+        logger.info(f"Stopping Deepgram connection for session {session.session_id}")
+        # Stop silence timer when manually stopping
+        stop_silence_timer(session)
+        # Stop keep alive connection
+        stop_keep_alive(session)
+        if session.dg_connection:
+            finish_deepgram_connection(session)
+            logger.info(f"Deepgram connection finished for session {session.session_id}")
+
+def compare_provider_available(api_provider):
+    """Whether a provider's handler is importable and its API key is configured"""
+    if api_provider == "Azure OpenAI":
+        return AZURE_OPENAI_AVAILABLE and bool(os.getenv("AZURE_OPENAI_API_KEY"))
+    if api_provider == "ElevenLabs ScribeV2":
+        return ELEVENLABS_AVAILABLE and bool(os.getenv("ELEVENLABS_API_KEY"))
+    return bool(API_KEY)
+
+def report_compare_race(session, language_name, utterance, results):
+    """Log one decided compare-mode utterance race and send it to the client"""
+    for result in results:
+        if result["rank"] is None:
+            performance_logger.info(MetricEvent(
+                COMPARE_RACE, session.session_id, provider=result["api"], language=language_name,
+                count=utterance, reason="No final transcript"
+            ))
+            continue
+        performance_logger.info(MetricEvent(
+            COMPARE_RACE, session.session_id, provider=result["api"], language=language_name,
+            count=utterance, text=result["text"], extra={
+                "Rank": result["rank"],
+                "FirstUpdate": f"{result['first_update_ms']:.2f}ms",
+                "Final": f"{result['final_ms']:.2f}ms",
+                "BehindWinner": f"{result['behind_winner_ms']:.2f}ms",
+            }
+        ))
+    logger.info(f"🏁 COMPARE_RACE | Session: {session.session_id} | Utterance: {utterance} | Winner: {results[0]['api']}")
+    socketio.emit('compare_race', {'utterance': utterance, 'results': results}, room=session.session_id)
+
+def start_compare_mode(session, language_name, requested_providers=None):
+    """
+    Connect a session to every available provider at once (compare mode)
+    
+    Args:
+        session: UserSession to stream from
+        language_name: Language selected in the browser
+        requested_providers: Optional subset of COMPARE_PROVIDERS to use
+    """
+    cancel_connection_retry(session)
+    stop_compare_mode(session)
+    providers = [api for api in COMPARE_PROVIDERS
+                 if (not requested_providers or api in requested_providers) and compare_provider_available(api)]
+    if not providers:
+        socketio.emit('transcription_status', {
+            'status': 'error',
+            'message': 'Compare mode needs at least one configured provider'
+        }, room=session.session_id)
+        return
+    
+    logger.info(f"Starting compare mode for session {session.session_id} with {', '.join(providers)} (language: {language_name})")
+    race = UtteranceRace(session.session_id, providers,
+                         lambda utterance, results: report_compare_race(session, language_name, utterance, results))
+    session.compare_providers = list(providers)
+    session.compare_race = race
+    session.audio_pipeline.reset(providers)
+    for api_provider in providers:
+        start_compare_provider(session, api_provider, language_name, race)
+
+def start_compare_provider(session, api_provider, language_name, race):
+    """Connect one provider of a compare session in the background, alongside the others"""
+    tagged_socketio = ProviderTaggedSocketIO(transcript_emitter, api_provider, race)
+    
+    def on_failure():
+        # Stop waiting for this provider in the race and stop routing audio to it
+        race.remove(api_provider)
+        session.compare_providers = [api for api in session.compare_providers if api != api_provider]
+        tagged_socketio.emit('transcription_status', {
+            'status': 'error',
+            'message': f'Failed to start {api_provider} connection after {STT_RETRY_COUNT + 1} attempts'
+        }, room=session.session_id)
+    
+    if api_provider == "Azure OpenAI":
+        start_connection_retry(
+            session,
+            lambda: initialize_azure_openai_connection(tagged_socketio, language_name, session.session_id),
+            service_name="Azure OpenAI",
+            on_success=lambda: tagged_socketio.emit('transcription_status', {'status': 'started'}, room=session.session_id),
+            on_failure=on_failure,
+            on_abandon=lambda: close_azure_openai_connection(session.session_id),
+            alongside=True
+        )
+    elif api_provider == "ElevenLabs ScribeV2":
+        # transcription_status 'started' is emitted by the handler when the session starts
+        start_connection_retry(
+            session,
+            lambda: initialize_elevenlabs_connection(tagged_socketio, language_name, session.session_id),
+            service_name="ElevenLabs",
+            on_success=lambda: logger.info(f"ElevenLabs connection initialization started for session {session.session_id}"),
+            on_failure=on_failure,
+            on_abandon=lambda: close_elevenlabs_connection(session.session_id),
+            alongside=True
+        )
+    else:  # Deepgram API - transcripts reach the race from on_message via session.compare_race
+        start_connection_retry(
+            session,
+            lambda: initialize_deepgram_connection(session, language_name),
+            service_name="Deepgram",
+            on_success=lambda: tagged_socketio.emit('transcription_status', {'status': 'started', 'language': language_name}, room=session.session_id),
+            on_failure=on_failure,
+            on_abandon=lambda: close_deepgram_connection(session),
+            alongside=True
+        )
+
+def stop_compare_mode(session):
+    """Close every compare-mode connection, then report utterances not all providers finalised"""
+    providers, session.compare_providers = session.compare_providers, []
+    for api_provider in providers:
+        close_provider_connection(session, api_provider)
+    # Closing flushes final transcripts into the race, so only drop it afterwards
+    race, session.compare_race = session.compare_race, None
+    if race:
+        race.flush()
+
 @socketio.on('toggle_transcription')
 def handle_toggle_transcription(data):
     # Get user session
@@ -653,7 +1134,19 @@ def handle_toggle_transcription(data):
     session.current_api_provider = api_provider
     
     if action == "start":
-        if api_provider == "Azure OpenAI":
+        audio_recorder.start(session.session_id, api_provider, language_name)
+        if session.vad_gate:
+            session.vad_gate.reset()
+        encoder = transcript_socketio.encoder(session.session_id)
+        if encoder:
+            encoder.reset()
+        session.audio_frames.reset()
+        # A new recording sends a new container stream (header first)
+        session.compressed_codec = None
+        session.decode_reset = True
+        if api_provider == COMPARE_API:
+            start_compare_mode(session, language_name, data.get("providers"))
+        elif api_provider == "Azure OpenAI":
             if not AZURE_OPENAI_AVAILABLE:
                 socketio.emit('transcription_status', {
                     'status': 'error',
@@ -663,22 +1156,18 @@ def handle_toggle_transcription(data):
             
             logger.info(f"Starting Azure OpenAI connection for session {session.session_id} with language: {language_name}")
             
-            # Use retry with exponential backoff
-            success = retry_with_backoff(
-                lambda: initialize_azure_openai_connection(socketio, language_name, session.session_id),
-                max_retries=STT_RETRY_COUNT,
-                session_id=session.session_id,
+            # Connect in the background with retry and exponential backoff
+            start_connection_retry(
+                session,
+                lambda: initialize_azure_openai_connection(transcript_emitter, language_name, session.session_id),
                 service_name="Azure OpenAI",
-                socketio_instance=socketio
-            )
-            
-            if success:
-                socketio.emit('transcription_status', {'status': 'started', 'api': 'Azure OpenAI'}, room=session.session_id)
-            else:
-                socketio.emit('transcription_status', {
+                on_success=lambda: socketio.emit('transcription_status', {'status': 'started', 'api': 'Azure OpenAI'}, room=session.session_id),
+                on_failure=lambda: socketio.emit('transcription_status', {
                     'status': 'error',
                     'message': f'Failed to start Azure OpenAI connection after {STT_RETRY_COUNT + 1} attempts'
-                }, room=session.session_id)
+                }, room=session.session_id),
+                on_abandon=lambda: close_azure_openai_connection(session.session_id)
+            )
         elif api_provider == "ElevenLabs ScribeV2":
             if not ELEVENLABS_AVAILABLE:
                 socketio.emit('transcription_status', {
@@ -696,24 +1185,21 @@ def handle_toggle_transcription(data):
                 return
             
             logger.info(f"Starting ElevenLabs connection for session {session.session_id} with language: {language_name}")
+            session.audio_pipeline.reset(["ElevenLabs ScribeV2"])
             
-            # Use retry with exponential backoff
-            success = retry_with_backoff(
-                lambda: initialize_elevenlabs_connection(socketio, language_name, session.session_id),
-                max_retries=STT_RETRY_COUNT,
-                session_id=session.session_id,
+            # Connect in the background with retry and exponential backoff
+            # Note: transcription_status 'started' is emitted by the handler when session starts
+            start_connection_retry(
+                session,
+                lambda: initialize_elevenlabs_connection(transcript_emitter, language_name, session.session_id),
                 service_name="ElevenLabs",
-                socketio_instance=socketio
-            )
-            
-            if success:
-                # Note: transcription_status 'started' is emitted by the handler when session starts
-                logger.info(f"ElevenLabs connection initialization started for session {session.session_id}")
-            else:
-                socketio.emit('transcription_status', {
+                on_success=lambda: logger.info(f"ElevenLabs connection initialization started for session {session.session_id}"),
+                on_failure=lambda: socketio.emit('transcription_status', {
                     'status': 'error',
                     'message': f'Failed to start ElevenLabs connection after {STT_RETRY_COUNT + 1} attempts'
-                }, room=session.session_id)
+                }, room=session.session_id),
+                on_abandon=lambda: close_elevenlabs_connection(session.session_id)
+            )
         else:  # Default to Deepgram API
             if not API_KEY:
                 socketio.emit('transcription_status', {
@@ -724,48 +1210,46 @@ def handle_toggle_transcription(data):
             
             logger.info(f"Starting Deepgram connection for session {session.session_id} with language: {language_name}")
             
-            # Use retry with exponential backoff
-            success = retry_with_backoff(
+            # Connect in the background with retry and exponential backoff
+            start_connection_retry(
+                session,
                 lambda: initialize_deepgram_connection(session, language_name),
-                max_retries=STT_RETRY_COUNT,
-                session_id=session.session_id,
                 service_name="Deepgram",
-                socketio_instance=socketio
+                on_success=lambda: socketio.emit('transcription_status', {'status': 'started', 'language': language_name, 'api': 'Deepgram API'}, room=session.session_id),
+                on_failure=lambda: socketio.emit('transcription_status', {'status': 'error', 'message': f'Failed to start Deepgram connection after {STT_RETRY_COUNT + 1} attempts'}, room=session.session_id),
+                on_abandon=lambda: close_deepgram_connection(session)
             )
-            
-            if success:
-                socketio.emit('transcription_status', {'status': 'started', 'language': language_name, 'api': 'Deepgram API'}, room=session.session_id)
-            else:
-                socketio.emit('transcription_status', {'status': 'error', 'message': f'Failed to start Deepgram connection after {STT_RETRY_COUNT + 1} attempts'}, room=session.session_id)
     
     elif action == "stop":
-        if api_provider == "Azure OpenAI":
-            logger.info(f"Stopping Azure OpenAI connection for session {session.session_id}")
-            close_azure_openai_connection(session.session_id)
-            socketio.emit('transcription_status', {'status': 'stopped'}, room=session.session_id)
-        elif api_provider == "ElevenLabs ScribeV2":
-            logger.info(f"Stopping ElevenLabs connection for session {session.session_id}")
-            if ELEVENLABS_AVAILABLE:
-                close_elevenlabs_connection(session.session_id)
-            socketio.emit('transcription_status', {'status': 'stopped'}, room=session.session_id)
-        else:  # Default to Deepgram API
-            logger.info(f"Stopping Deepgram connection for session {session.session_id}")
-            # Stop silence timer when manually stopping
-            stop_silence_timer(session)
-            # Stop keep alive connection
-            stop_keep_alive(session)
-            if session.dg_connection:
-                try:
-                    session.dg_connection.finish()
-                    logger.info(f"Deepgram connection finished for session {session.session_id}")
-                except Exception as e:
-                    logger.error(f"Error finishing Deepgram connection for session {session.session_id}: {e}")
-            socketio.emit('transcription_status', {'status': 'stopped'}, room=session.session_id)
+        # A stop supersedes any connection still being established
+        cancel_connection_retry(session)
+        audio_recorder.stop(session.session_id)
+        if session.vad_gate and session.vad_gate.bytes_in:
+            gate = session.vad_gate
+            logger.info(f"🔇 VAD_GATE | Session: {session.session_id} | Forwarded: {gate.bytes_forwarded} bytes | "
+                        f"Saved: {gate.bytes_saved} bytes ({100.0 * gate.bytes_saved / gate.bytes_in:.1f}%)")
+        log_audio_frames(session)
+        log_audio_decode(session)
+        if api_provider == COMPARE_API:
+            stop_compare_mode(session)
+        else:
+            close_provider_connection(session, api_provider)
+        socketio.emit('transcription_status', {'status': 'stopped'}, room=session.session_id)
 
 @socketio.on('connect')
-def server_connect():
+def server_connect(auth=None):
     session = get_user_session(request.sid)
-    logger.info(f'Client connected to SocketIO - Session ID: {session.session_id}')
+    protocol = negotiate_protocol(auth)
+    transcript_socketio.set_protocol(session.session_id, protocol)
+    logger.info(f'Client connected to SocketIO - Session ID: {session.session_id} | Transcript protocol: {protocol}')
+    socketio.emit('transcript_protocol', {'version': protocol}, room=session.session_id)
+    socketio.emit('audio_formats', {'codecs': [CODEC_NAMES[codec] for codec in ACCEPTED_AUDIO_CODECS]}, room=session.session_id)
+
+@socketio.on('transcription_resync')
+def transcription_resync(data=None):
+    # Client missed transcription_delta events - send it the full transcripts
+    logger.info(f'Transcript resync requested for session {request.sid}')
+    transcript_socketio.resync(request.sid)
 
 @socketio.on('disconnect')
 def server_disconnect():
@@ -776,17 +1260,19 @@ def server_disconnect():
     session = get_user_session(session_id)
     
     # Clean up session-specific connections when client disconnects
+    cancel_connection_retry(session)
     stop_silence_timer(session)
     stop_keep_alive(session)
+    audio_recorder.stop(session_id)
+    log_audio_frames(session)
+    log_audio_decode(session)
+    if session.compressed_codec and OPUS_AVAILABLE:
+        audio_decode_pool.close_stream(session_id)
     
     # Clean up Deepgram connection
     if session.dg_connection:
-        try:
-            logger.info(f'Closing Deepgram connection on client disconnect for session {session_id}')
-            session.dg_connection.finish()
-        except Exception as e:
-            logger.error(f"Error closing Deepgram connection on disconnect for session {session_id}: {e}")
-        session.dg_connection = None
+        logger.info(f'Closing Deepgram connection on client disconnect for session {session_id}')
+        finish_deepgram_connection(session)
     
     # Clean up Azure OpenAI connection
     if AZURE_OPENAI_AVAILABLE:
@@ -804,7 +1290,14 @@ def server_disconnect():
         except Exception as e:
             logger.error(f"Error closing ElevenLabs connection on disconnect for session {session_id}: {e}")
     
+    # Report compare-mode utterances that were still in progress
+    if session.compare_race:
+        session.compare_race.flush()
+        session.compare_race = None
+    
     # Clean up user session
+    transcript_emitter.remove(session_id)
+    transcript_socketio.remove(session_id)
     cleanup_user_session(session_id)
 
 @socketio.on('restart_deepgram')
@@ -818,7 +1311,7 @@ def restart_deepgram(data):
 def reconnect_transcription(data):
     """
     Handle reconnection request from frontend when transcription timeout is detected.
-    This uses retry with exponential backoff for seamless recovery.
+    This uses retry with exponential backoff for seamless recovery; attempts run in the background.
     """
     session = get_user_session(request.sid)
     api_provider = data.get("api", session.current_api_provider) if data else session.current_api_provider
@@ -833,7 +1326,11 @@ def reconnect_transcription(data):
         'message': f'Reconnecting to {api_provider}...'
     }, room=session.session_id)
     
-    if api_provider == "Azure OpenAI":
+    if api_provider == COMPARE_API:
+        # Reconnect every provider of the compare session
+        start_compare_mode(session, language_name, data.get("providers") if data else None)
+    
+    elif api_provider == "Azure OpenAI":
         if not AZURE_OPENAI_AVAILABLE:
             socketio.emit('transcription_status', {
                 'status': 'error',
@@ -842,26 +1339,29 @@ def reconnect_transcription(data):
             return
         
         # Close existing connection first
+        cancel_connection_retry(session)
         close_azure_openai_connection(session.session_id)
         
-        # Retry connection with backoff
-        success = retry_with_backoff(
-            lambda: initialize_azure_openai_connection(socketio, language_name, session.session_id),
-            max_retries=STT_RETRY_COUNT,
-            session_id=session.session_id,
-            service_name="Azure OpenAI",
-            socketio_instance=socketio
-        )
-        
-        if success:
+        def on_azure_reconnected():
             logger.info(f'✅ RECONNECT_SUCCESS | Session: {session.session_id} | Provider: Azure OpenAI')
             socketio.emit('transcription_status', {'status': 'started', 'api': 'Azure OpenAI'}, room=session.session_id)
-        else:
+        
+        def on_azure_reconnect_failed():
             logger.error(f'❌ RECONNECT_FAILED | Session: {session.session_id} | Provider: Azure OpenAI')
             socketio.emit('transcription_status', {
                 'status': 'error',
                 'message': f'Failed to reconnect to Azure OpenAI after {STT_RETRY_COUNT + 1} attempts'
             }, room=session.session_id)
+        
+        # Retry connection with backoff in the background
+        start_connection_retry(
+            session,
+            lambda: initialize_azure_openai_connection(transcript_emitter, language_name, session.session_id),
+            service_name="Azure OpenAI",
+            on_success=on_azure_reconnected,
+            on_failure=on_azure_reconnect_failed,
+            on_abandon=lambda: close_azure_openai_connection(session.session_id)
+        )
     
     elif api_provider == "ElevenLabs ScribeV2":
         if not ELEVENLABS_AVAILABLE:
@@ -872,25 +1372,29 @@ def reconnect_transcription(data):
             return
         
         # Close existing connection first
+        cancel_connection_retry(session)
         close_elevenlabs_connection(session.session_id)
+        session.audio_pipeline.reset(["ElevenLabs ScribeV2"])
         
-        # Retry connection with backoff
-        success = retry_with_backoff(
-            lambda: initialize_elevenlabs_connection(socketio, language_name, session.session_id),
-            max_retries=STT_RETRY_COUNT,
-            session_id=session.session_id,
-            service_name="ElevenLabs",
-            socketio_instance=socketio
-        )
-        
-        if success:
+        def on_elevenlabs_reconnected():
             logger.info(f'✅ RECONNECT_SUCCESS | Session: {session.session_id} | Provider: ElevenLabs')
-        else:
+        
+        def on_elevenlabs_reconnect_failed():
             logger.error(f'❌ RECONNECT_FAILED | Session: {session.session_id} | Provider: ElevenLabs')
             socketio.emit('transcription_status', {
                 'status': 'error',
                 'message': f'Failed to reconnect to ElevenLabs after {STT_RETRY_COUNT + 1} attempts'
             }, room=session.session_id)
+        
+        # Retry connection with backoff in the background
+        start_connection_retry(
+            session,
+            lambda: initialize_elevenlabs_connection(transcript_emitter, language_name, session.session_id),
+            service_name="ElevenLabs",
+            on_success=on_elevenlabs_reconnected,
+            on_failure=on_elevenlabs_reconnect_failed,
+            on_abandon=lambda: close_elevenlabs_connection(session.session_id)
+        )
     
     else:  # Default to Deepgram
         if not API_KEY:
@@ -901,35 +1405,53 @@ def reconnect_transcription(data):
             return
         
         # Close existing connection first
-        stop_silence_timer(session)
-        stop_keep_alive(session)
-        if session.dg_connection:
-            try:
-                session.dg_connection.finish()
-            except Exception as e:
-                logger.warning(f"Error closing Deepgram connection before reconnect: {e}")
-            session.dg_connection = None
-        
-        # Retry connection with backoff
-        success = retry_with_backoff(
-            lambda: initialize_deepgram_connection(session, language_name),
-            max_retries=STT_RETRY_COUNT,
-            session_id=session.session_id,
-            service_name="Deepgram",
-            socketio_instance=socketio
-        )
+        cancel_connection_retry(session)
+        close_deepgram_connection(session)
         
-        if success:
+        def on_deepgram_reconnected():
             logger.info(f'✅ RECONNECT_SUCCESS | Session: {session.session_id} | Provider: Deepgram')
             socketio.emit('transcription_status', {'status': 'started', 'language': language_name, 'api': 'Deepgram API'}, room=session.session_id)
-        else:
+        
+        def on_deepgram_reconnect_failed():
             logger.error(f'❌ RECONNECT_FAILED | Session: {session.session_id} | Provider: Deepgram')
             socketio.emit('transcription_status', {
                 'status': 'error',
                 'message': f'Failed to reconnect to Deepgram after {STT_RETRY_COUNT + 1} attempts'
             }, room=session.session_id)
+        
+        # Retry connection with backoff in the background
+        start_connection_retry(
+            session,
+            lambda: initialize_deepgram_connection(session, language_name),
+            service_name="Deepgram",
+            on_success=on_deepgram_reconnected,
+            on_failure=on_deepgram_reconnect_failed,
+            on_abandon=lambda: close_deepgram_connection(session)
+        )
+
+def start_warm_pools():
+    """Open warm connections for WARM_POOL_LANGUAGES on every configured provider (WARM_POOL_SIZE > 0)"""
+    if WARM_POOL_SIZE <= 0:
+        return
+    warming = []
+    if deepgram:
+        for language_name in WARM_POOL_LANGUAGES:
+            deepgram_warm_pool.warm(language_name)
+        warming.append("Deepgram")
+    if AZURE_OPENAI_AVAILABLE and os.getenv("AZURE_OPENAI_API_KEY"):
+        from azure_openai_handler import azure_warm_pool
+        azure_warm_pool.warm("")  # Same session config for every language
+        warming.append("Azure OpenAI")
+    if ELEVENLABS_AVAILABLE and os.getenv("ELEVENLABS_API_KEY"):
+        from elevenlabs_handler import elevenlabs_warm_pool
+        for language_name in WARM_POOL_LANGUAGES:
+            elevenlabs_warm_pool.warm(language_name)
+        warming.append("ElevenLabs")
+    logger.info(f"🔥 WARM_POOL_START | Size: {WARM_POOL_SIZE} | Providers: {', '.join(warming) or 'none'} | "
+                f"Languages: {', '.join(WARM_POOL_LANGUAGES)}")
 
 if __name__ == '__main__':
+    start_warm_pools()
     logger.info(f"Starting Flask-SocketIO server on {HOST}:{PORT}")
     # use_reloader=False prevents duplicate log entries from parent/child processes
     # debug=True still gives us helpful error pages
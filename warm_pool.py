@@ -0,0 +1,345 @@
+"""
+Warm Provider Connection Pool
+Idle, already configured provider connections that a transcription start claims
+instead of paying for the TLS + WebSocket handshake and session setup (Deepgram
+start(), Azure transcription_session.update, ElevenLabs session_started) while the
+user waits.
+
+A WarmPool keeps up to WARM_POOL_SIZE ready connections per key (the settings a
+connection is opened with - the language for Deepgram and ElevenLabs). Claiming one
+hands it over and refills the pool in the background; a miss falls back to the usual
+connect path. Only keys passed to warm() are kept filled - claiming any other key just
+misses, so client-chosen keys never open connections or grow the pool.
+
+Idle connections are kept alive on the shared timer wheel (KeepAlive every
+WARM_POOL_KEEP_ALIVE_SEC, for providers that need one) and retired after
+WARM_POOL_MAX_IDLE_SEC, before the provider's own idle timeout can close them under
+a claim. Connections that close or fail while idle are dropped from the pool.
+
+The pool is provider agnostic: the handlers supply how to open (a Future resolving to
+a ready handle), close and keep alive a connection.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from performance_log import get_performance_logger
+from provider_io_loop import PROVIDER_OPEN_TIMEOUT_SEC
+from timer_wheel import WheelTimer, get_timer_wheel
+
+logger = logging.getLogger(__name__)
+performance_logger = get_performance_logger('warm_pool_performance')
+
+# Ready connections kept per provider and key (0 disables the pools)
+WARM_POOL_SIZE = int(os.getenv("WARM_POOL_SIZE", "0"))
+# Seconds an idle connection is kept before it is closed and replaced (below the providers' idle timeouts)
+WARM_POOL_MAX_IDLE_SEC = float(os.getenv("WARM_POOL_MAX_IDLE_SEC", "15"))
+# Seconds between KeepAlive messages on idle connections
+WARM_POOL_KEEP_ALIVE_SEC = float(os.getenv("WARM_POOL_KEEP_ALIVE_SEC", "8"))
+# Languages warmed at startup (comma separated)
+WARM_POOL_LANGUAGES = [lang.strip() for lang in os.getenv("WARM_POOL_LANGUAGES", "English").split(",") if lang.strip()]
+# Longest wait before retrying a key whose connections keep failing to open
+WARM_POOL_MAX_RETRY_SEC = 60.0
+
+
+class _IdleConnection:
+    """A ready connection waiting in the pool, with its keep-alive and retirement timers"""
+    __slots__ = ("handle", "key", "ready_at", "keep_alive_timer", "retire_timer")
+
+    def __init__(self, handle: Any, key: str):
+        self.handle = handle
+        self.key = key
+        self.ready_at = time.perf_counter()
+        self.keep_alive_timer: Optional[WheelTimer] = None
+        self.retire_timer: Optional[WheelTimer] = None
+
+    def cancel_timers(self):
+        if self.keep_alive_timer:
+            self.keep_alive_timer.cancel()
+        if self.retire_timer:
+            self.retire_timer.cancel()
+
+
+class WarmPool:
+    """
+    Pool of ready connections to one provider.
+
+    Args:
+        provider: Provider name for logs and metrics
+        open_connection: open_connection(key, on_lost) starts opening a connection and
+                         returns a Future resolving to its handle once it can take audio;
+                         on_lost(handle) must be called if the connection closes or fails
+                         afterwards. If the Future is cancelled the opener closes the connection.
+        close_connection: Closes a handle - thread-safe, never blocks
+        keep_alive: Sends a KeepAlive on an idle handle (None if the provider needs none)
+        size: Ready connections kept per key
+        max_idle_sec: Idle connections are retired after this long
+        keep_alive_sec: Seconds between KeepAlives
+        open_timeout_sec: Opens that take longer are abandoned
+    """
+
+    def __init__(self, provider: str, open_connection: Callable[[str, Callable[[Any], None]], Future],
+                 close_connection: Callable[[Any], None], keep_alive: Optional[Callable[[Any], None]] = None,
+                 size: int = WARM_POOL_SIZE, max_idle_sec: float = WARM_POOL_MAX_IDLE_SEC,
+                 keep_alive_sec: float = WARM_POOL_KEEP_ALIVE_SEC, open_timeout_sec: float = PROVIDER_OPEN_TIMEOUT_SEC + 5):
+        self.provider = provider
+        self.size = max(0, size)
+        self.max_idle_sec = max_idle_sec
+        self.keep_alive_sec = keep_alive_sec
+        self.open_timeout_sec = open_timeout_sec
+        self._open_connection = open_connection
+        self._close_connection = close_connection
+        self._keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._idle: Dict[str, Deque[_IdleConnection]] = {}
+        self._opening: Dict[str, int] = {}
+        self._pinned: Set[str] = set()
+        self._failures: Dict[str, int] = {}  # Consecutive failed opens per key
+        self._retry_timers: Dict[str, WheelTimer] = {}
+        self._closed = False
+        self.counters = {"hits": 0, "misses": 0, "opened": 0, "failed": 0, "retired": 0, "lost": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def idle_count(self, key: Optional[str] = None) -> int:
+        with self._lock:
+            if key is not None:
+                return len(self._idle.get(key, ()))
+            return sum(len(idle) for idle in self._idle.values())
+
+    def warm(self, key: str):
+        """Keep the pool filled for a key from now on"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pinned.add(key)
+        self._refill(key)
+
+    def claim(self, key: str) -> Optional[Any]:
+        """
+        Take a ready connection for a key and refill the pool in the background (warmed keys only)
+
+        Returns:
+            The connection's handle (now owned by the caller), or None if none is ready
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            idle = self._idle.get(key)
+            entry = idle.popleft() if idle else None
+            self.counters["hits" if entry else "misses"] += 1
+            pinned = key in self._pinned
+        if pinned:
+            self._refill(key)
+        if entry is None:
+            performance_logger.info(f"WARM_POOL_CLAIM | Provider: {self.provider} | Key: {key or '-'} | Result: miss")
+            return None
+        entry.cancel_timers()
+        idle_ms = (time.perf_counter() - entry.ready_at) * 1000
+        performance_logger.info(f"WARM_POOL_CLAIM | Provider: {self.provider} | Key: {key or '-'} | Result: hit | IdleTime: {idle_ms:.2f}ms")
+        return entry.handle
+
+    def _refill(self, key: str):
+        """Start opening connections until ready + opening reaches the pool size"""
+        with self._lock:
+            if self._closed or key in self._retry_timers:
+                return
+            missing = self.size - len(self._idle.get(key, ())) - self._opening.get(key, 0)
+            if missing <= 0:
+                return
+            self._opening[key] = self._opening.get(key, 0) + missing
+        for _ in range(missing):
+            self._open(key)
+
+    def _open(self, key: str):
+        started = time.perf_counter()
+        try:
+            future = self._open_connection(key, self._on_lost)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        timeout = get_timer_wheel().schedule(self.open_timeout_sec, future.cancel, name=f"warm-open:{self.provider}")
+        future.add_done_callback(lambda f: self._on_opened(key, f, started, timeout))
+
+    def _on_opened(self, key: str, future: Future, started: float, timeout: WheelTimer):
+        timeout.cancel()
+        error = None
+        if future.cancelled():
+            error = TimeoutError(f"not ready within {self.open_timeout_sec}s")
+        elif future.exception():
+            error = future.exception()
+        with self._lock:
+            self._opening[key] -= 1
+            if error:
+                self.counters["failed"] += 1
+                failures = self._failures[key] = self._failures.get(key, 0) + 1
+            else:
+                self.counters["opened"] += 1
+                self._failures.pop(key, None)
+            closed = self._closed
+        if error:
+            logger.warning(f"⚠️ WARM_POOL_OPEN_FAILED | Provider: {self.provider} | Key: {key or '-'} | "
+                           f"Exception: {type(error).__name__}: {error}")
+            self._schedule_retry(key, failures)
+            return
+        handle = future.result()
+        if closed:
+            self._close(handle)
+            return
+        entry = _IdleConnection(handle, key)
+        wheel = get_timer_wheel()
+        if self._keep_alive and self.keep_alive_sec > 0:
+            entry.keep_alive_timer = wheel.schedule(self.keep_alive_sec, lambda: self._send_keep_alive(entry),
+                                                    name=f"warm-keepalive:{self.provider}")
+        entry.retire_timer = wheel.schedule(self.max_idle_sec, lambda: self._retire(entry), name=f"warm-retire:{self.provider}")
+        with self._lock:
+            self._idle.setdefault(key, deque()).append(entry)
+        logger.info(f"🔥 WARM_POOL_READY | Provider: {self.provider} | Key: {key or '-'} | "
+                    f"OpenTime: {(time.perf_counter() - started) * 1000:.0f}ms | Idle: {self.idle_count(key)}")
+
+    def _schedule_retry(self, key: str, failures: int):
+        """Back off before opening for a key again (a claim or a retired connection would otherwise retry at once)"""
+        delay = min(2 ** failures, WARM_POOL_MAX_RETRY_SEC)
+
+        def retry():
+            with self._lock:
+                self._retry_timers.pop(key, None)
+            if key in self._pinned:
+                self._refill(key)
+
+        with self._lock:
+            if self._closed or key in self._retry_timers:
+                return
+            self._retry_timers[key] = get_timer_wheel().schedule(delay, retry, name=f"warm-retry:{self.provider}")
+
+    def _remove(self, entry: _IdleConnection) -> bool:
+        """Take an entry out of the pool; False if it was already claimed or removed"""
+        with self._lock:
+            idle = self._idle.get(entry.key)
+            if not idle or entry not in idle:
+                return False
+            idle.remove(entry)
+        entry.cancel_timers()
+        return True
+
+    def _send_keep_alive(self, entry: _IdleConnection):
+        with self._lock:
+            if entry not in self._idle.get(entry.key, ()):
+                return  # Claimed or retired meanwhile
+        try:
+            self._keep_alive(entry.handle)
+        except Exception as e:
+            logger.warning(f"⚠️ WARM_POOL_KEEPALIVE_FAILED | Provider: {self.provider} | Exception: {type(e).__name__}: {e}")
+            self._on_lost(entry.handle)
+            return
+        entry.keep_alive_timer.reset(self.keep_alive_sec)
+
+    def _retire(self, entry: _IdleConnection):
+        """Close a connection that has been idle for max_idle_sec and replace it if its key is kept warm"""
+        if not self._remove(entry):
+            return
+        with self._lock:
+            self.counters["retired"] += 1
+            pinned = entry.key in self._pinned
+        self._close(entry.handle)
+        if pinned:
+            self._refill(entry.key)
+
+    def _on_lost(self, handle: Any):
+        """An idle connection closed or failed - drop it (no-op once the connection has been claimed)"""
+        with self._lock:
+            entry = next((e for idle in self._idle.values() for e in idle if e.handle is handle), None)
+        if entry is None or not self._remove(entry):
+            return
+        with self._lock:
+            self.counters["lost"] += 1
+            pinned = entry.key in self._pinned
+        logger.warning(f"⚠️ WARM_POOL_LOST | Provider: {self.provider} | Key: {entry.key or '-'} | "
+                       f"IdleTime: {(time.perf_counter() - entry.ready_at) * 1000:.0f}ms")
+        self._close(handle)
+        if pinned:
+            self._refill(entry.key)
+
+    def _close(self, handle: Any):
+        try:
+            self._close_connection(handle)
+        except Exception as e:
+            logger.debug(f"Error closing warm {self.provider} connection: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["idle"] = sum(len(idle) for idle in self._idle.values())
+            stats["opening"] = sum(self._opening.values())
+        return stats
+
+    def shutdown(self):
+        """Close every idle connection and stop refilling"""
+        with self._lock:
+            self._closed = True
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+            retry_timers = list(self._retry_timers.values())
+            self._retry_timers.clear()
+        for timer in retry_timers:
+            timer.cancel()
+        for entry in entries:
+            entry.cancel_timers()
+            self._close(entry.handle)
+
+
+# Process-wide pools, one per provider
+_warm_pools: Dict[str, WarmPool] = {}
+_warm_pools_lock = threading.Lock()
+
+
+def get_warm_pool(provider: str, open_connection: Callable[[str, Callable[[Any], None]], Future],
+                  close_connection: Callable[[Any], None], keep_alive: Optional[Callable[[Any], None]] = None) -> WarmPool:
+    """Get the process-wide pool for a provider, creating it on first use (connections open on warm() / claim())"""
+    with _warm_pools_lock:
+        pool = _warm_pools.get(provider)
+        if pool is None:
+            pool = _warm_pools[provider] = WarmPool(provider, open_connection, close_connection, keep_alive)
+            atexit.register(pool.shutdown)
+        return pool
+
+
+def warm_pools() -> List[WarmPool]:
+    with _warm_pools_lock:
+        return list(_warm_pools.values())
+
+
+def warm_pool_prometheus_text() -> str:
+    """Claim, open and idle counts of every enabled pool in Prometheus text exposition format"""
+    pools = [pool for pool in warm_pools() if pool.enabled]
+    if not pools:
+        return ""
+    stats = {pool.provider: pool.stats() for pool in pools}
+    lines = [
+        "# HELP stt_warm_pool_claims_total Transcription starts that claimed a warm connection (hit) or had to connect (miss)",
+        "# TYPE stt_warm_pool_claims_total counter",
+    ]
+    for provider, s in stats.items():
+        lines.append(f'stt_warm_pool_claims_total{{provider="{provider}",result="hit"}} {s["hits"]}')
+        lines.append(f'stt_warm_pool_claims_total{{provider="{provider}",result="miss"}} {s["misses"]}')
+    lines += [
+        "# HELP stt_warm_pool_connections_total Warm connections by outcome",
+        "# TYPE stt_warm_pool_connections_total counter",
+    ]
+    for provider, s in stats.items():
+        for outcome in ("opened", "failed", "retired", "lost"):
+            lines.append(f'stt_warm_pool_connections_total{{provider="{provider}",outcome="{outcome}"}} {s[outcome]}')
+    lines += [
+        "# HELP stt_warm_pool_idle_connections Ready connections waiting in the pool",
+        "# TYPE stt_warm_pool_idle_connections gauge",
+    ]
+    for provider, s in stats.items():
+        lines.append(f'stt_warm_pool_idle_connections{{provider="{provider}"}} {s["idle"]}')
+    return "\n".join(lines) + "\n"